@@ -0,0 +1,69 @@
+"""
+管理员运行指标接口
+汇总当前 worker 的数据库连接池等运行时统计，只对管理员开放
+"""
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app import models
+from app.core.database import get_pool_stats
+from app.core.query_stats import query_metrics
+from app.core.password_pool import password_hash_pool
+from app.utils.cache import Cache
+from app.utils.deps import get_admin_user as get_current_admin_user
+from app.schemas.common import success_response
+
+router = APIRouter()
+
+
+def _chat_model_stats() -> Dict[str, Any]:
+    from app.services.langchain.chat.pool import chat_model_pool
+    return chat_model_pool.stats()
+
+
+def _llm_response_cache_stats() -> Dict[str, Any]:
+    from app.services.langchain.response_cache import llm_response_cache
+    return llm_response_cache.stats()
+
+
+def _http_client_stats() -> Dict[str, Any]:
+    from app.core.http_client import http_client_stats
+    return http_client_stats()
+
+
+# 指标分组 -> 统计函数
+METRIC_SECTIONS: Dict[str, Callable[[], Any]] = {
+    "db": get_pool_stats,
+    "password_hash": password_hash_pool.stats,
+    "queries": query_metrics.stats,
+    "chat_models": _chat_model_stats,
+    "llm_cache": _llm_response_cache_stats,
+    "http_clients": _http_client_stats,
+    "cache": Cache.stats,
+}
+
+
+@router.get("")
+def get_metrics(
+    section: Optional[str] = Query(None, description="只返回指定分组（" + "/".join(METRIC_SECTIONS) + "），不传返回全部"),
+    current_user: models.User = Depends(get_current_admin_user),
+) -> Any:
+    """
+    获取运行指标
+
+    - db: 数据库连接池状态（主库/只读副本/异步引擎）
+    - password_hash: 密码哈希线程池状态（排队数、平均/最大排队耗时、平均计算耗时）
+    - queries: SQL 查询统计（各接口平均/最大 SQL 条数、数据库耗时，慢查询语句汇总）
+    - chat_models: Chat Model 实例池状态（实例数、命中率、淘汰数、bind_tools 复用情况）
+    - llm_cache: LLM 响应缓存状态（命中率、写入/跳过/淘汰次数）
+    - http_clients: 第三方 AI 接口共享连接池状态（各主机连接池数量、是否启用 HTTP/2）
+    - cache: 应用缓存状态（L1 本地/L2 Redis 命中次数，L1 与内存降级存储的条目数和占用）
+
+    **权限要求**: 管理员
+    """
+    if section is not None:
+        if section not in METRIC_SECTIONS:
+            raise HTTPException(status_code=404, detail=f"未知的指标分组: {section}")
+        return success_response(data={section: METRIC_SECTIONS[section]()})
+    return success_response(data={name: collect() for name, collect in METRIC_SECTIONS.items()})
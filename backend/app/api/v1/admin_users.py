@@ -8,7 +8,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from sqlalchemy import func, or_
 from app import models
-from app.utils.deps import get_db, get_admin_user as get_current_admin_user
+from app.core.security import invalidate_auth_user
+from app.utils.quota import daily_quota_counter
+from app.utils.deps import get_db, get_read_db, get_admin_user as get_current_admin_user
 from app.schemas.common import success_response
 
 router = APIRouter()
@@ -20,7 +22,7 @@ def get_user_list(
     page_size: int = 20,
     keyword: str = None,
     current_user: models.User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     获取用户列表（分页）
@@ -139,7 +141,7 @@ def get_user_detail(
                 "status": user.status,
                 "credits": user.credits,
                 "daily_quota": user.daily_quota,
-                "used_quota": user.used_quota,
+                "used_quota": daily_quota_counter.usage(user.id),  # 当日实时用量，数据库中的值由同步任务定期写回
                 "total_creations": user.total_creations,
                 "is_member": user.is_member,
                 "member_expired_at": user.member_expired_at,
@@ -193,6 +195,7 @@ def reset_user_password(
     # 重置密码为 123456
     user.password_hash = get_password_hash("123456")
     db.commit()
+    invalidate_auth_user(user.id)
     
     return success_response(message="密码已重置为 123456")
 
@@ -289,5 +292,6 @@ def delete_user(
     user.deleted_at = datetime.now()
     user.status = "inactive"
     db.commit()
+    invalidate_auth_user(user.id)
     
     return success_response(message="用户已成功删除")
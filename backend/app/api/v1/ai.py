@@ -21,7 +21,7 @@ router = APIRouter()
 
 
 @router.get("/models/available")
-async def get_available_models(
+def get_available_models(
     scene_type: str = None,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
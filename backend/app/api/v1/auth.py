@@ -4,15 +4,22 @@
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.database_async import get_async_db
+from app.utils.rate_limiter import rate_limit
 from app.core.security import (
+    aget_password_hash,
+    averify_password,
     create_access_token,
     create_refresh_token,
     get_current_user,
     get_password_hash,
+    invalidate_auth_user,
     verify_password,
 )
 from app.models.credit import TransactionType
@@ -26,46 +33,49 @@ from app.schemas.user import (
     PasswordResetRequest,
     PasswordResetConfirm,
 )
-from app.services.credit_service import CreditService
+from app.services.credit_service import AsyncCreditService
 
 router = APIRouter()
 
+# 登录/注册类接口按 IP 限流，防止暴力破解和批量注册
+_auth_rate_limit = rate_limit(settings.RATE_LIMIT_AUTH_PER_MINUTE, 60)
 
-@router.post("/register")
-def register(user_in: UserRegister, db: Session = Depends(get_db)) -> Any:
+
+@router.post("/register", dependencies=[Depends(_auth_rate_limit)])
+async def register(user_in: UserRegister, db: AsyncSession = Depends(get_async_db)) -> Any:
     """
     用户注册
     """
     # 检查用户名是否已存在
-    user = db.query(User).filter(User.username == user_in.username).first()
-    if user:
+    result = await db.execute(select(User.id).where(User.username == user_in.username))
+    if result.first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="用户名已存在",
         )
     
     # 检查邮箱是否已存在
-    user = db.query(User).filter(User.email == user_in.email).first()
-    if user:
+    result = await db.execute(select(User.id).where(User.email == user_in.email))
+    if result.first():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="邮箱已被注册",
         )
     
-    # 创建新用户
+    # 创建新用户（bcrypt 在密码哈希线程池中计算）
     user = User(
         username=user_in.username,
         email=user_in.email,
-        password_hash=get_password_hash(user_in.password),
+        password_hash=await aget_password_hash(user_in.password),
         nickname=user_in.nickname,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     
     # 新用户注册赠送 1000 积分
     try:
-        CreditService.add_credits(
+        await AsyncCreditService.add_credits(
             db=db,
             user_id=user.id,
             amount=1000,
@@ -76,22 +86,25 @@ def register(user_in: UserRegister, db: Session = Depends(get_db)) -> Any:
         # 赠送积分失败不影响注册流程
         import logging
         logging.error(f"新用户注册赠送积分失败：{e}")
+        await db.rollback()
     
+    await db.refresh(user)
     return success_response(data=UserResponse.model_validate(user).model_dump())
 
 
-@router.post("/login")
-def login(user_in: UserLogin, db: Session = Depends(get_db)) -> Any:
+@router.post("/login", dependencies=[Depends(_auth_rate_limit)])
+async def login(user_in: UserLogin, db: AsyncSession = Depends(get_async_db)) -> Any:
     """
     用户登录（支持用户名或邮箱登录）
     """
     # 查找用户 - 同时支持用户名和邮箱
-    user = db.query(User).filter(
+    result = await db.execute(select(User).where(
         (User.username == user_in.username) | 
         (User.email == user_in.username)
-    ).first()
+    ))
+    user = result.scalars().first()
     
-    if not user or not verify_password(user_in.password, user.password_hash):
+    if not user or not await averify_password(user_in.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="账号或密码不正确，请重新输入",
@@ -106,7 +119,8 @@ def login(user_in: UserLogin, db: Session = Depends(get_db)) -> Any:
     # 更新最后登录时间和IP
     from datetime import datetime
     user.last_login_at = datetime.utcnow()
-    db.commit()
+    await db.commit()
+    await db.refresh(user)
     
     # 生成访问令牌和刷新令牌
     access_token = create_access_token(subject=user.id)
@@ -217,11 +231,12 @@ def change_password(
     
     current_user.password_hash = get_password_hash(password_change.new_password)
     db.commit()
+    invalidate_auth_user(current_user.id)
     
     return success_response(message="密码修改成功")
 
 
-@router.post("/password-reset/request")
+@router.post("/password-reset/request", dependencies=[Depends(_auth_rate_limit)])
 def request_password_reset(
     reset_request: PasswordResetRequest,
     db: Session = Depends(get_db),
@@ -259,7 +274,7 @@ def request_password_reset(
     )
 
 
-@router.post("/password-reset/confirm")
+@router.post("/password-reset/confirm", dependencies=[Depends(_auth_rate_limit)])
 def confirm_password_reset(
     reset_confirm: PasswordResetConfirm,
     db: Session = Depends(get_db),
@@ -303,5 +318,6 @@ def confirm_password_reset(
     
     user.password_hash = get_password_hash(reset_confirm.new_password)
     db.commit()
+    invalidate_auth_user(user.id)
     
     return success_response(message="密码重置成功，请使用新密码登录")
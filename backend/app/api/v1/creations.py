@@ -3,11 +3,15 @@
 """
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, or_
+from sqlalchemy import desc, func, or_, select
 
 from app.core.database import get_db
+from app.core.database_async import get_async_db
 from app.core.security import get_current_user
+from app.utils.deps import get_current_user_async
+from app.utils.pagination import async_cached_count, keyset_filter, keyset_order_by, split_page
 from app.models.user import User
 from app.models.creation import Creation
 from app.schemas.creation import (
@@ -23,65 +27,86 @@ router = APIRouter()
 
 @router.get("", response_model=CreationListResponse)
 async def get_creations(
-    skip: int = Query(0, ge=0, description="跳过的记录数"),
+    skip: int = Query(0, ge=0, description="跳过的记录数（兼容旧分页，建议使用 cursor）"),
     limit: int = Query(20, ge=1, le=100, description="返回的记录数"),
+    cursor: Optional[str] = Query(None, description="分页游标，取上一页返回的 next_cursor"),
+    with_total: bool = Query(True, description="是否返回总数（缓存 60 秒）"),
     content_type: Optional[str] = Query(None, description="内容类型筛选"),
     tool_type: Optional[str] = Query(None, description="工具类型筛选"),
     search: Optional[str] = Query(None, description="搜索关键词"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     获取创作列表
     
-    支持分页、筛选和搜索功能
+    支持游标分页、筛选和搜索功能
     """
-    # 构建查询
-    query = db.query(Creation).filter(Creation.user_id == current_user.id)
+    # 构建查询条件
+    conditions = [Creation.user_id == current_user.id]
     
     # 内容类型筛选
     if content_type:
-        query = query.filter(Creation.creation_type == content_type)
+        conditions.append(Creation.creation_type == content_type)
     
     # 工具类型筛选
     if tool_type:
-        query = query.filter(Creation.creation_type == tool_type)
+        conditions.append(Creation.creation_type == tool_type)
     
     # 搜索功能
     if search:
         search_pattern = f"%{search}%"
-        query = query.filter(
+        conditions.append(
             or_(
                 Creation.title.like(search_pattern),
                 Creation.output_content.like(search_pattern)
             )
         )
     
-    # 获取总数
-    total = query.count()
+    # 分页和排序（多取一条判断是否还有下一页）
+    stmt = select(Creation).where(*conditions)
+    if cursor:
+        stmt = stmt.where(keyset_filter(Creation, cursor))
+    elif skip:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt.order_by(*keyset_order_by(Creation)).limit(limit + 1))
+    creations, next_cursor = split_page(result.scalars().all(), limit)
     
-    # 分页和排序
-    creations = query.order_by(desc(Creation.created_at)).offset(skip).limit(limit).all()
+    # 获取总数
+    total = None
+    if with_total:
+        total = await async_cached_count(
+            "creations",
+            lambda: db.scalar(select(func.count(Creation.id)).where(*conditions)),
+            user_id=current_user.id,
+            content_type=content_type,
+            tool_type=tool_type,
+            search=search,
+        )
     
     return {
         "total": total,
-        "items": creations
+        "items": creations,
+        "next_cursor": next_cursor
     }
 
 
 @router.get("/{creation_id}", response_model=CreationResponse)
 async def get_creation(
     creation_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """
     获取创作详情
     """
-    creation = db.query(Creation).filter(
-        Creation.id == creation_id,
-        Creation.user_id == current_user.id
-    ).first()
+    result = await db.execute(
+        select(Creation).where(
+            Creation.id == creation_id,
+            Creation.user_id == current_user.id
+        )
+    )
+    creation = result.scalar_one_or_none()
     
     if not creation:
         raise HTTPException(status_code=404, detail="创作记录不存在")
@@ -1,10 +1,15 @@
 """
 积分和会员API路由
 """
-from fastapi import APIRouter, Depends, Query
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
+from app.core.database_async import get_async_db
+from app.models.credit import TransactionType
 from app.models.user import User
 from app.schemas.common import success_response, PaginatedResponse
 from app.schemas.credit import (
@@ -13,11 +18,15 @@ from app.schemas.credit import (
     MembershipOrderCreate, MembershipOrderResponse,
     CreditPriceResponse, MembershipPriceResponse,
     CreditPriceCreate, MembershipPriceCreate,
-    PaymentCallbackRequest, UnifiedPaymentCallbackRequest
+    PaymentCallbackRequest, UnifiedPaymentCallbackRequest,
+    CreditGrantCreate
 )
 from app.services.credit_service import (
     CreditService, RechargeService, MembershipService, PriceService
 )
+from app.services.credit_grant_service import (
+    CreditGrantService, grant_progress, parse_amounts, run_grant_in_background
+)
 from app.utils.deps import get_current_user, get_admin_user
 
 router = APIRouter(tags=["积分和会员"])
@@ -39,19 +48,22 @@ async def get_balance(
 async def get_transactions(
     skip: int = Query(0, ge=0),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="分页游标，取上一页返回的 next_cursor"),
+    with_total: bool = Query(True, description="是否返回总数（缓存 60 秒）"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """获取积分交易记录"""
-    transactions, total = CreditService.get_transactions(
-        db, current_user.id, skip, limit
+    transactions, total, next_cursor = CreditService.get_transactions(
+        db, current_user.id, skip, limit, cursor=cursor, with_total=with_total
     )
     return success_response(data=PaginatedResponse(
         items=[CreditTransactionResponse.from_orm(t) for t in transactions],
         total=total,
         page=skip // limit + 1,
         page_size=limit,
-        total_pages=(total + limit - 1) // limit
+        total_pages=(total + limit - 1) // limit if total is not None else None,
+        next_cursor=next_cursor
     ))
 
 
@@ -201,17 +213,17 @@ async def get_membership_statistics(
 # ==================== 价格配置相关 ====================
 
 @router.get("/prices")
-async def get_credit_prices(db: Session = Depends(get_db)):
+def get_credit_prices(db: Session = Depends(get_db)):
     """获取积分价格列表（公开接口）"""
     prices = PriceService.get_credit_prices(db)
-    return success_response(data=[CreditPriceResponse.from_orm(p) for p in prices])
+    return success_response(data=prices)
 
 
 @router.get("/membership/prices")
-async def get_membership_prices(db: Session = Depends(get_db)):
+def get_membership_prices(db: Session = Depends(get_db)):
     """获取会员价格列表（公开接口）"""
     prices = PriceService.get_membership_prices(db)
-    return success_response(data=[MembershipPriceResponse.from_orm(p) for p in prices])
+    return success_response(data=prices)
 
 
 # ==================== 管理员接口 ====================
@@ -282,3 +294,54 @@ async def delete_membership_price(
     """删除会员价格配置（管理员）"""
     success = PriceService.delete_membership_price(db, price_id)
     return success_response(data={"success": success})
+
+
+@router.post("/admin/grants")
+async def create_credit_grant(
+    grant_data: CreditGrantCreate,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    批量发放积分（管理员）
+
+    同一 campaign_key 重复提交返回已有批次；新批次在后台分块执行，通过查询接口获取进度
+    """
+    grant, created = await CreditGrantService.create_grant(
+        db,
+        grant_data.campaign_key,
+        parse_amounts(grant_data.user_ids, grant_data.amount, grant_data.items),
+        transaction_type=TransactionType(grant_data.transaction_type),
+        description=grant_data.description,
+        related_id=grant_data.related_id,
+        related_type=grant_data.related_type,
+        created_by=current_user.id
+    )
+    if created:
+        background_tasks.add_task(run_grant_in_background, grant.id)
+    return success_response(data={"created": created, **grant_progress(grant).dict()})
+
+
+@router.get("/admin/grants/{grant_id}")
+async def get_credit_grant(
+    grant_id: int,
+    current_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """查询批量发放进度（管理员）"""
+    grant = await CreditGrantService.get_grant(db, grant_id)
+    return success_response(data=grant_progress(grant))
+
+
+@router.post("/admin/grants/{grant_id}/resume")
+async def resume_credit_grant(
+    grant_id: int,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """继续执行中断或失败的批量发放（管理员），已发放的用户不会重复发放"""
+    grant = await CreditGrantService.get_grant(db, grant_id)
+    background_tasks.add_task(run_grant_in_background, grant.id)
+    return success_response(data=grant_progress(grant))
@@ -8,20 +8,31 @@ import asyncio
 from datetime import datetime
 from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import atomic, get_db
+from app.core.database_async import get_async_db
+from app.utils.rate_limiter import rate_limit, TOKEN_BUCKET
+from app.utils.quota import daily_quota
 from app.models.user import User
 from app.models.creation import Creation, CreationStatus
-from app.models.credit import CreditTransaction, TransactionType
+from app.services.credit_service import CreditService
 from app.schemas.common import success_response
-from app.utils.deps import get_current_user
+from app.utils.deps import get_current_user, get_current_user_async
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# 生成接口按用户限流（令牌桶，允许少量突发），并计入每日配额
+_generate_rate_limit = rate_limit(settings.RATE_LIMIT_GENERATE_PER_MINUTE, 60, algorithm=TOKEN_BUCKET)
+_generate_quota = daily_quota()
+
+
 # 图片存储目录
 IMAGE_STORAGE_DIR = "uploads/images"
 
@@ -303,7 +314,7 @@ async def process_image_upscale(db: Session, creation_id: int, request_data: dic
             db.commit()
 
 
-@router.post("/generate")
+@router.post("/generate", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def generate_image(
     request: ImageGenerateRequest,
     background_tasks: BackgroundTasks,
@@ -325,6 +336,7 @@ async def generate_image(
         # 创建创作记录
         creation = Creation(
             user_id=current_user.id,
+            task_id=task_id,
             creation_type="image",
             title=f"图片生成: {request.prompt[:50]}",
             input_data={
@@ -341,20 +353,12 @@ async def generate_image(
         db.add(creation)
         
         # 扣除积分
-        current_user.credits -= required_credits
-        transaction = CreditTransaction(
-            user_id=current_user.id,
-            transaction_type=TransactionType.CONSUME,
-            amount=-required_credits,
-            balance_before=current_user.credits + required_credits,
-            balance_after=current_user.credits,
-            description=f"图片生成: {request.num_images}张",
-            related_id=creation.id,
-            related_type="creation"
-        )
-        db.add(transaction)
-        
-        db.commit()
+        with atomic(db):
+            db.flush()  # 取得 creation.id 作为流水关联
+            CreditService.check_and_consume_credits(
+                db, current_user.id, required_credits, f"图片生成: {request.num_images}张",
+                related_id=creation.id, related_type="creation", member_free=False
+            )
         db.refresh(creation)
         
         # 添加后台任务处理图片生成
@@ -379,7 +383,7 @@ async def generate_image(
         raise HTTPException(status_code=500, detail=f"图片生成失败: {str(e)}")
 
 
-@router.post("/variation")
+@router.post("/variation", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def create_image_variation(
     request: ImageVariationRequest,
     background_tasks: BackgroundTasks,
@@ -397,6 +401,7 @@ async def create_image_variation(
         
         creation = Creation(
             user_id=current_user.id,
+            task_id=task_id,
             creation_type="image",
             title="图片变体",
             input_data={
@@ -409,19 +414,12 @@ async def create_image_variation(
         )
         db.add(creation)
         
-        current_user.credits -= required_credits
-        transaction = CreditTransaction(
-            user_id=current_user.id,
-            transaction_type=TransactionType.CONSUME,
-            amount=-required_credits,
-            balance_before=current_user.credits + required_credits,
-            balance_after=current_user.credits,
-            description=f"图片变体: {request.num_variations}张",
-            related_id=creation.id,
-            related_type="creation"
-        )
-        db.add(transaction)
-        db.commit()
+        with atomic(db):
+            db.flush()  # 取得 creation.id 作为流水关联
+            CreditService.check_and_consume_credits(
+                db, current_user.id, required_credits, f"图片变体: {request.num_variations}张",
+                related_id=creation.id, related_type="creation", member_free=False
+            )
         db.refresh(creation)
         
         background_tasks.add_task(
@@ -445,7 +443,7 @@ async def create_image_variation(
         raise HTTPException(status_code=500, detail=f"图片变体失败: {str(e)}")
 
 
-@router.post("/edit")
+@router.post("/edit", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def edit_image(
     request: ImageEditRequest,
     background_tasks: BackgroundTasks,
@@ -463,6 +461,7 @@ async def edit_image(
         
         creation = Creation(
             user_id=current_user.id,
+            task_id=task_id,
             creation_type="image",
             title=f"图片编辑: {request.prompt[:50]}",
             input_data={
@@ -476,19 +475,12 @@ async def edit_image(
         )
         db.add(creation)
         
-        current_user.credits -= required_credits
-        transaction = CreditTransaction(
-            user_id=current_user.id,
-            transaction_type=TransactionType.CONSUME,
-            amount=-required_credits,
-            balance_before=current_user.credits + required_credits,
-            balance_after=current_user.credits,
-            description="图片编辑",
-            related_id=creation.id,
-            related_type="creation"
-        )
-        db.add(transaction)
-        db.commit()
+        with atomic(db):
+            db.flush()  # 取得 creation.id 作为流水关联
+            CreditService.check_and_consume_credits(
+                db, current_user.id, required_credits, "图片编辑",
+                related_id=creation.id, related_type="creation", member_free=False
+            )
         db.refresh(creation)
         
         background_tasks.add_task(
@@ -512,7 +504,7 @@ async def edit_image(
         raise HTTPException(status_code=500, detail=f"图片编辑失败: {str(e)}")
 
 
-@router.post("/upscale")
+@router.post("/upscale", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def upscale_image(
     request: ImageUpscaleRequest,
     background_tasks: BackgroundTasks,
@@ -530,6 +522,7 @@ async def upscale_image(
         
         creation = Creation(
             user_id=current_user.id,
+            task_id=task_id,
             creation_type="image",
             title=f"图片放大 {request.scale}x",
             input_data={
@@ -542,19 +535,12 @@ async def upscale_image(
         )
         db.add(creation)
         
-        current_user.credits -= required_credits
-        transaction = CreditTransaction(
-            user_id=current_user.id,
-            transaction_type=TransactionType.CONSUME,
-            amount=-required_credits,
-            balance_before=current_user.credits + required_credits,
-            balance_after=current_user.credits,
-            description=f"图片放大 {request.scale}x",
-            related_id=creation.id,
-            related_type="creation"
-        )
-        db.add(transaction)
-        db.commit()
+        with atomic(db):
+            db.flush()  # 取得 creation.id 作为流水关联
+            CreditService.check_and_consume_credits(
+                db, current_user.id, required_credits, f"图片放大 {request.scale}x",
+                related_id=creation.id, related_type="creation", member_free=False
+            )
         db.refresh(creation)
         
         background_tasks.add_task(
@@ -581,25 +567,33 @@ async def upscale_image(
 @router.get("/task/{task_id}")
 async def get_image_task_status(
     task_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """获取图片任务状态"""
     try:
-        # 从 input_data 中查找包含指定 task_id 的创作记录
-        # SQLite JSON 查询需要特殊处理
-        all_creations = db.query(Creation).filter(
-            Creation.user_id == current_user.id,
-            Creation.creation_type == "image"
-        ).all()
-        
-        # 在内存中查找匹配的 task_id
-        creation = None
-        for c in all_creations:
-            if c.input_data and isinstance(c.input_data, dict):
-                if c.input_data.get("task_id") == task_id:
-                    creation = c
-                    break
+        result = await db.execute(
+            select(Creation).where(
+                Creation.task_id == task_id,
+                Creation.user_id == current_user.id
+            )
+        )
+        creation = result.scalar_one_or_none()
+
+        if not creation:
+            # 兼容 task_id 只记录在 input_data 中的旧记录
+            result = await db.execute(
+                select(Creation).where(
+                    Creation.user_id == current_user.id,
+                    Creation.creation_type == "image",
+                    Creation.task_id.is_(None)
+                )
+            )
+            for c in result.scalars():
+                if c.input_data and isinstance(c.input_data, dict):
+                    if c.input_data.get("task_id") == task_id:
+                        creation = c
+                        break
         
         if not creation:
             raise HTTPException(status_code=404, detail="任务不存在")
@@ -9,8 +9,9 @@ from sqlalchemy import func, desc
 
 from app import models
 from app.models.model_usage_log import AIModelUsageLog
-from app.utils.deps import get_db, get_admin_user as get_current_admin_user
+from app.utils.deps import get_db, get_read_db, get_admin_user as get_current_admin_user
 from app.schemas.common import success_response
+from app.utils.pagination import cached_count, keyset_filter, keyset_order_by, split_page
 
 router = APIRouter()
 
@@ -23,12 +24,16 @@ def get_usage_logs(
     tool: Optional[str] = None,
     status: Optional[str] = None,
     user_id: Optional[int] = None,
+    cursor: Optional[str] = Query(None, description="分页游标，取上一页返回的 next_cursor（传入时忽略 page）"),
+    with_total: bool = Query(True, description="是否返回总数（缓存 60 秒）"),
     current_user: models.User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     获取模型调用日志（分页）
     
+    日志量很大时请使用 cursor 翻页并关闭 with_total
+    
     **权限要求**: 管理员
     """
     query = db.query(AIModelUsageLog)
@@ -42,8 +47,19 @@ def get_usage_logs(
     if user_id:
         query = query.filter(AIModelUsageLog.user_id == user_id)
     
-    total = query.count()
-    logs = query.order_by(desc(AIModelUsageLog.created_at)).offset((page - 1) * page_size).limit(page_size).all()
+    total = None
+    if with_total:
+        total = cached_count(
+            "model_usage_logs", query.count,
+            provider=provider, tool=tool, status=status, user_id=user_id
+        )
+    
+    if cursor:
+        query = query.filter(keyset_filter(AIModelUsageLog, cursor))
+    elif page > 1:
+        query = query.offset((page - 1) * page_size)
+    rows = query.order_by(*keyset_order_by(AIModelUsageLog)).limit(page_size + 1).all()
+    logs, next_cursor = split_page(rows, page_size)
     
     items = []
     for log in logs:
@@ -74,6 +90,7 @@ def get_usage_logs(
             "page": page,
             "page_size": page_size,
             "items": items,
+            "next_cursor": next_cursor,
         },
         message="success"
     )
@@ -122,7 +139,7 @@ def get_usage_log_detail(
 @router.get("/stats")
 def get_usage_stats(
     current_user: models.User = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     获取模型调用统计概览
@@ -19,6 +19,7 @@ from app.schemas.ai_model import (
     AIModelTestResponse
 )
 from app.services.ai.factory import AIServiceFactory
+from app.services.model_service import ModelService
 
 router = APIRouter()
 
@@ -120,6 +121,7 @@ async def create_model(
     db.add(model)
     db.commit()
     db.refresh(model)
+    ModelService.invalidate_available_models(current_user.id, system_builtin=model.is_system_builtin)
 
     return _model_to_response(model, is_admin, current_user.id)
 
@@ -167,11 +169,16 @@ async def update_model(
         if existing:
             raise HTTPException(status_code=400, detail="模型名称已存在")
 
+    was_system_builtin = model.is_system_builtin
     for field, value in update_data.items():
         setattr(model, field, value)
 
     db.commit()
     db.refresh(model)
+    ModelService.invalidate_available_models(
+        model.user_id or current_user.id,
+        system_builtin=was_system_builtin or model.is_system_builtin,
+    )
 
     return _model_to_response(model, is_admin, current_user.id)
 
@@ -201,8 +208,11 @@ async def delete_model(
     if not model:
         raise HTTPException(status_code=404, detail="模型不存在")
 
+    owner_id = model.user_id or current_user.id
+    system_builtin = model.is_system_builtin
     db.delete(model)
     db.commit()
+    ModelService.invalidate_available_models(owner_id, system_builtin=system_builtin)
 
     return {"message": "删除成功"}
 
@@ -22,6 +22,7 @@ from app.schemas.oauth import (
     ChatCompletionRequest,
     ChatCompletionResponse,
 )
+from app.services.model_service import ModelService
 from app.services.oauth.adapters import get_adapter, PLATFORM_ADAPTERS
 from app.services.oauth.oauth_service import oauth_service
 from app.services.oauth.oauth_session import oauth_session_manager
@@ -235,6 +236,7 @@ async def submit_oauth_cookies(
             db.refresh(existing_account)
             
             print(f"更新现有账号: {existing_account.id}")
+            ModelService.invalidate_available_models(current_user.id)
             account_dict = OAuthAccountResponse.from_orm(existing_account).dict()
         else:
             # 创建新账号
@@ -254,6 +256,7 @@ async def submit_oauth_cookies(
             db.refresh(account)
             
             print(f"创建新账号: {account.id}")
+            ModelService.invalidate_available_models(current_user.id)
             account_dict = OAuthAccountResponse.from_orm(account).dict()
         
         # 添加平台信息
@@ -697,6 +700,7 @@ async def authorize_complete(
             existing_account.updated_at = datetime.now()
             db.commit()
             db.refresh(existing_account)
+            ModelService.invalidate_available_models(current_user.id)
             
             # 关闭会话
             await oauth_session_manager.remove_session(current_user.id, platform)
@@ -721,6 +725,7 @@ async def authorize_complete(
         db.add(account)
         db.commit()
         db.refresh(account)
+        ModelService.invalidate_available_models(current_user.id)
         
         # 关闭会话
         await oauth_session_manager.remove_session(current_user.id, platform)
@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import desc, func, or_
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
 from app.core.security import get_current_user
 from app.utils.deps import get_admin_user
 from app.models.plugin import (
@@ -626,7 +626,7 @@ async def get_plugin_reviews(
 
 @router.get("/stats", summary="获取插件使用统计")
 async def get_plugin_stats(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user: User = Depends(get_current_user)
 ):
     """获取用户的插件使用统计"""
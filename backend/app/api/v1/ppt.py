@@ -8,19 +8,30 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, UploadFile, File
 from fastapi.responses import FileResponse
 from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import atomic, get_db
+from app.core.database_async import get_async_db
+from app.utils.rate_limiter import rate_limit, TOKEN_BUCKET
+from app.utils.quota import daily_quota
 from app.models.creation import Creation
-from app.models.credit import CreditTransaction, TransactionType
+from app.models.credit import TransactionType
 from app.models.user import User
 from app.schemas.common import success_response
 from app.services.ai.ppt_service import create_local_ppt_service
-from app.utils.deps import get_current_user
+from app.services.credit_service import CreditService
+from app.utils.deps import get_current_user, get_current_user_async
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# 生成接口按用户限流（令牌桶，允许少量突发），并计入每日配额
+_generate_rate_limit = rate_limit(settings.RATE_LIMIT_GENERATE_PER_MINUTE, 60, algorithm=TOKEN_BUCKET)
+_generate_quota = daily_quota()
+
 
 class PPTGenerateRequest(BaseModel):
     topic: str
@@ -250,7 +261,7 @@ async def process_ppt_generation(db: Session, creation_id: int, request_data: di
             logger.error(f"Failed to update creation status: {db_error}")
 
 
-@router.post("/generate")
+@router.post("/generate", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def generate_ppt(
     request: PPTGenerateRequest,
     background_tasks: BackgroundTasks,
@@ -278,25 +289,17 @@ async def generate_ppt(
             },
             status="processing"
         )
-        db.add(creation)
         
-        # 仅在API Key模式下扣除积分
-        if not request.platform:
-            required_credits = (request.slides_count or 10) * 50
-            current_user.credits -= required_credits
-            transaction = CreditTransaction(
-                user_id=current_user.id,
-                transaction_type=TransactionType.CONSUME,
-                amount=-required_credits,
-                balance_before=current_user.credits + required_credits,
-                balance_after=current_user.credits,
-                description=f"PPT生成: {request.slides_count}页",
-                related_id=creation.id,
-                related_type="creation"
-            )
-            db.add(transaction)
-        
-        db.commit()
+        with atomic(db):
+            db.add(creation)
+            db.flush()  # 取得 creation.id 作为流水关联
+            
+            # 仅在API Key模式下扣除积分
+            if not request.platform:
+                CreditService.check_and_consume_credits(
+                    db, current_user.id, required_credits, f"PPT生成: {request.slides_count}页",
+                    related_id=creation.id, related_type="creation", member_free=False
+                )
         db.refresh(creation)
 
         background_tasks.add_task(process_ppt_generation, db, creation.id, request.dict(), current_user.id, request.platform)
@@ -312,7 +315,7 @@ async def generate_ppt(
         raise HTTPException(status_code=500, detail=f"生成PPT失败: {str(e)}")
 
 
-@router.post("/from-outline")
+@router.post("/from-outline", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def generate_ppt_from_outline(
     request: PPTFromOutlineRequest,
     background_tasks: BackgroundTasks,
@@ -345,7 +348,7 @@ async def generate_ppt_from_outline(
         raise HTTPException(status_code=500, detail=f"生成PPT失败: {str(e)}")
 
 
-@router.post("/from-document")
+@router.post("/from-document", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def generate_ppt_from_document(
     file: UploadFile = File(...),
     background_tasks: BackgroundTasks = None,
@@ -382,15 +385,18 @@ async def generate_ppt_from_document(
 @router.get("/task/{task_id}")
 async def get_ppt_task_status(
     task_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """获取PPT任务状态"""
     try:
-        creation = db.query(Creation).filter(
-            Creation.task_id == task_id,
-            Creation.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(Creation).where(
+                Creation.task_id == task_id,
+                Creation.user_id == current_user.id
+            )
+        )
+        creation = result.scalar_one_or_none()
         if not creation:
             raise HTTPException(status_code=404, detail="任务不存在")
 
@@ -537,7 +543,6 @@ async def generate_ppt_outline(
     扣除10积分，保存历史记录
     """
     from app.services.writing_service import WritingService
-    from app.services.credit_service import CreditService
     from app.models.ai_model import AIModel
     import json
     
@@ -29,6 +29,7 @@ from app.services.credit_service import CreditService
 from app.services.publish.platforms import get_platform, PLATFORM_REGISTRY
 from app.services.publish.playwright_service import publish_playwright_service
 from app.utils.deps import get_current_user
+from app.utils.pagination import cached_count, keyset_filter, keyset_order_by, split_page
 
 router = APIRouter()
 
@@ -938,10 +939,16 @@ async def get_publish_history(
     status: str = None,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = None,
+    with_total: bool = True,
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """获取发布历史"""
+    """
+    获取发布历史
+
+    传入上一页返回的 next_cursor 翻页；with_total=false 时不统计总数（总数缓存 60 秒）
+    """
     query = db.query(PublishRecord).filter(
         PublishRecord.user_id == current_user.id
     )
@@ -951,13 +958,23 @@ async def get_publish_history(
     if status:
         query = query.filter(PublishRecord.status == status)
     
-    total = query.count()
-    histories = query.order_by(
-        PublishRecord.created_at.desc()
-    ).offset(skip).limit(limit).all()
+    total = None
+    if with_total:
+        total = cached_count(
+            "publish_history", query.count,
+            user_id=current_user.id, platform=platform, status=status
+        )
+    
+    if cursor:
+        query = query.filter(keyset_filter(PublishRecord, cursor))
+    elif skip:
+        query = query.offset(skip)
+    rows = query.order_by(*keyset_order_by(PublishRecord)).limit(limit + 1).all()
+    histories, next_cursor = split_page(rows, limit)
     
     return PublishRecordListResponse(
         total=total,
+        next_cursor=next_cursor,
         items=[
             PublishRecordResponse(
                 id=h.id,
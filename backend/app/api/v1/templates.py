@@ -23,6 +23,9 @@ from app.schemas.template import (
     PLATFORM_NAMES,
     CATEGORY_NAMES
 )
+from app.utils.cache import Cache
+from app.utils.cache_decorator import cached
+
 router = APIRouter()
 
 
@@ -46,7 +49,7 @@ async def get_platforms():
 
 
 @router.get("", response_model=TemplateListResponse)
-async def get_templates(
+def get_templates(
     skip: int = Query(0, ge=0, description="跳过的记录数"),
     limit: int = Query(50, ge=1, le=100, description="返回的记录数"),
     platform: Optional[str] = Query(None, description="平台筛选：wechat/xiaohongshu/toutiao/ppt/douyin"),
@@ -63,11 +66,83 @@ async def get_templates(
     返回系统模板 + 当前用户的自定义模板 + 公开的模板
     支持按平台、场景、风格筛选
     """
+    if _is_cacheable_list(skip, limit, platform, category, style, search):
+        return _list_templates(db, current_user.id, platform, category, is_system)
+    return _query_templates(
+        db, current_user.id, skip, limit, platform, category, style, is_system, search
+    )
+
+
+def _invalidate_template_lists() -> None:
+    """模板增删改后清除列表缓存（系统/公开模板对所有用户可见，因此全部清除）"""
+    Cache.invalidate_tags("templates:list")
+
+
+# 只缓存默认分页的第一页
+_CACHED_PAGE_SIZE = 50
+
+
+def _is_cacheable_list(
+    skip: int,
+    limit: int,
+    platform: Optional[str],
+    category: Optional[str],
+    style: Optional[str],
+    search: Optional[str],
+) -> bool:
+    """
+    是否走列表缓存
+
+    缓存键只能由取值有限的参数组成，否则任何用户都能用不同的搜索词、分页或筛选值
+    无限制地制造缓存键（且都挂在全局 templates:list 标签下）。搜索、翻页、风格筛选
+    以及不在已知取值内的平台/场景直接查库。
+    """
+    return (
+        not search
+        and not style
+        and skip == 0
+        and limit == _CACHED_PAGE_SIZE
+        and (platform is None or platform in PLATFORM_CHOICES)
+        and (category is None or category in CATEGORY_NAMES)
+    )
+
+
+@cached(
+    key="templates:list:{user_id}:{platform}:{category}:{is_system}",
+    ttl=60,
+    tags=["templates:list", "user:{user_id}"],
+    model=TemplateListResponse,
+)
+def _list_templates(
+    db: Session,
+    user_id: int,
+    platform: Optional[str],
+    category: Optional[str],
+    is_system: Optional[bool],
+) -> TemplateListResponse:
+    """查询默认分页第一页的模板列表（带缓存）"""
+    return _query_templates(
+        db, user_id, 0, _CACHED_PAGE_SIZE, platform, category, None, is_system, None
+    )
+
+
+def _query_templates(
+    db: Session,
+    user_id: int,
+    skip: int,
+    limit: int,
+    platform: Optional[str],
+    category: Optional[str],
+    style: Optional[str],
+    is_system: Optional[bool],
+    search: Optional[str],
+) -> TemplateListResponse:
+    """查询模板列表"""
     # 构建查询条件：系统模板 OR 用户自己的模板 OR 公开模板
     query = db.query(ContentTemplate).filter(
         or_(
             ContentTemplate.is_system == True,
-            ContentTemplate.user_id == current_user.id,
+            ContentTemplate.user_id == user_id,
             ContentTemplate.is_public == True
         )
     )
@@ -175,6 +250,7 @@ async def create_template(
     
     db.add(template)
     db.commit()
+    _invalidate_template_lists()
     db.refresh(template)
     
     return template
@@ -211,6 +287,7 @@ async def update_template(
         setattr(template, field, value)
     
     db.commit()
+    _invalidate_template_lists()
     db.refresh(template)
     
     return template
@@ -242,6 +319,7 @@ async def delete_template(
     
     db.delete(template)
     db.commit()
+    _invalidate_template_lists()
     
     return {"message": "模板已删除"}
 
@@ -308,6 +386,7 @@ async def clone_template(
     
     db.add(cloned)
     db.commit()
+    _invalidate_template_lists()
     db.refresh(cloned)
     
     return cloned
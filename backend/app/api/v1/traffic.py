@@ -2,19 +2,19 @@
 流量统计 API
 支持全埋点：页面访问 + 用户行为事件 + 批量上报
 """
-from datetime import date, datetime, timedelta
-from typing import Any, Optional, List
+from datetime import date, datetime, time, timedelta
+from typing import Any, Optional, List, Tuple
 
 from fastapi import APIRouter, Depends, Query, Request
 from pydantic import BaseModel, Field
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.traffic import PageView, UserEvent, DailyStats
 from app.models.user import User
 from app.schemas.common import success_response
-from app.services.tracker_service import tracker_service
+from app.services.tracker_service import async_tracker_service
 from app.utils.deps import get_admin_user
 
 router = APIRouter()
@@ -91,21 +91,17 @@ async def batch_track(
         if pv_dict["created_at"].endswith("Z"):
             pv_dict["created_at"] = pv_dict["created_at"][:-1].replace("T", " ")
 
-        record_id = tracker_service.cache_page_view(pv_dict)
+        record_id = await async_tracker_service.cache_page_view(pv_dict)
         if record_id:
             pv_count += 1
             if pv.id:
                 page_view_ids[pv.id] = record_id
 
     # 存入页面更新记录
-    update_count = 0
-    for update in data.page_view_updates:
-        tracker_service.update_page_view(
-            update.page_view_id,
-            update.stay_duration,
-            update.max_scroll_depth
-        )
-        update_count += 1
+    update_count = len(data.page_view_updates)
+    await async_tracker_service.update_page_views(
+        [update.model_dump() for update in data.page_view_updates]
+    )
 
     # 存入用户行为事件
     event_count = 0
@@ -121,7 +117,7 @@ async def batch_track(
                 event_dict["page_view_id"] = page_view_ids[event.page_view_id]
             events_data.append(event_dict)
 
-        event_count = tracker_service.cache_user_events(events_data)
+        event_count = await async_tracker_service.cache_user_events(events_data)
 
     return success_response(
         data={
@@ -134,7 +130,7 @@ async def batch_track(
 
 
 @router.get("/stats")
-def get_tracker_stats(
+async def get_tracker_stats(
     current_user: User = Depends(get_admin_user)
 ) -> Any:
     """
@@ -142,16 +138,26 @@ def get_tracker_stats(
 
     查看 Redis 中待处理的埋点数据量
     """
-    stats = tracker_service.get_stats()
+    stats = await async_tracker_service.get_stats()
     return success_response(data=stats)
 
 
 # ===== 管理员查询接口 =====
 
+def _day_range(day: date) -> Tuple[datetime, datetime]:
+    """
+    某天的时间范围 [当天 0 点, 次日 0 点)
+
+    用范围条件代替 func.date(created_at) == day，查询才能使用 created_at 上的索引
+    """
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+
 @router.get("/overview")
 def get_traffic_overview(
     current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     获取流量概览（管理员）
@@ -161,20 +167,21 @@ def get_traffic_overview(
     today = date.today()
     week_start = today - timedelta(days=today.weekday())
     month_start = today.replace(day=1)
+    today_range = _day_range(today)
 
     # 今日PV
     today_pv = db.query(func.count(PageView.id)).filter(
-        func.date(PageView.created_at) == today
+        PageView.created_at >= today_range[0], PageView.created_at < today_range[1]
     ).scalar() or 0
 
     # 今日UV（独立会话数）
     today_uv = db.query(func.count(func.distinct(PageView.session_id))).filter(
-        func.date(PageView.created_at) == today
+        PageView.created_at >= today_range[0], PageView.created_at < today_range[1]
     ).scalar() or 0
 
     # 今日新用户
     today_new_users = db.query(func.count(User.id)).filter(
-        func.date(User.created_at) == today
+        User.created_at >= today_range[0], User.created_at < today_range[1]
     ).scalar() or 0
 
     # 总用户数
@@ -189,36 +196,36 @@ def get_traffic_overview(
 
     # 本周PV
     week_pv = db.query(func.count(PageView.id)).filter(
-        func.date(PageView.created_at) >= week_start
+        PageView.created_at >= datetime.combine(week_start, time.min)
     ).scalar() or 0
 
     # 本周UV
     week_uv = db.query(func.count(func.distinct(PageView.session_id))).filter(
-        func.date(PageView.created_at) >= week_start
+        PageView.created_at >= datetime.combine(week_start, time.min)
     ).scalar() or 0
 
     # 本月PV
     month_pv = db.query(func.count(PageView.id)).filter(
-        func.date(PageView.created_at) >= month_start
+        PageView.created_at >= datetime.combine(month_start, time.min)
     ).scalar() or 0
 
     # 本月UV
     month_uv = db.query(func.count(func.distinct(PageView.session_id))).filter(
-        func.date(PageView.created_at) >= month_start
+        PageView.created_at >= datetime.combine(month_start, time.min)
     ).scalar() or 0
 
     # 今日平均停留时长
     avg_duration = db.query(func.avg(PageView.stay_duration)).filter(
-        func.date(PageView.created_at) == today,
+        PageView.created_at >= today_range[0], PageView.created_at < today_range[1],
         PageView.stay_duration > 0
     ).scalar() or 0
 
     # 今日跳出率
     total_today = db.query(func.count(PageView.id)).filter(
-        func.date(PageView.created_at) == today
+        PageView.created_at >= today_range[0], PageView.created_at < today_range[1]
     ).scalar() or 1
     bounce_today = db.query(func.count(PageView.id)).filter(
-        func.date(PageView.created_at) == today,
+        PageView.created_at >= today_range[0], PageView.created_at < today_range[1],
         PageView.is_bounce == True
     ).scalar() or 0
     bounce_rate = round(bounce_today / total_today * 100) if total_today > 0 else 0
@@ -244,7 +251,7 @@ def get_traffic_overview(
 def get_daily_stats(
     days: int = Query(default=30, ge=1, le=90, description="查询天数"),
     current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     获取每日统计列表（管理员）
@@ -266,16 +273,17 @@ def get_daily_stats(
         end_date = date.today()
 
         while current <= end_date:
+            day_range = _day_range(current)
             day_pv = db.query(func.count(PageView.id)).filter(
-                func.date(PageView.created_at) == current
+                PageView.created_at >= day_range[0], PageView.created_at < day_range[1]
             ).scalar() or 0
 
             day_uv = db.query(func.count(func.distinct(PageView.session_id))).filter(
-                func.date(PageView.created_at) == current
+                PageView.created_at >= day_range[0], PageView.created_at < day_range[1]
             ).scalar() or 0
 
             day_new_users = db.query(func.count(User.id)).filter(
-                func.date(User.created_at) == current
+                User.created_at >= day_range[0], User.created_at < day_range[1]
             ).scalar() or 0
 
             daily_data.append({
@@ -306,7 +314,7 @@ def get_hot_pages(
     days: int = Query(default=7, ge=1, le=90, description="查询天数"),
     limit: int = Query(default=10, ge=1, le=50, description="返回数量"),
     current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     获取热门页面（管理员）
@@ -344,7 +352,7 @@ def get_click_events(
     days: int = Query(default=7, ge=1, le=90, description="查询天数"),
     limit: int = Query(default=20, ge=1, le=100, description="返回数量"),
     current_user: User = Depends(get_admin_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ) -> Any:
     """
     获取点击事件统计（管理员）
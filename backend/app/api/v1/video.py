@@ -6,20 +6,30 @@ import uuid
 import asyncio
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 import logging
 
-from app.core.database import get_db
+from app.core.config import settings
+from app.core.database import atomic, get_db
+from app.core.database_async import get_async_db
+from app.utils.rate_limiter import rate_limit, TOKEN_BUCKET
+from app.utils.quota import daily_quota
 from app.models.user import User
 from app.models.creation import Creation
-from app.models.credit import CreditTransaction, TransactionType
+from app.services.credit_service import CreditService
 from app.schemas.common import success_response
-from app.utils.deps import get_current_user
+from app.utils.deps import get_current_user, get_current_user_async
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# 生成接口按用户限流（令牌桶，允许少量突发），并计入每日配额
+_generate_rate_limit = rate_limit(settings.RATE_LIMIT_GENERATE_PER_MINUTE, 60, algorithm=TOKEN_BUCKET)
+_generate_quota = daily_quota()
+
 
 class VideoGenerateRequest(BaseModel):
     """视频生成请求"""
@@ -206,7 +216,7 @@ async def process_image_to_video(db: Session, creation_id: int, request_data: di
             db.commit()
 
 
-@router.post("/generate")
+@router.post("/generate", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def generate_video(
     request: VideoGenerateRequest,
     background_tasks: BackgroundTasks,
@@ -242,29 +252,17 @@ async def generate_video(
             },
             status="processing"
         )
-        db.add(creation)
         
-        # 仅在API Key模式下扣除积分
-        if not request.platform:
-            base_credits = 200
-            duration_multiplier = request.duration / 5
-            resolution_multiplier = {"720p": 1.0, "1080p": 1.5, "4k": 2.5}.get(request.resolution, 1.0)
-            required_credits = int(base_credits * duration_multiplier * resolution_multiplier)
+        with atomic(db):
+            db.add(creation)
+            db.flush()  # 取得 creation.id 作为流水关联
             
-            current_user.credits -= required_credits
-            transaction = CreditTransaction(
-                user_id=current_user.id,
-                transaction_type=TransactionType.CONSUME,
-                amount=-required_credits,
-                balance_before=current_user.credits + required_credits,
-                balance_after=current_user.credits,
-                description=f"视频生成: {request.duration}秒 {request.resolution}",
-                related_id=creation.id,
-                related_type="creation"
-            )
-            db.add(transaction)
-        
-        db.commit()
+            # 仅在API Key模式下扣除积分
+            if not request.platform:
+                CreditService.check_and_consume_credits(
+                    db, current_user.id, required_credits, f"视频生成: {request.duration}秒 {request.resolution}",
+                    related_id=creation.id, related_type="creation", member_free=False
+                )
         db.refresh(creation)
         
         background_tasks.add_task(
@@ -288,7 +286,7 @@ async def generate_video(
         raise HTTPException(status_code=500, detail=f"视频生成失败: {str(e)}")
 
 
-@router.post("/text-to-video")
+@router.post("/text-to-video", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def text_to_video(
     request: TextToVideoRequest,
     background_tasks: BackgroundTasks,
@@ -323,19 +321,12 @@ async def text_to_video(
         )
         db.add(creation)
         
-        current_user.credits -= required_credits
-        transaction = CreditTransaction(
-            user_id=current_user.id,
-            transaction_type=TransactionType.CONSUME,
-            amount=-required_credits,
-            balance_before=current_user.credits + required_credits,
-            balance_after=current_user.credits,
-            description="文本转视频",
-            related_id=creation.id,
-            related_type="creation"
-        )
-        db.add(transaction)
-        db.commit()
+        with atomic(db):
+            db.flush()  # 取得 creation.id 作为流水关联
+            CreditService.check_and_consume_credits(
+                db, current_user.id, required_credits, "文本转视频",
+                related_id=creation.id, related_type="creation", member_free=False
+            )
         db.refresh(creation)
         
         background_tasks.add_task(
@@ -359,7 +350,7 @@ async def text_to_video(
         raise HTTPException(status_code=500, detail=f"文本转视频失败: {str(e)}")
 
 
-@router.post("/image-to-video")
+@router.post("/image-to-video", dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def image_to_video(
     request: ImageToVideoRequest,
     background_tasks: BackgroundTasks,
@@ -389,19 +380,12 @@ async def image_to_video(
         )
         db.add(creation)
         
-        current_user.credits -= required_credits
-        transaction = CreditTransaction(
-            user_id=current_user.id,
-            transaction_type=TransactionType.CONSUME,
-            amount=-required_credits,
-            balance_before=current_user.credits + required_credits,
-            balance_after=current_user.credits,
-            description=f"图片转视频: {len(request.images)}张",
-            related_id=creation.id,
-            related_type="creation"
-        )
-        db.add(transaction)
-        db.commit()
+        with atomic(db):
+            db.flush()  # 取得 creation.id 作为流水关联
+            CreditService.check_and_consume_credits(
+                db, current_user.id, required_credits, f"图片转视频: {len(request.images)}张",
+                related_id=creation.id, related_type="creation", member_free=False
+            )
         db.refresh(creation)
         
         background_tasks.add_task(
@@ -428,15 +412,18 @@ async def image_to_video(
 @router.get("/task/{task_id}")
 async def get_video_task_status(
     task_id: str,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: User = Depends(get_current_user_async)
 ):
     """获取视频任务状态"""
     try:
-        creation = db.query(Creation).filter(
-            Creation.task_id == task_id,
-            Creation.user_id == current_user.id
-        ).first()
+        result = await db.execute(
+            select(Creation).where(
+                Creation.task_id == task_id,
+                Creation.user_id == current_user.id
+            )
+        )
+        creation = result.scalar_one_or_none()
         
         if not creation:
             raise HTTPException(status_code=404, detail="任务不存在")
@@ -485,18 +472,10 @@ async def generate_voiceover(
         # 模拟生成配音
         audio_url = f"https://example.com/voiceover_{uuid.uuid4().hex[:8]}.mp3"
         
-        current_user.credits -= required_credits
-        transaction = CreditTransaction(
-            user_id=current_user.id,
-            transaction_type=TransactionType.CONSUME,
-            amount=-required_credits,
-            balance_before=current_user.credits + required_credits,
-            balance_after=current_user.credits,
-            description="AI配音",
-            related_type="voiceover"
+        CreditService.check_and_consume_credits(
+            db, current_user.id, required_credits, "AI配音",
+            related_type="voiceover", member_free=False
         )
-        db.add(transaction)
-        db.commit()
         
         return success_response(
             data={"audio_url": audio_url},
@@ -532,18 +511,10 @@ async def generate_subtitles(
             {"start": 2, "end": 4, "text": "示例字幕2"}
         ]
         
-        current_user.credits -= required_credits
-        transaction = CreditTransaction(
-            user_id=current_user.id,
-            transaction_type=TransactionType.CONSUME,
-            amount=-required_credits,
-            balance_before=current_user.credits + required_credits,
-            balance_after=current_user.credits,
-            description="生成字幕",
-            related_type="subtitle"
+        CreditService.check_and_consume_credits(
+            db, current_user.id, required_credits, "生成字幕",
+            related_type="subtitle", member_free=False
         )
-        db.add(transaction)
-        db.commit()
         
         return success_response(
             data={"subtitles": subtitles},
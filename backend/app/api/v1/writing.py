@@ -4,10 +4,13 @@ AI写作相关API路由
 from typing import Any, List, Optional
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
+from app.utils.rate_limiter import rate_limit, TOKEN_BUCKET
+from app.utils.quota import daily_quota
 from app.core.security import get_current_user
 from app.models.user import User
 from app.models.creation import Creation, CreationVersion
@@ -20,12 +23,16 @@ from app.schemas.creation import (
     CreationListResponse,
 )
 from app.services.writing_service import WritingService
-from app.services.credit_service import CreditService
+from app.services.credit_service import CreditService, is_active_member
 from app.models.credit import TransactionType
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# 生成接口按用户限流（令牌桶，允许少量突发），并计入每日配额
+_generate_rate_limit = rate_limit(settings.RATE_LIMIT_GENERATE_PER_MINUTE, 60, algorithm=TOKEN_BUCKET)
+_generate_quota = daily_quota()
+
 
 @router.get("/tools", response_model=List[WritingToolInfo])
 def get_writing_tools() -> Any:
@@ -135,7 +142,7 @@ def get_writing_tools() -> Any:
     return tools
 
 
-@router.post("/generate", response_model=WritingGenerateResponse)
+@router.post("/generate", response_model=WritingGenerateResponse, dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def generate_content(
     request: WritingGenerateRequest,
     background_tasks: BackgroundTasks,
@@ -252,7 +259,7 @@ async def generate_content(
     except Exception as e:
         logger.error(f"Content generation failed: {e}", exc_info=True)
         # 生成失败，退还积分
-        if not current_user.is_member:
+        if not is_active_member(current_user.is_member, current_user.member_expired_at):
             CreditService.add_credits(
                 db=db,
                 user_id=current_user.id,
@@ -413,9 +420,10 @@ def get_creation_versions(
     return versions
 
 
-@router.post("/creations/{creation_id}/regenerate", response_model=WritingGenerateResponse)
+@router.post("/creations/{creation_id}/regenerate", response_model=WritingGenerateResponse, dependencies=[Depends(_generate_rate_limit), Depends(_generate_quota)])
 async def regenerate_content(
     creation_id: int,
+    bypass_cache: bool = Query(False, description="跳过响应缓存，强制重新调用模型"),
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Any:
@@ -469,6 +477,7 @@ async def regenerate_content(
             tool_type=creation.tool_type,
             user_input=input_data,
             ai_model=ai_model,
+            bypass_cache=bypass_cache,
         )
         
         # 更新创作记录
@@ -482,7 +491,7 @@ async def regenerate_content(
         raise
     except Exception as e:
         # 生成失败，退还积分
-        if not current_user.is_member:
+        if not is_active_member(current_user.is_member, current_user.member_expired_at):
             CreditService.add_credits(
                 db=db,
                 user_id=current_user.id,
@@ -2,7 +2,7 @@
 核心模块
 """
 from .config import settings
-from .database import get_db, init_db, Base
+from .database import get_db, get_read_db, init_db, Base
 from .security import (
     get_password_hash,
     verify_password,
@@ -26,6 +26,7 @@ from .exceptions import (
 __all__ = [
     "settings",
     "get_db",
+    "get_read_db",
     "init_db",
     "Base",
     "get_password_hash",
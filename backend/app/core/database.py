@@ -1,13 +1,17 @@
 """
 数据库配置
 """
+from contextlib import contextmanager
 from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Any, Dict, Generator, Iterator
 import logging
+import time
 
 from app.core.config import settings
+from app.core.query_stats import install_query_instrumentation
 
 logger = logging.getLogger(__name__)
 
@@ -22,24 +26,43 @@ def get_sync_database_url(url: str) -> str:
         url = url.replace("mysql://", "mysql+pymysql://", 1)
     return url
 
+
+def _create_sync_engine(url: str) -> Engine:
+    return create_engine(
+        url,
+        pool_pre_ping=True,
+        pool_size=10,
+        max_overflow=20,
+        echo=settings.DEBUG,
+        connect_args={
+            "charset": "utf8mb4",
+            "autocommit": True,
+        }
+    )
+
+
+# 统计每个请求的 SQL 条数和耗时（注册在 Engine 类上，对主库、副本和异步引擎都生效）
+install_query_instrumentation()
+
 # 创建数据库引擎（使用同步驱动）
 sync_database_url = get_sync_database_url(settings.DATABASE_URL)
 logger.info(f"Using database URL: {sync_database_url.split('@')[0]}@***")
 
-engine = create_engine(
-    sync_database_url,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    echo=settings.DEBUG,
-    connect_args={
-        "charset": "utf8mb4",
-        "autocommit": True,
-    }
-)
+engine = _create_sync_engine(sync_database_url)
+
+# 只读副本（可选）
+read_engine = None
+if settings.DATABASE_READ_URL:
+    read_engine = _create_sync_engine(get_sync_database_url(settings.DATABASE_READ_URL))
+    logger.info(f"Using read replica: {read_engine.url.render_as_string(hide_password=True)}")
 
 # 创建会话工厂
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine or engine)
+
+# 副本不可用时，在该时间点之前直接使用主库
+_replica_down_until = 0.0
+_replica_fallbacks = 0
 
 # 创建基类
 Base = declarative_base()
@@ -59,6 +82,109 @@ def get_db() -> Generator:
         db.close()
 
 
+@contextmanager
+def atomic(db: Session) -> Iterator[Session]:
+    """
+    在一个真正的数据库事务中执行代码块，正常结束时提交，出错时回滚
+
+    同步引擎以 autocommit 模式连接 MySQL，每条语句单独提交，UPDATE 加的行锁在语句结束时就释放了。
+    需要多条语句原子执行（如扣减余额、读取新余额、写流水）时用它显式 BEGIN，
+    COMMIT/ROLLBACK 之后连接恢复 autocommit。嵌套使用时只有最外层开启和提交事务。
+
+    Example:
+        with atomic(db):
+            db.execute(update(User).where(...).values(credits=User.credits - 10))
+            balance = db.execute(select(User.credits).where(...)).scalar_one()
+            db.add(CreditTransaction(...))
+    """
+    if db.info.get("atomic"):
+        yield db
+        return
+
+    connection = db.connection()
+    if connection.dialect.detect_autocommit_setting(connection.connection.dbapi_connection):
+        connection.exec_driver_sql("BEGIN")
+    db.info["atomic"] = True
+    try:
+        yield db
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    finally:
+        db.info.pop("atomic", None)
+
+
+def _open_read_session():
+    """打开只读会话，副本连接失败时回退主库"""
+    global _replica_down_until, _replica_fallbacks
+    if read_engine is None or time.monotonic() < _replica_down_until:
+        return SessionLocal()
+
+    db = ReadSessionLocal()
+    try:
+        # 提前取出连接（pool_pre_ping 会检测失效连接），连不上时在进入接口前就切到主库
+        db.connection()
+        return db
+    except Exception as e:
+        db.close()
+        _replica_down_until = time.monotonic() + settings.DATABASE_READ_RETRY_INTERVAL
+        _replica_fallbacks += 1
+        logger.warning(
+            f"Read replica unavailable, falling back to primary for "
+            f"{settings.DATABASE_READ_RETRY_INTERVAL}s: {e}"
+        )
+        return SessionLocal()
+
+
+def get_read_db() -> Generator:
+    """
+    获取只读数据库会话
+
+    用于后台统计、列表等允许秒级延迟的只读查询，配置了 DATABASE_READ_URL 时走只读副本，
+    未配置或副本不可用时使用主库。不要在该会话上写入，写后立即读的场景请使用 get_db。
+
+    Yields:
+        Session: 数据库会话
+    """
+    db = _open_read_session()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def _pool_stats(db_engine: Engine) -> Dict[str, Any]:
+    pool = db_engine.pool
+    stats = {"status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    各数据库引擎的连接池状态
+
+    Returns:
+        primary/replica/async 三个引擎的连接池占用情况（未启用的引擎不返回）
+    """
+    from app.core import database_async
+
+    stats = {"primary": _pool_stats(engine)}
+    if read_engine is not None:
+        stats["replica"] = {
+            **_pool_stats(read_engine),
+            "healthy": time.monotonic() >= _replica_down_until,
+            "fallbacks": _replica_fallbacks,
+        }
+    if database_async._async_engine is not None:
+        stats["async"] = _pool_stats(database_async._async_engine.sync_engine)
+    return stats
+
+
 def init_db() -> None:
     """
     初始化数据库
@@ -1,51 +1,103 @@
 """
 异步数据库配置
+与 app.core.database 共用 Base（同一份模型元数据），供 async def 接口使用，查询时不阻塞事件循环
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
-from typing import AsyncGenerator
+import logging
+from typing import AsyncGenerator, Optional
+
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
 from app.core.config import settings
+from app.core.database import Base
+
+logger = logging.getLogger(__name__)
+
+
+def get_async_database_url(url: str) -> str:
+    """将数据库URL转换为异步驱动"""
+    url = url.replace("mysql+pymysql://", "mysql+aiomysql://")
+    url = url.replace("mysql+asyncmy://", "mysql+aiomysql://")
+    if url.startswith("mysql://"):
+        url = url.replace("mysql://", "mysql+aiomysql://", 1)
+    if url.startswith("sqlite://"):
+        url = url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    return url
+
+
+_async_engine: Optional[AsyncEngine] = None
+
+
+def get_async_engine() -> AsyncEngine:
+    """
+    获取异步数据库引擎
+
+    首次使用时创建，未安装异步驱动时不影响同步代码路径的导入。
+    """
+    global _async_engine
+    if _async_engine is None:
+        url = get_async_database_url(settings.DATABASE_URL)
+        kwargs = {"pool_pre_ping": True, "echo": settings.DEBUG}
+        if url.startswith("mysql"):
+            kwargs.update(
+                pool_size=10,
+                max_overflow=20,
+                pool_recycle=3600,
+                connect_args={"charset": "utf8mb4"},
+            )
+        _async_engine = create_async_engine(url, **kwargs)
+    return _async_engine
+
+
+class _LazyAsyncSessionmaker(async_sessionmaker):
+    """第一次创建会话时才绑定引擎"""
+
+    def __call__(self, **local_kw) -> AsyncSession:
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_async_engine())
+        return super().__call__(**local_kw)
 
-# 创建异步数据库引擎
-async_engine = create_async_engine(
-    settings.DATABASE_URL.replace("mysql://", "mysql+aiomysql://"),
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-    echo=settings.DEBUG,
-    future=True
-)
 
 # 创建异步会话工厂
-AsyncSessionLocal = sessionmaker(
-    autocommit=False,
-    autoflush=False,
-    bind=async_engine,
+AsyncSessionLocal = _LazyAsyncSessionmaker(
     class_=AsyncSession,
+    autoflush=False,
     expire_on_commit=False
 )
 
-# 创建基类
-Base = declarative_base()
-
 
 async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
     """
     获取异步数据库会话
-    
+
     Yields:
         AsyncSession: 异步数据库会话
     """
     async with AsyncSessionLocal() as session:
-        yield session
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
 
 
 async def init_async_db() -> None:
     """
     初始化异步数据库
-    创建所有表
+    创建所有表（与 init_db 使用同一份元数据）
     """
-    async with async_engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
\ No newline at end of file
+    async with get_async_engine().begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def close_async_db() -> None:
+    """释放异步连接池（在应用 shutdown 时调用）"""
+    global _async_engine
+    engine, _async_engine = _async_engine, None
+    if engine is not None:
+        await engine.dispose()
+        AsyncSessionLocal.configure(bind=None)
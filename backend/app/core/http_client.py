@@ -0,0 +1,218 @@
+"""
+HTTP 客户端管理
+调用第三方 AI 厂商接口时共用 httpx 客户端：每个主机一个 keep-alive 连接池，
+同一主机的请求复用已建立的 TCP/TLS 连接，不再每次调用都重新握手
+
+- async_http_client() / http_client(): 替代 `httpx.AsyncClient(timeout=...)` / `httpx.Client(timeout=...)`，
+  用法相同（async with / with），退出时不关闭连接
+- close_http_clients(): 在应用 shutdown 时关闭所有连接池
+"""
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Optional, Tuple, Union
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_Origin = Tuple[str, str, Optional[int]]
+_TimeoutTypes = Union[float, httpx.Timeout, None]
+
+_lock = threading.Lock()
+_sync_clients: Dict[_Origin, httpx.Client] = {}
+# 异步客户端的连接绑定在创建它的事件循环上，按事件循环分别保存（后台线程中的独立事件循环各用各的）
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[_Origin, httpx.AsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_http2_warned = False
+
+
+def _origin(url: Union[str, httpx.URL]) -> _Origin:
+    url = httpx.URL(url)
+    return url.scheme, url.host, url.port
+
+
+def _http2_enabled() -> bool:
+    global _http2_warned
+    if not settings.HTTP_CLIENT_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        if not _http2_warned:
+            _http2_warned = True
+            logger.warning("HTTP_CLIENT_HTTP2 已开启但未安装 h2（pip install httpx[http2]），使用 HTTP/1.1")
+        return False
+
+
+def _client_kwargs() -> Dict[str, Any]:
+    return {
+        "http2": _http2_enabled(),
+        "limits": httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+        ),
+        "timeout": httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT, connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT),
+    }
+
+
+def get_http_client(url: Union[str, httpx.URL]) -> httpx.Client:
+    """获取 url 所在主机的共享同步客户端（线程安全）"""
+    origin = _origin(url)
+    client = _sync_clients.get(origin)
+    if client is None or client.is_closed:
+        with _lock:
+            client = _sync_clients.get(origin)
+            if client is None or client.is_closed:
+                client = _sync_clients[origin] = httpx.Client(**_client_kwargs())
+    return client
+
+
+def get_async_http_client(url: Union[str, httpx.URL]) -> httpx.AsyncClient:
+    """获取 url 所在主机在当前事件循环上的共享异步客户端"""
+    loop = asyncio.get_running_loop()
+    origin = _origin(url)
+    with _lock:
+        clients = _async_clients.get(loop)
+        if clients is None:
+            clients = _async_clients[loop] = {}
+        client = clients.get(origin)
+        if client is None or client.is_closed:
+            client = clients[origin] = httpx.AsyncClient(**_client_kwargs())
+    return client
+
+
+class SharedAsyncClient:
+    """
+    共享异步客户端的轻量包装
+
+    按请求 URL 选择对应主机的连接池；构造时的 timeout 作为每个请求的默认超时。
+    """
+
+    def __init__(self, timeout: _TimeoutTypes = None):
+        self.timeout = timeout
+
+    async def __aenter__(self) -> "SharedAsyncClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # 连接归还连接池，不关闭
+        return None
+
+    def _kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        return kwargs
+
+    async def request(self, method: str, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return await get_async_http_client(url).request(method, url, **self._kwargs(kwargs))
+
+    async def get(self, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def put(self, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return await self.request("PUT", url, **kwargs)
+
+    async def delete(self, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return await self.request("DELETE", url, **kwargs)
+
+    def stream(self, method: str, url: Union[str, httpx.URL], **kwargs):
+        """流式请求，用法与 httpx.AsyncClient.stream 相同（async with client.stream(...) as response）"""
+        return get_async_http_client(url).stream(method, url, **self._kwargs(kwargs))
+
+
+class SharedClient:
+    """共享同步客户端的轻量包装，用法同 SharedAsyncClient"""
+
+    def __init__(self, timeout: _TimeoutTypes = None):
+        self.timeout = timeout
+
+    def __enter__(self) -> "SharedClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def _kwargs(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        if self.timeout is not None:
+            kwargs.setdefault("timeout", self.timeout)
+        return kwargs
+
+    def request(self, method: str, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return get_http_client(url).request(method, url, **self._kwargs(kwargs))
+
+    def get(self, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: Union[str, httpx.URL], **kwargs) -> httpx.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def stream(self, method: str, url: Union[str, httpx.URL], **kwargs):
+        """流式请求，用法与 httpx.Client.stream 相同（with client.stream(...) as response）"""
+        return get_http_client(url).stream(method, url, **self._kwargs(kwargs))
+
+
+def async_http_client(timeout: _TimeoutTypes = None) -> SharedAsyncClient:
+    """
+    获取共享异步客户端
+
+    Example:
+        async with async_http_client(timeout=120.0) as client:
+            response = await client.post(url, json=payload)
+    """
+    return SharedAsyncClient(timeout)
+
+
+def http_client(timeout: _TimeoutTypes = None) -> SharedClient:
+    """获取共享同步客户端，用法同 async_http_client"""
+    return SharedClient(timeout)
+
+
+def http_client_stats() -> Dict[str, Any]:
+    """各主机的连接池数量"""
+    with _lock:
+        hosts = {f"{scheme}://{host}" + (f":{port}" if port else "") for scheme, host, port in _sync_clients}
+        async_pools = 0
+        for clients in _async_clients.values():
+            async_pools += len(clients)
+            hosts.update(f"{scheme}://{host}" + (f":{port}" if port else "") for scheme, host, port in clients)
+        return {
+            "sync_pools": len(_sync_clients),
+            "async_pools": async_pools,
+            "hosts": sorted(hosts),
+            "http2": _http2_enabled(),
+        }
+
+
+async def close_http_clients() -> None:
+    """关闭所有共享客户端（在应用 shutdown 时调用），之后再次使用会重新创建"""
+    with _lock:
+        sync_clients = list(_sync_clients.values())
+        _sync_clients.clear()
+        async_clients = list(_async_clients.pop(asyncio.get_running_loop(), {}).values())
+
+    for client in sync_clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Close http client error: {e}")
+    for client in async_clients:
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Close async http client error: {e}")
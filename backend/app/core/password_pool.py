@@ -0,0 +1,104 @@
+"""
+密码哈希线程池
+bcrypt 单次计算耗时数十到数百毫秒，放在专用线程池中执行：
+不阻塞事件循环，也不会在登录高峰时占满 FastAPI 同步接口共用的线程池
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class PasswordHashPool:
+    """
+    bcrypt 专用线程池
+
+    bcrypt 计算期间释放 GIL，多个线程可以真正并行。max_workers 即同时进行的哈希数量上限
+    （通常不超过 CPU 核数），超出的请求在线程池队列中等待，排队和计算耗时计入统计。
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self._pending = 0
+        self._running = 0
+        self._completed = 0
+        self._queue_seconds = 0.0
+        self._queue_seconds_max = 0.0
+        self._run_seconds = 0.0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="password-hash",
+                    )
+        return self._executor
+
+    def _wrap(self, func: Callable[..., Any], *args) -> Callable[[], Any]:
+        """包装任务，记录排队时间和执行时间"""
+        submitted_at = time.perf_counter()
+        with self._lock:
+            self._pending += 1
+
+        def task():
+            started_at = time.perf_counter()
+            queued = started_at - submitted_at
+            with self._lock:
+                self._pending -= 1
+                self._running += 1
+                self._queue_seconds += queued
+                self._queue_seconds_max = max(self._queue_seconds_max, queued)
+            try:
+                return func(*args)
+            finally:
+                elapsed = time.perf_counter() - started_at
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    self._run_seconds += elapsed
+
+        return task
+
+    def run(self, func: Callable[..., Any], *args) -> Any:
+        """在线程池中执行并等待结果（同步调用方使用）"""
+        return self._get_executor().submit(self._wrap(func, *args)).result()
+
+    async def arun(self, func: Callable[..., Any], *args) -> Any:
+        """在线程池中执行，等待期间让出事件循环"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), self._wrap(func, *args))
+
+    def stats(self) -> Dict[str, Any]:
+        """线程池统计"""
+        with self._lock:
+            completed = self._completed
+            return {
+                "max_workers": self.max_workers,
+                "pending": self._pending,
+                "running": self._running,
+                "completed": completed,
+                "avg_queue_ms": round(self._queue_seconds / completed * 1000, 2) if completed else 0.0,
+                "max_queue_ms": round(self._queue_seconds_max * 1000, 2),
+                "avg_run_ms": round(self._run_seconds / completed * 1000, 2) if completed else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        """关闭线程池（在应用 shutdown 时调用）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+password_hash_pool = PasswordHashPool(settings.PASSWORD_HASH_WORKERS)
@@ -0,0 +1,287 @@
+"""
+SQL 查询统计
+通过 SQLAlchemy 引擎事件统计每个请求执行的 SQL 条数、数据库耗时和慢查询：
+- QueryStatsMiddleware: 为每个请求开启统计，结束后写日志、汇总到 query_metrics，
+  DEBUG 模式下通过 X-DB-Query-Count / X-DB-Time-Ms 响应头返回
+- query_metrics: 按接口和慢查询语句（去掉参数后的 SQL）汇总的进程内指标
+- assert_max_queries(): 测试中断言代码块内的 SQL 条数上限
+"""
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|:\w+|\?|\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\)(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))+")
+_WHITESPACE = re.compile(r"\s+")
+
+# 慢查询语句最多汇总的条数，超出后新语句只计入接口维度
+_MAX_SLOW_STATEMENTS = 200
+
+# 未匹配到路由（404、405、静态文件）的请求统一计入该项，避免按原始路径无限增长
+UNMATCHED_ENDPOINT = "<unmatched>"
+
+
+def normalize_sql(statement: str) -> str:
+    """
+    去掉 SQL 中的参数和字面量，同一类语句归并为同一条
+
+    Example:
+        SELECT * FROM users WHERE id IN (%(id_1_1)s, %(id_1_2)s) AND status = 'active'
+        -> SELECT * FROM users WHERE id IN (...) AND status = ?
+    """
+    sql = _STRING_LITERAL.sub("?", statement)
+    sql = _PLACEHOLDER.sub("?", sql)
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _VALUES_LIST.sub("), ...", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@dataclass
+class QueryStats:
+    """一个请求（或测试代码块）内的查询统计"""
+    count: int = 0
+    seconds: float = 0.0
+    slow: List[Dict[str, Any]] = field(default_factory=list)
+    statements: Optional[List[str]] = None  # 测试时记录全部语句，便于定位多出来的查询
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 2)
+
+    def add(self, statement: str, elapsed: float, normalized: Optional[str] = None) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        if self.statements is not None:
+            self.statements.append(normalized or normalize_sql(statement))
+        if normalized is not None and len(self.slow) < settings.QUERY_STATS_SLOW_SAMPLES:
+            self.slow.append({"sql": normalized, "ms": round(elapsed * 1000, 2)})
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_collectors: List[QueryStats] = []
+
+
+class QueryMetrics:
+    """进程内查询指标：按接口汇总请求数、SQL 条数和数据库耗时，按语句汇总慢查询"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, Dict[str, float]] = {}
+        self._slow: Dict[str, Dict[str, float]] = {}
+
+    def record_request(self, endpoint: str, stats: QueryStats) -> None:
+        with self._lock:
+            item = self._endpoints.get(endpoint)
+            if item is None:
+                item = self._endpoints[endpoint] = {
+                    "requests": 0, "queries": 0, "max_queries": 0, "db_seconds": 0.0, "slow_queries": 0
+                }
+            item["requests"] += 1
+            item["queries"] += stats.count
+            item["max_queries"] = max(item["max_queries"], stats.count)
+            item["db_seconds"] += stats.seconds
+            item["slow_queries"] += len(stats.slow)
+
+    def record_slow(self, normalized: str, elapsed: float) -> None:
+        with self._lock:
+            item = self._slow.get(normalized)
+            if item is None:
+                if len(self._slow) >= _MAX_SLOW_STATEMENTS:
+                    return
+                item = self._slow[normalized] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0}
+            item["count"] += 1
+            item["seconds"] += elapsed
+            item["max_seconds"] = max(item["max_seconds"], elapsed)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        查询指标
+
+        Returns:
+            endpoints: 各接口的请求数、平均/最大 SQL 条数、平均数据库耗时、慢查询数（按平均 SQL 条数降序）
+            slow_queries: 慢查询语句的次数、平均/最大耗时（按总耗时降序）
+        """
+        with self._lock:
+            endpoints = [
+                {
+                    "endpoint": endpoint,
+                    "requests": item["requests"],
+                    "avg_queries": round(item["queries"] / item["requests"], 2),
+                    "max_queries": item["max_queries"],
+                    "avg_db_ms": round(item["db_seconds"] / item["requests"] * 1000, 2),
+                    "slow_queries": item["slow_queries"],
+                }
+                for endpoint, item in self._endpoints.items()
+            ]
+            slow = [
+                {
+                    "sql": sql,
+                    "count": item["count"],
+                    "avg_ms": round(item["seconds"] / item["count"] * 1000, 2),
+                    "max_ms": round(item["max_seconds"] * 1000, 2),
+                    "total_ms": round(item["seconds"] * 1000, 2),
+                }
+                for sql, item in self._slow.items()
+            ]
+        endpoints.sort(key=lambda e: e["avg_queries"], reverse=True)
+        slow.sort(key=lambda s: s["total_ms"], reverse=True)
+        return {
+            "slow_query_threshold_ms": settings.SLOW_QUERY_THRESHOLD_MS,
+            "endpoints": endpoints,
+            "slow_queries": slow,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._slow.clear()
+
+
+query_metrics = QueryMetrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("query_started_at")
+    if not started:
+        return
+    elapsed = time.perf_counter() - started.pop()
+
+    stats = _current_stats.get()
+    if stats is None and not _collectors:
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            # 请求之外（后台任务、脚本）的慢查询直接记录
+            normalized = normalize_sql(statement)
+            query_metrics.record_slow(normalized, elapsed)
+            logger.warning(f"慢查询 {elapsed * 1000:.1f}ms: {normalized}")
+        return
+
+    normalized = None
+    if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+        normalized = normalize_sql(statement)
+        query_metrics.record_slow(normalized, elapsed)
+    if stats is not None:
+        stats.add(statement, elapsed, normalized)
+    for collector in _collectors:
+        collector.add(statement, elapsed, normalized)
+
+
+def _handle_error(exception_context):
+    # 执行出错时不会触发 after_cursor_execute，丢弃对应的开始时间
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+def install_query_instrumentation() -> None:
+    """在所有引擎（含异步引擎底层的同步引擎和测试引擎）上注册统计事件，可重复调用"""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+class QueryStatsMiddleware:
+    """
+    请求级查询统计中间件（纯 ASGI 实现，流式响应也能正常统计）
+
+    同步接口在线程池中执行时会复制当前上下文，统计对象随 ContextVar 传递到线程中。
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.QUERY_STATS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start" and settings.DEBUG:
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Query-Count"] = str(stats.count)
+                headers["X-DB-Time-Ms"] = str(stats.milliseconds)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            _current_stats.reset(token)
+            endpoint = _endpoint_name(scope)
+            query_metrics.record_request(endpoint, stats)
+            _log_request(endpoint, stats)
+
+
+def _endpoint_name(scope: Scope) -> str:
+    """请求对应的接口名（方法 + 路由模板），路由和方法都匹配时才按接口区分"""
+    route = scope.get("route")
+    methods = getattr(route, "methods", None)
+    if route is None or (methods is not None and scope["method"] not in methods):
+        return UNMATCHED_ENDPOINT
+    return f"{scope['method']} {route.path}"
+
+
+def _log_request(endpoint: str, stats: QueryStats) -> None:
+    message = f"{endpoint} 执行 {stats.count} 条SQL，数据库耗时 {stats.milliseconds}ms"
+    if stats.slow or stats.count > settings.QUERY_COUNT_WARN_THRESHOLD:
+        slow = "".join(f"\n  慢查询 {s['ms']}ms: {s['sql']}" for s in stats.slow)
+        logger.warning(message + slow)
+    elif stats.count:
+        logger.debug(message)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryStats]:
+    """
+    统计代码块内执行的 SQL（不区分线程，TestClient 在独立线程中运行应用也能统计到）
+
+    Example:
+        with count_queries() as stats:
+            client.get("/api/v1/image/tasks/1")
+        print(stats.count, stats.statements)
+    """
+    stats = QueryStats(statements=[])
+    _collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        _collectors.remove(stats)
+
+
+@contextmanager
+def assert_max_queries(limit: int) -> Iterator[QueryStats]:
+    """
+    断言代码块内执行的 SQL 不超过 limit 条，超出时列出全部语句
+
+    Example:
+        with assert_max_queries(3):
+            response = client.get("/api/v1/traffic/overview", headers=auth_headers)
+    """
+    with count_queries() as stats:
+        yield stats
+    if stats.count > limit:
+        statements = "\n".join(f"  {i}. {sql}" for i, sql in enumerate(stats.statements, 1))
+        raise AssertionError(f"期望最多 {limit} 条SQL，实际执行 {stats.count} 条:\n{statements}")
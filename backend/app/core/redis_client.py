@@ -0,0 +1,88 @@
+"""
+Redis连接管理
+同步客户端供脚本和后台线程使用，异步客户端供 async 接口使用，进程内共享同一个连接池
+"""
+import logging
+from typing import Optional
+from urllib.parse import urlparse, urlunparse
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_async_pool: Optional[aioredis.ConnectionPool] = None
+_async_client: Optional[aioredis.Redis] = None
+
+
+def get_redis_url() -> str:
+    """
+    获取Redis连接URL
+
+    如果设置了 REDIS_PASSWORD，则构建带认证的URL: redis://:password@host:port/db
+    """
+    redis_url = settings.REDIS_URL
+    if settings.REDIS_PASSWORD:
+        parsed = urlparse(redis_url)
+        if parsed.port:
+            netloc = f":{settings.REDIS_PASSWORD}@{parsed.hostname}:{parsed.port}"
+        else:
+            netloc = f":{settings.REDIS_PASSWORD}@{parsed.hostname}"
+        redis_url = urlunparse((
+            parsed.scheme,
+            netloc,
+            parsed.path,
+            parsed.params,
+            parsed.query,
+            parsed.fragment
+        ))
+    return redis_url
+
+
+def create_sync_redis() -> redis.Redis:
+    """创建同步Redis客户端"""
+    return redis.from_url(
+        get_redis_url(),
+        encoding="utf-8",
+        decode_responses=True,
+        socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+    )
+
+
+def get_async_redis() -> aioredis.Redis:
+    """
+    获取共享的异步Redis客户端
+
+    首次调用时创建连接池，之后所有 AsyncCache / AsyncTrackerService 复用同一个池。
+    连接池绑定到应用主事件循环，后台线程中的独立事件循环请使用同步客户端。
+    """
+    global _async_pool, _async_client
+    if _async_client is None:
+        _async_pool = aioredis.ConnectionPool.from_url(
+            get_redis_url(),
+            encoding="utf-8",
+            decode_responses=True,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        )
+        _async_client = aioredis.Redis(connection_pool=_async_pool)
+    return _async_client
+
+
+async def close_async_redis() -> None:
+    """关闭异步Redis连接池（在应用 shutdown 时调用）"""
+    global _async_pool, _async_client
+    client, pool = _async_client, _async_pool
+    _async_client = None
+    _async_pool = None
+    try:
+        if client is not None:
+            await client.aclose()
+        if pool is not None:
+            await pool.aclose()
+    except Exception as e:
+        logger.warning(f"Close async redis error: {e}")
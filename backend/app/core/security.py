@@ -1,16 +1,20 @@
 """
 安全认证模块
 """
+import logging
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.password_pool import password_hash_pool
 from app.models.user import User
 
 # 密码加密上下文
@@ -19,10 +23,21 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # HTTP Bearer认证
 security = HTTPBearer()
 
+logger = logging.getLogger(__name__)
+
+# 令牌解码失败日志的最小间隔（秒），过期令牌集中出现时避免刷屏
+_DECODE_ERROR_LOG_INTERVAL = 60
+_decode_error_logged_at = 0.0
+_decode_error_suppressed = 0
+
+# 认证用户快照只保存鉴权和每日配额检查需要的字段，其余字段（积分、会员等）访问时从数据库加载
+_USER_SNAPSHOT_FIELDS = ("id", "username", "email", "role", "status", "daily_quota")
+_user_cache = None
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
-    验证密码
+    验证密码（在密码哈希线程池中执行，async 接口请使用 averify_password）
     
     Args:
         plain_password: 明文密码
@@ -31,12 +46,12 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         bool: 是否匹配
     """
-    return pwd_context.verify(plain_password, hashed_password)
+    return password_hash_pool.run(pwd_context.verify, plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
     """
-    获取密码哈希值
+    获取密码哈希值（在密码哈希线程池中执行，async 接口请使用 aget_password_hash）
     
     Args:
         password: 明文密码
@@ -44,7 +59,17 @@ def get_password_hash(password: str) -> str:
     Returns:
         str: 哈希密码
     """
-    return pwd_context.hash(password)
+    return password_hash_pool.run(pwd_context.hash, password)
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    """验证密码，等待期间不阻塞事件循环"""
+    return await password_hash_pool.arun(pwd_context.verify, plain_password, hashed_password)
+
+
+async def aget_password_hash(password: str) -> str:
+    """获取密码哈希值，等待期间不阻塞事件循环"""
+    return await password_hash_pool.arun(pwd_context.hash, password)
 
 
 def create_access_token(subject: int, expires_delta: Optional[timedelta] = None) -> str:
@@ -103,13 +128,11 @@ def decode_token(token: str) -> dict:
         HTTPException: 令牌无效或过期
     """
     try:
-        payload = jwt.decode(
+        return jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        print(f"Token decoded successfully: {payload}")
-        return payload
     except JWTError as e:
-        print(f"Token decode error: {str(e)}")
+        _log_decode_error(e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="无效的认证凭证",
@@ -117,6 +140,81 @@ def decode_token(token: str) -> dict:
         )
 
 
+def _log_decode_error(error: Exception) -> None:
+    """记录令牌解码失败，每个时间间隔内最多输出一条"""
+    global _decode_error_logged_at, _decode_error_suppressed
+    now = time.monotonic()
+    if now - _decode_error_logged_at < _DECODE_ERROR_LOG_INTERVAL:
+        _decode_error_suppressed += 1
+        return
+    suppressed, _decode_error_suppressed = _decode_error_suppressed, 0
+    _decode_error_logged_at = now
+    message = f"Token decode error: {error}"
+    if suppressed:
+        message += f" ({suppressed} similar errors suppressed)"
+    logger.warning(message)
+
+
+def _get_user_cache():
+    global _user_cache
+    if _user_cache is None:
+        # 延迟导入：app.utils 包会反向导入本模块
+        from app.utils.memory_cache import MemoryCache
+        _user_cache = MemoryCache(
+            max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES,
+            sweep_interval=settings.MEMORY_CACHE_SWEEP_INTERVAL,
+            name="auth_user",
+        )
+    return _user_cache
+
+
+def load_auth_user(db: Session, user_id: int) -> Optional[User]:
+    """
+    获取认证用户
+
+    每个 worker 缓存用户快照（AUTH_USER_CACHE_TTL 秒）。命中时不查询数据库，
+    而是用快照构造一个持久化状态的 User 加入当前会话：快照字段直接可用，
+    其余字段在首次访问时由 SQLAlchemy 一次性加载，因此积分等字段读到的始终是最新值，
+    对 current_user 的修改也照常随会话提交。
+
+    Args:
+        db: 数据库会话
+        user_id: 用户ID
+
+    Returns:
+        Optional[User]: 用户，不存在时返回 None
+    """
+    ttl = settings.AUTH_USER_CACHE_TTL
+    if ttl > 0:
+        snapshot = _get_user_cache().get(str(user_id))
+        if snapshot is not None:
+            user = db.identity_map.get(identity_key(User, user_id))
+            if user is None:
+                user = User(**snapshot)
+                make_transient_to_detached(user)
+                db.add(user)
+            return user
+
+    user = db.query(User).filter(User.id == user_id).first()
+    if user is not None and ttl > 0:
+        _get_user_cache().set(
+            str(user_id),
+            {field: getattr(user, field) for field in _USER_SNAPSHOT_FIELDS},
+            expire=ttl
+        )
+    return user
+
+
+def invalidate_auth_user(user_id: int) -> None:
+    """
+    清除认证用户快照
+
+    在修改密码、状态、角色或删除用户后调用。缓存是每个 worker 一份，
+    其他 worker 上的快照最多在 AUTH_USER_CACHE_TTL 秒后过期。
+    """
+    _get_user_cache().delete(str(user_id))
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -154,7 +252,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = load_auth_user(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -25,7 +25,10 @@ MultiPartParser.spool_max_size = 50 * 1024 * 1024
 
 from app.core.config import settings
 from app.core.database import init_db
-from app.api.v1 import auth, writing, image, video, ppt, creations, publish, models as models_api, credit, operation, oauth, ai, plugins, templates, hotspot, title, image_stock, platform_converter, viral_analyzer, admin_users, traffic, ppt_templates, model_usage
+from app.core.password_pool import password_hash_pool
+from app.core.query_stats import QueryStatsMiddleware
+from app.utils.rate_limiter import RateLimitMiddleware
+from app.api.v1 import auth, writing, image, video, ppt, creations, publish, models as models_api, credit, operation, oauth, ai, plugins, templates, hotspot, title, image_stock, platform_converter, viral_analyzer, admin_users, admin_metrics, traffic, ppt_templates, model_usage
 
 # 配置日志
 logging.basicConfig(
@@ -43,6 +46,12 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# 请求级 SQL 统计
+app.add_middleware(QueryStatsMiddleware)
+
+# 全局限流（先于 CORS 注册，使 429 响应也带上 CORS 头）
+app.add_middleware(RateLimitMiddleware)
+
 # 配置CORS
 app.add_middleware(
     CORSMiddleware,
@@ -68,7 +77,8 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
             "code": exc.status_code,
             "message": exc.detail,
             "data": None
-        }
+        },
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -122,6 +132,22 @@ async def startup_event():
     except Exception as e:
         logger.error(f"启动埋点后台任务失败: {e}")
 
+    # 启动会员过期清扫任务
+    try:
+        from app.tasks.membership_expiry import start_membership_expiry_sweeper
+        start_membership_expiry_sweeper()
+        logger.info("会员过期清扫任务已启动")
+    except Exception as e:
+        logger.error(f"启动会员过期清扫任务失败: {e}")
+
+    # 启动每日用量同步任务
+    try:
+        from app.tasks.quota_sync import start_quota_usage_syncer
+        start_quota_usage_syncer()
+        logger.info("每日用量同步任务已启动")
+    except Exception as e:
+        logger.error(f"启动每日用量同步任务失败: {e}")
+
     # 同步插件到数据库
     try:
         from app.services.plugins.plugin_manager import PluginManager
@@ -140,6 +166,26 @@ async def startup_event():
     logger.info("应用启动完成")
 
 
+# 关闭事件
+@app.on_event("shutdown")
+async def shutdown_event():
+    """应用关闭时执行"""
+    from app.core.redis_client import close_async_redis
+    from app.core.database_async import close_async_db
+    from app.core.http_client import close_http_clients
+    from app.services.langchain.chat.providers.spark_pool import close_spark_pools
+    from app.tasks.membership_expiry import stop_membership_expiry_sweeper
+    from app.tasks.quota_sync import stop_quota_usage_syncer
+    stop_membership_expiry_sweeper()
+    stop_quota_usage_syncer()
+    await close_async_redis()
+    await close_async_db()
+    await close_http_clients()
+    await close_spark_pools()
+    password_hash_pool.shutdown()
+    logger.info("应用已关闭")
+
+
 @app.get("/", tags=["系统"])
 async def root():
     """根路径"""
@@ -322,6 +368,13 @@ app.include_router(
     tags=["管理员 - 模型调用监控"]
 )
 
+# 运行指标
+app.include_router(
+    admin_metrics.router,
+    prefix=f"{settings.API_V1_PREFIX}/admin/metrics",
+    tags=["管理员 - 运行指标"]
+)
+
 
 if __name__ == "__main__":
     import uvicorn
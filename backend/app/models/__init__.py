@@ -6,8 +6,8 @@ from app.models.ai_model import AIModel
 from app.models.creation import Creation, CreationVersion, CreationType, CreationStatus
 from app.models.publish import PlatformAccount, PublishRecord, PublishStatus, PlatformStatus
 from app.models.credit import (
-    CreditTransaction, MembershipOrder, RechargeOrder, CreditPrice, MembershipPrice,
-    TransactionType, MembershipType, PaymentStatus
+    CreditTransaction, MembershipOrder, RechargeOrder, CreditPrice, MembershipPrice, UserCreditStats,
+    CreditGrant, CreditGrantItem, TransactionType, MembershipType, PaymentStatus, CreditGrantStatus
 )
 from app.models.operation import (
     Activity, ActivityParticipation, Coupon, UserCoupon, ReferralRecord, OperationStatistics,
@@ -52,9 +52,13 @@ __all__ = [
     "RechargeOrder",
     "CreditPrice",
     "MembershipPrice",
+    "UserCreditStats",
+    "CreditGrant",
+    "CreditGrantItem",
     "TransactionType",
     "MembershipType",
     "PaymentStatus",
+    "CreditGrantStatus",
     
     # Operation models
     "Activity",
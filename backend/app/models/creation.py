@@ -1,7 +1,7 @@
 """
 创作记录模型
 """
-from sqlalchemy import Column, BigInteger, String, Enum, Integer, DateTime, Text, JSON, Boolean
+from sqlalchemy import Column, BigInteger, String, Enum, Integer, DateTime, Text, JSON, Boolean, Index
 from sqlalchemy.orm import relationship, foreign
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -124,6 +124,13 @@ class Creation(Base):
     )
     deleted_at = Column(DateTime, comment="删除时间（软删除）")
 
+    __table_args__ = (
+        # 作品列表/图片、视频任务查询：按用户+类型+状态过滤后按时间倒序
+        Index("idx_creation_user_type_status_created", "user_id", "creation_type", "status", "created_at"),
+        # 不限类型的个人作品列表
+        Index("idx_creation_user_created", "user_id", "created_at"),
+    )
+
     # 关系（不使用外键，通过 primaryjoin 指定关联条件）
     user = relationship("User", back_populates="creations", primaryjoin="Creation.user_id == foreign(User.id)",
                         remote_side="User.id")
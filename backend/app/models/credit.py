@@ -1,7 +1,7 @@
 """
 积分和会员模型
 """
-from sqlalchemy import Column, BigInteger, Integer, String, Enum, DateTime, Numeric, Text, Boolean
+from sqlalchemy import Column, BigInteger, Integer, String, Enum, DateTime, Numeric, Text, Boolean, Index
 from sqlalchemy.orm import relationship, foreign
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -25,6 +25,14 @@ class MembershipType(str, enum.Enum):
     YEARLY = "yearly"  # 年度会员
 
 
+class CreditGrantStatus(str, enum.Enum):
+    """批量发放状态枚举"""
+    PENDING = "pending"  # 待执行
+    RUNNING = "running"  # 执行中
+    COMPLETED = "completed"  # 已完成
+    FAILED = "failed"  # 失败（可重新执行，从未处理的用户继续）
+
+
 class PaymentStatus(str, enum.Enum):
     """支付状态枚举"""
     PENDING = "pending"  # 待支付
@@ -62,6 +70,11 @@ class CreditTransaction(Base):
         comment="创建时间"
     )
 
+    __table_args__ = (
+        # 积分明细按用户分页
+        Index("idx_credit_tx_user_created", "user_id", "created_at"),
+    )
+
     # 关系（不使用外键）
     user = relationship("User", back_populates="credit_transactions",
                         primaryjoin="CreditTransaction.user_id == foreign(User.id)", remote_side="User.id")
@@ -170,6 +183,116 @@ class RechargeOrder(Base):
         return f"<RechargeOrder(id={self.id}, order_no={self.order_no}, user_id={self.user_id}, status={self.payment_status})>"
 
 
+class UserCreditStats(Base):
+    """
+    用户积分/会员统计表
+
+    写入积分流水和订单支付成功时增量累加（CreditStatsService），统计接口直接读取，
+    不再扫描用户的全部流水和订单；历史数据通过 scripts/rebuild_credit_stats.py 回填。
+    """
+    __tablename__ = "user_credit_stats"
+
+    user_id = Column(BigInteger, primary_key=True, autoincrement=False, comment="用户ID")
+
+    total_earned = Column(Integer, nullable=False, default=0, comment="累计增加积分（所有正数流水之和）")
+    total_spent = Column(Integer, nullable=False, default=0, comment="累计减少积分（所有负数流水绝对值之和）")
+    total_recharge = Column(Integer, nullable=False, default=0, comment="累计充值积分")
+    total_consume = Column(Integer, nullable=False, default=0, comment="累计消费积分")
+    total_reward = Column(Integer, nullable=False, default=0, comment="累计奖励积分")
+
+    recharge_amount = Column(Numeric(12, 2), nullable=False, default=0, comment="累计充值金额")
+    recharge_count = Column(Integer, nullable=False, default=0, comment="充值次数")
+    last_recharge_at = Column(DateTime, comment="最近一次充值时间")
+
+    membership_amount = Column(Numeric(12, 2), nullable=False, default=0, comment="累计会员购买金额")
+    membership_count = Column(Integer, nullable=False, default=0, comment="会员购买次数")
+    last_membership_at = Column(DateTime, comment="最近一次购买会员时间")
+    last_membership_type = Column(Enum(MembershipType), comment="最近一次购买的会员类型")
+
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+        comment="更新时间"
+    )
+
+    def __repr__(self):
+        return f"<UserCreditStats(user_id={self.user_id}, earned={self.total_earned}, spent={self.total_spent})>"
+
+
+class CreditGrant(Base):
+    """
+    积分批量发放表
+
+    一次运营活动/补偿对应一条记录，campaign_key 唯一，重复提交同一活动不会重复发放。
+    """
+    __tablename__ = "credit_grants"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True, comment="发放ID")
+    campaign_key = Column(String(100), unique=True, nullable=False, comment="活动幂等键")
+
+    transaction_type = Column(
+        Enum(TransactionType),
+        nullable=False,
+        default=TransactionType.REWARD,
+        comment="积分流水类型"
+    )
+    description = Column(String(255), comment="积分流水描述")
+    related_id = Column(BigInteger, comment="关联ID（如活动ID）")
+    related_type = Column(String(50), comment="关联类型（如activity）")
+
+    status = Column(
+        Enum(CreditGrantStatus),
+        nullable=False,
+        default=CreditGrantStatus.PENDING,
+        comment="状态: pending-待执行, running-执行中, completed-已完成, failed-失败"
+    )
+    total_count = Column(Integer, nullable=False, default=0, comment="发放用户数")
+    granted_count = Column(Integer, nullable=False, default=0, comment="已发放用户数")
+    skipped_count = Column(Integer, nullable=False, default=0, comment="跳过用户数（用户不存在）")
+    granted_credits = Column(BigInteger, nullable=False, default=0, comment="已发放积分总数")
+    error = Column(Text, comment="最近一次失败原因")
+
+    created_by = Column(BigInteger, comment="创建人ID")
+    created_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+        comment="创建时间"
+    )
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+        comment="更新时间"
+    )
+    finished_at = Column(DateTime, comment="完成时间")
+
+    def __repr__(self):
+        return f"<CreditGrant(id={self.id}, campaign_key={self.campaign_key}, status={self.status})>"
+
+
+class CreditGrantItem(Base):
+    """积分批量发放明细表（每个用户一行，主键保证同一批次每个用户最多发放一次）"""
+    __tablename__ = "credit_grant_items"
+
+    grant_id = Column(BigInteger, primary_key=True, autoincrement=False, comment="发放ID")
+    user_id = Column(BigInteger, primary_key=True, autoincrement=False, comment="用户ID")
+    amount = Column(Integer, nullable=False, comment="发放积分数")
+    status = Column(String(20), nullable=False, default="pending", comment="状态: pending-待发放, granted-已发放, skipped-已跳过")
+    processed_at = Column(DateTime, comment="处理时间")
+
+    __table_args__ = (
+        # 按批次分块取待发放用户
+        Index("idx_credit_grant_item_status", "grant_id", "status", "user_id"),
+    )
+
+    def __repr__(self):
+        return f"<CreditGrantItem(grant_id={self.grant_id}, user_id={self.user_id}, status={self.status})>"
+
+
 class CreditPrice(Base):
     """积分价格配置表"""
     __tablename__ = "credit_prices"
@@ -37,6 +37,12 @@ class AIModelUsageLog(Base):
     
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True, comment="创建时间")
 
+    __table_args__ = (
+        # 调用日志按厂商/步骤筛选后按时间倒序
+        Index("idx_usage_log_provider_created", "provider", "created_at"),
+        Index("idx_usage_log_tool_created", "tool", "created_at"),
+    )
+
     # 关系（不使用外键）
     user = relationship("User", primaryjoin="AIModelUsageLog.user_id == foreign(User.id)")
     ai_model = relationship("AIModel", primaryjoin="AIModelUsageLog.ai_model_id == foreign(AIModel.id)")
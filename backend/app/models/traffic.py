@@ -2,7 +2,7 @@
 流量统计模型
 全埋点：页面访问 + 用户行为事件
 """
-from sqlalchemy import Column, BigInteger, String, Integer, DateTime, Date, Boolean, Text, JSON
+from sqlalchemy import Column, BigInteger, String, Integer, DateTime, Date, Boolean, Text, JSON, Index
 from datetime import datetime
 
 from app.core.database import Base
@@ -28,6 +28,11 @@ class PageView(Base):
     created_at = Column(DateTime, default=datetime.utcnow, index=True, comment="访问时间")
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, comment="更新时间")
 
+    __table_args__ = (
+        # 按时间段统计 UV（COUNT DISTINCT session_id）时只扫描索引
+        Index("idx_page_view_created_session", "created_at", "session_id"),
+    )
+
     def __repr__(self):
         return f"<PageView(id={self.id}, path='{self.path}')>"
 
@@ -40,9 +40,10 @@ class PaginationParams(BaseModel):
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
-    """分页响应"""
+    """分页响应（游标分页时 total/total_pages 可能为空）"""
     items: list[T]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
@@ -81,8 +81,9 @@ class CreationResponse(BaseModel):
 
 class CreationListResponse(BaseModel):
     """创作列表响应"""
-    total: int = Field(..., description="总数")
+    total: Optional[int] = Field(None, description="总数（with_total=false 时不返回）")
     items: List[CreationResponse] = Field(..., description="创作列表")
+    next_cursor: Optional[str] = Field(None, description="下一页游标，为空表示没有更多")
 
 
 class CreationListItem(BaseModel):
@@ -209,3 +209,46 @@ class MembershipStatisticsResponse(BaseModel):
     total_orders: int = Field(description="总订单数")
     total_amount: Decimal = Field(description="总消费金额")
     days_remaining: Optional[int] = Field(description="剩余天数")
+    last_purchase_at: Optional[datetime] = Field(default=None, description="最近一次购买时间")
+    last_membership_type: Optional[str] = Field(default=None, description="最近一次购买的会员类型")
+
+
+# ============ 批量发放相关 ============
+
+class CreditGrantItemCreate(BaseModel):
+    """批量发放明细（用户单独指定积分数）"""
+    user_id: int
+    amount: int
+
+
+class CreditGrantCreate(BaseModel):
+    """创建积分批量发放"""
+    campaign_key: str = Field(..., max_length=100, description="活动幂等键，重复提交返回已有批次")
+    user_ids: List[int] = Field(default_factory=list, description="发放用户，每人 amount 积分")
+    amount: Optional[int] = Field(None, description="user_ids 中每个用户的积分数，负数为扣减")
+    items: List[CreditGrantItemCreate] = Field(default_factory=list, description="逐个指定积分数的用户")
+    transaction_type: str = Field(default="reward", description="积分流水类型")
+    description: Optional[str] = Field(None, max_length=255, description="积分流水描述")
+    related_id: Optional[int] = None
+    related_type: Optional[str] = Field(None, max_length=50)
+
+    @validator('transaction_type')
+    def validate_transaction_type(cls, v):
+        if v not in ['recharge', 'consume', 'refund', 'reward', 'expire']:
+            raise ValueError('交易类型必须是 recharge, consume, refund, reward 或 expire')
+        return v
+
+
+class CreditGrantResponse(BaseModel):
+    """积分批量发放进度"""
+    id: int
+    campaign_key: str
+    status: str
+    total_count: int
+    granted_count: int
+    skipped_count: int
+    granted_credits: int
+    progress: float = Field(description="处理进度（0-100）")
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
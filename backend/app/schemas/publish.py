@@ -140,8 +140,9 @@ class PublishRecordResponse(PublishContentBase):
 
 class PublishRecordListResponse(BaseModel):
     """发布记录列表响应"""
-    total: int
+    total: Optional[int] = None
     items: List[PublishRecordResponse]
+    next_cursor: Optional[str] = None
 
 
 class PublishStatusResponse(BaseModel):
@@ -0,0 +1,284 @@
+"""
+积分批量发放服务
+运营活动、补偿等一次给大量用户发放（或扣减）积分：按用户分块，每块一个事务，
+一条集合 UPDATE 加一次批量插入流水，代替逐个调用 add_credits
+"""
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, Mapping, Optional, Tuple
+
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.exceptions import BusinessException
+from app.models.credit import (
+    CreditGrant, CreditGrantItem, CreditGrantStatus, TransactionType
+)
+from app.models.user import User
+from app.schemas.credit import CreditGrantResponse
+from app.services.credit_service import AsyncCreditService, _ledger_row
+
+logger = logging.getLogger(__name__)
+
+ITEM_PENDING = "pending"
+ITEM_GRANTED = "granted"
+ITEM_SKIPPED = "skipped"
+
+# 创建批次时每次插入的明细行数
+_ITEM_INSERT_BATCH = 5000
+
+
+def grant_progress(grant: CreditGrant) -> CreditGrantResponse:
+    """批次进度"""
+    processed = (grant.granted_count or 0) + (grant.skipped_count or 0)
+    return CreditGrantResponse(
+        id=grant.id,
+        campaign_key=grant.campaign_key,
+        status=grant.status.value if isinstance(grant.status, CreditGrantStatus) else grant.status,
+        total_count=grant.total_count or 0,
+        granted_count=grant.granted_count or 0,
+        skipped_count=grant.skipped_count or 0,
+        granted_credits=grant.granted_credits or 0,
+        progress=round(processed / grant.total_count * 100, 2) if grant.total_count else 100.0,
+        error=grant.error,
+        created_at=grant.created_at,
+        finished_at=grant.finished_at,
+    )
+
+
+class CreditGrantService:
+    """积分批量发放服务"""
+
+    @staticmethod
+    async def create_grant(
+        db: AsyncSession,
+        campaign_key: str,
+        amounts: Mapping[int, int],
+        transaction_type: TransactionType = TransactionType.REWARD,
+        description: Optional[str] = None,
+        related_id: Optional[int] = None,
+        related_type: Optional[str] = None,
+        created_by: Optional[int] = None
+    ) -> Tuple[CreditGrant, bool]:
+        """
+        创建发放批次（不执行发放）
+
+        campaign_key 已存在时直接返回已有批次，同一活动重复提交不会重复发放。
+
+        Args:
+            db: 异步数据库会话
+            campaign_key: 活动幂等键
+            amounts: {用户ID: 积分数}，负数为扣减
+            transaction_type: 积分流水类型
+            description: 积分流水描述
+            related_id: 关联ID
+            related_type: 关联类型
+            created_by: 创建人ID
+
+        Returns:
+            (批次, 是否新创建)
+        """
+        existing = await CreditGrantService.get_by_campaign_key(db, campaign_key)
+        if existing is not None:
+            return existing, False
+
+        if not amounts:
+            raise BusinessException("发放用户不能为空")
+        if any(amount == 0 for amount in amounts.values()):
+            raise BusinessException("发放积分数不能为 0")
+
+        grant = CreditGrant(
+            campaign_key=campaign_key,
+            transaction_type=transaction_type,
+            description=description,
+            related_id=related_id,
+            related_type=related_type,
+            status=CreditGrantStatus.PENDING,
+            total_count=len(amounts),
+            granted_count=0,
+            skipped_count=0,
+            granted_credits=0,
+            created_by=created_by,
+        )
+        db.add(grant)
+        try:
+            await db.flush()
+            # 批次和明细在同一事务中写入，不会出现只有一部分用户的批次
+            items = [
+                {"grant_id": grant.id, "user_id": user_id, "amount": amount, "status": ITEM_PENDING}
+                for user_id, amount in sorted(amounts.items())
+            ]
+            for start in range(0, len(items), _ITEM_INSERT_BATCH):
+                await db.execute(insert(CreditGrantItem), items[start:start + _ITEM_INSERT_BATCH])
+            await db.commit()
+        except IntegrityError:
+            # 并发提交同一活动
+            await db.rollback()
+            existing = await CreditGrantService.get_by_campaign_key(db, campaign_key)
+            if existing is None:
+                raise
+            return existing, False
+
+        await db.refresh(grant)
+        return grant, True
+
+    @staticmethod
+    async def get_by_campaign_key(db: AsyncSession, campaign_key: str) -> Optional[CreditGrant]:
+        return (await db.execute(
+            select(CreditGrant).where(CreditGrant.campaign_key == campaign_key)
+        )).scalar_one_or_none()
+
+    @staticmethod
+    async def get_grant(db: AsyncSession, grant_id: int) -> CreditGrant:
+        grant = await db.get(CreditGrant, grant_id)
+        if grant is None:
+            raise BusinessException("发放批次不存在")
+        return grant
+
+    @staticmethod
+    async def run_grant(
+        db: AsyncSession,
+        grant_id: int,
+        chunk_size: int = 1000,
+        progress: Optional[Callable[[CreditGrantResponse], None]] = None
+    ) -> CreditGrant:
+        """
+        执行发放，可重复调用
+
+        每块用户在一个事务中完成：加锁读取余额、按积分数分组集合 UPDATE、批量写流水和统计、
+        标记明细并累加批次进度。中断后重新执行只处理仍为 pending 的用户，已发放的不会重复。
+
+        Args:
+            db: 异步数据库会话
+            grant_id: 批次ID
+            chunk_size: 每个事务处理的用户数
+            progress: 每块完成后的回调，参数为当前进度
+
+        Returns:
+            批次
+        """
+        grant = await CreditGrantService.get_grant(db, grant_id)
+        if grant.status == CreditGrantStatus.COMPLETED:
+            return grant
+
+        campaign_key = grant.campaign_key
+        grant.status = CreditGrantStatus.RUNNING
+        grant.error = None
+        await db.commit()
+
+        try:
+            while await CreditGrantService._process_chunk(db, grant, chunk_size):
+                await db.refresh(grant)
+                if progress:
+                    progress(grant_progress(grant))
+
+            # 其他执行者可能还锁着部分明细，全部处理完才标记完成
+            pending = (await db.execute(
+                select(func.count()).select_from(CreditGrantItem)
+                .where(CreditGrantItem.grant_id == grant.id, CreditGrantItem.status == ITEM_PENDING)
+            )).scalar_one()
+            if not pending:
+                grant.status = CreditGrantStatus.COMPLETED
+                grant.finished_at = datetime.now()
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            grant.status = CreditGrantStatus.FAILED
+            grant.error = str(e)[:1000]
+            await db.commit()
+            logger.error(f"积分批量发放失败 campaign_key={campaign_key}: {e}")
+            raise
+
+        await db.refresh(grant)
+        return grant
+
+    @staticmethod
+    async def _process_chunk(db: AsyncSession, grant: CreditGrant, chunk_size: int) -> int:
+        """处理一块待发放用户，返回处理的用户数（0 表示没有待处理用户）"""
+        items = (await db.execute(
+            select(CreditGrantItem.user_id, CreditGrantItem.amount)
+            .where(CreditGrantItem.grant_id == grant.id, CreditGrantItem.status == ITEM_PENDING)
+            .order_by(CreditGrantItem.user_id)
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+        )).all()
+        if not items:
+            await db.commit()
+            return 0
+
+        amounts = dict(items)
+        balances = dict((await db.execute(
+            select(User.id, User.credits).where(User.id.in_(amounts)).with_for_update()
+        )).all())
+
+        # 用户不存在，或扣减后余额为负的跳过
+        by_amount = defaultdict(list)
+        for user_id, amount in amounts.items():
+            if user_id in balances and balances[user_id] + amount >= 0:
+                by_amount[amount].append(user_id)
+        granted_ids = [user_id for user_ids in by_amount.values() for user_id in user_ids]
+        granted = set(granted_ids)
+        skipped_ids = [user_id for user_id in amounts if user_id not in granted]
+
+        for amount, user_ids in by_amount.items():
+            await db.execute(
+                update(User)
+                .where(User.id.in_(user_ids))
+                .values(credits=User.credits + amount)
+                .execution_options(synchronize_session=False)
+            )
+        await AsyncCreditService.record_transactions(db, [
+            _ledger_row(
+                user_id, grant.transaction_type, amounts[user_id], balances[user_id] + amounts[user_id],
+                grant.description, grant.related_id, grant.related_type
+            )
+            for user_id in granted_ids
+        ])
+
+        now = datetime.now()
+        for status, user_ids in ((ITEM_GRANTED, granted_ids), (ITEM_SKIPPED, skipped_ids)):
+            if user_ids:
+                await db.execute(
+                    update(CreditGrantItem)
+                    .where(CreditGrantItem.grant_id == grant.id, CreditGrantItem.user_id.in_(user_ids))
+                    .values(status=status, processed_at=now)
+                    .execution_options(synchronize_session=False)
+                )
+        await db.execute(
+            update(CreditGrant)
+            .where(CreditGrant.id == grant.id)
+            .values(
+                granted_count=CreditGrant.granted_count + len(granted_ids),
+                skipped_count=CreditGrant.skipped_count + len(skipped_ids),
+                granted_credits=CreditGrant.granted_credits + sum(amounts[user_id] for user_id in granted_ids),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+        return len(items)
+
+
+async def run_grant_in_background(grant_id: int, chunk_size: int = 1000) -> None:
+    """在后台执行发放（供 BackgroundTasks 使用，使用独立会话）"""
+    from app.core.database_async import AsyncSessionLocal
+
+    async with AsyncSessionLocal() as db:
+        try:
+            await CreditGrantService.run_grant(db, grant_id, chunk_size=chunk_size)
+        except Exception:
+            # run_grant 已记录失败原因，可通过 resume 接口重新执行
+            pass
+
+
+def parse_amounts(user_ids, amount: Optional[int], items) -> Dict[int, int]:
+    """合并 user_ids + amount 和逐个指定的 items，同一用户以 items 为准"""
+    amounts: Dict[int, int] = {}
+    if user_ids:
+        if amount is None:
+            raise BusinessException("指定 user_ids 时必须指定 amount")
+        amounts.update(dict.fromkeys(user_ids, amount))
+    for item in items or []:
+        amounts[item.user_id] = item.amount
+    return amounts
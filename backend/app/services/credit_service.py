@@ -2,7 +2,10 @@
 积分和会员服务
 """
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, or_, select, update, insert
 from datetime import datetime, timedelta
 from typing import Optional, List, Tuple
 from decimal import Decimal
@@ -12,15 +15,122 @@ from app.models.user import User
 from app.models.credit import (
     CreditTransaction, TransactionType,
     RechargeOrder, MembershipOrder, PaymentStatus,
-    CreditPrice, MembershipPrice, MembershipType
+    CreditPrice, MembershipPrice, MembershipType,
+    UserCreditStats
 )
 from app.schemas.credit import (
     CreditTransactionResponse,
+    CreditPriceResponse, MembershipPriceResponse,
     RechargeOrderCreate, RechargeOrderResponse,
     MembershipOrderCreate, MembershipOrderResponse,
     CreditStatisticsResponse, MembershipStatisticsResponse
 )
+from app.core.database import atomic
 from app.core.exceptions import BusinessException
+from app.services.credit_stats_service import CreditStatsService
+from app.utils.cache_decorator import cached
+from app.utils.pagination import cached_count, keyset_filter, keyset_order_by, split_page
+
+
+def is_active_member(is_member, member_expired_at: Optional[datetime], now: Optional[datetime] = None) -> bool:
+    """
+    会员是否有效
+
+    以 member_expired_at 为准：过期后 is_member 由 MembershipExpirySweeper 批量置 0，
+    在此之前请求路径只读不写，按到期时间推导会员状态
+    """
+    return bool(is_member) and member_expired_at is not None and member_expired_at > (now or datetime.now())
+
+
+def _not_active_member(now: datetime):
+    """非有效会员条件（有效会员不扣积分），与 is_active_member 相反"""
+    return or_(
+        User.is_member == 0,
+        User.member_expired_at.is_(None),
+        User.member_expired_at <= now,
+    )
+
+
+def _consume_statement(user_id: int, amount: int, now: datetime, member_free: bool = True):
+    """
+    条件扣减语句：余额检查和扣减在同一条 UPDATE 中完成，并发扣减不会超扣
+
+    UPDATE users SET credits = credits - :amount
+    WHERE id = :user_id AND credits >= :amount [AND <非有效会员>]
+    """
+    conditions = [User.id == user_id, User.credits >= amount]
+    if member_free:
+        conditions.append(_not_active_member(now))
+    return (
+        update(User)
+        .where(*conditions)
+        .values(credits=User.credits - amount)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _add_statement(user_id: int, amount: int):
+    """增加积分语句：UPDATE users SET credits = credits + :amount WHERE id = :user_id"""
+    return (
+        update(User)
+        .where(User.id == user_id)
+        .values(credits=User.credits + amount)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _balance_query(user_id: int):
+    return select(User.credits).where(User.id == user_id)
+
+
+def _member_state_query(user_id: int):
+    return select(User.credits, User.is_member, User.member_expired_at).where(User.id == user_id)
+
+
+def _check_consume_miss(row, amount: int, now: datetime, member_free: bool = True) -> bool:
+    """
+    条件扣减未命中时判断原因
+
+    Returns:
+        会员免扣时有效会员返回 True（不扣积分）
+
+    Raises:
+        BusinessException: 用户不存在或积分不足
+    """
+    if row is None:
+        raise BusinessException("用户不存在")
+    if member_free and is_active_member(row.is_member, row.member_expired_at, now):
+        return True
+    raise BusinessException(f"积分不足，当前余额: {row.credits}，需要: {amount}")
+
+
+def _ledger_row(
+    user_id: int,
+    transaction_type: TransactionType,
+    amount: int,
+    balance_after: int,
+    description: str,
+    related_id: Optional[int] = None,
+    related_type: Optional[str] = None
+) -> dict:
+    """构造一条积分流水（amount 为带符号的变动值）"""
+    return {
+        "user_id": user_id,
+        "transaction_type": transaction_type,
+        "amount": amount,
+        "balance_before": balance_after - amount,
+        "balance_after": balance_after,
+        "description": description,
+        "related_id": related_id,
+        "related_type": related_type,
+    }
+
+
+def _set_loaded_credits(db, user_id: int, credits: int) -> None:
+    """积分由 SQL 直接更新，同步会话中已加载的 User.credits，避免后续读到旧值"""
+    user = db.identity_map.get(identity_key(User, user_id))
+    if user is not None:
+        set_committed_value(user, "credits", credits)
 
 
 class CreditService:
@@ -38,24 +148,17 @@ class CreditService:
         Returns:
             用户余额信息
         """
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
+        row = db.execute(_member_state_query(user_id)).first()
+        if not row:
             raise BusinessException("用户不存在")
         
-        # 检查会员是否过期
-        is_member = False
-        if user.is_member and user.member_expired_at:
-            if user.member_expired_at > datetime.now():
-                is_member = True
-            else:
-                # 会员已过期，更新状态
-                user.is_member = 0
-                db.commit()
+        # 过期会员由清扫任务批量处理，这里只按到期时间判断，不写库
+        is_member = is_active_member(row.is_member, row.member_expired_at)
         
         return {
-            "credits": user.credits,
+            "credits": row.credits,
             "is_member": is_member,
-            "member_expired_at": user.member_expired_at if is_member else None
+            "member_expired_at": row.member_expired_at if is_member else None
         }
     
     @staticmethod
@@ -65,10 +168,15 @@ class CreditService:
         amount: int,
         description: str,
         related_id: Optional[int] = None,
-        related_type: Optional[str] = None
+        related_type: Optional[str] = None,
+        member_free: bool = True
     ) -> bool:
         """
-        检查并消费积分（会员不扣积分）
+        检查并消费积分（默认会员不扣积分）
+        
+        余额检查和扣减由一条条件 UPDATE 完成，不需要先读出 User 再加锁，
+        并发扣减时余额不会变成负数；UPDATE 未命中时再查询原因。
+        在外层 atomic(db) 中调用时与外层一起提交，否则自行提交。
         
         Args:
             db: 数据库会话
@@ -77,50 +185,28 @@ class CreditService:
             description: 消费描述
             related_id: 关联ID
             related_type: 关联类型
+            member_free: 有效会员是否免扣（图片、视频、PPT 等按次计费的功能会员也扣积分）
             
         Returns:
             是否成功
-        """
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise BusinessException("用户不存在")
-        
-        # 检查是否是会员
-        is_member = False
-        if user.is_member and user.member_expired_at:
-            if user.member_expired_at > datetime.now():
-                is_member = True
-            else:
-                # 会员已过期
-                user.is_member = 0
-                db.commit()
-        
-        # 会员不扣积分
-        if is_member:
-            return True
-        
-        # 非会员检查积分余额
-        if user.credits < amount:
-            raise BusinessException(f"积分不足，当前余额: {user.credits}，需要: {amount}")
-        
-        # 扣减积分
-        balance_before = user.credits
-        user.credits -= amount
-        balance_after = user.credits
-        
-        # 记录交易
-        transaction = CreditTransaction(
-            user_id=user_id,
-            transaction_type=TransactionType.CONSUME,
-            amount=-amount,
-            balance_before=balance_before,
-            balance_after=balance_after,
-            description=description,
-            related_id=related_id,
-            related_type=related_type
-        )
-        db.add(transaction)
-        db.commit()
+            
+        Raises:
+            BusinessException: 用户不存在或积分不足
+        """
+        now = datetime.now()
+        with atomic(db):
+            if db.execute(_consume_statement(user_id, amount, now, member_free)).rowcount == 0:
+                return _check_consume_miss(
+                    db.execute(_member_state_query(user_id)).first(), amount, now, member_free
+                )
+            
+            # UPDATE 的行锁持有到事务提交，读到的就是本次扣减后的余额；写流水失败时扣减一并回滚
+            balance_after = db.execute(_balance_query(user_id)).scalar_one()
+            CreditService.record_transactions(db, [_ledger_row(
+                user_id, TransactionType.CONSUME, -amount, balance_after,
+                description, related_id, related_type
+            )])
+        _set_loaded_credits(db, user_id, balance_after)
         
         return True
     
@@ -149,65 +235,84 @@ class CreditService:
         Returns:
             交易记录
         """
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise BusinessException("用户不存在")
-        
-        balance_before = user.credits
-        user.credits += amount
-        balance_after = user.credits
-        
-        transaction = CreditTransaction(
-            user_id=user_id,
-            transaction_type=transaction_type,
-            amount=amount,
-            balance_before=balance_before,
-            balance_after=balance_after,
-            description=description,
-            related_id=related_id,
-            related_type=related_type
-        )
-        db.add(transaction)
-        db.commit()
+        with atomic(db):
+            if db.execute(_add_statement(user_id, amount)).rowcount == 0:
+                raise BusinessException("用户不存在")
+            
+            balance_after = db.execute(_balance_query(user_id)).scalar_one()
+            row = _ledger_row(
+                user_id, transaction_type, amount, balance_after,
+                description, related_id, related_type
+            )
+            db.execute(CreditStatsService.ledger_statement(db, [row]))
+            transaction = CreditTransaction(**row)
+            db.add(transaction)
+            db.flush()
         db.refresh(transaction)
+        _set_loaded_credits(db, user_id, balance_after)
         
         return transaction
     
+    @staticmethod
+    def record_transactions(db: Session, rows: List[dict]) -> None:
+        """
+        批量写入积分流水并累加用户统计（不提交事务）
+        
+        Args:
+            db: 数据库会话
+            rows: 流水列值列表，可用 _ledger_row 构造
+        """
+        if rows:
+            db.execute(insert(CreditTransaction), rows)
+            db.execute(CreditStatsService.ledger_statement(db, rows))
+    
     @staticmethod
     def get_transactions(
         db: Session,
         user_id: int,
         skip: int = 0,
-        limit: int = 20
-    ) -> Tuple[List[CreditTransaction], int]:
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        with_total: bool = True
+    ) -> Tuple[List[CreditTransaction], Optional[int], Optional[str]]:
         """
         获取积分交易记录
         
         Args:
             db: 数据库会话
             user_id: 用户ID
-            skip: 跳过数量
+            skip: 跳过数量（传入 cursor 时忽略）
             limit: 限制数量
+            cursor: 分页游标
+            with_total: 是否统计总数（缓存 60 秒）
             
         Returns:
-            交易记录列表和总数
+            交易记录列表、总数（未统计时为 None）和下一页游标
         """
         query = db.query(CreditTransaction).filter(
             CreditTransaction.user_id == user_id
         )
         
-        total = query.count()
-        transactions = query.order_by(
-            CreditTransaction.created_at.desc()
-        ).offset(skip).limit(limit).all()
+        total = None
+        if with_total:
+            total = cached_count("credit_transactions", query.count, user_id=user_id)
+        
+        if cursor:
+            query = query.filter(keyset_filter(CreditTransaction, cursor))
+        elif skip:
+            query = query.offset(skip)
+        rows = query.order_by(*keyset_order_by(CreditTransaction)).limit(limit + 1).all()
+        transactions, next_cursor = split_page(rows, limit)
         
-        return transactions, total
+        return transactions, total, next_cursor
     
     @staticmethod
     def get_credit_statistics(db: Session, user_id: int) -> CreditStatisticsResponse:
         """
         获取积分统计
         
+        读取 user_credit_stats 中增量维护的累计值，不扫描流水和订单
+        
         Args:
             db: 数据库会话
             user_id: 用户ID
@@ -215,51 +320,66 @@ class CreditService:
         Returns:
             积分统计
         """
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise BusinessException("用户不存在")
-        
-        # 统计各类型积分
-        stats = db.query(
-            CreditTransaction.transaction_type,
-            func.sum(CreditTransaction.amount).label('total')
-        ).filter(
-            CreditTransaction.user_id == user_id
-        ).group_by(CreditTransaction.transaction_type).all()
-        
-        total_recharge = 0
-        total_consume = 0
-        total_reward = 0
-        
-        for stat in stats:
-            if stat.transaction_type == TransactionType.RECHARGE:
-                total_recharge = abs(stat.total or 0)
-            elif stat.transaction_type == TransactionType.CONSUME:
-                total_consume = abs(stat.total or 0)
-            elif stat.transaction_type == TransactionType.REWARD:
-                total_reward = abs(stat.total or 0)
-        
-        # 统计充值金额和次数
-        recharge_stats = db.query(
-            func.sum(RechargeOrder.amount).label('total_amount'),
-            func.count(RechargeOrder.id).label('count')
-        ).filter(
-            and_(
-                RechargeOrder.user_id == user_id,
-                RechargeOrder.payment_status == PaymentStatus.PAID
-            )
+        row = db.execute(
+            select(User.credits, UserCreditStats)
+            .outerjoin(UserCreditStats, UserCreditStats.user_id == User.id)
+            .where(User.id == user_id)
         ).first()
+        if not row:
+            raise BusinessException("用户不存在")
         
+        stats = row.UserCreditStats or UserCreditStats()
         return CreditStatisticsResponse(
-            total_recharge=total_recharge,
-            total_consume=total_consume,
-            total_reward=total_reward,
-            current_balance=user.credits,
-            recharge_amount=recharge_stats.total_amount or Decimal(0),
-            recharge_count=recharge_stats.count or 0
+            total_recharge=stats.total_recharge or 0,
+            total_consume=stats.total_consume or 0,
+            total_reward=stats.total_reward or 0,
+            current_balance=row.credits,
+            recharge_amount=stats.recharge_amount or Decimal(0),
+            recharge_count=stats.recharge_count or 0
         )
 
 
+class AsyncCreditService:
+    """积分服务（异步会话版本），规则与 CreditService 一致"""
+
+    @staticmethod
+    async def add_credits(
+        db: AsyncSession,
+        user_id: int,
+        amount: int,
+        transaction_type: TransactionType,
+        description: str,
+        related_id: Optional[int] = None,
+        related_type: Optional[str] = None
+    ) -> CreditTransaction:
+        """
+        增加积分，参数同 CreditService.add_credits
+        """
+        if (await db.execute(_add_statement(user_id, amount))).rowcount == 0:
+            raise BusinessException("用户不存在")
+
+        balance_after = (await db.execute(_balance_query(user_id))).scalar_one()
+        row = _ledger_row(
+            user_id, transaction_type, amount, balance_after,
+            description, related_id, related_type
+        )
+        await db.execute(CreditStatsService.ledger_statement(db, [row]))
+        transaction = CreditTransaction(**row)
+        db.add(transaction)
+        await db.commit()
+        await db.refresh(transaction)
+        _set_loaded_credits(db, user_id, balance_after)
+
+        return transaction
+
+    @staticmethod
+    async def record_transactions(db: AsyncSession, rows: List[dict]) -> None:
+        """批量写入积分流水（不提交事务），参数同 CreditService.record_transactions"""
+        if rows:
+            await db.execute(insert(CreditTransaction), rows)
+            await db.execute(CreditStatsService.ledger_statement(db, rows))
+
+
 class RechargeService:
     """充值服务"""
     
@@ -339,24 +459,25 @@ class RechargeService:
             return True  # 已支付，避免重复处理
         
         if status == "paid":
-            # 更新订单状态
-            order.payment_status = PaymentStatus.PAID
-            order.paid_at = datetime.now()
-            order.transaction_id = transaction_id
-            
-            # 增加用户积分
-            total_credits = order.credits + order.bonus_credits
-            CreditService.add_credits(
-                db=db,
-                user_id=order.user_id,
-                amount=total_credits,
-                transaction_type=TransactionType.RECHARGE,
-                description=f"充值 {order.credits} 积分（赠送 {order.bonus_credits} 积分）",
-                related_id=order.id,
-                related_type="recharge_order"
-            )
-            
-            db.commit()
+            # 订单状态、充值统计和加积分在同一事务中提交，任一步失败都整体回滚，回调重试时不会重复计入统计
+            with atomic(db):
+                # 更新订单状态
+                order.payment_status = PaymentStatus.PAID
+                order.paid_at = datetime.now()
+                order.transaction_id = transaction_id
+                db.execute(CreditStatsService.recharge_statement(db, order))
+                
+                # 增加用户积分
+                total_credits = order.credits + order.bonus_credits
+                CreditService.add_credits(
+                    db=db,
+                    user_id=order.user_id,
+                    amount=total_credits,
+                    transaction_type=TransactionType.RECHARGE,
+                    description=f"充值 {order.credits} 积分（赠送 {order.bonus_credits} 积分）",
+                    related_id=order.id,
+                    related_type="recharge_order"
+                )
             return True
         
         return False
@@ -472,49 +593,50 @@ class MembershipService:
             return True  # 已支付，避免重复处理
         
         if status == "paid":
-            # 获取价格配置以获取有效期
-            price = db.query(MembershipPrice).filter(
-                MembershipPrice.membership_type == order.membership_type,
-                MembershipPrice.is_active == True
-            ).first()
-            
-            if not price:
-                raise BusinessException("会员套餐配置不存在")
-            
-            # 更新订单状态
-            order.payment_status = PaymentStatus.PAID
-            order.paid_at = datetime.now()
-            order.transaction_id = transaction_id
-            
-            # 更新用户会员状态
-            user = db.query(User).filter(User.id == order.user_id).first()
-            if not user:
-                raise BusinessException("用户不存在")
-            
-            # 计算会员到期时间
-            now = datetime.now()
-            if user.is_member and user.member_expired_at and user.member_expired_at > now:
-                # 如果当前是会员且未过期，在原有基础上延长
-                start_time = user.member_expired_at
-            else:
-                # 否则从现在开始计算
-                start_time = now
-            
-            # 根据会员类型计算到期时间
-            if price.membership_type == MembershipType.MONTHLY:
-                expired_at = start_time + timedelta(days=price.duration_days)
-            elif price.membership_type == MembershipType.QUARTERLY:
-                expired_at = start_time + timedelta(days=price.duration_days)
-            elif price.membership_type == MembershipType.YEARLY:
-                expired_at = start_time + timedelta(days=price.duration_days)
-            else:
-                expired_at = start_time + timedelta(days=price.duration_days)
-            
-            user.is_member = 1
-            user.member_expired_at = expired_at
-            order.expired_at = expired_at
-            
-            db.commit()
+            # 订单状态、会员到期时间和会员统计在同一事务中提交
+            with atomic(db):
+                # 获取价格配置以获取有效期
+                price = db.query(MembershipPrice).filter(
+                    MembershipPrice.membership_type == order.membership_type,
+                    MembershipPrice.is_active == True
+                ).first()
+                
+                if not price:
+                    raise BusinessException("会员套餐配置不存在")
+                
+                # 更新订单状态
+                order.payment_status = PaymentStatus.PAID
+                order.paid_at = datetime.now()
+                order.transaction_id = transaction_id
+                
+                # 更新用户会员状态
+                user = db.query(User).filter(User.id == order.user_id).first()
+                if not user:
+                    raise BusinessException("用户不存在")
+                
+                # 计算会员到期时间
+                now = datetime.now()
+                if is_active_member(user.is_member, user.member_expired_at, now):
+                    # 如果当前是会员且未过期，在原有基础上延长
+                    start_time = user.member_expired_at
+                else:
+                    # 否则从现在开始计算
+                    start_time = now
+                
+                # 根据会员类型计算到期时间
+                if price.membership_type == MembershipType.MONTHLY:
+                    expired_at = start_time + timedelta(days=price.duration_days)
+                elif price.membership_type == MembershipType.QUARTERLY:
+                    expired_at = start_time + timedelta(days=price.duration_days)
+                elif price.membership_type == MembershipType.YEARLY:
+                    expired_at = start_time + timedelta(days=price.duration_days)
+                else:
+                    expired_at = start_time + timedelta(days=price.duration_days)
+                
+                user.is_member = 1
+                user.member_expired_at = expired_at
+                order.expired_at = expired_at
+                db.execute(CreditStatsService.membership_statement(db, order))
             return True
         
         return False
@@ -557,6 +679,8 @@ class MembershipService:
         """
         获取会员统计
         
+        读取 user_credit_stats 中增量维护的累计值，不扫描订单
+        
         Args:
             db: 数据库会话
             user_id: 用户ID
@@ -564,55 +688,82 @@ class MembershipService:
         Returns:
             会员统计
         """
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            raise BusinessException("用户不存在")
-        
-        # 检查会员状态
-        is_member = False
-        if user.is_member and user.member_expired_at:
-            if user.member_expired_at > datetime.now():
-                is_member = True
-            else:
-                user.is_member = 0
-                db.commit()
-        
-        # 统计购买次数和金额
-        purchase_stats = db.query(
-            func.sum(MembershipOrder.amount).label('total_amount'),
-            func.count(MembershipOrder.id).label('count')
-        ).filter(
-            and_(
-                MembershipOrder.user_id == user_id,
-                MembershipOrder.payment_status == PaymentStatus.PAID
-            )
+        row = db.execute(
+            select(User.is_member, User.member_expired_at, UserCreditStats)
+            .outerjoin(UserCreditStats, UserCreditStats.user_id == User.id)
+            .where(User.id == user_id)
         ).first()
+        if not row:
+            raise BusinessException("用户不存在")
         
-        # 获取最近一次购买记录
-        last_order = db.query(MembershipOrder).filter(
-            and_(
-                MembershipOrder.user_id == user_id,
-                MembershipOrder.payment_status == PaymentStatus.PAID
-            )
-        ).order_by(MembershipOrder.paid_at.desc()).first()
+        # 检查会员状态（只读，过期会员由清扫任务批量处理）
+        now = datetime.now()
+        is_member = is_active_member(row.is_member, row.member_expired_at, now)
+        stats = row.UserCreditStats or UserCreditStats()
         
         return MembershipStatisticsResponse(
             is_member=is_member,
-            member_expired_at=user.member_expired_at if is_member else None,
-            total_purchase_amount=purchase_stats.total_amount or Decimal(0),
-            total_purchase_count=purchase_stats.count or 0,
-            last_purchase_at=last_order.paid_at if last_order else None,
-            last_membership_type=last_order.membership_type if last_order else None
+            member_expired_at=row.member_expired_at if is_member else None,
+            total_orders=stats.membership_count or 0,
+            total_amount=stats.membership_amount or Decimal(0),
+            days_remaining=(row.member_expired_at - now).days if is_member else None,
+            last_purchase_at=stats.last_membership_at,
+            last_membership_type=stats.last_membership_type
         )
 
+    @staticmethod
+    def expire_memberships(
+        db: Session,
+        now: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> List[int]:
+        """
+        批量将已过期会员的 is_member 置 0（由 MembershipExpirySweeper 定时调用）
+
+        每批先按条件查出用户ID，再用同样的过期条件更新：查询和更新之间续费的用户
+        member_expired_at 已变化，不会被误清。
+
+        Args:
+            db: 数据库会话
+            now: 判断过期的时间点，默认当前时间
+            batch_size: 每批处理的用户数
+
+        Returns:
+            本次被置为非会员的用户ID列表
+        """
+        now = now or datetime.now()
+        expired = and_(User.is_member == 1, User.member_expired_at <= now)
+        expired_ids: List[int] = []
+
+        while True:
+            ids = db.execute(
+                select(User.id).where(expired).order_by(User.id).limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+
+            db.execute(
+                update(User)
+                .where(User.id.in_(ids), expired)
+                .values(is_member=0)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+            expired_ids.extend(ids)
+            if len(ids) < batch_size:
+                break
+
+        return expired_ids
+
 
 class PriceService:
     """价格配置服务"""
     
     @staticmethod
-    def get_credit_prices(db: Session) -> List[CreditPrice]:
+    @cached(key="credit:prices", ttl=600, stale_ttl=60, model=CreditPriceResponse)
+    def get_credit_prices(db: Session) -> List[CreditPriceResponse]:
         """
-        获取积分价格列表
+        获取积分价格列表（带缓存，价格配置变更时失效）
         
         Args:
             db: 数据库会话
@@ -620,14 +771,16 @@ class PriceService:
         Returns:
             价格列表
         """
-        return db.query(CreditPrice).filter(
+        prices = db.query(CreditPrice).filter(
             CreditPrice.is_active == True
         ).order_by(CreditPrice.sort_order).all()
+        return [CreditPriceResponse.model_validate(p) for p in prices]
     
     @staticmethod
-    def get_membership_prices(db: Session) -> List[MembershipPrice]:
+    @cached(key="credit:membership_prices", ttl=600, stale_ttl=60, model=MembershipPriceResponse)
+    def get_membership_prices(db: Session) -> List[MembershipPriceResponse]:
         """
-        获取会员价格列表
+        获取会员价格列表（带缓存，价格配置变更时失效）
         
         Args:
             db: 数据库会话
@@ -635,9 +788,10 @@ class PriceService:
         Returns:
             价格列表
         """
-        return db.query(MembershipPrice).filter(
+        prices = db.query(MembershipPrice).filter(
             MembershipPrice.is_active == True
         ).order_by(MembershipPrice.sort_order).all()
+        return [MembershipPriceResponse.model_validate(p) for p in prices]
     
     @staticmethod
     def create_credit_price(
@@ -657,6 +811,7 @@ class PriceService:
         price = CreditPrice(**price_data)
         db.add(price)
         db.commit()
+        PriceService.get_credit_prices.invalidate(db)
         db.refresh(price)
         return price
     
@@ -678,6 +833,7 @@ class PriceService:
         price = MembershipPrice(**price_data)
         db.add(price)
         db.commit()
+        PriceService.get_membership_prices.invalidate(db)
         db.refresh(price)
         return price
     
@@ -706,6 +862,7 @@ class PriceService:
             setattr(price, key, value)
         
         db.commit()
+        PriceService.get_credit_prices.invalidate(db)
         db.refresh(price)
         return price
     
@@ -734,6 +891,7 @@ class PriceService:
             setattr(price, key, value)
         
         db.commit()
+        PriceService.get_membership_prices.invalidate(db)
         db.refresh(price)
         return price
     
@@ -755,6 +913,7 @@ class PriceService:
         
         price.is_active = False
         db.commit()
+        PriceService.get_credit_prices.invalidate(db)
         return True
     
     @staticmethod
@@ -775,4 +934,5 @@ class PriceService:
         
         price.is_active = False
         db.commit()
+        PriceService.get_membership_prices.invalidate(db)
         return True
@@ -0,0 +1,209 @@
+"""
+积分/会员统计服务
+维护 user_credit_stats 中的按用户累计值：写流水、订单支付成功时在同一事务内增量更新，
+统计接口按主键读取一行即可
+"""
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy import case, func, select, delete, insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.credit import (
+    CreditTransaction, TransactionType,
+    RechargeOrder, MembershipOrder, PaymentStatus,
+    UserCreditStats
+)
+from app.models.user import User
+
+# 按交易类型累计的列（与原先按类型 SUM 的统计口径一致）
+_TYPE_COLUMNS = {
+    TransactionType.RECHARGE: "total_recharge",
+    TransactionType.CONSUME: "total_consume",
+    TransactionType.REWARD: "total_reward",
+}
+_LEDGER_COLUMNS = ["total_earned", "total_spent", *_TYPE_COLUMNS.values()]
+_EMPTY_ORDER_STATS = {
+    "recharge_amount": Decimal(0),
+    "recharge_count": 0,
+    "last_recharge_at": None,
+    "membership_amount": Decimal(0),
+    "membership_count": 0,
+    "last_membership_at": None,
+    "last_membership_type": None,
+}
+
+_UPSERT_INSERTS = {
+    "mysql": mysql.insert,
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def _dialect_name(db) -> str:
+    """Session / AsyncSession 均可，get_bind 返回同步 Engine"""
+    return db.get_bind().dialect.name
+
+
+def _upsert(dialect: str, rows: List[dict], increments: Iterable[str], replaces: Iterable[str] = ()):
+    """
+    INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE
+
+    用户首次产生统计时插入，之后 increments 中的列累加、replaces 中的列覆盖，
+    单条语句完成，不需要先查询统计行是否存在。
+    """
+    table = UserCreditStats.__table__
+    stmt = _UPSERT_INSERTS[dialect](table).values(rows)
+    new = stmt.inserted if dialect == "mysql" else stmt.excluded
+    values = {column: table.c[column] + new[column] for column in increments}
+    values.update({column: new[column] for column in replaces})
+    values["updated_at"] = func.now()
+    if dialect == "mysql":
+        return stmt.on_duplicate_key_update(values)
+    return stmt.on_conflict_do_update(index_elements=[table.c.user_id], set_=values)
+
+
+def _ledger_deltas(rows: Iterable[dict]) -> List[dict]:
+    """按用户汇总一批积分流水的增量"""
+    deltas: Dict[int, dict] = {}
+    for row in rows:
+        delta = deltas.setdefault(row["user_id"], dict.fromkeys(_LEDGER_COLUMNS, 0))
+        amount = row["amount"]
+        if amount > 0:
+            delta["total_earned"] += amount
+        else:
+            delta["total_spent"] -= amount
+        column = _TYPE_COLUMNS.get(TransactionType(row["transaction_type"]))
+        if column:
+            delta[column] += abs(amount)
+    return [{"user_id": user_id, **delta} for user_id, delta in deltas.items()]
+
+
+class CreditStatsService:
+    """积分/会员统计服务"""
+
+    @staticmethod
+    def ledger_statement(db, rows: List[dict]):
+        """
+        一批积分流水对应的统计更新语句（由调用方在写流水的同一事务中执行）
+
+        Args:
+            db: 数据库会话（同步或异步，仅用于判断数据库方言）
+            rows: 积分流水，字段同 CreditTransaction（amount 为带符号的变动值）
+        """
+        return _upsert(_dialect_name(db), _ledger_deltas(rows), _LEDGER_COLUMNS)
+
+    @staticmethod
+    def recharge_statement(db, order: RechargeOrder):
+        """充值订单支付成功后的统计更新语句"""
+        return _upsert(
+            _dialect_name(db),
+            [{
+                "user_id": order.user_id,
+                "recharge_amount": order.amount,
+                "recharge_count": 1,
+                "last_recharge_at": order.paid_at,
+            }],
+            ["recharge_amount", "recharge_count"],
+            ["last_recharge_at"],
+        )
+
+    @staticmethod
+    def membership_statement(db, order: MembershipOrder):
+        """会员订单支付成功后的统计更新语句"""
+        return _upsert(
+            _dialect_name(db),
+            [{
+                "user_id": order.user_id,
+                "membership_amount": order.amount,
+                "membership_count": 1,
+                "last_membership_at": order.paid_at,
+                "last_membership_type": order.membership_type,
+            }],
+            ["membership_amount", "membership_count"],
+            ["last_membership_at", "last_membership_type"],
+        )
+
+    @staticmethod
+    def rebuild(db: Session, user_ids: Optional[List[int]] = None, batch_size: int = 500) -> int:
+        """
+        从积分流水和订单重新计算统计（用于上线回填或数据修复）
+
+        按用户分批：汇总该批用户的流水和已支付订单后整批替换统计行。重建期间该批用户
+        新写入的流水可能被覆盖，建议在低峰期执行，或只对指定用户重建。
+
+        Args:
+            db: 数据库会话
+            user_ids: 只重建这些用户，默认全部用户
+            batch_size: 每批用户数
+
+        Returns:
+            重建的用户数
+        """
+        if user_ids is None:
+            user_ids = db.execute(select(User.id).order_by(User.id)).scalars().all()
+
+        rebuilt = 0
+        for start in range(0, len(user_ids), batch_size):
+            batch = list(user_ids[start:start + batch_size])
+            rows = {
+                user_id: {"user_id": user_id, **dict.fromkeys(_LEDGER_COLUMNS, 0), **_EMPTY_ORDER_STATS}
+                for user_id in batch
+            }
+
+            positive = func.sum(case((CreditTransaction.amount > 0, CreditTransaction.amount), else_=0))
+            negative = func.sum(case((CreditTransaction.amount < 0, -CreditTransaction.amount), else_=0))
+            ledger = db.execute(
+                select(CreditTransaction.user_id, CreditTransaction.transaction_type, positive, negative)
+                .where(CreditTransaction.user_id.in_(batch))
+                .group_by(CreditTransaction.user_id, CreditTransaction.transaction_type)
+            ).all()
+            for user_id, transaction_type, earned, spent in ledger:
+                row = rows[user_id]
+                row["total_earned"] += earned or 0
+                row["total_spent"] += spent or 0
+                column = _TYPE_COLUMNS.get(transaction_type)
+                if column:
+                    row[column] += (earned or 0) + (spent or 0)
+
+            recharges = db.execute(
+                select(
+                    RechargeOrder.user_id,
+                    func.sum(RechargeOrder.amount),
+                    func.count(RechargeOrder.id),
+                    func.max(RechargeOrder.paid_at),
+                )
+                .where(RechargeOrder.user_id.in_(batch), RechargeOrder.payment_status == PaymentStatus.PAID)
+                .group_by(RechargeOrder.user_id)
+            ).all()
+            for user_id, amount, count, last_at in recharges:
+                rows[user_id].update(recharge_amount=amount or Decimal(0), recharge_count=count, last_recharge_at=last_at)
+
+            # 会员订单数量很少，直接按支付时间取每个用户的最后一单
+            memberships = defaultdict(list)
+            for order in db.execute(
+                select(MembershipOrder.user_id, MembershipOrder.amount,
+                       MembershipOrder.paid_at, MembershipOrder.membership_type)
+                .where(MembershipOrder.user_id.in_(batch), MembershipOrder.payment_status == PaymentStatus.PAID)
+                .order_by(MembershipOrder.paid_at)
+            ).all():
+                memberships[order.user_id].append(order)
+            for user_id, orders in memberships.items():
+                rows[user_id].update(
+                    membership_amount=sum((order.amount for order in orders), Decimal(0)),
+                    membership_count=len(orders),
+                    last_membership_at=orders[-1].paid_at,
+                    last_membership_type=orders[-1].membership_type,
+                )
+
+            db.execute(delete(UserCreditStats).where(UserCreditStats.user_id.in_(batch)))
+            db.execute(insert(UserCreditStats), [
+                {**row, "updated_at": datetime.now()} for row in rows.values()
+            ])
+            db.commit()
+            rebuilt += len(batch)
+
+        return rebuilt
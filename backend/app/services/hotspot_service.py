@@ -16,6 +16,7 @@ from app.schemas.hotspot import (
     WritingAngle,
     TopicSuggestResponse,
 )
+from app.utils.cache_decorator import cached
 
 logger = logging.getLogger(__name__)
 
@@ -177,6 +178,12 @@ class HotspotService:
         ]
     
     @classmethod
+    @cached(
+        key="hotspot:{platform}:{subtype}:{limit}",
+        ttl=300,
+        stale_ttl=600,
+        model=HotspotListResponse,
+    )
     async def get_hot_list(
         cls,
         platform: str,
@@ -83,6 +83,7 @@ from .config import (
 
 # Chat 工厂
 from .chat.factory import LangChainChatFactory
+from .chat.pool import ChatModelPool, chat_model_pool
 
 # 服务
 from .service import (
@@ -93,6 +94,7 @@ from .service import (
     get_supported_providers,
     is_provider_supported,
 )
+from .response_cache import LLMResponseCache, llm_response_cache
 
 # 兼容层
 from .compat import (
@@ -152,6 +154,8 @@ __all__ = [
     
     # Chat 工厂
     "LangChainChatFactory",
+    "ChatModelPool",
+    "chat_model_pool",
     
     # 服务
     "LangChainService",
@@ -160,6 +164,8 @@ __all__ = [
     "quick_chat_with_plugins",
     "get_supported_providers",
     "is_provider_supported",
+    "LLMResponseCache",
+    "llm_response_cache",
     
     # 兼容层
     "LangChainAIService",
@@ -105,6 +105,11 @@ class UsageCallbackHandler(BaseCallbackHandler):
                         "completion_tokens": self._completion_tokens,
                         "total_tokens": self._total_tokens,
                     }
+                
+                # 流式调用的首 token 耗时和生成速度（支持的厂商在最后一个分块中返回）
+                stream_metrics = gen.generation_info.get("stream_metrics")
+                if stream_metrics:
+                    self.extra_data = {**self.extra_data, "stream": stream_metrics}
         
         # 写入数据库
         self._save_to_db(response_time_ms)
@@ -120,6 +125,20 @@ class UsageCallbackHandler(BaseCallbackHandler):
         
         self._save_to_db(response_time_ms)
     
+    def record_cache_hit(
+        self,
+        input_content: str,
+        output_content: str,
+        response_time_ms: int,
+        cache_info: Dict[str, Any],
+    ) -> None:
+        """记录命中响应缓存的调用（没有请求模型，token 数为 0）"""
+        self._input_messages = input_content
+        self._response_content = output_content
+        self._prompt_tokens = self._completion_tokens = self._total_tokens = 0
+        self.extra_data = {**self.extra_data, "cache": cache_info}
+        self._save_to_db(response_time_ms)
+    
     def _save_to_db(self, response_time_ms: int) -> None:
         """保存日志到数据库"""
         try:
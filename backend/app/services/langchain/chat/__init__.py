@@ -3,5 +3,6 @@ Chat 模块 - 文本生成
 """
 
 from .factory import LangChainChatFactory
+from .pool import ChatModelPool, chat_model_pool
 
-__all__ = ["LangChainChatFactory"]
+__all__ = ["LangChainChatFactory", "ChatModelPool", "chat_model_pool"]
@@ -213,6 +213,7 @@ class LangChainChatFactory:
             from .providers.spark import ChatSpark
             return ChatSpark(
                 model=model_name,
+                api_base=base_url,
                 app_id=kwargs.get("app_id", ""),
                 api_key=api_key,
                 api_secret=kwargs.get("api_secret", ""),
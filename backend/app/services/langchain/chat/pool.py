@@ -0,0 +1,200 @@
+"""
+Chat Model 实例池
+按 (厂商, 模型, 密钥, 地址, 其他参数) 复用已创建的 Chat Model：SDK 客户端及其 HTTP 连接池
+在多次请求之间保持，不必每次新建服务都重新导入类、建立连接。
+同一实例上 bind_tools 的结果按工具集缓存
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.runnables import Runnable
+
+from app.core.config import settings
+
+from .factory import LangChainChatFactory
+
+logger = logging.getLogger(__name__)
+
+# 每个实例最多缓存的工具集数
+_MAX_TOOLSETS_PER_MODEL = 16
+
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+def _json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def _toolset_key(tools: Sequence[Any], kwargs: Dict[str, Any]) -> str:
+    """工具集标识：名称、描述和参数定义都相同的工具集共用一个绑定结果"""
+    parts = []
+    for tool in tools:
+        if isinstance(tool, dict):
+            parts.append(tool)
+        else:
+            parts.append([getattr(tool, "name", repr(tool)), getattr(tool, "description", ""), getattr(tool, "args", None)])
+    return _digest(_json([parts, kwargs]))
+
+
+@dataclass
+class _PooledModel:
+    model: BaseChatModel
+    last_used: float
+    bound: "OrderedDict[str, Runnable]" = field(default_factory=OrderedDict)
+
+
+class ChatModelPool:
+    """
+    Chat Model 实例池
+
+    - 容量超出 max_size 时淘汰最久未使用的实例，空闲超过 ttl 秒的实例在下次访问时淘汰
+    - 键中只保存密钥的摘要，不保存明文
+    - 实例本身无状态（回调等按调用传入），可以在并发请求间共享
+    """
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._models: "OrderedDict[Tuple, _PooledModel]" = OrderedDict()
+        self._keys_by_id: Dict[int, Tuple] = {}
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._bind_hits = 0
+        self._bind_misses = 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model_name: str,
+        api_key: str,
+        api_base: Optional[str] = None,
+        **kwargs
+    ) -> Tuple:
+        return (
+            provider.lower(),
+            model_name,
+            _digest(api_key or ""),
+            api_base or "",
+            _digest(_json(kwargs)) if kwargs else "",
+        )
+
+    def get(
+        self,
+        provider: str,
+        model_name: str,
+        api_key: str,
+        api_base: Optional[str] = None,
+        **kwargs
+    ) -> BaseChatModel:
+        """
+        获取 Chat Model 实例，池中没有时通过 LangChainChatFactory 创建
+
+        参数与 LangChainChatFactory.create 相同。
+        """
+        key = self.make_key(provider, model_name, api_key, api_base, **kwargs)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None and now - entry.last_used <= self.ttl:
+                entry.last_used = now
+                self._models.move_to_end(key)
+                self._hits += 1
+                return entry.model
+            if entry is not None:
+                self._remove(key)
+            self._misses += 1
+
+        # 创建可能较慢（导入 SDK、初始化客户端），不在锁内进行
+        model = LangChainChatFactory.create(
+            provider=provider,
+            model_name=model_name,
+            api_key=api_key,
+            api_base=api_base,
+            **kwargs
+        )
+
+        with self._lock:
+            entry = self._models.get(key)
+            if entry is not None:
+                # 并发请求已经创建过，使用先放入的实例
+                return entry.model
+            self._models[key] = _PooledModel(model=model, last_used=now)
+            self._keys_by_id[id(model)] = key
+            self._evict(now)
+        return model
+
+    def bind_tools(self, model: BaseChatModel, tools: List[Any], **kwargs) -> Runnable:
+        """
+        返回绑定了工具的模型，同一实例、同一工具集重复调用时复用绑定结果
+
+        不在池中的实例直接调用 model.bind_tools。
+        """
+        toolset = _toolset_key(tools, kwargs)
+        with self._lock:
+            key = self._keys_by_id.get(id(model))
+            entry = self._models.get(key) if key is not None else None
+            if entry is None or entry.model is not model:
+                entry = None
+            elif toolset in entry.bound:
+                entry.bound.move_to_end(toolset)
+                self._bind_hits += 1
+                return entry.bound[toolset]
+
+        bound = model.bind_tools(tools, **kwargs)
+        if entry is not None:
+            with self._lock:
+                self._bind_misses += 1
+                entry.bound[toolset] = bound
+                while len(entry.bound) > _MAX_TOOLSETS_PER_MODEL:
+                    entry.bound.popitem(last=False)
+        return bound
+
+    def _remove(self, key: Tuple) -> None:
+        entry = self._models.pop(key)
+        self._keys_by_id.pop(id(entry.model), None)
+        self._evictions += 1
+
+    def _evict(self, now: float) -> None:
+        """淘汰过期和超出容量的实例（调用方持有锁）"""
+        for key in [k for k, e in self._models.items() if now - e.last_used > self.ttl]:
+            self._remove(key)
+        while len(self._models) > self.max_size:
+            self._remove(next(iter(self._models)))
+
+    def stats(self) -> Dict[str, Any]:
+        """实例池统计"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "size": len(self._models),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "evictions": self._evictions,
+                "bind_tools_hits": self._bind_hits,
+                "bind_tools_misses": self._bind_misses,
+            }
+
+    def clear(self) -> None:
+        """清空实例池（密钥更新后可调用，使新请求立即使用新实例）"""
+        with self._lock:
+            self._models.clear()
+            self._keys_by_id.clear()
+
+
+chat_model_pool = ChatModelPool(settings.CHAT_MODEL_POOL_SIZE, settings.CHAT_MODEL_POOL_TTL)
@@ -5,16 +5,62 @@
 
 import json
 import logging
-from typing import Any, Dict, Iterator, List, Optional
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 import httpx
-from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.callbacks import AsyncCallbackManagerForLLMRun, CallbackManagerForLLMRun
 from langchain_core.language_models.chat_models import BaseChatModel
-from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage, SystemMessage
 from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
 
+from app.core.http_client import async_http_client, http_client
+from app.utils.sse import aiter_sse, iter_sse
+
 logger = logging.getLogger(__name__)
 
+class _StreamState:
+    """一次流式调用的状态：结束原因、token 使用量和计时"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.last_token_at: Optional[float] = None
+        self.chunks = 0
+        self.usage: Optional[Dict[str, Any]] = None
+        self.finish_reason: Optional[str] = None
+    
+    def token(self) -> None:
+        now = time.perf_counter()
+        if self.first_token_at is None:
+            self.first_token_at = now
+        self.last_token_at = now
+        self.chunks += 1
+    
+    def metrics(self) -> Dict[str, Any]:
+        """
+        流式指标
+        
+        - ttft_ms: 发出请求到收到第一个内容分块的耗时
+        - tokens_per_second: 首个分块之后的生成速度（输出 token 数取服务端返回的使用量，没有时按分块数估算）
+        """
+        total_ms = round((time.perf_counter() - self.started) * 1000, 1)
+        completion_tokens = (self.usage or {}).get("completion_tokens") or self.chunks
+        if self.first_token_at is None:
+            return {"ttft_ms": None, "total_ms": total_ms, "completion_tokens": completion_tokens,
+                    "tokens_per_second": None}
+        
+        generation_seconds = self.last_token_at - self.first_token_at
+        tokens_per_second = None
+        if generation_seconds > 0 and completion_tokens > 1:
+            tokens_per_second = round((completion_tokens - 1) / generation_seconds, 1)
+        return {
+            "ttft_ms": round((self.first_token_at - self.started) * 1000, 1),
+            "total_ms": total_ms,
+            "completion_tokens": completion_tokens,
+            "tokens_per_second": tokens_per_second,
+        }
+
 
 class ChatDoubao(BaseChatModel):
     """
@@ -71,19 +117,14 @@ class ChatDoubao(BaseChatModel):
                 converted.append({"role": "user", "content": str(msg.content)})
         return converted
     
-    def _generate(
+    def _build_request(
         self,
         messages: List[BaseMessage],
         stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        stream: bool = False,
         **kwargs: Any,
-    ) -> ChatResult:
-        """生成聊天响应"""
-        
-        # 转换消息
-        api_messages = self._convert_messages(messages)
-        
-        # 构建请求
+    ) -> Tuple[str, Dict[str, str], Dict[str, Any]]:
+        """构建请求地址、请求头和请求体"""
         url = f"{self.api_base}/chat/completions"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
@@ -92,7 +133,7 @@ class ChatDoubao(BaseChatModel):
         
         payload = {
             "model": self.model,
-            "messages": api_messages,
+            "messages": self._convert_messages(messages),
             "temperature": kwargs.get("temperature", self.temperature),
         }
         
@@ -100,10 +141,40 @@ class ChatDoubao(BaseChatModel):
             payload["max_tokens"] = self.max_tokens
         if stop:
             payload["stop"] = stop
+        if stream:
+            payload["stream"] = True
+            # 最后一个分块返回 token 使用量
+            payload["stream_options"] = {"include_usage": True}
+        
+        return url, headers, payload
+    
+    def _build_result(self, data: Dict[str, Any]) -> ChatResult:
+        """解析非流式响应"""
+        choice = data.get("choices", [{}])[0]
+        message = choice.get("message", {})
+        content = message.get("content", "")
+        
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=content))],
+            llm_output={
+                "token_usage": data.get("usage", {}),
+                "model_name": self.model,
+            }
+        )
+    
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """生成聊天响应"""
+        url, headers, payload = self._build_request(messages, stop, **kwargs)
         
         # 发送请求
         try:
-            with httpx.Client(timeout=self.timeout) as client:
+            with http_client(timeout=self.timeout) as client:
                 response = client.post(url, headers=headers, json=payload)
                 response.raise_for_status()
                 data = response.json()
@@ -114,59 +185,21 @@ class ChatDoubao(BaseChatModel):
             logger.error(f"Doubao API error: {e}")
             raise ValueError(f"Doubao API 调用失败: {e}")
         
-        # 解析响应
-        choice = data.get("choices", [{}])[0]
-        message = choice.get("message", {})
-        content = message.get("content", "")
-        
-        # 构建返回结果
-        ai_message = AIMessage(content=content)
-        generation = ChatGeneration(message=ai_message)
-        
-        # 使用信息
-        usage = data.get("usage", {})
-        
-        return ChatResult(
-            generations=[generation],
-            llm_output={
-                "token_usage": usage,
-                "model_name": self.model,
-            }
-        )
+        return self._build_result(data)
     
     async def _agenerate(
         self,
         messages: List[BaseMessage],
         stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> ChatResult:
         """异步生成聊天响应"""
-        
-        # 转换消息
-        api_messages = self._convert_messages(messages)
-        
-        # 构建请求
-        url = f"{self.api_base}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        
-        payload = {
-            "model": self.model,
-            "messages": api_messages,
-            "temperature": kwargs.get("temperature", self.temperature),
-        }
-        
-        if self.max_tokens:
-            payload["max_tokens"] = self.max_tokens
-        if stop:
-            payload["stop"] = stop
+        url, headers, payload = self._build_request(messages, stop, **kwargs)
         
         # 发送异步请求
         try:
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async with async_http_client(timeout=self.timeout) as client:
                 response = await client.post(url, headers=headers, json=payload)
                 response.raise_for_status()
                 data = response.json()
@@ -177,24 +210,55 @@ class ChatDoubao(BaseChatModel):
             logger.error(f"Doubao API error: {e}")
             raise ValueError(f"Doubao API 调用失败: {e}")
         
-        # 解析响应
-        choice = data.get("choices", [{}])[0]
-        message = choice.get("message", {})
-        content = message.get("content", "")
+        return self._build_result(data)
+    
+    def _parse_stream_event(self, data_str: str, state: "_StreamState") -> Optional[ChatGenerationChunk]:
+        """解析一个流式事件，返回内容分块（无内容时返回 None）"""
+        try:
+            data = json.loads(data_str)
+        except json.JSONDecodeError:
+            logger.warning(f"Doubao stream: invalid event {data_str[:200]}")
+            return None
         
-        # 构建返回结果
-        ai_message = AIMessage(content=content)
-        generation = ChatGeneration(message=ai_message)
+        if "error" in data:
+            raise ValueError(f"Doubao API 错误: {data['error'].get('message', data['error'])}")
+        if data.get("usage"):
+            state.usage = data["usage"]
         
-        # 使用信息
-        usage = data.get("usage", {})
+        choices = data.get("choices") or []
+        if not choices:
+            return None
+        choice = choices[0]
+        if choice.get("finish_reason"):
+            state.finish_reason = choice["finish_reason"]
+        content = (choice.get("delta") or {}).get("content") or ""
+        if not content:
+            return None
         
-        return ChatResult(
-            generations=[generation],
-            llm_output={
-                "token_usage": usage,
+        state.token()
+        return ChatGenerationChunk(message=AIMessageChunk(content=content))
+    
+    def _final_chunk(self, state: "_StreamState") -> ChatGenerationChunk:
+        """
+        流结束时的分块：携带 token 使用量和流式指标
+        
+        回调的 on_llm_end 中通过 generation_info["stream_metrics"] 读取，
+        流式输出的最后一个消息分块的 response_metadata 中也有同样的数据
+        """
+        usage = state.usage or {}
+        usage_metadata = {
+            "input_tokens": usage.get("prompt_tokens", 0),
+            "output_tokens": usage.get("completion_tokens", 0),
+            "total_tokens": usage.get("total_tokens", 0),
+        }
+        return ChatGenerationChunk(
+            message=AIMessageChunk(content="", usage_metadata=usage_metadata if usage else None),
+            generation_info={
+                "finish_reason": state.finish_reason,
                 "model_name": self.model,
-            }
+                "usage_metadata": usage_metadata if usage else None,
+                "stream_metrics": state.metrics(),
+            },
         )
     
     def _stream(
@@ -204,56 +268,62 @@ class ChatDoubao(BaseChatModel):
         run_manager: Optional[CallbackManagerForLLMRun] = None,
         **kwargs: Any,
     ) -> Iterator[ChatGenerationChunk]:
-        """流式生成"""
-        
-        # 转换消息
-        api_messages = self._convert_messages(messages)
+        """流式生成（每个分块由 BaseChatModel 触发 on_llm_new_token）"""
+        url, headers, payload = self._build_request(messages, stop, stream=True, **kwargs)
+        state = _StreamState()
         
-        # 构建请求
-        url = f"{self.api_base}/chat/completions"
-        headers = {
-            "Authorization": f"Bearer {self.api_key}",
-            "Content-Type": "application/json",
-        }
-        
-        payload = {
-            "model": self.model,
-            "messages": api_messages,
-            "temperature": kwargs.get("temperature", self.temperature),
-            "stream": True,
-        }
+        try:
+            with http_client(timeout=self.timeout) as client:
+                with client.stream("POST", url, headers=headers, json=payload) as response:
+                    if response.is_error:
+                        response.read()
+                        response.raise_for_status()
+                    for event in iter_sse(response):
+                        if event.data.strip() == "[DONE]":
+                            break
+                        chunk = self._parse_stream_event(event.data, state)
+                        if chunk is not None:
+                            yield chunk
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Doubao API error: {e.response.status_code} - {e.response.text}")
+            raise ValueError(f"Doubao API 调用失败: {e.response.status_code}")
+        except httpx.HTTPError as e:
+            logger.error(f"Doubao API error: {e}")
+            raise ValueError(f"Doubao API 调用失败: {e}")
         
-        if self.max_tokens:
-            payload["max_tokens"] = self.max_tokens
-        if stop:
-            payload["stop"] = stop
+        yield self._final_chunk(state)
+    
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        """异步流式生成"""
+        url, headers, payload = self._build_request(messages, stop, stream=True, **kwargs)
+        state = _StreamState()
         
-        # 发送流式请求
-        with httpx.Client(timeout=self.timeout) as client:
-            with client.stream("POST", url, headers=headers, json=payload) as response:
-                response.raise_for_status()
-                
-                for line in response.iter_lines():
-                    if line.startswith("data: "):
-                        data_str = line[6:]
-                        if data_str.strip() == "[DONE]":
+        try:
+            async with async_http_client(timeout=self.timeout) as client:
+                async with client.stream("POST", url, headers=headers, json=payload) as response:
+                    if response.is_error:
+                        await response.aread()
+                        response.raise_for_status()
+                    async for event in aiter_sse(response):
+                        if event.data.strip() == "[DONE]":
                             break
-                        
-                        try:
-                            data = json.loads(data_str)
-                            delta = data.get("choices", [{}])[0].get("delta", {})
-                            content = delta.get("content", "")
-                            
-                            if content:
-                                chunk = ChatGenerationChunk(
-                                    message=AIMessage(content=content)
-                                )
-                                yield chunk
-                                
-                                if run_manager:
-                                    run_manager.on_llm_new_token(content)
-                        except json.JSONDecodeError:
-                            continue
+                        chunk = self._parse_stream_event(event.data, state)
+                        if chunk is not None:
+                            yield chunk
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Doubao API error: {e.response.status_code} - {e.response.text}")
+            raise ValueError(f"Doubao API 调用失败: {e.response.status_code}")
+        except httpx.HTTPError as e:
+            logger.error(f"Doubao API error: {e}")
+            raise ValueError(f"Doubao API 调用失败: {e}")
+        
+        yield self._final_chunk(state)
     
     def bind_tools(self, tools: List[Any], **kwargs) -> "ChatDoubao":
         """绑定工具（豆包支持 function calling）"""
@@ -3,21 +3,20 @@
 使用 WebSocket 协议通信
 """
 
-import base64
-import hashlib
-import hmac
+import asyncio
 import json
 import logging
-from datetime import datetime
-from time import mktime
-from typing import Any, Dict, Iterator, List, Optional
-from urllib.parse import urlencode, urlparse
-from wsgiref.handlers import format_date_time
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
 
 from langchain_core.callbacks import CallbackManagerForLLMRun
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
 from langchain_core.outputs import ChatGeneration, ChatResult
+from websockets.asyncio.client import connect as async_connect
+from websockets.exceptions import ConnectionClosed
+from websockets.sync.client import connect as sync_connect
+
+from .spark_pool import get_async_pool, get_signer, get_sync_pool
 
 logger = logging.getLogger(__name__)
 
@@ -49,9 +48,11 @@ class ChatSpark(BaseChatModel):
     temperature: float = 0.5
     max_tokens: int = 4096
     timeout: float = 60.0
+    api_base: str = "wss://spark-api.xf-yun.com"
+    use_pool: bool = True  # 复用已鉴权的 WebSocket 连接（见 spark_pool）
     
     # 模型版本映射
-    MODEL_VERSIONS = {
+    MODEL_VERSIONS: ClassVar[Dict[str, Tuple[str, str]]] = {
         "spark-4.0-ultra": ("v4.0", "generalv3.5"),
         "spark-max": ("v3.5", "generalv3.5"),
         "spark-pro": ("v3.1", "generalv3"),
@@ -73,44 +74,14 @@ class ChatSpark(BaseChatModel):
             "temperature": self.temperature,
         }
     
-    def _get_ws_url(self) -> str:
-        """生成 WebSocket 鉴权 URL"""
+    def _endpoint(self) -> str:
+        """接口地址（不含鉴权参数）"""
         version, _ = self.MODEL_VERSIONS.get(self.model, ("v3.5", "generalv3.5"))
-        host = "spark-api.xf-yun.com"
-        path = f"/{version}/chat"
-        
-        # 生成 RFC1123 格式的时间戳
-        now = datetime.now()
-        date = format_date_time(mktime(now.timetuple()))
-        
-        # 构建签名原文
-        signature_origin = f"host: {host}\ndate: {date}\nGET {path} HTTP/1.1"
-        
-        # HMAC-SHA256 签名
-        signature_sha = hmac.new(
-            self.api_secret.encode('utf-8'),
-            signature_origin.encode('utf-8'),
-            digestmod=hashlib.sha256
-        ).digest()
-        signature = base64.b64encode(signature_sha).decode()
-        
-        # 构建 authorization
-        authorization_origin = (
-            f'api_key="{self.api_key}", '
-            f'algorithm="hmac-sha256", '
-            f'headers="host date request-line", '
-            f'signature="{signature}"'
-        )
-        authorization = base64.b64encode(authorization_origin.encode('utf-8')).decode()
-        
-        # 构建 URL
-        params = {
-            "authorization": authorization,
-            "date": date,
-            "host": host,
-        }
-        url = f"wss://{host}{path}?{urlencode(params)}"
-        return url
+        return f"{self.api_base.rstrip('/')}/{version}/chat"
+    
+    def _get_ws_url(self) -> str:
+        """生成 WebSocket 鉴权 URL（签名在有效期内复用）"""
+        return get_signer(self._endpoint(), self.api_key, self.api_secret).signed_url()
     
     def _convert_messages(self, messages: List[BaseMessage]) -> List[Dict[str, str]]:
         """将 LangChain 消息转换为 API 格式"""
@@ -127,24 +98,10 @@ class ChatSpark(BaseChatModel):
                 converted.append({"role": "user", "content": str(msg.content)})
         return converted
     
-    def _generate(
-        self,
-        messages: List[BaseMessage],
-        stop: Optional[List[str]] = None,
-        run_manager: Optional[CallbackManagerForLLMRun] = None,
-        **kwargs: Any,
-    ) -> ChatResult:
-        """生成聊天响应（同步，使用 websockets）"""
-        import websockets.sync.client as ws_sync
-        
-        # 转换消息
-        api_messages = self._convert_messages(messages)
-        
-        # 获取模型域名
+    def _build_request(self, messages: List[BaseMessage], **kwargs: Any) -> str:
+        """构建请求数据"""
         _, domain = self.MODEL_VERSIONS.get(self.model, ("v3.5", "generalv3.5"))
-        
-        # 构建请求数据
-        request_data = {
+        return json.dumps({
             "header": {
                 "app_id": self.app_id,
             },
@@ -157,69 +114,116 @@ class ChatSpark(BaseChatModel):
             },
             "payload": {
                 "message": {
-                    "text": api_messages
+                    "text": self._convert_messages(messages)
                 }
             }
+        })
+    
+    @staticmethod
+    def _parse_frame(raw: str, parts: List[str]) -> Optional[Dict[str, int]]:
+        """
+        解析一帧响应，内容追加到 parts
+        
+        Returns:
+            最后一帧返回 token 使用量，否则返回 None
+        """
+        data = json.loads(raw)
+        
+        # 检查错误
+        header = data.get("header", {})
+        if header.get("code") != 0:
+            error_msg = header.get("message", "Unknown error")
+            raise ValueError(f"讯飞星火 API 错误: {error_msg}")
+        
+        # 提取内容
+        payload = data.get("payload", {})
+        choices = payload.get("choices", {})
+        for item in choices.get("text", []):
+            parts.append(item.get("content", ""))
+        
+        # status 为 2 表示结束
+        if choices.get("status") != 2:
+            return None
+        usage_data = payload.get("usage", {}).get("text", {})
+        return {
+            "prompt_tokens": usage_data.get("prompt_tokens", 0),
+            "completion_tokens": usage_data.get("completion_tokens", 0),
+            "total_tokens": usage_data.get("total_tokens", 0),
         }
-        
-        # 获取 WebSocket URL
-        ws_url = self._get_ws_url()
-        
-        # 收集响应
-        full_content = ""
-        usage = {}
-        
-        try:
-            with ws_sync.connect(ws_url) as ws:
-                ws.send(json.dumps(request_data))
-                
-                while True:
-                    response = ws.recv()
-                    data = json.loads(response)
-                    
-                    # 检查错误
-                    header = data.get("header", {})
-                    if header.get("code") != 0:
-                        error_msg = header.get("message", "Unknown error")
-                        raise ValueError(f"讯飞星火 API 错误: {error_msg}")
-                    
-                    # 提取内容
-                    payload = data.get("payload", {})
-                    choices = payload.get("choices", {})
-                    text = choices.get("text", [])
-                    
-                    for item in text:
-                        content = item.get("content", "")
-                        full_content += content
-                    
-                    # 检查是否结束
-                    status = choices.get("status")
-                    if status == 2:  # 结束
-                        # 提取使用信息
-                        usage_data = payload.get("usage", {}).get("text", {})
-                        usage = {
-                            "prompt_tokens": usage_data.get("prompt_tokens", 0),
-                            "completion_tokens": usage_data.get("completion_tokens", 0),
-                            "total_tokens": usage_data.get("total_tokens", 0),
-                        }
-                        break
-                        
-        except Exception as e:
-            logger.error(f"Spark API error: {e}")
-            raise ValueError(f"讯飞星火 API 调用失败: {e}")
-        
-        # 构建返回结果
-        ai_message = AIMessage(content=full_content)
-        generation = ChatGeneration(message=ai_message)
-        
+    
+    def _exchange(self, ws: Any, request: str) -> Tuple[str, Dict[str, int]]:
+        """在一条连接上完成一次请求（同步）"""
+        ws.send(request)
+        parts: List[str] = []
+        while True:
+            usage = self._parse_frame(ws.recv(timeout=self.timeout), parts)
+            if usage is not None:
+                return "".join(parts), usage
+    
+    async def _aexchange(self, ws: Any, request: str) -> Tuple[str, Dict[str, int]]:
+        """在一条连接上完成一次请求（异步）"""
+        await ws.send(request)
+        parts: List[str] = []
+        while True:
+            usage = self._parse_frame(await asyncio.wait_for(ws.recv(), self.timeout), parts)
+            if usage is not None:
+                return "".join(parts), usage
+    
+    def _call(self, request: str) -> Tuple[str, Dict[str, int]]:
+        if not self.use_pool:
+            with sync_connect(self._get_ws_url(), open_timeout=self.timeout) as ws:
+                return self._exchange(ws, request)
+        
+        pool = get_sync_pool(self._endpoint(), self.api_key, self.api_secret, self.timeout)
+        for attempt in range(2):
+            lease = None
+            try:
+                with pool.connection() as lease:
+                    return self._exchange(lease.ws, request)
+            except ConnectionClosed:
+                # 复用的空闲连接可能已被服务端断开，换一条新连接重试一次
+                if attempt or lease is None or not lease.reused:
+                    raise
+    
+    async def _acall(self, request: str) -> Tuple[str, Dict[str, int]]:
+        if not self.use_pool:
+            async with async_connect(self._get_ws_url(), open_timeout=self.timeout) as ws:
+                return await self._aexchange(ws, request)
+        
+        pool = get_async_pool(self._endpoint(), self.api_key, self.api_secret, self.timeout)
+        for attempt in range(2):
+            lease = None
+            try:
+                async with pool.connection() as lease:
+                    return await self._aexchange(lease.ws, request)
+            except ConnectionClosed:
+                if attempt or lease is None or not lease.reused:
+                    raise
+    
+    def _build_result(self, content: str, usage: Dict[str, int]) -> ChatResult:
         return ChatResult(
-            generations=[generation],
+            generations=[ChatGeneration(message=AIMessage(content=content))],
             llm_output={
                 "token_usage": usage,
                 "model_name": self.model,
             }
         )
     
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        """生成聊天响应（同步）"""
+        try:
+            content, usage = self._call(self._build_request(messages, **kwargs))
+        except Exception as e:
+            logger.error(f"Spark API error: {e}")
+            raise ValueError(f"讯飞星火 API 调用失败: {e}")
+        return self._build_result(content, usage)
+    
     async def _agenerate(
         self,
         messages: List[BaseMessage],
@@ -228,90 +232,12 @@ class ChatSpark(BaseChatModel):
         **kwargs: Any,
     ) -> ChatResult:
         """异步生成聊天响应"""
-        import websockets
-        
-        # 转换消息
-        api_messages = self._convert_messages(messages)
-        
-        # 获取模型域名
-        _, domain = self.MODEL_VERSIONS.get(self.model, ("v3.5", "generalv3.5"))
-        
-        # 构建请求数据
-        request_data = {
-            "header": {
-                "app_id": self.app_id,
-            },
-            "parameter": {
-                "chat": {
-                    "domain": domain,
-                    "temperature": kwargs.get("temperature", self.temperature),
-                    "max_tokens": kwargs.get("max_tokens", self.max_tokens),
-                }
-            },
-            "payload": {
-                "message": {
-                    "text": api_messages
-                }
-            }
-        }
-        
-        # 获取 WebSocket URL
-        ws_url = self._get_ws_url()
-        
-        # 收集响应
-        full_content = ""
-        usage = {}
-        
         try:
-            async with websockets.connect(ws_url) as ws:
-                await ws.send(json.dumps(request_data))
-                
-                while True:
-                    response = await ws.recv()
-                    data = json.loads(response)
-                    
-                    # 检查错误
-                    header = data.get("header", {})
-                    if header.get("code") != 0:
-                        error_msg = header.get("message", "Unknown error")
-                        raise ValueError(f"讯飞星火 API 错误: {error_msg}")
-                    
-                    # 提取内容
-                    payload = data.get("payload", {})
-                    choices = payload.get("choices", {})
-                    text = choices.get("text", [])
-                    
-                    for item in text:
-                        content = item.get("content", "")
-                        full_content += content
-                    
-                    # 检查是否结束
-                    status = choices.get("status")
-                    if status == 2:  # 结束
-                        # 提取使用信息
-                        usage_data = payload.get("usage", {}).get("text", {})
-                        usage = {
-                            "prompt_tokens": usage_data.get("prompt_tokens", 0),
-                            "completion_tokens": usage_data.get("completion_tokens", 0),
-                            "total_tokens": usage_data.get("total_tokens", 0),
-                        }
-                        break
-                        
+            content, usage = await self._acall(self._build_request(messages, **kwargs))
         except Exception as e:
             logger.error(f"Spark API error: {e}")
             raise ValueError(f"讯飞星火 API 调用失败: {e}")
-        
-        # 构建返回结果
-        ai_message = AIMessage(content=full_content)
-        generation = ChatGeneration(message=ai_message)
-        
-        return ChatResult(
-            generations=[generation],
-            llm_output={
-                "token_usage": usage,
-                "model_name": self.model,
-            }
-        )
+        return self._build_result(content, usage)
     
     def bind_tools(self, tools: List[Any], **kwargs) -> "ChatSpark":
         """绑定工具（讯飞支持有限的 function calling）"""
@@ -0,0 +1,449 @@
+"""
+讯飞星火 WebSocket 连接池
+
+星火接口每个请求占用一条 WebSocket 连接，协议没有请求ID，一条连接上不能并发多个请求，
+因此连接池按请求串行分配连接：
+- 每个请求独占一条连接，完成后若连接仍处于打开状态则放回复用
+- 服务端在响应结束后关闭连接时，后台预先建立备用连接，下一次请求不必等待 TLS/WebSocket 握手
+- 签名 URL 缓存复用，生成超过 SIGNATURE_TTL 秒后重新签名（服务端只接受 5 分钟内的签名）
+- 复用的空闲连接在发送时发现已断开，换一条新连接重试一次
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from time import mktime
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import urlencode, urlparse
+from wsgiref.handlers import format_date_time
+
+from websockets.asyncio.client import ClientConnection as AsyncConnection
+from websockets.asyncio.client import connect as async_connect
+from websockets.protocol import State
+from websockets.sync.client import ClientConnection as SyncConnection
+from websockets.sync.client import connect as sync_connect
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 签名有效期内提前刷新（服务端允许 300 秒时钟偏差）
+SIGNATURE_TTL = 240
+
+# 连接放回后这么短时间内被关闭，视为服务端在响应结束后主动关闭（而非空闲超时）
+_CLOSED_AFTER_RESPONSE = 2.0
+
+
+class SparkUrlSigner:
+    """生成并缓存 HMAC-SHA256 鉴权 URL"""
+
+    def __init__(self, url: str, api_key: str, api_secret: str):
+        """
+        Args:
+            url: 接口地址，如 wss://spark-api.xf-yun.com/v3.5/chat
+            api_key: API Key
+            api_secret: API Secret
+        """
+        self.url = url
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self._lock = threading.Lock()
+        self._signed: Optional[str] = None
+        self._signed_at = 0.0
+
+    def sign(self) -> str:
+        """生成新的鉴权 URL"""
+        parsed = urlparse(self.url)
+        host = parsed.netloc
+        path = parsed.path
+
+        # RFC1123 格式的时间戳
+        date = format_date_time(mktime(datetime.now().timetuple()))
+
+        # 签名原文
+        signature_origin = f"host: {host}\ndate: {date}\nGET {path} HTTP/1.1"
+        signature_sha = hmac.new(
+            self.api_secret.encode("utf-8"),
+            signature_origin.encode("utf-8"),
+            digestmod=hashlib.sha256
+        ).digest()
+        signature = base64.b64encode(signature_sha).decode()
+
+        authorization_origin = (
+            f'api_key="{self.api_key}", '
+            f'algorithm="hmac-sha256", '
+            f'headers="host date request-line", '
+            f'signature="{signature}"'
+        )
+        authorization = base64.b64encode(authorization_origin.encode("utf-8")).decode()
+
+        params = {
+            "authorization": authorization,
+            "date": date,
+            "host": host,
+        }
+        return f"{self.url}?{urlencode(params)}"
+
+    def signed_url(self) -> str:
+        """获取鉴权 URL，缓存的签名即将过期时重新生成"""
+        now = time.monotonic()
+        with self._lock:
+            if self._signed is None or now - self._signed_at > SIGNATURE_TTL:
+                self._signed = self.sign()
+                self._signed_at = now
+            return self._signed
+
+
+def _is_open(ws) -> bool:
+    return ws.protocol.state is State.OPEN
+
+
+@dataclass
+class Lease:
+    """一次请求占用的连接"""
+    ws: Any
+    reused: bool  # 是否为复用的空闲连接（可能已被服务端断开）
+
+
+class AsyncSparkConnectionPool:
+    """
+    异步连接池
+
+    连接绑定在创建它的事件循环上，通过 get_async_pool() 按事件循环分别获取。
+    """
+
+    def __init__(self, signer: SparkUrlSigner, max_size: int, idle_timeout: float, prewarm: int,
+                 open_timeout: float = 10.0):
+        self.signer = signer
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.prewarm = prewarm
+        self.open_timeout = open_timeout
+        self._idle: Deque[Tuple[AsyncConnection, float]] = deque()
+        self._size = 0      # 已建立（空闲 + 使用中）和正在建立的连接数
+        self._opening = 0   # 正在后台预建的连接数
+        self._prewarm_waiters = 0  # 正在等待预建连接的请求数
+        self._cond = asyncio.Condition()
+        self._tasks: set = set()
+        self._prewarming: set = set()
+        self._closed = False
+
+    async def _open(self) -> AsyncConnection:
+        return await async_connect(self.signer.signed_url(), open_timeout=self.open_timeout)
+
+    async def _acquire(self) -> Lease:
+        async with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    ws, since = self._idle.pop()
+                    if _is_open(ws) and now - since <= self.idle_timeout:
+                        return Lease(ws, reused=True)
+                    self._size -= 1
+                    self._close_later(ws)
+                if self._opening > self._prewarm_waiters:
+                    # 备用连接已经在建立，等它比重新握手更快
+                    self._prewarm_waiters += 1
+                    try:
+                        await self._cond.wait()
+                    finally:
+                        self._prewarm_waiters -= 1
+                    continue
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                await self._cond.wait()
+
+        try:
+            return Lease(await self._open(), reused=False)
+        except BaseException:
+            await self._discard(None)
+            raise
+
+    async def _release(self, ws: AsyncConnection) -> None:
+        if _is_open(ws) and not self._closed:
+            released_at = time.monotonic()
+            async with self._cond:
+                self._idle.append((ws, released_at))
+                self._cond.notify()
+            self._spawn(self._watch(ws, released_at))
+        else:
+            await self._discard(ws)
+            self._schedule_prewarm()
+
+    async def _watch(self, ws: AsyncConnection, released_at: float) -> None:
+        """空闲连接被服务端关闭时移出连接池；响应后随即被关闭的，预建备用连接"""
+        await ws.wait_closed()
+        async with self._cond:
+            try:
+                self._idle.remove((ws, released_at))
+            except ValueError:
+                return  # 已被取走或已清理
+            self._size -= 1
+            self._cond.notify_all()
+        if time.monotonic() - released_at <= _CLOSED_AFTER_RESPONSE:
+            self._schedule_prewarm()
+
+    async def _discard(self, ws: Optional[AsyncConnection]) -> None:
+        if ws is not None:
+            self._close_later(ws)
+        async with self._cond:
+            self._size -= 1
+            self._cond.notify_all()
+
+    def _spawn(self, coro) -> "asyncio.Future":
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _close_later(self, ws: AsyncConnection) -> None:
+        self._spawn(ws.close())
+
+    def _schedule_prewarm(self) -> None:
+        """
+        预建备用连接
+
+        只在请求结束后连接被关闭时触发（每次请求最多一次），空闲超时被关闭的连接不会触发，
+        应用空闲时不会反复重连。
+        """
+        if self._closed or len(self._idle) + self._opening >= self.prewarm or self._size >= self.max_size:
+            return
+        self._size += 1
+        self._opening += 1
+        task = self._spawn(self._prewarm())
+        self._prewarming.add(task)
+        task.add_done_callback(self._prewarming.discard)
+
+    async def _prewarm(self) -> None:
+        try:
+            ws = await self._open()
+        except Exception as e:
+            logger.warning(f"Spark prewarm connection failed: {e}")
+            self._opening -= 1
+            await self._discard(None)
+            return
+        async with self._cond:
+            self._opening -= 1
+            if not self._closed:
+                self._idle.append((ws, time.monotonic()))
+                self._cond.notify_all()
+                return
+        await self._discard(ws)
+
+    @asynccontextmanager
+    async def connection(self):
+        """
+        获取一条连接，代码块正常结束后放回（连接仍打开时），异常时关闭
+
+        Yields:
+            Lease
+        """
+        lease = await self._acquire()
+        try:
+            yield lease
+        except BaseException:
+            await self._discard(lease.ws)
+            raise
+        await self._release(lease.ws)
+
+    def stats(self) -> Dict[str, int]:
+        return {"size": self._size, "idle": len(self._idle), "opening": self._opening, "max_size": self.max_size}
+
+    async def close(self) -> None:
+        self._closed = True
+        for task in list(self._prewarming):
+            task.cancel()
+        async with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for ws, _ in idle:
+            await ws.close()
+
+
+class SyncSparkConnectionPool:
+    """同步连接池（线程安全），供 ChatSpark 的同步调用使用"""
+
+    def __init__(self, signer: SparkUrlSigner, max_size: int, idle_timeout: float, prewarm: int,
+                 open_timeout: float = 10.0):
+        self.signer = signer
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.prewarm = prewarm
+        self.open_timeout = open_timeout
+        self._idle: Deque[Tuple[SyncConnection, float]] = deque()
+        self._size = 0
+        self._opening = 0
+        self._prewarm_waiters = 0
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def _open(self) -> SyncConnection:
+        return sync_connect(self.signer.signed_url(), open_timeout=self.open_timeout)
+
+    def _acquire(self) -> Lease:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                while self._idle:
+                    ws, since = self._idle.pop()
+                    if _is_open(ws) and now - since <= self.idle_timeout:
+                        return Lease(ws, reused=True)
+                    self._size -= 1
+                    ws.close()
+                if self._opening > self._prewarm_waiters:
+                    self._prewarm_waiters += 1
+                    try:
+                        self._cond.wait()
+                    finally:
+                        self._prewarm_waiters -= 1
+                    continue
+                if self._size < self.max_size:
+                    self._size += 1
+                    break
+                self._cond.wait()
+
+        try:
+            return Lease(self._open(), reused=False)
+        except BaseException:
+            self._discard(None)
+            raise
+
+    def _release(self, ws: SyncConnection) -> None:
+        if _is_open(ws) and not self._closed:
+            with self._cond:
+                self._idle.append((ws, time.monotonic()))
+                self._cond.notify()
+        else:
+            self._discard(ws)
+            self._schedule_prewarm()
+
+    def _discard(self, ws: Optional[SyncConnection]) -> None:
+        if ws is not None:
+            ws.close()
+        with self._cond:
+            self._size -= 1
+            self._cond.notify_all()
+
+    def _schedule_prewarm(self) -> None:
+        with self._cond:
+            if self._closed or len(self._idle) + self._opening >= self.prewarm or self._size >= self.max_size:
+                return
+            self._size += 1
+            self._opening += 1
+        threading.Thread(target=self._prewarm, daemon=True, name="SparkPrewarm").start()
+
+    def _prewarm(self) -> None:
+        try:
+            ws = self._open()
+        except Exception as e:
+            logger.warning(f"Spark prewarm connection failed: {e}")
+            with self._cond:
+                self._opening -= 1
+            self._discard(None)
+            return
+        with self._cond:
+            self._opening -= 1
+            if not self._closed:
+                self._idle.append((ws, time.monotonic()))
+                self._cond.notify_all()
+                return
+        self._discard(ws)
+
+    @contextmanager
+    def connection(self):
+        """获取一条连接，用法同 AsyncSparkConnectionPool.connection"""
+        lease = self._acquire()
+        try:
+            yield lease
+        except BaseException:
+            self._discard(lease.ws)
+            raise
+        self._release(lease.ws)
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {"size": self._size, "idle": len(self._idle), "opening": self._opening, "max_size": self.max_size}
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+        for ws, _ in idle:
+            ws.close()
+
+
+# 连接池注册表：同一组凭证共用签名缓存和连接池
+_lock = threading.Lock()
+_signers: Dict[Tuple[str, str, str], SparkUrlSigner] = {}
+_sync_pools: Dict[Tuple[str, str, str], SyncSparkConnectionPool] = {}
+_async_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str, str], AsyncSparkConnectionPool]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _pool_key(url: str, api_key: str, api_secret: str) -> Tuple[str, str, str]:
+    return url, api_key, hashlib.sha256(api_secret.encode("utf-8")).hexdigest()
+
+
+def get_signer(url: str, api_key: str, api_secret: str) -> SparkUrlSigner:
+    key = _pool_key(url, api_key, api_secret)
+    with _lock:
+        signer = _signers.get(key)
+        if signer is None:
+            signer = _signers[key] = SparkUrlSigner(url, api_key, api_secret)
+        return signer
+
+
+def get_sync_pool(url: str, api_key: str, api_secret: str, open_timeout: float = 10.0) -> SyncSparkConnectionPool:
+    """获取同步连接池"""
+    key = _pool_key(url, api_key, api_secret)
+    signer = get_signer(url, api_key, api_secret)
+    with _lock:
+        pool = _sync_pools.get(key)
+        if pool is None:
+            pool = _sync_pools[key] = SyncSparkConnectionPool(
+                signer, settings.SPARK_POOL_MAX_SIZE, settings.SPARK_POOL_IDLE_TIMEOUT,
+                settings.SPARK_POOL_PREWARM, open_timeout,
+            )
+        return pool
+
+
+def get_async_pool(url: str, api_key: str, api_secret: str, open_timeout: float = 10.0) -> AsyncSparkConnectionPool:
+    """获取当前事件循环上的异步连接池"""
+    key = _pool_key(url, api_key, api_secret)
+    signer = get_signer(url, api_key, api_secret)
+    loop = asyncio.get_running_loop()
+    with _lock:
+        pools = _async_pools.get(loop)
+        if pools is None:
+            pools = _async_pools[loop] = {}
+        pool = pools.get(key)
+        if pool is None:
+            pool = pools[key] = AsyncSparkConnectionPool(
+                signer, settings.SPARK_POOL_MAX_SIZE, settings.SPARK_POOL_IDLE_TIMEOUT,
+                settings.SPARK_POOL_PREWARM, open_timeout,
+            )
+        return pool
+
+
+async def close_spark_pools() -> None:
+    """关闭所有连接池的空闲连接（在应用 shutdown 时调用）"""
+    with _lock:
+        sync_pools = list(_sync_pools.values())
+        _sync_pools.clear()
+        async_pools = list(_async_pools.pop(asyncio.get_running_loop(), {}).values())
+    for pool in sync_pools:
+        pool.close()
+    for pool in async_pools:
+        await pool.close()
@@ -10,6 +10,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -51,7 +52,7 @@ class BaiduImageGenerator(ImageGeneratorBase):
             "client_secret": self.secret_key
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with async_http_client(timeout=30.0) as client:
             response = await client.post(url, params=params)
             if response.status_code != 200:
                 raise Exception(f"获取 access_token 失败: {response.status_code}")
@@ -92,7 +93,7 @@ class BaiduImageGenerator(ImageGeneratorBase):
             if negative_prompt:
                 payload["negative_prompt"] = negative_prompt
             
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with async_http_client(timeout=120.0) as client:
                 response = await client.post(
                     url,
                     params={"access_token": access_token},
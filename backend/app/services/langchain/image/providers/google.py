@@ -9,6 +9,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -72,7 +73,7 @@ class GoogleImageGenerator(ImageGeneratorBase):
                 }
             }
             
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with async_http_client(timeout=120.0) as client:
                 response = await client.post(
                     f"{self.base_url}/models/{model}:predict",
                     params={"key": self.api_key},
@@ -14,6 +14,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -122,7 +123,7 @@ class HunyuanImageGenerator(ImageGeneratorBase):
             
             headers = self._sign_request(payload, "TextToImage")
             
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with async_http_client(timeout=120.0) as client:
                 response = await client.post(
                     f"https://{self.host}",
                     headers=headers,
@@ -19,6 +19,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -112,7 +113,7 @@ class LeonardoImageGenerator(ImageGeneratorBase):
             full_prompt = f"{prompt}, {style} style"
         
         try:
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with async_http_client(timeout=120.0) as client:
                 # 1. 创建生成任务
                 payload = {
                     "prompt": full_prompt,
@@ -17,6 +17,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -104,7 +105,7 @@ class ModelScopeImageGenerator(ImageGeneratorBase):
         images = []
         
         try:
-            async with httpx.AsyncClient(timeout=180.0) as client:
+            async with async_http_client(timeout=180.0) as client:
                 for i in range(min(n, 4)):
                     payload = {
                         "model": model,
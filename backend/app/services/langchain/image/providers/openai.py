@@ -10,6 +10,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -110,7 +111,7 @@ class OpenAIImageGenerator(ImageGeneratorBase):
                 "modalities": ["image"]
             }
             
-            async with httpx.AsyncClient(timeout=180.0) as client:
+            async with async_http_client(timeout=180.0) as client:
                 response = await client.post(
                     f"{self.base_url}/chat/completions",
                     headers=headers,
@@ -213,7 +214,7 @@ class OpenAIImageGenerator(ImageGeneratorBase):
             if style and model == "dall-e-3":
                 payload["style"] = style
             
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with async_http_client(timeout=120.0) as client:
                 response = await client.post(
                     f"{self.base_url}/images/generations",
                     headers=headers,
@@ -10,6 +10,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -80,7 +81,7 @@ class QwenImageGenerator(ImageGeneratorBase):
             if style:
                 payload["parameters"]["style"] = style
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with async_http_client(timeout=30.0) as client:
                 # 提交任务
                 response = await client.post(
                     f"{self.base_url}/services/aigc/text2image/image-synthesis",
@@ -123,7 +124,7 @@ class QwenImageGenerator(ImageGeneratorBase):
             "Authorization": f"Bearer {self.api_key}",
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with async_http_client(timeout=30.0) as client:
             for _ in range(max_attempts):
                 response = await client.get(
                     f"{self.base_url}/tasks/{task_id}",
@@ -10,6 +10,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -99,7 +100,7 @@ class ReplicateImageGenerator(ImageGeneratorBase):
                 endpoint = f"{self.base_url}/models/{model_version}/predictions"
                 del payload["version"]
             
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with async_http_client(timeout=30.0) as client:
                 response = await client.post(
                     endpoint,
                     headers=headers,
@@ -138,7 +139,7 @@ class ReplicateImageGenerator(ImageGeneratorBase):
         interval: float = 1.0
     ) -> ImageGenerationResult:
         """轮询预测结果"""
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with async_http_client(timeout=30.0) as client:
             for _ in range(max_attempts):
                 response = await client.get(url, headers=headers)
                 
@@ -10,6 +10,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -87,7 +88,7 @@ class StabilityImageGenerator(ImageGeneratorBase):
             if style:
                 form_data["style_preset"] = style
             
-            async with httpx.AsyncClient(timeout=180.0) as client:
+            async with async_http_client(timeout=180.0) as client:
                 response = await client.post(
                     f"{self.base_url}/stable-image/generate/sd3",
                     headers=headers,
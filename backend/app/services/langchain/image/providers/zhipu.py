@@ -9,6 +9,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import ImageGeneratorBase, ImageGenerationResult
 
 logger = logging.getLogger(__name__)
@@ -71,7 +72,7 @@ class ZhipuImageGenerator(ImageGeneratorBase):
             if kwargs.get("user_id"):
                 payload["user_id"] = kwargs["user_id"]
             
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with async_http_client(timeout=120.0) as client:
                 response = await client.post(
                     f"{self.base_url}/images/generations",
                     headers=headers,
@@ -0,0 +1,250 @@
+"""
+LLM 响应缓存
+厂商、模型、地址、消息和采样参数完全相同的对话直接返回上次的结果，不再调用模型：
+- 键为上述内容规范化后的 SHA-256，不含密钥
+- 过期时间按调用步骤（tool）配置，0 表示该步骤不缓存
+- 总容量有上限：Redis 中用有序集合按过期时间索引各条目大小，写入时先清理已过期条目，
+  仍超出时淘汰最早过期的条目；Redis 不可用时降级为进程内 LRU 缓存
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+
+from app.core.config import settings
+from app.core.redis_client import get_async_redis
+from app.utils import cache as _cache
+from app.utils.memory_cache import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+_KEY_PREFIX = "llm:resp:"
+_INDEX_KEY = "llm:resp:index"   # 有序集合：条目键 -> 过期时间戳
+_SIZES_KEY = "llm:resp:sizes"   # 哈希：条目键 -> 字节数
+_TOTAL_KEY = "llm:resp:bytes"   # 当前总字节数
+
+# 不影响模型输出的调用参数，不计入缓存键
+_IGNORED_PARAMS = {"callbacks", "config", "tags", "metadata", "run_name", "run_id"}
+
+# KEYS: 条目键, 索引, 大小哈希, 总字节数
+# ARGV: 值, 过期秒数, 当前时间戳, 总容量
+# 返回 {是否写入, 淘汰的条目数}
+# 先清理过期条目、淘汰旧条目腾出空间，最后才写入新条目，新条目不会被本次淘汰；
+# 淘汰完所有旧条目仍放不下时不写入
+_SET_SCRIPT = """
+local key, index, sizes, total = KEYS[1], KEYS[2], KEYS[3], KEYS[4]
+local ttl, now, budget = tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local size = string.len(ARGV[1])
+local old = redis.call('HGET', sizes, key)
+if old then
+    redis.call('DECRBY', total, old)
+    redis.call('HDEL', sizes, key)
+    redis.call('ZREM', index, key)
+end
+local used = tonumber(redis.call('GET', total) or '0')
+
+local expired = redis.call('ZRANGEBYSCORE', index, '-inf', now, 'LIMIT', 0, 100)
+for _, k in ipairs(expired) do
+    local s = redis.call('HGET', sizes, k)
+    if s then
+        used = redis.call('DECRBY', total, s)
+    end
+    redis.call('HDEL', sizes, k)
+    redis.call('ZREM', index, k)
+end
+
+local evicted = 0
+while used + size > budget do
+    local popped = redis.call('ZPOPMIN', index)
+    if #popped == 0 then
+        break
+    end
+    local s = redis.call('HGET', sizes, popped[1])
+    if s then
+        used = redis.call('DECRBY', total, s)
+    end
+    redis.call('HDEL', sizes, popped[1])
+    redis.call('DEL', popped[1])
+    evicted = evicted + 1
+end
+
+if used + size > budget then
+    redis.call('DEL', key)
+    return {0, evicted}
+end
+redis.call('SET', key, ARGV[1], 'EX', ttl)
+redis.call('HSET', sizes, key, size)
+redis.call('ZADD', index, now + ttl, key)
+redis.call('INCRBY', total, size)
+return {1, evicted}
+"""
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def _message_parts(messages: Sequence[BaseMessage]) -> List[Dict[str, Any]]:
+    return [{"type": m.type, "content": m.content, "name": m.name} for m in messages]
+
+
+def _tool_parts(tools: Sequence[Any]) -> List[Any]:
+    parts = []
+    for tool in tools:
+        if isinstance(tool, dict):
+            parts.append(tool)
+        else:
+            parts.append([getattr(tool, "name", repr(tool)), getattr(tool, "description", ""), getattr(tool, "args", None)])
+    return parts
+
+
+class LLMResponseCache:
+    """LLM 响应缓存"""
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._local = MemoryCache(
+            max_entries=settings.MEMORY_CACHE_MAX_ENTRIES,
+            max_bytes=max_bytes,
+            sweep_interval=settings.MEMORY_CACHE_SWEEP_INTERVAL,
+            name="llm_response",
+        )
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stores = 0
+        self._skipped = 0
+        self._evictions = 0
+
+    @staticmethod
+    def make_key(
+        provider: str,
+        model: str,
+        api_base: Optional[str],
+        messages: Sequence[BaseMessage],
+        params: Dict[str, Any],
+        tools: Optional[Sequence[Any]] = None,
+    ) -> str:
+        """
+        生成缓存键
+
+        Args:
+            provider: 厂商
+            model: 模型名称
+            api_base: 接口地址（同名模型在不同地址上可能是不同部署）
+            messages: 发送给模型的消息
+            params: 采样参数（temperature、max_tokens 等），值为 None 的忽略
+            tools: 绑定的工具
+        """
+        params = {k: v for k, v in params.items() if v is not None and k not in _IGNORED_PARAMS}
+        digest = hashlib.sha256(_canonical({
+            "provider": provider.lower(),
+            "model": model,
+            "api_base": api_base or "",
+            "messages": _message_parts(messages),
+            "params": params,
+            "tools": _tool_parts(tools) if tools else None,
+        }).encode("utf-8")).hexdigest()
+        return f"{_KEY_PREFIX}{digest}"
+
+    @staticmethod
+    def ttl_for(tool: Optional[str]) -> int:
+        """调用步骤的缓存时间（秒），未启用缓存或该步骤不缓存时返回 0"""
+        if not settings.LLM_RESPONSE_CACHE_ENABLED:
+            return 0
+        ttls = settings.LLM_RESPONSE_CACHE_TOOL_TTLS or {}
+        return int(ttls.get(tool or "chat", settings.LLM_RESPONSE_CACHE_TTL))
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存，未命中或出错时返回 None"""
+        raw = None
+        if _cache.REDIS_AVAILABLE:
+            try:
+                raw = await get_async_redis().get(key)
+            except Exception as e:
+                logger.warning(f"LLM response cache get error: {e}")
+        else:
+            raw = self._local.get(key)
+
+        if raw is None:
+            self._count("_misses")
+            return None
+        self._count("_hits")
+        return json.loads(raw)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: int) -> bool:
+        """写入缓存，超过单条大小上限的不缓存"""
+        raw = _canonical({**value, "cached_at": int(time.time())})
+        if ttl <= 0 or len(raw.encode("utf-8")) > self.max_entry_bytes:
+            self._count("_skipped")
+            return False
+
+        if _cache.REDIS_AVAILABLE:
+            try:
+                stored, evicted = await get_async_redis().eval(
+                    _SET_SCRIPT, 4, key, _INDEX_KEY, _SIZES_KEY, _TOTAL_KEY,
+                    raw, ttl, int(time.time()), self.max_bytes
+                )
+            except Exception as e:
+                logger.warning(f"LLM response cache set error: {e}")
+                return False
+            self._count("_evictions", int(evicted or 0))
+            if not int(stored):
+                self._count("_skipped")
+                return False
+        elif not self._local.set(key, raw, expire=ttl):
+            self._count("_skipped")
+            return False
+        self._count("_stores")
+        return True
+
+    async def clear(self) -> None:
+        """清空缓存"""
+        self._local.clear()
+        if _cache.REDIS_AVAILABLE:
+            try:
+                client = get_async_redis()
+                keys = await client.zrange(_INDEX_KEY, 0, -1)
+                for i in range(0, len(keys), 500):
+                    await client.delete(*keys[i:i + 500])
+                await client.delete(_INDEX_KEY, _SIZES_KEY, _TOTAL_KEY)
+            except Exception as e:
+                logger.warning(f"LLM response cache clear error: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """缓存统计（当前 worker 的命中情况）"""
+        with self._lock:
+            lookups = self._hits + self._misses
+            stats = {
+                "enabled": settings.LLM_RESPONSE_CACHE_ENABLED,
+                "backend": "redis" if _cache.REDIS_AVAILABLE else "memory",
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "stores": self._stores,
+                "skipped": self._skipped,
+                "evictions": self._evictions,
+            }
+        if not _cache.REDIS_AVAILABLE:
+            local = self._local.stats()
+            stats["entries"] = local.get("entries")
+            stats["bytes"] = local.get("bytes")
+            stats["evictions"] += local.get("evictions", 0)
+        return stats
+
+
+llm_response_cache = LLMResponseCache(
+    settings.LLM_RESPONSE_CACHE_MAX_BYTES,
+    settings.LLM_RESPONSE_CACHE_MAX_ENTRY_BYTES,
+)
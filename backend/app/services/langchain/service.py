@@ -10,8 +10,10 @@ LangChain 统一服务入口
 这是新 LangChain 架构的核心服务层。
 """
 
+import asyncio
 import logging
-from dataclasses import dataclass, field
+import time
+from dataclasses import asdict, dataclass, field
 from typing import Any, AsyncGenerator, Callable, Dict, List, Optional
 
 from langchain_core.language_models.chat_models import BaseChatModel
@@ -20,15 +22,27 @@ from langchain_core.messages import (
     BaseMessage,
     HumanMessage,
     SystemMessage,
-    ToolMessage
+    ToolMessage,
+    get_buffer_string
 )
 from langchain_core.tools import BaseTool
 
 from .chat.factory import LangChainChatFactory
+from .chat.pool import chat_model_pool
+from .response_cache import llm_response_cache
 from .tools import ToolExecutor, create_tool_from_plugin
 
 logger = logging.getLogger(__name__)
 
+# 计入响应缓存键的模型默认采样参数（调用时传入的参数优先）
+_SAMPLING_PARAMS = (
+    "temperature", "top_p", "top_k", "max_tokens", "stop",
+    "presence_penalty", "frequency_penalty", "seed", "model_kwargs",
+)
+
+# 只缓存正常结束的响应
+_CACHEABLE_FINISH_REASONS = ("stop", "tool_calls")
+
 
 @dataclass
 class ChatResponse:
@@ -118,8 +132,8 @@ class LangChainService:
         self._monitor_tool = tool
         self._monitor_creation_id = creation_id
         
-        # 创建 LangChain Chat Model
-        self._chat_model = LangChainChatFactory.create(
+        # 从实例池获取 LangChain Chat Model（相同厂商/模型/密钥复用同一实例及其连接池）
+        self._chat_model = chat_model_pool.get(
             provider=provider,
             model_name=model,
             api_key=api_key,
@@ -145,16 +159,68 @@ class LangChainService:
             )]
         return []
     
+    def _run_config(self, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        取出调用参数中的 callbacks/config，与监控回调合并为 RunnableConfig
+        
+        回调需要通过 config 传入，作为模型参数传给 ainvoke 时会与 config 中的 callbacks 冲突。
+        """
+        config = dict(kwargs.pop("config", None) or {})
+        callbacks = list(kwargs.pop("callbacks", None) or config.get("callbacks") or [])
+        callbacks += self._build_callbacks()
+        if callbacks:
+            config["callbacks"] = callbacks
+        return config or None
+    
     @property
     def chat_model(self) -> BaseChatModel:
         """获取底层的 LangChain Chat Model"""
         return self._chat_model
     
+    def _response_cache_key(
+        self,
+        messages: List[BaseMessage],
+        kwargs: Dict[str, Any],
+        tools: Optional[List[BaseTool]] = None,
+        **options
+    ) -> str:
+        """响应缓存键：厂商、模型、地址、消息、采样参数和工具"""
+        params = {name: getattr(self._chat_model, name, None) for name in _SAMPLING_PARAMS}
+        params.update(kwargs)
+        params.update(options)
+        return llm_response_cache.make_key(self.provider, self.model, self.api_base, messages, params, tools)
+    
+    async def _get_cached_response(self, key: str, messages: List[BaseMessage]) -> Optional[ChatResponse]:
+        """读取响应缓存，命中时按 0 token 记录调用日志"""
+        started = time.perf_counter()
+        cached = await llm_response_cache.get(key)
+        if cached is None:
+            return None
+        
+        response = ChatResponse(**cached["response"])
+        logger.debug(f"LLM response cache hit: provider={self.provider}, model={self.model}, tool={self._monitor_tool}")
+        
+        callbacks = self._build_callbacks()
+        if callbacks:
+            await asyncio.to_thread(
+                callbacks[0].record_cache_hit,
+                get_buffer_string(messages),
+                response.content,
+                int((time.perf_counter() - started) * 1000),
+                {"hit": True, "key": key[-16:], "cached_at": cached.get("cached_at")},
+            )
+        return response
+    
+    async def _store_response(self, key: str, ttl: int, response: ChatResponse) -> None:
+        if response.finish_reason in _CACHEABLE_FINISH_REASONS and (response.content or response.tool_calls):
+            await llm_response_cache.set(key, {"response": asdict(response)}, ttl)
+    
     async def chat(
         self,
         message: str,
         system_prompt: Optional[str] = None,
         history: List[Dict[str, str]] = None,
+        bypass_cache: bool = False,
         **kwargs
     ) -> ChatResponse:
         """
@@ -164,28 +230,35 @@ class LangChainService:
             message: 用户消息
             system_prompt: 系统提示词
             history: 历史消息 [{"role": "user/assistant", "content": "..."}]
+            bypass_cache: 不读取响应缓存，强制调用模型（结果仍会写入缓存）
             **kwargs: 额外参数（temperature, max_tokens 等）
             
         Returns:
             ChatResponse 对象
         """
         messages = self._build_messages(message, system_prompt, history)
-        monitor_callbacks = self._build_callbacks()
-        if monitor_callbacks:
-            user_callbacks = kwargs.pop("callbacks", None)
-            if user_callbacks:
-                kwargs["callbacks"] = list(user_callbacks) + monitor_callbacks
-            else:
-                kwargs["callbacks"] = monitor_callbacks
+        
+        # 响应缓存（LLM_RESPONSE_CACHE_ENABLED 开启且该调用步骤的缓存时间大于 0）
+        cache_ttl = llm_response_cache.ttl_for(self._monitor_tool)
+        cache_key = self._response_cache_key(messages, kwargs) if cache_ttl > 0 else None
+        if cache_key and not bypass_cache:
+            cached = await self._get_cached_response(cache_key, messages)
+            if cached is not None:
+                return cached
+        
+        config = self._run_config(kwargs)
         
         try:
-            response = await self._chat_model.ainvoke(messages, **kwargs)
+            response = await self._chat_model.ainvoke(messages, config=config, **kwargs)
             
-            return ChatResponse(
+            result = ChatResponse(
                 content=response.content if isinstance(response.content, str) else "",
                 model=self.model,
                 finish_reason="stop"
             )
+            if cache_key:
+                await self._store_response(cache_key, cache_ttl, result)
+            return result
             
         except Exception as e:
             logger.error(f"Chat error: {e}", exc_info=True)
@@ -199,6 +272,7 @@ class LangChainService:
         history: List[Dict[str, str]] = None,
         max_iterations: int = 10,
         auto_execute_tools: bool = True,
+        bypass_cache: bool = False,
         **kwargs
     ) -> ChatResponse:
         """
@@ -217,6 +291,7 @@ class LangChainService:
             history: 历史消息
             max_iterations: 最大迭代次数（防止无限循环）
             auto_execute_tools: 是否自动执行工具（False 则只返回工具调用请求）
+            bypass_cache: 不读取响应缓存，强制调用模型（结果仍会写入缓存）
             **kwargs: 额外参数
             
         Returns:
@@ -226,17 +301,26 @@ class LangChainService:
         self._tool_executor.register_tools(tools)
         
         # 将 tools 绑定到 model
-        model_with_tools = self._chat_model.bind_tools(tools)
+        model_with_tools = chat_model_pool.bind_tools(self._chat_model, tools)
         
         # 构建消息
         messages = self._build_messages(message, system_prompt, history)
-        monitor_callbacks = self._build_callbacks()
-        if monitor_callbacks:
-            user_callbacks = kwargs.pop("callbacks", None)
-            if user_callbacks:
-                kwargs["callbacks"] = list(user_callbacks) + monitor_callbacks
-            else:
-                kwargs["callbacks"] = monitor_callbacks
+        
+        # 响应缓存（键包含工具定义）。只缓存没有执行过工具的响应：
+        # 工具结果可能与用户相关（查询该用户的数据）或随时间变化，执行过工具的最终回答不能给其他请求复用
+        cache_ttl = llm_response_cache.ttl_for(self._monitor_tool)
+        cache_key = None
+        if cache_ttl > 0:
+            cache_key = self._response_cache_key(
+                messages, kwargs, tools,
+                max_iterations=max_iterations, auto_execute_tools=auto_execute_tools
+            )
+            if not bypass_cache:
+                cached = await self._get_cached_response(cache_key, messages)
+                if cached is not None:
+                    return cached
+        
+        config = self._run_config(kwargs)
         
         # 工具调用循环
         iteration = 0
@@ -246,25 +330,31 @@ class LangChainService:
             logger.debug(f"Tool call iteration {iteration}")
             
             # 调用 LLM
-            response: AIMessage = await model_with_tools.ainvoke(messages, **kwargs)
+            response: AIMessage = await model_with_tools.ainvoke(messages, config=config, **kwargs)
             
             # 检查是否有工具调用
             if not response.tool_calls:
                 # 没有工具调用，返回最终响应
-                return ChatResponse(
+                result = ChatResponse(
                     content=response.content if isinstance(response.content, str) else "",
                     model=self.model,
                     finish_reason="stop"
                 )
+                if cache_key and iteration == 1:
+                    await self._store_response(cache_key, cache_ttl, result)
+                return result
             
             # 如果不自动执行，返回工具调用请求
             if not auto_execute_tools:
-                return ChatResponse(
+                result = ChatResponse(
                     content=response.content if isinstance(response.content, str) else "",
                     tool_calls=response.tool_calls,
                     model=self.model,
                     finish_reason="tool_calls"
                 )
+                if cache_key:
+                    await self._store_response(cache_key, cache_ttl, result)
+                return result
             
             # 将 AI 响应添加到消息历史
             messages.append(response)
@@ -305,16 +395,10 @@ class LangChainService:
             文本片段
         """
         messages = self._build_messages(message, system_prompt, history)
-        monitor_callbacks = self._build_callbacks()
-        if monitor_callbacks:
-            user_callbacks = kwargs.pop("callbacks", None)
-            if user_callbacks:
-                kwargs["callbacks"] = list(user_callbacks) + monitor_callbacks
-            else:
-                kwargs["callbacks"] = monitor_callbacks
+        config = self._run_config(kwargs)
         
         try:
-            async for chunk in self._chat_model.astream(messages, **kwargs):
+            async for chunk in self._chat_model.astream(messages, config=config, **kwargs):
                 if chunk.content:
                     yield chunk.content
                     
@@ -352,7 +436,7 @@ class LangChainService:
             文本片段
         """
         self._tool_executor.register_tools(tools)
-        model_with_tools = self._chat_model.bind_tools(tools)
+        model_with_tools = chat_model_pool.bind_tools(self._chat_model, tools)
         messages = self._build_messages(message, system_prompt, history)
         
         iteration = 0
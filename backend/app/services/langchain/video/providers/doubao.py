@@ -12,6 +12,7 @@ from typing import List, Optional, Tuple, Any
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import VideoGeneratorBase, VideoGenerationResult, VideoGenerationMode
 
 logger = logging.getLogger(__name__)
@@ -91,7 +92,7 @@ class DoubaoVideoGenerator(VideoGeneratorBase):
             if kwargs.get("seed"):
                 payload["video_parameters"]["seed"] = kwargs["seed"]
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with async_http_client(timeout=60.0) as client:
                 # 提交任务
                 response = await client.post(
                     f"{self.base_url}/contents/generations/tasks",
@@ -133,7 +134,7 @@ class DoubaoVideoGenerator(VideoGeneratorBase):
             "Authorization": f"Bearer {self.api_key}",
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with async_http_client(timeout=30.0) as client:
             response = await client.get(
                 f"{self.base_url}/contents/generations/tasks/{task_id}",
                 headers=headers
@@ -18,6 +18,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import VideoGeneratorBase, VideoGenerationResult, VideoGenerationMode
 
 logger = logging.getLogger(__name__)
@@ -107,7 +108,7 @@ class HuggingFaceVideoGenerator(VideoGeneratorBase):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=300.0) as client:  # 视频生成需要更长时间
+            async with async_http_client(timeout=300.0) as client:  # 视频生成需要更长时间
                 # 构建请求体
                 if image_url:
                     # 图生视频
@@ -10,6 +10,7 @@ from typing import List, Optional, Tuple, Any
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import VideoGeneratorBase, VideoGenerationResult, VideoGenerationMode
 
 logger = logging.getLogger(__name__)
@@ -78,7 +79,7 @@ class MiniMaxVideoGenerator(VideoGeneratorBase):
             if image_url:
                 payload["first_frame_image"] = image_url
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with async_http_client(timeout=60.0) as client:
                 # 提交任务
                 response = await client.post(
                     f"{self.base_url}/video_generation?GroupId={self.group_id}",
@@ -126,7 +127,7 @@ class MiniMaxVideoGenerator(VideoGeneratorBase):
             "Authorization": f"Bearer {self.api_key}",
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with async_http_client(timeout=30.0) as client:
             response = await client.get(
                 f"{self.base_url}/query/video_generation?GroupId={self.group_id}&task_id={task_id}",
                 headers=headers
@@ -17,6 +17,7 @@ from typing import List, Optional
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import VideoGeneratorBase, VideoGenerationResult, VideoGenerationMode
 
 logger = logging.getLogger(__name__)
@@ -92,7 +93,7 @@ class ModelScopeVideoGenerator(VideoGeneratorBase):
         }
         
         try:
-            async with httpx.AsyncClient(timeout=300.0) as client:  # 视频生成需要更长时间
+            async with async_http_client(timeout=300.0) as client:  # 视频生成需要更长时间
                 # 构建请求体
                 payload = {
                     "model": model,
@@ -12,6 +12,7 @@ from typing import List, Optional, Tuple, Any
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import VideoGeneratorBase, VideoGenerationResult, VideoGenerationMode
 
 logger = logging.getLogger(__name__)
@@ -95,7 +96,7 @@ class QwenVideoGenerator(VideoGeneratorBase):
                 # 通义支持的时长参数
                 payload["parameters"]["duration"] = min(int(duration), 5)
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with async_http_client(timeout=60.0) as client:
                 # 提交任务
                 response = await client.post(
                     f"{self.base_url}/services/aigc/video-generation/generation",
@@ -137,7 +138,7 @@ class QwenVideoGenerator(VideoGeneratorBase):
             "Authorization": f"Bearer {self.api_key}",
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with async_http_client(timeout=30.0) as client:
             response = await client.get(
                 f"{self.base_url}/tasks/{task_id}",
                 headers=headers
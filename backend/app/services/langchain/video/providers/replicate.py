@@ -13,6 +13,7 @@ from typing import List, Optional, Tuple, Any
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import VideoGeneratorBase, VideoGenerationResult, VideoGenerationMode
 
 logger = logging.getLogger(__name__)
@@ -124,7 +125,7 @@ class ReplicateVideoGenerator(VideoGeneratorBase):
                 "input": input_params
             }
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with async_http_client(timeout=60.0) as client:
                 # 创建预测
                 response = await client.post(
                     f"{self.base_url}/predictions",
@@ -166,7 +167,7 @@ class ReplicateVideoGenerator(VideoGeneratorBase):
             "Authorization": f"Token {self.api_key}",
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with async_http_client(timeout=30.0) as client:
             response = await client.get(
                 f"{self.base_url}/predictions/{prediction_id}",
                 headers=headers
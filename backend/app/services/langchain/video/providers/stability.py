@@ -12,6 +12,7 @@ from typing import List, Optional, Tuple, Any
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import VideoGeneratorBase, VideoGenerationResult, VideoGenerationMode
 
 logger = logging.getLogger(__name__)
@@ -75,7 +76,7 @@ class StabilityVideoGenerator(VideoGeneratorBase):
             }
             
             # 下载图片并转换为 base64
-            async with httpx.AsyncClient(timeout=30.0) as client:
+            async with async_http_client(timeout=30.0) as client:
                 img_response = await client.get(image_url)
                 if img_response.status_code != 200:
                     return VideoGenerationResult.fail("无法下载参考图片", self.provider_name)
@@ -93,7 +94,7 @@ class StabilityVideoGenerator(VideoGeneratorBase):
                 "motion_bucket_id": kwargs.get("motion_bucket_id", 40),
             }
             
-            async with httpx.AsyncClient(timeout=120.0) as client:
+            async with async_http_client(timeout=120.0) as client:
                 # 提交任务
                 response = await client.post(
                     f"{self.base_url}/image-to-video",
@@ -151,7 +152,7 @@ class StabilityVideoGenerator(VideoGeneratorBase):
             "Accept": "application/json"
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with async_http_client(timeout=30.0) as client:
             response = await client.get(
                 f"{self.base_url}/image-to-video/result/{generation_id}",
                 headers=headers
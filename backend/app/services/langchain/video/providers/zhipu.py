@@ -12,6 +12,7 @@ from typing import List, Optional, Tuple, Any
 
 import httpx
 
+from app.core.http_client import async_http_client
 from ..base import VideoGeneratorBase, VideoGenerationResult, VideoGenerationMode
 
 logger = logging.getLogger(__name__)
@@ -86,7 +87,7 @@ class ZhipuVideoGenerator(VideoGeneratorBase):
             if kwargs.get("with_audio"):
                 payload["with_audio"] = kwargs["with_audio"]
             
-            async with httpx.AsyncClient(timeout=60.0) as client:
+            async with async_http_client(timeout=60.0) as client:
                 # 提交任务
                 response = await client.post(
                     f"{self.base_url}/videos/generations",
@@ -128,7 +129,7 @@ class ZhipuVideoGenerator(VideoGeneratorBase):
             "Authorization": f"Bearer {self.api_key}",
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
+        async with async_http_client(timeout=30.0) as client:
             response = await client.get(
                 f"{self.base_url}/async-result/{task_id}",
                 headers=headers
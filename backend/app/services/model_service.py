@@ -8,12 +8,21 @@ from datetime import datetime
 
 from app.models import OAuthAccount, AIModel, Creation
 from app.schemas.ai_model import ModelInfo, AvailableModelsResponse
+from app.utils.cache import Cache
+from app.utils.cache_decorator import cached
 
 
 class ModelService:
     """统一模型管理服务"""
     
     @staticmethod
+    @cached(
+        key="user:{user_id}:available_models:{scene_type}",
+        ttl=60,
+        tags=["user:{user_id}", "user:{user_id}:available_models", "available_models:system"],
+        stale_ttl=30,
+        model=AvailableModelsResponse,
+    )
     def get_available_models(
         db: Session,
         user_id: int,
@@ -22,6 +31,8 @@ class ModelService:
         """
         获取用户可用的所有模型（OAuth + API Key）
         
+        结果按用户和场景缓存，OAuth 账号或 AI 模型变更时通过 invalidate_available_models 清除
+        
         Args:
             db: 数据库会话
             user_id: 用户ID
@@ -60,6 +71,24 @@ class ModelService:
             total=len(models)
         )
     
+    @staticmethod
+    def invalidate_available_models(user_id: int, system_builtin: bool = False) -> int:
+        """
+        清除用户的可用模型缓存
+        
+        系统内置模型出现在每个用户的列表中，变更时需清除所有用户的缓存
+        
+        Args:
+            user_id: 用户ID
+            system_builtin: 变更涉及系统内置模型（新增、编辑、删除，或内置标记被修改）
+        
+        Returns:
+            清除的缓存数量
+        """
+        if system_builtin:
+            return Cache.invalidate_tags("available_models:system")
+        return Cache.invalidate_tags(f"user:{user_id}:available_models")
+    
     @staticmethod
     def _get_oauth_models(db: Session, user_id: int) -> List[ModelInfo]:
         """获取OAuth账号模型"""
@@ -10,6 +10,7 @@ from loguru import logger
 from app.models.oauth_account import OAuthAccount
 from app.models.oauth_usage_log import OAuthUsageLog
 from app.models.platform_config import PlatformConfig
+from app.services.model_service import ModelService
 from app.services.oauth.encryption import encrypt_credentials, decrypt_credentials
 from app.services.oauth.playwright_service import playwright_service
 from app.services.oauth.adapters import (
@@ -122,6 +123,7 @@ class OAuthService:
             db.commit()
             db.refresh(existing_account)
             logger.info(f"Updated OAuth account {existing_account.id}")
+            ModelService.invalidate_available_models(user_id)
             return existing_account
         
         # 创建新账号
@@ -148,6 +150,7 @@ class OAuthService:
         db.refresh(account)
         
         logger.info(f"Created OAuth account {account.id}")
+        ModelService.invalidate_available_models(user_id)
         return account
     
     def create_or_update_account_with_credentials(
@@ -201,6 +204,7 @@ class OAuthService:
             db.commit()
             db.refresh(existing_account)
             logger.info(f"Updated OAuth account {existing_account.id}")
+            ModelService.invalidate_available_models(user_id)
             return existing_account
 
         quota_limit = adapter.get_quota_limit()
@@ -221,6 +225,7 @@ class OAuthService:
         db.refresh(account)
 
         logger.info(f"Created OAuth account {account.id}")
+        ModelService.invalidate_available_models(user_id)
         return account
 
     def get_user_accounts(
@@ -341,6 +346,7 @@ class OAuthService:
         db.refresh(account)
         
         logger.info(f"Updated OAuth account {account_id}")
+        ModelService.invalidate_available_models(user_id)
         return account
     
     def delete_account(
@@ -369,6 +375,7 @@ class OAuthService:
         db.commit()
         
         logger.info(f"Deleted OAuth account {account_id}")
+        ModelService.invalidate_available_models(user_id)
         return True
     
     def log_usage(
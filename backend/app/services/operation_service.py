@@ -18,7 +18,9 @@ from app.models.credit import CreditTransaction, TransactionType, PaymentStatus,
 from app.schemas.operation import (
     ActivityCreate, ActivityUpdate, CouponCreate, CouponUpdate
 )
+from app.core.database import atomic
 from app.core.exceptions import BusinessException
+from app.services.credit_service import CreditService
 
 
 class ActivityService:
@@ -111,44 +113,33 @@ class ActivityService:
         reward_amount = None
         reward_data = None
         
-        if activity.activity_type == ActivityType.CREDIT_GIFT:
-            # 积分赠送
-            reward_type = "credits"
-            reward_amount = activity.rules.get("credits", 0) if activity.rules else 0
+        with atomic(db):
+            if activity.activity_type == ActivityType.CREDIT_GIFT:
+                # 积分赠送
+                reward_type = "credits"
+                reward_amount = activity.rules.get("credits", 0) if activity.rules else 0
+                
+                # 增加用户积分并记录积分交易
+                CreditService.add_credits(
+                    db, user_id, reward_amount, TransactionType.REWARD,
+                    f"参与活动：{activity.title}", related_id=activity_id, related_type="activity"
+                )
             
-            # 增加用户积分
-            user = db.query(User).filter(User.id == user_id).first()
-            user.credits += reward_amount
-            
-            # 记录积分交易
-            transaction = CreditTransaction(
+            # 创建参与记录
+            participation = ActivityParticipation(
+                activity_id=activity_id,
                 user_id=user_id,
-                transaction_type=TransactionType.REWARD,
-                amount=reward_amount,
-                balance_before=user.credits - reward_amount,
-                balance_after=user.credits,
-                description=f"参与活动：{activity.title}",
-                related_id=activity_id,
-                related_type="activity"
+                reward_type=reward_type,
+                reward_amount=reward_amount,
+                reward_data=reward_data
             )
-            db.add(transaction)
-        
-        # 创建参与记录
-        participation = ActivityParticipation(
-            activity_id=activity_id,
-            user_id=user_id,
-            reward_type=reward_type,
-            reward_amount=reward_amount,
-            reward_data=reward_data
-        )
-        db.add(participation)
-        
-        # 更新活动参与人数和成本
-        activity.current_participants += 1
-        if reward_amount:
-            activity.cost += Decimal(str(reward_amount * 0.01))  # 假设1积分=0.01元
+            db.add(participation)
+            
+            # 更新活动参与人数和成本
+            activity.current_participants += 1
+            if reward_amount:
+                activity.cost += Decimal(str(reward_amount * 0.01))  # 假设1积分=0.01元
         
-        db.commit()
         db.refresh(participation)
         
         return participation
@@ -355,29 +346,18 @@ class ReferralService:
         if record.status != ReferralStatus.PENDING:
             raise BusinessException("推荐记录状态异常")
         
-        # 发放返利
-        referrer = db.query(User).filter(User.id == record.referrer_id).first()
-        referrer.credits += int(reward_amount * 100)  # 转换为积分
-        
-        # 记录积分交易
-        transaction = CreditTransaction(
-            user_id=record.referrer_id,
-            transaction_type=TransactionType.REFERRAL,
-            amount=int(reward_amount * 100),
-            balance_before=referrer.credits - int(reward_amount * 100),
-            balance_after=referrer.credits,
-            description=f"推荐返利",
-            related_id=record_id,
-            related_type="referral"
-        )
-        db.add(transaction)
-        
-        # 更新推荐记录
-        record.status = ReferralStatus.SETTLED
-        record.reward_amount = reward_amount
-        record.completed_at = datetime.now()
+        with atomic(db):
+            # 发放返利并记录积分交易
+            CreditService.add_credits(
+                db, record.referrer_id, int(reward_amount * 100),  # 转换为积分
+                TransactionType.REFERRAL, "推荐返利", related_id=record_id, related_type="referral"
+            )
+            
+            # 更新推荐记录
+            record.status = ReferralStatus.SETTLED
+            record.reward_amount = reward_amount
+            record.completed_at = datetime.now()
         
-        db.commit()
         db.refresh(record)
         
         return record
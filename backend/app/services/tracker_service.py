@@ -2,12 +2,15 @@
 埋点数据 Redis 缓存服务
 将埋点数据先存入 Redis，再定时批量写入 MySQL
 """
+import asyncio
 import json
+import time
 import redis
 from typing import Dict, List, Optional
 from datetime import datetime
 
 from app.core.config import settings
+from app.core.redis_client import get_async_redis
 
 
 class TrackerService:
@@ -281,5 +284,120 @@ class TrackerService:
             return None
 
 
+class AsyncTrackerService:
+    """
+    埋点数据缓存服务（异步版本）
+
+    供 async def 接口使用，基于共享的 redis.asyncio 连接池，不阻塞事件循环。
+    Redis 出错后在 UNAVAILABLE_COOLDOWN 秒内直接走降级逻辑，避免每次请求都等待连接超时。
+    """
+
+    PAGE_VIEW_KEY = TrackerService.PAGE_VIEW_KEY
+    USER_EVENT_KEY = TrackerService.USER_EVENT_KEY
+    PAGE_VIEW_UPDATE_KEY = TrackerService.PAGE_VIEW_UPDATE_KEY
+    UNAVAILABLE_COOLDOWN = 30
+
+    def __init__(self, fallback: TrackerService):
+        self._fallback = fallback
+        self._unavailable_until = 0.0
+
+    def _available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    def _mark_unavailable(self):
+        self._unavailable_until = time.monotonic() + self.UNAVAILABLE_COOLDOWN
+
+    async def cache_page_view(self, data: Dict) -> Optional[str]:
+        """缓存页面访问记录，参数同 TrackerService.cache_page_view"""
+        if not self._available():
+            return await asyncio.to_thread(self._fallback._fallback_db_store, data)
+
+        try:
+            record_id = data.get("id") or f"pv_{int(datetime.utcnow().timestamp())}_{hash(data['session_id'])}"
+            data["id"] = record_id
+
+            pipeline = get_async_redis().pipeline(transaction=False)
+            pipeline.lpush(self.PAGE_VIEW_KEY, json.dumps(data, ensure_ascii=False))
+            pipeline.ltrim(self.PAGE_VIEW_KEY, 0, 99999)
+            await pipeline.execute()
+
+            return record_id
+        except Exception as e:
+            print(f"Redis cache failed: {e}")
+            self._mark_unavailable()
+            return await asyncio.to_thread(self._fallback._fallback_db_store, data)
+
+    async def update_page_views(self, updates: List[Dict]) -> int:
+        """
+        批量更新页面访问记录（停留时长、滚动深度）
+
+        Args:
+            updates: [{"page_view_id": str, "stay_duration": int, "max_scroll_depth": int}, ...]
+
+        Returns:
+            成功缓存的更新数量
+        """
+        if not updates or not self._available():
+            return 0
+
+        try:
+            pipeline = get_async_redis().pipeline(transaction=False)
+            for update in updates:
+                update_data = {
+                    "page_view_id": update["page_view_id"],
+                    "stay_duration": update["stay_duration"],
+                    "max_scroll_depth": update["max_scroll_depth"],
+                    "updated_at": datetime.utcnow().isoformat()
+                }
+                pipeline.lpush(self.PAGE_VIEW_UPDATE_KEY, json.dumps(update_data))
+            pipeline.ltrim(self.PAGE_VIEW_UPDATE_KEY, 0, 99999)
+            await pipeline.execute()
+            return len(updates)
+        except Exception as e:
+            print(f"Redis update failed: {e}")
+            self._mark_unavailable()
+            return 0
+
+    async def cache_user_events(self, events: List[Dict]) -> int:
+        """批量缓存用户行为事件，参数同 TrackerService.cache_user_events"""
+        if not events or not self._available():
+            return 0
+
+        try:
+            pipeline = get_async_redis().pipeline(transaction=False)
+            for event in events:
+                event["created_at"] = event.get("created_at") or datetime.utcnow().isoformat()
+                pipeline.lpush(self.USER_EVENT_KEY, json.dumps(event, ensure_ascii=False))
+            pipeline.ltrim(self.USER_EVENT_KEY, 0, 99999)
+            await pipeline.execute()
+            return len(events)
+        except Exception as e:
+            print(f"Redis batch cache failed: {e}")
+            self._mark_unavailable()
+            return 0
+
+    async def get_stats(self) -> Dict:
+        """获取缓存统计信息"""
+        if not self._available():
+            return {"status": "redis_unavailable", "page_views": 0, "events": 0, "updates": 0}
+
+        try:
+            pipeline = get_async_redis().pipeline(transaction=False)
+            pipeline.llen(self.PAGE_VIEW_KEY)
+            pipeline.llen(self.USER_EVENT_KEY)
+            pipeline.llen(self.PAGE_VIEW_UPDATE_KEY)
+            page_views, events, updates = await pipeline.execute()
+            return {
+                "status": "ok",
+                "page_views": page_views,
+                "events": events,
+                "updates": updates
+            }
+        except Exception:
+            self._mark_unavailable()
+            return {"status": "error", "page_views": 0, "events": 0, "updates": 0}
+
+
 # 全局实例
 tracker_service = TrackerService()
+async_tracker_service = AsyncTrackerService(tracker_service)
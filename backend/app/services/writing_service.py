@@ -388,7 +388,8 @@ class WritingService:
         user_input: Dict[str, Any],
         ai_model: AIModel,
         user_id: int = None,
-        creation_id: int = None
+        creation_id: int = None,
+        bypass_cache: bool = False
     ) -> str:
         """生成内容
         
@@ -399,6 +400,7 @@ class WritingService:
             ai_model: AI模型实例
             user_id: 用户ID（用于监控日志）
             creation_id: 关联创作ID（用于监控日志）
+            bypass_cache: 跳过 LLM 响应缓存，强制重新调用模型
         """
         # 获取提示词模板
         if tool_type not in cls.TOOL_PROMPTS:
@@ -430,7 +432,7 @@ class WritingService:
             tool=tool_type,
             creation_id=creation_id
         )
-        response = await service.chat(prompt)
+        response = await service.chat(prompt, bypass_cache=bypass_cache)
         
         return response.content
     
@@ -0,0 +1,121 @@
+"""
+会员过期清扫任务
+定时把已过期会员的 is_member 批量置 0，请求路径只按 member_expired_at 判断会员状态，不再写库
+使用独立线程运行，不依赖 Celery
+"""
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.credit_service import MembershipService
+from app.utils.cache import REDIS_AVAILABLE, Cache, redis_client
+
+logger = logging.getLogger(__name__)
+
+# 多个 worker 都会启动清扫线程，用 Redis 锁保证每个周期只有一个执行
+SWEEP_LOCK_KEY = "lock:membership_expiry_sweep"
+
+
+def sweep_expired_memberships(batch_size: Optional[int] = None) -> List[int]:
+    """
+    执行一次会员过期清扫
+
+    被置为非会员的用户通过 user:{id} 标签广播缓存失效，依赖会员状态的缓存随之淘汰。
+
+    Returns:
+        本次被置为非会员的用户ID列表
+    """
+    db = SessionLocal()
+    try:
+        expired_ids = MembershipService.expire_memberships(
+            db, batch_size=batch_size or settings.MEMBERSHIP_EXPIRY_BATCH_SIZE
+        )
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if expired_ids:
+        Cache.invalidate_tags(*(f"user:{user_id}" for user_id in expired_ids))
+        logger.info(f"会员过期清扫完成，{len(expired_ids)} 个用户会员已过期")
+    return expired_ids
+
+
+class MembershipExpirySweeper:
+    """会员过期清扫后台任务"""
+
+    def __init__(self, interval: int):
+        """
+        Args:
+            interval: 清扫间隔（秒）
+        """
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """启动后台任务"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            daemon=True,
+            name="MembershipExpirySweeper"
+        )
+        self._thread.start()
+
+    def stop(self):
+        """停止后台任务"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _acquire(self) -> bool:
+        """获取本周期的执行权，Redis 不可用时每个 worker 各自执行（更新语句幂等）"""
+        if not REDIS_AVAILABLE:
+            return True
+        try:
+            return bool(redis_client.set(SWEEP_LOCK_KEY, "1", nx=True, ex=max(self.interval - 1, 1)))
+        except Exception as e:
+            logger.warning(f"会员过期清扫获取锁失败: {e}")
+            return True
+
+    def _run(self):
+        # 启动后稍等再执行，避免和应用初始化抢占数据库连接
+        if self._stop_event.wait(10):
+            return
+
+        while not self._stop_event.is_set():
+            if self._acquire():
+                try:
+                    sweep_expired_memberships()
+                except Exception as e:
+                    logger.error(f"会员过期清扫失败: {e}")
+            self._stop_event.wait(self.interval)
+
+
+membership_expiry_sweeper = MembershipExpirySweeper(settings.MEMBERSHIP_EXPIRY_SWEEP_INTERVAL)
+
+
+def start_membership_expiry_sweeper():
+    """启动会员过期清扫（在 FastAPI startup 事件中调用），间隔为 0 时不启动"""
+    if membership_expiry_sweeper.interval > 0:
+        membership_expiry_sweeper.start()
+
+
+def stop_membership_expiry_sweeper():
+    """停止会员过期清扫"""
+    membership_expiry_sweeper.stop()
+
+
+# 独立运行：由 cron 等外部调度时执行一次（此时可将 MEMBERSHIP_EXPIRY_SWEEP_INTERVAL 设为 0）
+if __name__ == "__main__":
+    start = time.perf_counter()
+    ids = sweep_expired_memberships()
+    print(f"会员过期清扫完成: {len(ids)} 个用户，耗时 {time.perf_counter() - start:.2f}s")
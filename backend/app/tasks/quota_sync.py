@@ -0,0 +1,124 @@
+"""
+每日用量同步任务
+把 Redis 中的每日用量计数定期写回 users.used_quota，供后台报表和管理页展示；
+配额检查本身只读写 Redis，不依赖这里的同步结果
+使用独立线程运行，不依赖 Celery
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import update
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.user import User
+from app.utils.quota import daily_quota_counter
+
+logger = logging.getLogger(__name__)
+
+
+def sync_daily_usage(batch_size: Optional[int] = None) -> int:
+    """
+    执行一次用量同步
+
+    先同步前一天（零点前最后一次同步之后的用量），再同步当天，
+    因此 used_quota 保存的是该用户最近一次有用量那天的最终/当前计数。
+    只处理有用量变化的用户（当日待同步集合），每批一条 executemany UPDATE。
+
+    Returns:
+        本次同步的用户数
+    """
+    batch_size = batch_size or settings.QUOTA_SYNC_BATCH_SIZE
+    today = datetime.now().date()
+    synced = 0
+
+    db = SessionLocal()
+    try:
+        for day in (today - timedelta(days=1), today):
+            while True:
+                usage = daily_quota_counter.pop_dirty(day, batch_size)
+                if not usage:
+                    break
+                db.execute(
+                    update(User),
+                    [{"id": user_id, "used_quota": used} for user_id, used in usage.items()],
+                )
+                db.commit()
+                synced += len(usage)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if synced:
+        logger.info(f"每日用量同步完成，{synced} 个用户")
+    return synced
+
+
+class QuotaUsageSyncer:
+    """每日用量同步后台任务"""
+
+    def __init__(self, interval: int):
+        """
+        Args:
+            interval: 同步间隔（秒）
+        """
+        self.interval = interval
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        """启动后台任务"""
+        if self._thread and self._thread.is_alive():
+            return
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            daemon=True,
+            name="QuotaUsageSyncer"
+        )
+        self._thread.start()
+
+    def stop(self):
+        """停止后台任务，退出前再同步一次"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _run(self):
+        # 待同步集合用 SPOP 取出，多个 worker 同时运行也不会重复处理，无需加锁
+        while not self._stop_event.wait(self.interval):
+            try:
+                sync_daily_usage()
+            except Exception as e:
+                logger.error(f"每日用量同步失败: {e}")
+        try:
+            sync_daily_usage()
+        except Exception as e:
+            logger.error(f"每日用量同步失败: {e}")
+
+
+quota_usage_syncer = QuotaUsageSyncer(settings.QUOTA_SYNC_INTERVAL)
+
+
+def start_quota_usage_syncer():
+    """启动每日用量同步（在 FastAPI startup 事件中调用），间隔为 0 时不启动"""
+    if quota_usage_syncer.interval > 0:
+        quota_usage_syncer.start()
+
+
+def stop_quota_usage_syncer():
+    """停止每日用量同步"""
+    quota_usage_syncer.stop()
+
+
+# 独立运行：由 cron 等外部调度时执行一次（此时可将 QUOTA_SYNC_INTERVAL 设为 0）
+if __name__ == "__main__":
+    start = time.perf_counter()
+    count = sync_daily_usage()
+    print(f"每日用量同步完成: {count} 个用户，耗时 {time.perf_counter() - start:.2f}s")
@@ -22,7 +22,10 @@ from app.utils.helpers import (
 )
 from app.utils.cache import (
     Cache,
+    AsyncCache,
     get_user_cache_key,
+    get_user_cache_tag,
+    get_model_cache_tag,
     get_creation_cache_key,
     get_model_cache_key,
     get_platform_cache_key,
@@ -31,6 +34,8 @@ from app.utils.cache import (
     get_cached_user_quota,
     clear_user_cache
 )
+from app.utils.cache_decorator import cached
+from app.utils.rate_limiter import RateLimiter, rate_limit
 
 __all__ = [
     # Deps
@@ -52,7 +57,10 @@ __all__ = [
     "format_duration",
     # Cache
     "Cache",
+    "AsyncCache",
     "get_user_cache_key",
+    "get_user_cache_tag",
+    "get_model_cache_tag",
     "get_creation_cache_key",
     "get_model_cache_key",
     "get_platform_cache_key",
@@ -60,4 +68,8 @@ __all__ = [
     "cache_user_quota",
     "get_cached_user_quota",
     "clear_user_cache",
+    "cached",
+    # Rate limit
+    "RateLimiter",
+    "rate_limit",
 ]
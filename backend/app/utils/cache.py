@@ -1,49 +1,234 @@
 """
 Redis缓存工具
 """
+import fnmatch
 import json
-from typing import Optional, Any
+import logging
+import threading
+import time
+import uuid
+from typing import Optional, Any, Dict, List, Mapping, Union
 from datetime import timedelta
-import redis
 from app.core.config import settings
+from app.core.redis_client import create_sync_redis, get_async_redis
+from app.utils.cache_codec import get_codec
+from app.utils.memory_cache import MemoryCache
+
+logger = logging.getLogger(__name__)
 
 # Create Redis connection safely
 try:
-    # 如果设置了密码，则构建带认证的URL
-    redis_url = settings.REDIS_URL
-    if settings.REDIS_PASSWORD:
-        # 解析现有URL并添加密码
-        from urllib.parse import urlparse, urlunparse
-        parsed = urlparse(redis_url)
-        # 构建带密码的新URL: redis://:password@host:port/db
-        if parsed.port:
-            netloc = f":{settings.REDIS_PASSWORD}@{parsed.hostname}:{parsed.port}"
-        else:
-            netloc = f":{settings.REDIS_PASSWORD}@{parsed.hostname}"
-        redis_url = urlunparse((
-            parsed.scheme,
-            netloc,
-            parsed.path,
-            parsed.params,
-            parsed.query,
-            parsed.fragment
-        ))
-    
-    redis_client = redis.from_url(
-        redis_url,
-        encoding="utf-8",
-        decode_responses=True
-    )
+    redis_client = create_sync_redis()
     # Test connection
     redis_client.ping()
     REDIS_AVAILABLE = True
 except Exception as e:
-    print(f"Redis connection failed: {e}. Using memory cache.")
+    logger.warning(f"Redis connection failed: {e}. Using memory cache.")
     REDIS_AVAILABLE = False
     redis_client = None
 
-# Memory cache for fallback
-_memory_cache = {}
+# Memory cache for fallback（带过期时间和容量上限）
+_memory_cache = MemoryCache(
+    max_entries=settings.MEMORY_CACHE_MAX_ENTRIES,
+    max_bytes=settings.MEMORY_CACHE_MAX_BYTES,
+    sweep_interval=settings.MEMORY_CACHE_SWEEP_INTERVAL,
+    name="fallback",
+)
+
+# L1 本地缓存（两级缓存模式下位于 Redis 之前，每个 worker 一份）
+_l1_cache = MemoryCache(
+    max_entries=settings.CACHE_L1_MAX_ENTRIES,
+    max_bytes=settings.CACHE_L1_MAX_BYTES,
+    sweep_interval=settings.MEMORY_CACHE_SWEEP_INTERVAL,
+    name="l1",
+)
+
+# 当前 worker 标识，用于忽略自己发出的失效消息
+_NODE_ID = uuid.uuid4().hex
+
+
+class CacheStats:
+    """各级缓存命中统计"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {"l1_hits": 0, "l1_misses": 0, "l2_hits": 0, "l2_misses": 0}
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            for name in self._counters:
+                self._counters[name] = 0
+
+
+_stats = CacheStats()
+
+
+def _l1_enabled(key: str) -> bool:
+    """判断键是否走 L1 本地缓存"""
+    if not (settings.CACHE_L1_ENABLED and REDIS_AVAILABLE and redis_client):
+        return False
+    return any(fnmatch.fnmatchcase(key, p) for p in settings.CACHE_L1_PATTERNS)
+
+
+class CacheInvalidationListener:
+    """
+    L1 失效消息监听器
+
+    订阅 Redis pub/sub 频道，收到其他 worker 的 delete/clear_pattern/set 消息后
+    淘汰本地 L1 中对应的键。连接中断期间可能错过消息，因此重连时清空整个 L1。
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._running = False
+
+    def ensure_started(self) -> None:
+        """首次使用 L1 时启动监听线程"""
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._running = True
+            self._thread = threading.Thread(
+                target=self._run,
+                daemon=True,
+                name="CacheInvalidationListener",
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._running = False
+
+    def _run(self) -> None:
+        while self._running:
+            pubsub = None
+            try:
+                pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # 订阅建立前的消息可能已丢失
+                _l1_cache.clear()
+                while self._running:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        self.handle_message(message.get("data"))
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener error: {e}")
+                _l1_cache.clear()
+                time.sleep(1)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+    @staticmethod
+    def handle_message(data: Any) -> None:
+        """处理一条失效消息"""
+        try:
+            payload = json.loads(data)
+        except (TypeError, ValueError):
+            return
+        if payload.get("node") == _NODE_ID:
+            return
+        for key in payload.get("keys") or []:
+            _l1_cache.delete(key)
+        pattern = payload.get("pattern")
+        if pattern:
+            _l1_cache.clear_pattern(pattern)
+
+
+_invalidation_listener = CacheInvalidationListener(settings.CACHE_INVALIDATION_CHANNEL)
+
+
+def _publish_invalidation(keys: Optional[List[str]] = None, pattern: Optional[str] = None) -> None:
+    """淘汰本地 L1 并广播失效消息给其他 worker"""
+    for key in keys or []:
+        _l1_cache.delete(key)
+    if pattern:
+        _l1_cache.clear_pattern(pattern)
+    try:
+        redis_client.publish(
+            settings.CACHE_INVALIDATION_CHANNEL,
+            json.dumps({"node": _NODE_ID, "keys": keys or [], "pattern": pattern})
+        )
+    except Exception as e:
+        logger.error(f"Cache invalidation publish error: {e}")
+
+
+# 释放锁脚本：仅当值等于令牌时删除
+_RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+# 标签登记脚本：SADD 后仅在新 TTL 更长时延长标签集合的过期时间
+_TAG_ADD_SCRIPT = """
+redis.call('sadd', KEYS[1], ARGV[1])
+local ttl = tonumber(ARGV[2])
+if redis.call('ttl', KEYS[1]) < ttl then
+    redis.call('expire', KEYS[1], ttl)
+end
+return 1
+"""
+
+# 标签失效脚本：删除所有标签集合中的成员及集合本身，返回被删除的键
+_TAG_INVALIDATE_SCRIPT = """
+local deleted = {}
+for _, tag_key in ipairs(KEYS) do
+    local members = redis.call('smembers', tag_key)
+    for i = 1, #members, 500 do
+        local chunk = {}
+        for j = i, math.min(i + 499, #members) do
+            chunk[#chunk + 1] = members[j]
+        end
+        redis.call('del', unpack(chunk))
+        for _, member in ipairs(chunk) do
+            deleted[#deleted + 1] = member
+        end
+    end
+    redis.call('del', tag_key)
+end
+return deleted
+"""
+
+# SCAN 每批扫描/删除的键数量
+_SCAN_BATCH_SIZE = 500
+
+# 批量操作每批的键数量，避免单条 MGET / pipeline 过大
+_BULK_BATCH_SIZE = 500
+
+
+def _chunks(items: List[str], size: int = _BULK_BATCH_SIZE):
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _expire_for(key: str, expire: Union[int, Mapping[str, int]], default: int = 3600) -> int:
+    """从统一过期时间或按键过期时间字典中取出键的过期时间"""
+    if isinstance(expire, Mapping):
+        return expire.get(key, default)
+    return expire
+
+
+def get_tag_key(tag: str) -> str:
+    """获取标签集合在 Redis 中的键"""
+    return f"tag:{tag}"
+
 
 class Cache:
     """Cache Management Class"""
@@ -53,39 +238,69 @@ class Cache:
         """Get cache"""
         try:
             if REDIS_AVAILABLE and redis_client:
-                value = redis_client.get(key)
+                use_l1 = _l1_enabled(key)
+                if use_l1:
+                    _invalidation_listener.ensure_started()
+                    value = _l1_cache.get(key)
+                    if value is not None:
+                        _stats.incr("l1_hits")
+                        return get_codec().decode(value)
+                    _stats.incr("l1_misses")
+
+                value = redis_client.execute_command("GET", key, NEVER_DECODE=True)
                 if value:
-                    return json.loads(value)
+                    _stats.incr("l2_hits")
+                    if use_l1:
+                        _l1_cache.set(key, value, expire=settings.CACHE_L1_TTL)
+                    return get_codec().decode(value)
+                _stats.incr("l2_misses")
                 return None
             else:
                 # Fallback to memory cache
-                data = _memory_cache.get(key)
-                if data:
-                    # Check expiration (simplified for memory cache)
-                    # In a real implementation, we should store (value, expire_time)
-                    return data
+                value = _memory_cache.get(key)
+                if value:
+                    return get_codec().decode(value)
                 return None
         except Exception as e:
-            print(f"Cache get error: {e}")
+            logger.error(f"Cache get error: {e}")
             return None
     
     @staticmethod
-    def set(key: str, value: Any, expire: int = 3600) -> bool:
-        """Set cache"""
+    def set(key: str, value: Any, expire: int = 3600, tags: Optional[List[str]] = None) -> bool:
+        """
+        Set cache
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            expire: 过期时间（秒）
+            tags: 标签列表（如 "user:1"），之后可通过 invalidate_tags 精确删除
+        """
         try:
             if REDIS_AVAILABLE and redis_client:
-                redis_client.setex(
-                    key,
-                    expire,
-                    json.dumps(value, ensure_ascii=False)
-                )
+                serialized = get_codec().encode(value)
+                if tags:
+                    pipeline = redis_client.pipeline(transaction=False)
+                    pipeline.setex(key, expire, serialized)
+                    for tag in tags:
+                        pipeline.eval(_TAG_ADD_SCRIPT, 1, get_tag_key(tag), key, expire)
+                    pipeline.execute()
+                else:
+                    redis_client.setex(key, expire, serialized)
+                if _l1_enabled(key):
+                    _publish_invalidation(keys=[key])
+                    _l1_cache.set(key, serialized, expire=min(expire, settings.CACHE_L1_TTL))
                 return True
             else:
                 # Fallback to memory cache
-                _memory_cache[key] = value
-                return True
+                return _memory_cache.set(
+                    key,
+                    get_codec().encode(value),
+                    expire=expire,
+                    tags=tags
+                )
         except Exception as e:
-            print(f"Cache set error: {e}")
+            logger.error(f"Cache set error: {e}")
             return False
     
     @staticmethod
@@ -94,13 +309,14 @@ class Cache:
         try:
             if REDIS_AVAILABLE and redis_client:
                 redis_client.delete(key)
+                if _l1_enabled(key):
+                    _publish_invalidation(keys=[key])
                 return True
             else:
-                if key in _memory_cache:
-                    del _memory_cache[key]
+                _memory_cache.delete(key)
                 return True
         except Exception as e:
-            print(f"Cache delete error: {e}")
+            logger.error(f"Cache delete error: {e}")
             return False
     
     @staticmethod
@@ -110,31 +326,170 @@ class Cache:
             if REDIS_AVAILABLE and redis_client:
                 return redis_client.exists(key) > 0
             else:
-                return key in _memory_cache
+                return _memory_cache.exists(key)
+        except Exception as e:
+            logger.error(f"Cache exists error: {e}")
+            return False
+
+    @staticmethod
+    def get_many(keys: List[str]) -> Dict[str, Any]:
+        """
+        批量获取缓存（MGET，每 500 个键一次往返）
+
+        Returns:
+            Dict[str, Any]: 命中的键值，未命中的键不出现在结果中
+        """
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        try:
+            if REDIS_AVAILABLE and redis_client:
+                result = {}
+                remote = []
+                for key in keys:
+                    if _l1_enabled(key):
+                        _invalidation_listener.ensure_started()
+                        value = _l1_cache.get(key)
+                        if value is not None:
+                            _stats.incr("l1_hits")
+                            result[key] = get_codec().decode(value)
+                            continue
+                        _stats.incr("l1_misses")
+                    remote.append(key)
+
+                for chunk in _chunks(remote):
+                    for key, value in zip(chunk, redis_client.execute_command("MGET", *chunk, NEVER_DECODE=True)):
+                        if value:
+                            _stats.incr("l2_hits")
+                            if _l1_enabled(key):
+                                _l1_cache.set(key, value, expire=settings.CACHE_L1_TTL)
+                            result[key] = get_codec().decode(value)
+                        else:
+                            _stats.incr("l2_misses")
+                return result
+            else:
+                values = _memory_cache.get_many(keys)
+                return {k: get_codec().decode(v) for k, v in values.items() if v}
+        except Exception as e:
+            logger.error(f"Cache get many error: {e}")
+            return {}
+
+    @staticmethod
+    def set_many(
+        mapping: Mapping[str, Any],
+        expire: Union[int, Mapping[str, int]] = 3600,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """
+        批量设置缓存（pipeline SETEX，每 500 个键一次往返）
+
+        Args:
+            mapping: 键值对
+            expire: 统一的过期时间（秒），或 {key: 过期时间} 按键指定（未指定的键为 3600）
+            tags: 所有键共同登记的标签
+        """
+        if not mapping:
+            return True
+        try:
+            serialized = {k: get_codec().encode(v) for k, v in mapping.items()}
+            if REDIS_AVAILABLE and redis_client:
+                for chunk in _chunks(list(serialized)):
+                    pipeline = redis_client.pipeline(transaction=False)
+                    for key in chunk:
+                        ttl = _expire_for(key, expire)
+                        pipeline.setex(key, ttl, serialized[key])
+                        for tag in tags or []:
+                            pipeline.eval(_TAG_ADD_SCRIPT, 1, get_tag_key(tag), key, ttl)
+                    pipeline.execute()
+                l1_keys = [k for k in serialized if _l1_enabled(k)]
+                if l1_keys:
+                    _publish_invalidation(keys=l1_keys)
+                    for key in l1_keys:
+                        _l1_cache.set(key, serialized[key], expire=min(_expire_for(key, expire), settings.CACHE_L1_TTL))
+                return True
+            else:
+                return _memory_cache.set_many(
+                    serialized,
+                    expire={k: _expire_for(k, expire) for k in serialized},
+                    tags=tags
+                )
         except Exception as e:
-            print(f"Cache exists error: {e}")
+            logger.error(f"Cache set many error: {e}")
             return False
+
+    @staticmethod
+    def delete_many(keys: List[str]) -> int:
+        """批量删除缓存，返回实际删除的键数量"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+        try:
+            if REDIS_AVAILABLE and redis_client:
+                deleted = 0
+                for chunk in _chunks(keys):
+                    deleted += redis_client.unlink(*chunk)
+                l1_keys = [k for k in keys if _l1_enabled(k)]
+                if l1_keys:
+                    _publish_invalidation(keys=l1_keys)
+                return deleted
+            else:
+                return _memory_cache.delete_many(keys)
+        except Exception as e:
+            logger.error(f"Cache delete many error: {e}")
+            return 0
             
+    @staticmethod
+    def invalidate_tags(*tags: str) -> int:
+        """
+        按标签删除缓存
+
+        只删除写入时登记到这些标签下的键，复杂度与标签成员数成正比，不扫描整个键空间。
+
+        Returns:
+            int: 被清除的标签成员数量
+        """
+        if not tags:
+            return 0
+        try:
+            if REDIS_AVAILABLE and redis_client:
+                tag_keys = [get_tag_key(tag) for tag in tags]
+                deleted = redis_client.eval(_TAG_INVALIDATE_SCRIPT, len(tag_keys), *tag_keys) or []
+                l1_keys = [k for k in deleted if _l1_enabled(k)]
+                if l1_keys:
+                    _publish_invalidation(keys=l1_keys)
+                return len(deleted)
+            else:
+                return len(_memory_cache.invalidate_tags(*tags))
+        except Exception as e:
+            logger.error(f"Cache invalidate tags error: {e}")
+            return 0
+
     @staticmethod
     def clear_pattern(pattern: str) -> int:
-        """Clear cache by pattern"""
+        """
+        Clear cache by pattern
+
+        使用 SCAN 增量遍历并分批 UNLINK，不会像 KEYS 一样长时间阻塞 Redis。
+        新代码请优先使用 tags + invalidate_tags，本方法仅用于兼容旧的按模式清理。
+        """
         try:
             if REDIS_AVAILABLE and redis_client:
-                keys = redis_client.keys(pattern)
-                if keys:
-                    return redis_client.delete(*keys)
-                return 0
-            else:
-                # Simple pattern matching for memory cache (supports * at end)
-                count = 0
-                prefix = pattern.rstrip('*')
-                keys_to_delete = [k for k in _memory_cache.keys() if k.startswith(prefix)]
-                for k in keys_to_delete:
-                    del _memory_cache[k]
-                    count += 1
-                return count
-        except Exception as e:
-            print(f"Cache clear pattern error: {e}")
+                deleted = 0
+                batch = []
+                for key in redis_client.scan_iter(match=pattern, count=_SCAN_BATCH_SIZE):
+                    batch.append(key)
+                    if len(batch) >= _SCAN_BATCH_SIZE:
+                        deleted += redis_client.unlink(*batch)
+                        batch = []
+                if batch:
+                    deleted += redis_client.unlink(*batch)
+                if settings.CACHE_L1_ENABLED:
+                    _publish_invalidation(pattern=pattern)
+                return deleted
+            else:
+                return _memory_cache.clear_pattern(pattern)
+        except Exception as e:
+            logger.error(f"Cache clear pattern error: {e}")
             return 0
             
     @staticmethod
@@ -142,15 +497,14 @@ class Cache:
         """Increment value"""
         try:
             if REDIS_AVAILABLE and redis_client:
-                return redis_client.incrby(key, amount)
+                result = redis_client.incrby(key, amount)
+                if _l1_enabled(key):
+                    _publish_invalidation(keys=[key])
+                return result
             else:
-                val = _memory_cache.get(key, 0)
-                if isinstance(val, int):
-                    _memory_cache[key] = val + amount
-                    return _memory_cache[key]
-                return 0
+                return _memory_cache.incr(key, amount)
         except Exception as e:
-            print(f"Cache increment error: {e}")
+            logger.error(f"Cache increment error: {e}")
             return 0
     
     @staticmethod
@@ -159,11 +513,379 @@ class Cache:
         减少计数
         """
         try:
-            return redis_client.decrby(key, amount)
+            if REDIS_AVAILABLE and redis_client:
+                result = redis_client.decrby(key, amount)
+                if _l1_enabled(key):
+                    _publish_invalidation(keys=[key])
+                return result
+            else:
+                return _memory_cache.incr(key, -amount)
+        except Exception as e:
+            logger.error(f"Cache decrement error: {e}")
+            return 0
+
+    @staticmethod
+    def acquire_lock(name: str, timeout: int = 10) -> Optional[str]:
+        """
+        获取分布式锁（SET NX PX）
+
+        Args:
+            name: 锁名称
+            timeout: 锁自动过期时间（秒），防止持有者崩溃后死锁
+
+        Returns:
+            Optional[str]: 成功返回锁令牌（释放时需要），失败返回 None
+        """
+        token = uuid.uuid4().hex
+        lock_key = f"lock:{name}"
+        try:
+            if REDIS_AVAILABLE and redis_client:
+                acquired = redis_client.set(lock_key, token, nx=True, px=int(timeout * 1000))
+            else:
+                acquired = _memory_cache.add(lock_key, token, expire=timeout)
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Cache acquire lock error: {e}")
+            return None
+
+    @staticmethod
+    def release_lock(name: str, token: str) -> bool:
+        """释放分布式锁（仅当令牌匹配时删除，避免误删他人的锁）"""
+        lock_key = f"lock:{name}"
+        try:
+            if REDIS_AVAILABLE and redis_client:
+                return bool(redis_client.eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token))
+            else:
+                return _memory_cache.delete_if_equals(lock_key, token)
+        except Exception as e:
+            logger.error(f"Cache release lock error: {e}")
+            return False
+
+    @staticmethod
+    def stats() -> dict:
+        """
+        获取缓存统计
+
+        Returns:
+            dict: L1（本地）与 L2（Redis）的命中/未命中次数，以及内存存储状态
+        """
+        counters = _stats.snapshot()
+        return {
+            "backend": "redis" if REDIS_AVAILABLE and redis_client else "memory",
+            "l1": {
+                "enabled": bool(settings.CACHE_L1_ENABLED),
+                "hits": counters["l1_hits"],
+                "misses": counters["l1_misses"],
+                **_l1_cache.stats(),
+            },
+            "l2": {
+                "hits": counters["l2_hits"],
+                "misses": counters["l2_misses"],
+            },
+            "memory": _memory_cache.stats(),
+        }
+
+
+async def _publish_invalidation_async(keys: Optional[List[str]] = None, pattern: Optional[str] = None) -> None:
+    """_publish_invalidation 的异步版本"""
+    for key in keys or []:
+        _l1_cache.delete(key)
+    if pattern:
+        _l1_cache.clear_pattern(pattern)
+    try:
+        await get_async_redis().publish(
+            settings.CACHE_INVALIDATION_CHANNEL,
+            json.dumps({"node": _NODE_ID, "keys": keys or [], "pattern": pattern})
+        )
+    except Exception as e:
+        logger.error(f"Cache invalidation publish error: {e}")
+
+
+class AsyncCache:
+    """
+    异步缓存管理类
+
+    与 Cache 接口一致，基于 redis.asyncio，供 async def 接口 await 使用，不阻塞事件循环。
+    L1 本地缓存与内存降级存储和 Cache 共享。
+    """
+
+    @staticmethod
+    async def get(key: str) -> Optional[Any]:
+        """Get cache"""
+        try:
+            if REDIS_AVAILABLE:
+                use_l1 = _l1_enabled(key)
+                if use_l1:
+                    _invalidation_listener.ensure_started()
+                    value = _l1_cache.get(key)
+                    if value is not None:
+                        _stats.incr("l1_hits")
+                        return get_codec().decode(value)
+                    _stats.incr("l1_misses")
+
+                value = await get_async_redis().execute_command("GET", key, NEVER_DECODE=True)
+                if value:
+                    _stats.incr("l2_hits")
+                    if use_l1:
+                        _l1_cache.set(key, value, expire=settings.CACHE_L1_TTL)
+                    return get_codec().decode(value)
+                _stats.incr("l2_misses")
+                return None
+            else:
+                value = _memory_cache.get(key)
+                if value:
+                    return get_codec().decode(value)
+                return None
+        except Exception as e:
+            logger.error(f"Async cache get error: {e}")
+            return None
+
+    @staticmethod
+    async def set(key: str, value: Any, expire: int = 3600, tags: Optional[List[str]] = None) -> bool:
+        """Set cache，参数同 Cache.set"""
+        try:
+            serialized = get_codec().encode(value)
+            if REDIS_AVAILABLE:
+                client = get_async_redis()
+                if tags:
+                    pipeline = client.pipeline(transaction=False)
+                    pipeline.setex(key, expire, serialized)
+                    for tag in tags:
+                        pipeline.eval(_TAG_ADD_SCRIPT, 1, get_tag_key(tag), key, expire)
+                    await pipeline.execute()
+                else:
+                    await client.setex(key, expire, serialized)
+                if _l1_enabled(key):
+                    await _publish_invalidation_async(keys=[key])
+                    _l1_cache.set(key, serialized, expire=min(expire, settings.CACHE_L1_TTL))
+                return True
+            else:
+                return _memory_cache.set(key, serialized, expire=expire, tags=tags)
+        except Exception as e:
+            logger.error(f"Async cache set error: {e}")
+            return False
+
+    @staticmethod
+    async def delete(key: str) -> bool:
+        """Delete cache"""
+        try:
+            if REDIS_AVAILABLE:
+                await get_async_redis().delete(key)
+                if _l1_enabled(key):
+                    await _publish_invalidation_async(keys=[key])
+                return True
+            else:
+                _memory_cache.delete(key)
+                return True
+        except Exception as e:
+            logger.error(f"Async cache delete error: {e}")
+            return False
+
+    @staticmethod
+    async def exists(key: str) -> bool:
+        """Check if cache exists"""
+        try:
+            if REDIS_AVAILABLE:
+                return await get_async_redis().exists(key) > 0
+            else:
+                return _memory_cache.exists(key)
+        except Exception as e:
+            logger.error(f"Async cache exists error: {e}")
+            return False
+
+    @staticmethod
+    async def get_many(keys: List[str]) -> Dict[str, Any]:
+        """批量获取缓存，参数同 Cache.get_many"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return {}
+        try:
+            if REDIS_AVAILABLE:
+                result = {}
+                remote = []
+                for key in keys:
+                    if _l1_enabled(key):
+                        _invalidation_listener.ensure_started()
+                        value = _l1_cache.get(key)
+                        if value is not None:
+                            _stats.incr("l1_hits")
+                            result[key] = get_codec().decode(value)
+                            continue
+                        _stats.incr("l1_misses")
+                    remote.append(key)
+
+                client = get_async_redis()
+                for chunk in _chunks(remote):
+                    for key, value in zip(chunk, await client.execute_command("MGET", *chunk, NEVER_DECODE=True)):
+                        if value:
+                            _stats.incr("l2_hits")
+                            if _l1_enabled(key):
+                                _l1_cache.set(key, value, expire=settings.CACHE_L1_TTL)
+                            result[key] = get_codec().decode(value)
+                        else:
+                            _stats.incr("l2_misses")
+                return result
+            else:
+                values = _memory_cache.get_many(keys)
+                return {k: get_codec().decode(v) for k, v in values.items() if v}
+        except Exception as e:
+            logger.error(f"Async cache get many error: {e}")
+            return {}
+
+    @staticmethod
+    async def set_many(
+        mapping: Mapping[str, Any],
+        expire: Union[int, Mapping[str, int]] = 3600,
+        tags: Optional[List[str]] = None
+    ) -> bool:
+        """批量设置缓存，参数同 Cache.set_many"""
+        if not mapping:
+            return True
+        try:
+            serialized = {k: get_codec().encode(v) for k, v in mapping.items()}
+            if REDIS_AVAILABLE:
+                client = get_async_redis()
+                for chunk in _chunks(list(serialized)):
+                    pipeline = client.pipeline(transaction=False)
+                    for key in chunk:
+                        ttl = _expire_for(key, expire)
+                        pipeline.setex(key, ttl, serialized[key])
+                        for tag in tags or []:
+                            pipeline.eval(_TAG_ADD_SCRIPT, 1, get_tag_key(tag), key, ttl)
+                    await pipeline.execute()
+                l1_keys = [k for k in serialized if _l1_enabled(k)]
+                if l1_keys:
+                    await _publish_invalidation_async(keys=l1_keys)
+                    for key in l1_keys:
+                        _l1_cache.set(key, serialized[key], expire=min(_expire_for(key, expire), settings.CACHE_L1_TTL))
+                return True
+            else:
+                return _memory_cache.set_many(
+                    serialized,
+                    expire={k: _expire_for(k, expire) for k in serialized},
+                    tags=tags
+                )
+        except Exception as e:
+            logger.error(f"Async cache set many error: {e}")
+            return False
+
+    @staticmethod
+    async def delete_many(keys: List[str]) -> int:
+        """批量删除缓存，返回实际删除的键数量"""
+        keys = list(dict.fromkeys(keys))
+        if not keys:
+            return 0
+        try:
+            if REDIS_AVAILABLE:
+                client = get_async_redis()
+                deleted = 0
+                for chunk in _chunks(keys):
+                    deleted += await client.unlink(*chunk)
+                l1_keys = [k for k in keys if _l1_enabled(k)]
+                if l1_keys:
+                    await _publish_invalidation_async(keys=l1_keys)
+                return deleted
+            else:
+                return _memory_cache.delete_many(keys)
+        except Exception as e:
+            logger.error(f"Async cache delete many error: {e}")
+            return 0
+
+    @staticmethod
+    async def invalidate_tags(*tags: str) -> int:
+        """按标签删除缓存，参数同 Cache.invalidate_tags"""
+        if not tags:
+            return 0
+        try:
+            if REDIS_AVAILABLE:
+                tag_keys = [get_tag_key(tag) for tag in tags]
+                deleted = await get_async_redis().eval(
+                    _TAG_INVALIDATE_SCRIPT, len(tag_keys), *tag_keys
+                ) or []
+                l1_keys = [k for k in deleted if _l1_enabled(k)]
+                if l1_keys:
+                    await _publish_invalidation_async(keys=l1_keys)
+                return len(deleted)
+            else:
+                return len(_memory_cache.invalidate_tags(*tags))
+        except Exception as e:
+            logger.error(f"Async cache invalidate tags error: {e}")
+            return 0
+
+    @staticmethod
+    async def clear_pattern(pattern: str) -> int:
+        """Clear cache by pattern（SCAN + 分批 UNLINK，同 Cache.clear_pattern）"""
+        try:
+            if REDIS_AVAILABLE:
+                client = get_async_redis()
+                deleted = 0
+                batch = []
+                async for key in client.scan_iter(match=pattern, count=_SCAN_BATCH_SIZE):
+                    batch.append(key)
+                    if len(batch) >= _SCAN_BATCH_SIZE:
+                        deleted += await client.unlink(*batch)
+                        batch = []
+                if batch:
+                    deleted += await client.unlink(*batch)
+                if settings.CACHE_L1_ENABLED:
+                    await _publish_invalidation_async(pattern=pattern)
+                return deleted
+            else:
+                return _memory_cache.clear_pattern(pattern)
         except Exception as e:
-            print(f"Cache decrement error: {e}")
+            logger.error(f"Async cache clear pattern error: {e}")
             return 0
 
+    @staticmethod
+    async def increment(key: str, amount: int = 1) -> int:
+        """Increment value"""
+        try:
+            if REDIS_AVAILABLE:
+                result = await get_async_redis().incrby(key, amount)
+                if _l1_enabled(key):
+                    await _publish_invalidation_async(keys=[key])
+                return result
+            else:
+                return _memory_cache.incr(key, amount)
+        except Exception as e:
+            logger.error(f"Async cache increment error: {e}")
+            return 0
+
+    @staticmethod
+    async def decrement(key: str, amount: int = 1) -> int:
+        """
+        减少计数
+        """
+        return await AsyncCache.increment(key, -amount)
+
+    @staticmethod
+    async def acquire_lock(name: str, timeout: int = 10) -> Optional[str]:
+        """获取分布式锁，参数同 Cache.acquire_lock"""
+        token = uuid.uuid4().hex
+        lock_key = f"lock:{name}"
+        try:
+            if REDIS_AVAILABLE:
+                acquired = await get_async_redis().set(lock_key, token, nx=True, px=int(timeout * 1000))
+            else:
+                acquired = _memory_cache.add(lock_key, token, expire=timeout)
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Async cache acquire lock error: {e}")
+            return None
+
+    @staticmethod
+    async def release_lock(name: str, token: str) -> bool:
+        """释放分布式锁，参数同 Cache.release_lock"""
+        lock_key = f"lock:{name}"
+        try:
+            if REDIS_AVAILABLE:
+                return bool(await get_async_redis().eval(_RELEASE_LOCK_SCRIPT, 1, lock_key, token))
+            else:
+                return _memory_cache.delete_if_equals(lock_key, token)
+        except Exception as e:
+            logger.error(f"Async cache release lock error: {e}")
+            return False
+
 
 def get_user_cache_key(user_id: int, suffix: str = "") -> str:
     """
@@ -174,6 +896,20 @@ def get_user_cache_key(user_id: int, suffix: str = "") -> str:
     return f"user:{user_id}"
 
 
+def get_user_cache_tag(user_id: int) -> str:
+    """
+    获取用户缓存标签（用户相关的缓存写入时登记该标签，clear_user_cache 按标签清除）
+    """
+    return f"user:{user_id}"
+
+
+def get_model_cache_tag(model_id: int) -> str:
+    """
+    获取AI模型缓存标签
+    """
+    return f"model:{model_id}"
+
+
 def get_creation_cache_key(creation_id: int) -> str:
     """
     获取创作内容缓存键
@@ -204,26 +940,14 @@ def get_rate_limit_key(user_id: int, action: str) -> str:
 
 def check_rate_limit(user_id: int, action: str, max_requests: int = 10, window: int = 60) -> bool:
     """
-    检查频率限制
+    检查频率限制（滑动窗口，原子操作）
     max_requests: 时间窗口内最大请求数
     window: 时间窗口（秒）
     """
-    key = get_rate_limit_key(user_id, action)
-    
-    try:
-        current = redis_client.get(key)
-        if current is None:
-            redis_client.setex(key, window, 1)
-            return True
-        
-        if int(current) >= max_requests:
-            return False
-        
-        redis_client.incr(key)
-        return True
-    except Exception as e:
-        print(f"Rate limit check error: {e}")
-        return True  # 出错时允许请求
+    from app.utils.rate_limiter import RateLimiter
+
+    limiter = RateLimiter(max_requests, window, prefix="rate_limit")
+    return limiter.hit(f"{user_id}:{action}").allowed
 
 
 def cache_user_quota(user_id: int, used_quota: int, daily_quota: int) -> bool:
@@ -235,7 +959,7 @@ def cache_user_quota(user_id: int, used_quota: int, daily_quota: int) -> bool:
         "used_quota": used_quota,
         "daily_quota": daily_quota
     }
-    return Cache.set(key, data, expire=3600)
+    return Cache.set(key, data, expire=3600, tags=[get_user_cache_tag(user_id)])
 
 
 def get_cached_user_quota(user_id: int) -> Optional[dict]:
@@ -249,6 +973,11 @@ def get_cached_user_quota(user_id: int) -> Optional[dict]:
 def clear_user_cache(user_id: int) -> int:
     """
     清除用户相关的所有缓存
+
+    按用户标签精确删除；写入时未登记标签的旧键由 clear_pattern（SCAN）兜底，
+    可在所有写入方迁移到标签后去掉。
     """
-    pattern = f"user:{user_id}:*"
-    return Cache.clear_pattern(pattern)
+    count = Cache.invalidate_tags(get_user_cache_tag(user_id))
+    if settings.CACHE_LEGACY_PATTERN_CLEAR:
+        count += Cache.clear_pattern(f"user:{user_id}:*")
+    return count
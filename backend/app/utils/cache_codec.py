@@ -0,0 +1,280 @@
+"""
+缓存值编解码
+Cache 写入前将值编码为 bytes，读取时解码，序列化格式和压缩算法可配置
+
+存储格式：
+    \\x00 + 序列化格式标识(1字节) + 压缩算法标识(1字节) + 数据
+旧版本写入的值是不带头部的 JSON 文本，首字节不可能是 \\x00，读取时按 JSON 解析，
+因此切换格式期间新旧数据可以同时读取。整数不加头部，保证 INCR/DECR 仍可作用于缓存值。
+
+类型还原：json/orjson 格式为了与旧数据及其他 worker 保持兼容，不携带类型信息，
+datetime/date/time 读出为 ISO 字符串，bytes 为 base64 字符串，Decimal 为字符串，set/tuple 为列表。
+需要原样还原时，缓存 pydantic 模型（cached(model=...) 读取时重新校验为原类型），
+或使用 msgpack 格式（bytes/datetime/date/Decimal 可还原）。
+"""
+import base64
+import json
+import logging
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Any, Dict, Optional, Union
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+HEADER_MARK = b"\x00"
+HEADER_SIZE = 3
+
+
+def _json_default(obj: Any) -> Any:
+    """JSON 不支持的类型：时间转 ISO 字符串，Decimal 转字符串，bytes 转 base64，集合转列表（读取时不还原）"""
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return base64.b64encode(obj).decode("ascii")
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+# ===== 序列化 =====
+
+class Serializer:
+    """序列化器基类"""
+    name = ""
+    tag = b""
+
+    def dumps(self, value: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+
+class JsonSerializer(Serializer):
+    """标准库 json，与旧版本写入的格式一致（datetime/bytes 等读出为字符串）"""
+    name = "json"
+    tag = b"j"
+
+    def dumps(self, value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, default=_json_default).encode("utf-8")
+
+    def loads(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class OrjsonSerializer(Serializer):
+    """orjson：比标准库快数倍，原生序列化 datetime/date（读出为 ISO 字符串，不还原类型）"""
+    name = "orjson"
+    tag = b"o"
+
+    def __init__(self):
+        import orjson
+        self._orjson = orjson
+        self._options = orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, value: Any) -> bytes:
+        return self._orjson.dumps(value, default=_json_default, option=self._options)
+
+    def loads(self, data: bytes) -> Any:
+        return self._orjson.loads(data)
+
+
+# msgpack 扩展类型编号
+_EXT_DATETIME = 1
+_EXT_DATE = 2
+_EXT_DECIMAL = 3
+
+
+class MsgpackSerializer(Serializer):
+    """msgpack：二进制格式，体积更小，bytes/datetime/Decimal 可以原样还原"""
+    name = "msgpack"
+    tag = b"m"
+
+    def __init__(self):
+        import msgpack
+        self._msgpack = msgpack
+
+    def _default(self, obj: Any) -> Any:
+        if isinstance(obj, datetime):
+            return self._msgpack.ExtType(_EXT_DATETIME, obj.isoformat().encode("ascii"))
+        if isinstance(obj, date):
+            return self._msgpack.ExtType(_EXT_DATE, obj.isoformat().encode("ascii"))
+        if isinstance(obj, Decimal):
+            return self._msgpack.ExtType(_EXT_DECIMAL, str(obj).encode("ascii"))
+        return _json_default(obj)
+
+    @staticmethod
+    def _ext_hook(code: int, data: bytes) -> Any:
+        if code == _EXT_DATETIME:
+            return datetime.fromisoformat(data.decode("ascii"))
+        if code == _EXT_DATE:
+            return date.fromisoformat(data.decode("ascii"))
+        if code == _EXT_DECIMAL:
+            return Decimal(data.decode("ascii"))
+        raise ValueError(f"Unknown msgpack ext type: {code}")
+
+    def dumps(self, value: Any) -> bytes:
+        return self._msgpack.packb(value, default=self._default, use_bin_type=True)
+
+    def loads(self, data: bytes) -> Any:
+        return self._msgpack.unpackb(data, ext_hook=self._ext_hook, raw=False, strict_map_key=False)
+
+
+# ===== 压缩 =====
+
+class Compressor:
+    """压缩器基类（不压缩）"""
+    name = "none"
+    tag = b"-"
+
+    def compress(self, data: bytes) -> bytes:
+        return data
+
+    def decompress(self, data: bytes) -> bytes:
+        return data
+
+
+class ZlibCompressor(Compressor):
+    name = "zlib"
+    tag = b"z"
+
+    def __init__(self, level: int = 6):
+        self.level = level
+
+    def compress(self, data: bytes) -> bytes:
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data: bytes) -> bytes:
+        return zlib.decompress(data)
+
+
+class Lz4Compressor(Compressor):
+    """lz4：压缩率低于 zlib，但压缩/解压快一个数量级"""
+    name = "lz4"
+    tag = b"4"
+
+    def __init__(self):
+        import lz4.frame
+        self._lz4 = lz4.frame
+
+    def compress(self, data: bytes) -> bytes:
+        return self._lz4.compress(data)
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._lz4.decompress(data)
+
+
+_SERIALIZERS = {cls.name: cls for cls in (JsonSerializer, OrjsonSerializer, MsgpackSerializer)}
+_COMPRESSORS = {cls.name: cls for cls in (Compressor, ZlibCompressor, Lz4Compressor)}
+
+# 解码时按头部标识查找，已实例化的放在这里复用
+_serializers_by_tag: Dict[bytes, Serializer] = {}
+_compressors_by_tag: Dict[bytes, Compressor] = {}
+
+
+def _load_serializer(name: str) -> Serializer:
+    try:
+        serializer = _SERIALIZERS[name]()
+    except KeyError:
+        raise ValueError(f"未知的缓存序列化格式: {name}")
+    except ImportError:
+        logger.warning(f"{name} not installed, cache serializer falls back to json")
+        serializer = JsonSerializer()
+    _serializers_by_tag.setdefault(serializer.tag, serializer)
+    return serializer
+
+
+def _load_compressor(name: str) -> Compressor:
+    try:
+        compressor = _COMPRESSORS[name]()
+    except KeyError:
+        raise ValueError(f"未知的缓存压缩算法: {name}")
+    except ImportError:
+        logger.warning(f"{name} not installed, cache compression falls back to zlib")
+        compressor = ZlibCompressor()
+    _compressors_by_tag.setdefault(compressor.tag, compressor)
+    return compressor
+
+
+def _serializer_for_tag(tag: bytes) -> Serializer:
+    serializer = _serializers_by_tag.get(tag)
+    if serializer is None:
+        for name, cls in _SERIALIZERS.items():
+            if cls.tag == tag:
+                return _load_serializer(name)
+        raise ValueError(f"Unknown cache serializer tag: {tag!r}")
+    return serializer
+
+
+def _compressor_for_tag(tag: bytes) -> Compressor:
+    compressor = _compressors_by_tag.get(tag)
+    if compressor is None:
+        for name, cls in _COMPRESSORS.items():
+            if cls.tag == tag:
+                return _load_compressor(name)
+        raise ValueError(f"Unknown cache compression tag: {tag!r}")
+    return compressor
+
+
+class CacheCodec:
+    """
+    缓存编解码器
+
+    Args:
+        serializer: json / orjson / msgpack，或 legacy（不带头部的 JSON 文本，用于滚动升级期间兼容旧 worker）
+        compression: none / zlib / lz4
+        compress_threshold: 序列化结果超过该字节数才压缩，且压缩后更小才使用压缩结果
+    """
+
+    def __init__(self, serializer: str = "orjson", compression: str = "zlib", compress_threshold: int = 4096):
+        self.legacy = serializer == "legacy"
+        self.serializer = _load_serializer("json" if self.legacy else serializer)
+        self.compressor = _load_compressor(compression)
+        self.compress_threshold = compress_threshold
+
+    def encode(self, value: Any) -> bytes:
+        """编码缓存值"""
+        if type(value) is int:
+            return str(value).encode("ascii")
+        data = self.serializer.dumps(value)
+        if self.legacy:
+            return data
+
+        compressor = Compressor
+        if self.compressor.tag != Compressor.tag and len(data) > self.compress_threshold:
+            compressed = self.compressor.compress(data)
+            if len(compressed) < len(data):
+                data, compressor = compressed, self.compressor
+        return HEADER_MARK + self.serializer.tag + compressor.tag + data
+
+    def decode(self, data: Union[bytes, str, None]) -> Optional[Any]:
+        """解码缓存值，兼容旧版本写入的 JSON 文本"""
+        if data is None:
+            return None
+        if isinstance(data, str):
+            return json.loads(data)
+        if not data.startswith(HEADER_MARK):
+            return json.loads(data)
+        serializer = _serializer_for_tag(data[1:2])
+        compressor = _compressor_for_tag(data[2:3])
+        return serializer.loads(compressor.decompress(data[HEADER_SIZE:]))
+
+
+_codec: Optional[CacheCodec] = None
+
+
+def get_codec() -> CacheCodec:
+    """获取按配置创建的全局编解码器"""
+    global _codec
+    if _codec is None:
+        _codec = CacheCodec(
+            serializer=settings.CACHE_SERIALIZER,
+            compression=settings.CACHE_COMPRESSION,
+            compress_threshold=settings.CACHE_COMPRESS_THRESHOLD,
+        )
+    return _codec
@@ -0,0 +1,288 @@
+"""
+缓存装饰器
+为同步/异步函数提供带防击穿（single-flight）和过期后台刷新（stale-while-revalidate）的缓存
+"""
+import asyncio
+import functools
+import inspect
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from app.utils.cache import Cache, AsyncCache
+
+logger = logging.getLogger(__name__)
+
+# 异步函数等待其他 worker 计算结果时的轮询间隔（秒）
+_POLL_INTERVAL = 0.05
+
+
+def _build_key(key: Union[str, Callable[..., str]], signature: inspect.Signature, args, kwargs) -> str:
+    """根据模板或函数生成缓存键，模板中的 {name} 使用被装饰函数的实参填充"""
+    if callable(key):
+        return key(*args, **kwargs)
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    return key.format(**bound.arguments)
+
+
+def _build_tags(tags: Optional[List[str]], signature: inspect.Signature, args, kwargs) -> Optional[List[str]]:
+    """按与键相同的规则格式化标签模板"""
+    if not tags:
+        return None
+    return [_build_key(tag, signature, args, kwargs) for tag in tags]
+
+
+def _dump_model(value: Any) -> Any:
+    """将 pydantic 模型（或模型列表）转换为可 JSON 序列化的数据"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (list, tuple)):
+        return [_dump_model(item) for item in value]
+    return value
+
+
+class _SingleFlight:
+    """同一进程内相同键只允许一个线程计算，其余线程等待其结果"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+
+class _AsyncSingleFlight:
+    """_SingleFlight 的协程版本，按事件循环隔离"""
+
+    def __init__(self):
+        self._calls: Dict[Tuple[int, str], asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        loop = asyncio.get_running_loop()
+        call_key = (id(loop), key)
+        future = self._calls.get(call_key)
+        if future is not None:
+            return await asyncio.shield(future)
+
+        future = loop.create_future()
+        self._calls[call_key] = future
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # 没有等待者时避免 "exception was never retrieved" 警告
+            future.exception()
+            raise
+        finally:
+            self._calls.pop(call_key, None)
+
+
+def cached(
+    key: Union[str, Callable[..., str]],
+    ttl: int = 300,
+    tags: Optional[List[str]] = None,
+    stale_ttl: int = 0,
+    lock_timeout: int = 10,
+    model: Optional[Type[BaseModel]] = None,
+    serializer: Optional[Callable[[Any], Any]] = None,
+    deserializer: Optional[Callable[[Any], Any]] = None,
+):
+    """
+    缓存装饰器，同时支持同步函数和异步函数
+
+    - 防击穿：缓存未命中时，进程内通过 Future 合并并发请求，跨 worker 通过 Redis 锁
+      保证只有一个调用者执行原函数；抢到锁后会再读一次缓存，已被其他 worker 写入时不再重复计算。
+      异步函数在锁被占用时等待对方写入的结果；同步函数不轮询等待（可能被 async 接口直接调用，
+      sleep 会阻塞整个事件循环），有旧值时返回旧值，否则直接计算
+    - stale-while-revalidate：stale_ttl > 0 时，数据过期后的 stale_ttl 秒内仍可返回旧值，
+      由抢到锁的那个请求负责重新计算（在调用线程内执行，不会在请求结束后使用已关闭的数据库会话）
+
+    Args:
+        key: 缓存键模板（如 "model:available:{user_id}"，按函数实参格式化）或生成键的函数
+        ttl: 数据新鲜期（秒）
+        tags: 标签模板列表（如 "user:{user_id}"），写入时登记，可通过 Cache.invalidate_tags 批量失效
+        stale_ttl: 过期后仍可返回旧值的时长（秒），0 表示不启用
+        lock_timeout: 计算锁的超时时间（秒），也是异步函数等待其他 worker 结果的最长时间
+        model: 返回值的 pydantic 模型类型，自动处理模型（及模型列表）的序列化和反序列化
+        serializer: 自定义序列化函数，将返回值转换为可 JSON 序列化的数据
+        deserializer: 自定义反序列化函数，将缓存数据还原为返回值
+
+    被装饰的函数会附带 invalidate(*args, **kwargs) 方法，用于删除对应参数的缓存。
+
+    Example:
+        @staticmethod
+        @cached(key="credit:prices", ttl=600, model=CreditPriceResponse)
+        def get_credit_prices(db: Session) -> List[CreditPriceResponse]:
+            ...
+    """
+    if model is not None:
+        serializer = serializer or _dump_model
+        deserializer = deserializer or (
+            lambda data: [model.model_validate(item) for item in data]
+            if isinstance(data, list) else model.model_validate(data)
+        )
+    serializer = serializer or _dump_model
+    deserializer = deserializer or (lambda data: data)
+
+    def _fresh(entry: Any) -> bool:
+        return isinstance(entry, dict) and entry.get("t", 0) > time.time()
+
+    def _usable(entry: Any) -> bool:
+        return isinstance(entry, dict) and "v" in entry
+
+    def _envelope(value: Any) -> dict:
+        return {"v": serializer(value), "t": time.time() + ttl}
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        if asyncio.iscoroutinefunction(func):
+            single_flight = _AsyncSingleFlight()
+
+            async def _compute_and_store(cache_key: str, args, kwargs) -> Any:
+                value = await func(*args, **kwargs)
+                await AsyncCache.set(
+                    cache_key,
+                    _envelope(value),
+                    expire=ttl + stale_ttl,
+                    tags=_build_tags(tags, signature, args, kwargs),
+                )
+                return value
+
+            async def _load(cache_key: str, args, kwargs) -> Any:
+                token = await AsyncCache.acquire_lock(cache_key, lock_timeout)
+                if token is None:
+                    # 其他 worker 正在计算，等待其结果
+                    deadline = time.monotonic() + lock_timeout
+                    while time.monotonic() < deadline:
+                        await asyncio.sleep(_POLL_INTERVAL)
+                        entry = await AsyncCache.get(cache_key)
+                        if _fresh(entry):
+                            return deserializer(entry["v"])
+                    logger.warning(f"Cached wait timeout, computing locally: {cache_key}")
+                else:
+                    # 抢锁前其他 worker 可能刚写入并释放锁
+                    entry = await AsyncCache.get(cache_key)
+                    if _fresh(entry):
+                        await AsyncCache.release_lock(cache_key, token)
+                        return deserializer(entry["v"])
+                try:
+                    return await _compute_and_store(cache_key, args, kwargs)
+                finally:
+                    if token:
+                        await AsyncCache.release_lock(cache_key, token)
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = _build_key(key, signature, args, kwargs)
+                entry = await AsyncCache.get(cache_key)
+                if _fresh(entry):
+                    return deserializer(entry["v"])
+
+                if stale_ttl > 0 and _usable(entry):
+                    token = await AsyncCache.acquire_lock(cache_key, lock_timeout)
+                    if token is None:
+                        return deserializer(entry["v"])
+                    try:
+                        latest = await AsyncCache.get(cache_key)
+                        if _fresh(latest):
+                            return deserializer(latest["v"])
+                        return await _compute_and_store(cache_key, args, kwargs)
+                    except Exception as e:
+                        logger.error(f"Cached refresh error, serving stale value: {cache_key}: {e}")
+                        return deserializer(entry["v"])
+                    finally:
+                        await AsyncCache.release_lock(cache_key, token)
+
+                return await single_flight.do(cache_key, lambda: _load(cache_key, args, kwargs))
+
+            async def async_invalidate(*args, **kwargs) -> bool:
+                return await AsyncCache.delete(_build_key(key, signature, args, kwargs))
+
+            async_wrapper.invalidate = async_invalidate
+            return async_wrapper
+
+        single_flight = _SingleFlight()
+
+        def _compute_and_store(cache_key: str, args, kwargs) -> Any:
+            value = func(*args, **kwargs)
+            Cache.set(
+                cache_key,
+                _envelope(value),
+                expire=ttl + stale_ttl,
+                tags=_build_tags(tags, signature, args, kwargs),
+            )
+            return value
+
+        def _load(cache_key: str, args, kwargs) -> Any:
+            token = Cache.acquire_lock(cache_key, lock_timeout)
+            # 抢到锁时确认其他 worker 没有刚写入；没抢到时看对方是否已写入或留有旧值
+            entry = Cache.get(cache_key)
+            if _fresh(entry) or (token is None and stale_ttl > 0 and _usable(entry)):
+                if token:
+                    Cache.release_lock(cache_key, token)
+                return deserializer(entry["v"])
+            # 锁被占用且没有可用的值时直接计算，不在调用线程里轮询等待
+            try:
+                return _compute_and_store(cache_key, args, kwargs)
+            finally:
+                if token:
+                    Cache.release_lock(cache_key, token)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            cache_key = _build_key(key, signature, args, kwargs)
+            entry = Cache.get(cache_key)
+            if _fresh(entry):
+                return deserializer(entry["v"])
+
+            if stale_ttl > 0 and _usable(entry):
+                token = Cache.acquire_lock(cache_key, lock_timeout)
+                if token is None:
+                    return deserializer(entry["v"])
+                try:
+                    latest = Cache.get(cache_key)
+                    if _fresh(latest):
+                        return deserializer(latest["v"])
+                    return _compute_and_store(cache_key, args, kwargs)
+                except Exception as e:
+                    logger.error(f"Cached refresh error, serving stale value: {cache_key}: {e}")
+                    return deserializer(entry["v"])
+                finally:
+                    Cache.release_lock(cache_key, token)
+
+            return single_flight.do(cache_key, lambda: _load(cache_key, args, kwargs))
+
+        def invalidate(*args, **kwargs) -> bool:
+            return Cache.delete(_build_key(key, signature, args, kwargs))
+
+        wrapper.invalidate = invalidate
+        return wrapper
+
+    return decorator
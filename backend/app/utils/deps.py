@@ -4,11 +4,14 @@
 from typing import Generator, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from jose import JWTError
 
-from app.core.database import get_db
-from app.core.security import decode_token
+from app.core.database import get_db, get_read_db
+from app.core.database_async import get_async_db
+from app.core.security import decode_token, load_auth_user
 from app.models.user import User, UserStatus
 
 security = HTTPBearer()
@@ -25,19 +28,20 @@ def get_current_user(
     
     try:
         payload = decode_token(token)
-        user_id: int = payload.get("sub")
+        user_id = payload.get("sub")
         if user_id is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="无效的认证凭证"
             )
-    except JWTError:
+        user_id = int(user_id)
+    except (JWTError, TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="无效的认证凭证"
         )
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = load_auth_user(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -53,6 +57,42 @@ def get_current_user(
     return user
 
 
+async def get_current_user_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db)
+) -> User:
+    """
+    获取当前登录用户（异步会话）
+
+    与 get_current_user 校验规则一致，返回的 User 属于异步会话，
+    只能在同样使用 get_async_db 的接口中使用，不要和同步 Session 混用。
+    """
+    payload = decode_token(credentials.credentials)
+    try:
+        user_id = int(payload.get("sub"))
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="无效的认证凭证"
+        )
+
+    result = await db.execute(select(User).where(User.id == user_id))
+    user = result.scalar_one_or_none()
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="用户不存在"
+        )
+
+    if user.status != UserStatus.ACTIVE:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="用户账号已被禁用"
+        )
+
+    return user
+
+
 def get_current_active_user(
     current_user: User = Depends(get_current_user)
 ) -> User:
@@ -81,13 +121,14 @@ def get_current_user_optional(
     
     try:
         payload = decode_token(token)
-        user_id: int = payload.get("sub")
+        user_id = payload.get("sub")
         if user_id is None:
             return None
-    except JWTError:
+        user_id = int(user_id)
+    except (JWTError, TypeError, ValueError):
         return None
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = load_auth_user(db, user_id)
     if user is None:
         return None
     
@@ -119,9 +160,11 @@ def check_quota(
     db: Session = Depends(get_db)
 ) -> User:
     """
-    检查用户配额
+    检查用户配额（只检查不消耗，生成类接口使用 app.utils.quota.daily_quota 计数）
     """
-    if current_user.used_quota >= current_user.daily_quota:
+    from app.utils.quota import daily_quota_counter
+
+    if daily_quota_counter.usage(current_user.id) >= current_user.daily_quota:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="今日配额已用完，请明天再试"
@@ -0,0 +1,354 @@
+"""
+进程内缓存引擎
+Redis 不可用时作为 Cache 的降级存储：支持按键过期、条目数/字节数上限、LRU 淘汰和后台清理
+"""
+import fnmatch
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+
+def _sizeof(value: Any) -> int:
+    """估算缓存值占用的字节数"""
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return sys.getsizeof(value)
+
+
+class MemoryCache:
+    """
+    线程安全的 TTL + LRU 内存缓存
+
+    - 每个键可单独设置过期时间（秒），None 表示永不过期
+    - 超出 max_entries 或 max_bytes 时按最近最少使用顺序淘汰
+    - 读取时惰性删除过期键，后台线程定期批量清理
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 60.0,
+        name: str = "memory",
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.name = name
+
+        # key -> (value, expire_at, size)
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+        # 标签索引：tag -> keys，以及反向索引 key -> tags（键被删除/淘汰时同步清理）
+        self._tags: Dict[str, Set[str]] = {}
+        self._key_tags: Dict[str, Set[str]] = {}
+
+        self._evictions = 0
+        self._expirations = 0
+
+        self._sweeper: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    # ===== 内部方法 =====
+
+    def _is_expired(self, expire_at: Optional[float], now: float) -> bool:
+        return expire_at is not None and expire_at <= now
+
+    def _remove(self, key: str) -> None:
+        """删除键（调用方需持有锁）"""
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+        self._untag(key)
+
+    def _untag(self, key: str) -> None:
+        """从标签索引中移除键（调用方需持有锁）"""
+        for tag in self._key_tags.pop(key, ()):
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tags[tag]
+
+    def _evict(self) -> None:
+        """按 LRU 顺序淘汰，直到满足容量限制（调用方需持有锁）"""
+        while self._data and (
+            len(self._data) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            key, (_, _, size) = self._data.popitem(last=False)
+            self._bytes -= size
+            self._untag(key)
+            self._evictions += 1
+
+    def _get_entry(self, key: str) -> Optional[Tuple[Any, Optional[float], int]]:
+        """获取未过期的条目并刷新 LRU 位置（调用方需持有锁）"""
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if self._is_expired(entry[1], time.monotonic()):
+            self._remove(key)
+            self._expirations += 1
+            return None
+        self._data.move_to_end(key)
+        return entry
+
+    # ===== 基本操作 =====
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取缓存值，不存在或已过期返回 None"""
+        with self._lock:
+            entry = self._get_entry(key)
+            return entry[0] if entry is not None else None
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        expire: Optional[int] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        设置缓存值
+
+        Args:
+            key: 缓存键
+            value: 缓存值
+            expire: 过期时间（秒），None 或 <=0 表示永不过期
+            tags: 标签列表，可通过 invalidate_tags 按标签批量删除
+        """
+        size = _sizeof(value)
+        if size > self.max_bytes:
+            # 单个值超过总预算，不缓存
+            self.delete(key)
+            return False
+
+        expire_at = time.monotonic() + expire if expire and expire > 0 else None
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (value, expire_at, size)
+            self._bytes += size
+            if tags:
+                key_tags = self._key_tags.setdefault(key, set())
+                for tag in tags:
+                    self._tags.setdefault(tag, set()).add(key)
+                    key_tags.add(tag)
+            self._evict()
+        self._ensure_sweeper()
+        return True
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """批量获取，只返回存在且未过期的键"""
+        result = {}
+        with self._lock:
+            for key in keys:
+                entry = self._get_entry(key)
+                if entry is not None:
+                    result[key] = entry[0]
+        return result
+
+    def set_many(
+        self,
+        mapping: Mapping[str, Any],
+        expire: Union[int, Mapping[str, int], None] = None,
+        tags: Optional[Iterable[str]] = None,
+    ) -> bool:
+        """
+        批量设置
+
+        Args:
+            mapping: 键值对
+            expire: 统一的过期时间（秒），或按键指定的过期时间字典
+            tags: 所有键共同登记的标签
+        """
+        tags = list(tags) if tags else None
+        ok = True
+        with self._lock:
+            for key, value in mapping.items():
+                ttl = expire.get(key) if isinstance(expire, Mapping) else expire
+                ok = self.set(key, value, expire=ttl, tags=tags) and ok
+        return ok
+
+    def delete_many(self, keys: Iterable[str]) -> int:
+        """批量删除，返回实际存在的键数量"""
+        with self._lock:
+            return sum(1 for key in keys if self.delete(key))
+
+    def invalidate_tags(self, *tags: str) -> List[str]:
+        """删除标签下的所有键，返回被删除的键"""
+        with self._lock:
+            keys: Set[str] = set()
+            for tag in tags:
+                keys.update(self._tags.get(tag, ()))
+            deleted = [k for k in keys if k in self._data]
+            for k in keys:
+                self._remove(k)
+            return deleted
+
+    def add(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
+        """仅当键不存在时设置（与 Redis SET NX 一致），返回是否设置成功"""
+        with self._lock:
+            if self._get_entry(key) is not None:
+                return False
+            return self.set(key, value, expire=expire)
+
+    def delete_if_equals(self, key: str, value: Any) -> bool:
+        """仅当当前值等于 value 时删除，返回是否删除"""
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is None or entry[0] != value:
+                return False
+            self._remove(key)
+            return True
+
+    def delete(self, key: str) -> bool:
+        """删除缓存，返回键是否存在"""
+        with self._lock:
+            existed = key in self._data
+            self._remove(key)
+            return existed
+
+    def exists(self, key: str) -> bool:
+        """检查键是否存在且未过期"""
+        with self._lock:
+            return self._get_entry(key) is not None
+
+    def ttl(self, key: str) -> int:
+        """
+        获取剩余过期时间（秒）
+
+        Returns:
+            int: -2 表示不存在，-1 表示永不过期
+        """
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is None:
+                return -2
+            if entry[1] is None:
+                return -1
+            return max(0, int(entry[1] - time.monotonic()))
+
+    def incr(self, key: str, amount: int = 1, expire: Optional[int] = None) -> int:
+        """
+        原子增加计数
+
+        与 Redis INCRBY 一致：键不存在时从 0 开始并保留原有过期时间。
+
+        Raises:
+            ValueError: 原值不是整数
+        """
+        with self._lock:
+            entry = self._get_entry(key)
+            if entry is None:
+                current = 0
+                expire_at = time.monotonic() + expire if expire and expire > 0 else None
+            else:
+                current = int(entry[0])
+                expire_at = entry[1]
+            new_value = current + amount
+            stored = str(new_value)
+            # 保留标签索引，只替换值
+            if entry is not None:
+                self._data.pop(key)
+                self._bytes -= entry[2]
+            size = _sizeof(stored)
+            self._data[key] = (stored, expire_at, size)
+            self._bytes += size
+            self._evict()
+        if expire_at is not None:
+            self._ensure_sweeper()
+        return new_value
+
+    def keys(self, pattern: str = "*") -> List[str]:
+        """按 glob 模式列出未过期的键（与 Redis KEYS 语义一致）"""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                k for k, (_, expire_at, _) in self._data.items()
+                if not self._is_expired(expire_at, now) and fnmatch.fnmatchcase(k, pattern)
+            ]
+
+    def clear_pattern(self, pattern: str) -> int:
+        """按 glob 模式删除键，返回删除数量"""
+        with self._lock:
+            matched = [k for k in self._data if fnmatch.fnmatchcase(k, pattern)]
+            for k in matched:
+                self._remove(k)
+            return len(matched)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self._tags.clear()
+            self._key_tags.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    # ===== 过期清理 =====
+
+    def sweep(self) -> int:
+        """清理所有已过期的键，返回清理数量"""
+        now = time.monotonic()
+        with self._lock:
+            expired = [
+                k for k, (_, expire_at, _) in self._data.items()
+                if self._is_expired(expire_at, now)
+            ]
+            for k in expired:
+                self._remove(k)
+            self._expirations += len(expired)
+        return len(expired)
+
+    def _ensure_sweeper(self) -> None:
+        """首次写入时启动后台清理线程"""
+        if self.sweep_interval <= 0 or (self._sweeper and self._sweeper.is_alive()):
+            return
+        with self._lock:
+            if self._sweeper and self._sweeper.is_alive():
+                return
+            self._stop_event.clear()
+            self._sweeper = threading.Thread(
+                target=self._sweep_loop,
+                daemon=True,
+                name=f"MemoryCacheSweeper-{self.name}",
+            )
+            self._sweeper.start()
+
+    def _sweep_loop(self) -> None:
+        while not self._stop_event.wait(self.sweep_interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Memory cache sweep error: {e}")
+
+    def stop(self) -> None:
+        """停止后台清理线程"""
+        self._stop_event.set()
+        if self._sweeper:
+            self._sweeper.join(timeout=5)
+            self._sweeper = None
+
+    # ===== 统计 =====
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
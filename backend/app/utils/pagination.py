@@ -0,0 +1,114 @@
+"""
+游标分页工具
+基于 (created_at, id) 的键集分页：翻页耗时与页码无关，不会像 offset 一样越往后越慢
+
+游标对客户端不透明，内容为上一页最后一条记录的 created_at 和 id。
+列表按 created_at DESC, id DESC 排序，id 作为 created_at 相同时的决胜字段。
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, or_
+
+from app.utils.cache import AsyncCache, Cache
+
+# 总数缓存时间（秒），列表总数允许短时间不精确
+COUNT_CACHE_TTL = 60
+
+
+def encode_cursor(created_at: datetime, id: int) -> str:
+    """根据记录的 created_at 和 id 生成游标"""
+    raw = json.dumps([created_at.isoformat(), id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    解析游标
+
+    Raises:
+        HTTPException: 游标格式不正确
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(id)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="无效的分页游标"
+        )
+
+
+def keyset_filter(model: Any, cursor: str):
+    """生成“位于游标之后”的过滤条件（按 created_at DESC, id DESC）"""
+    created_at, id = decode_cursor(cursor)
+    return or_(
+        model.created_at < created_at,
+        and_(model.created_at == created_at, model.id < id),
+    )
+
+
+def keyset_order_by(model: Any) -> tuple:
+    """键集分页的排序字段"""
+    return model.created_at.desc(), model.id.desc()
+
+
+def split_page(rows: Sequence[Any], limit: int) -> Tuple[List[Any], Optional[str]]:
+    """
+    拆分查询结果
+
+    查询时应多取一条（limit + 1），多出的一条说明还有下一页。
+
+    Returns:
+        (当前页记录, 下一页游标，没有下一页时为 None)
+    """
+    items = list(rows[:limit])
+    if len(rows) > limit and items:
+        last = items[-1]
+        return items, encode_cursor(last.created_at, last.id)
+    return items, None
+
+
+def _count_key(name: str, **filters) -> str:
+    digest = hashlib.md5(
+        json.dumps(filters, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return f"count:{name}:{digest}"
+
+
+def cached_count(name: str, count_fn: Callable[[], int], ttl: int = COUNT_CACHE_TTL, **filters) -> int:
+    """
+    缓存列表总数
+
+    Args:
+        name: 列表名称
+        count_fn: 实际计数的函数
+        ttl: 缓存时间（秒）
+        filters: 影响总数的筛选条件，参与缓存键计算
+    """
+    key = _count_key(name, **filters)
+    total = Cache.get(key)
+    if total is None:
+        total = count_fn()
+        Cache.set(key, total, expire=ttl)
+    return total
+
+
+async def async_cached_count(
+    name: str,
+    count_fn: Callable[[], Awaitable[int]],
+    ttl: int = COUNT_CACHE_TTL,
+    **filters
+) -> int:
+    """cached_count 的异步版本"""
+    key = _count_key(name, **filters)
+    total = await AsyncCache.get(key)
+    if total is None:
+        total = await count_fn()
+        await AsyncCache.set(key, total, expire=ttl)
+    return total
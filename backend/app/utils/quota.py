@@ -0,0 +1,271 @@
+"""
+每日配额
+按用户、按天在 Redis 中计数（quota:{user_id}:{YYYYMMDD}），键在次日零点后自然过期，
+不需要每天零点批量重置数据库；用量由后台任务异步同步到 users.used_quota 供报表使用。
+Redis 不可用时降级为进程内计数
+
+- DailyQuota: hit()/ahit() 消耗配额并返回 QuotaResult，refund()/arefund() 退还，usage() 查询当日用量
+- daily_quota(): FastAPI 依赖，生成类接口按用户的 daily_quota 限额，请求失败时退还
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.redis_client import get_async_redis
+from app.core.security import load_auth_user
+from app.utils import cache as _cache
+from app.utils.memory_cache import MemoryCache
+from app.utils.rate_limiter import get_rate_limit_identity
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1] 计数键 KEYS[2] 当日待同步用户集合
+# ARGV: cost, limit, 过期时间戳, user_id
+_QUOTA_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local used = redis.call('INCRBY', KEYS[1], cost)
+if used == cost then
+    redis.call('EXPIREAT', KEYS[1], ARGV[3])
+end
+if used > limit then
+    redis.call('DECRBY', KEYS[1], cost)
+    return {0, used - cost}
+end
+redis.call('SADD', KEYS[2], ARGV[4])
+redis.call('EXPIREAT', KEYS[2], ARGV[3])
+return {1, used}
+"""
+
+# KEYS[1] 计数键 KEYS[2] 当日待同步用户集合
+# ARGV: cost, 过期时间戳, user_id
+# 计数不减到 0 以下；键已过期（跨天）时不做处理
+_REFUND_SCRIPT = """
+local used = tonumber(redis.call('GET', KEYS[1]) or '0')
+if used <= 0 then
+    return 0
+end
+local refund = math.min(used, tonumber(ARGV[1]))
+redis.call('DECRBY', KEYS[1], refund)
+redis.call('SADD', KEYS[2], ARGV[3])
+redis.call('EXPIREAT', KEYS[2], ARGV[2])
+return used - refund
+"""
+
+
+@dataclass
+class QuotaResult:
+    """配额检查结果"""
+    allowed: bool       # 是否放行
+    limit: int          # 当日配额
+    used: int           # 当日已用（含本次）
+    reset_at: int       # 配额重置时间（次日零点，Unix 时间戳）
+    day: Optional[date] = None  # 计数所属日期，退还时使用
+
+    def headers(self) -> Dict[str, str]:
+        """生成响应头（被拒绝时包含 Retry-After）"""
+        headers = {
+            "X-Quota-Limit": str(self.limit),
+            "X-Quota-Remaining": str(max(0, self.limit - self.used)),
+            "X-Quota-Reset": str(self.reset_at),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, self.reset_at - int(time.time())))
+        return headers
+
+
+def _day_start(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day)
+
+
+def quota_key(user_id: int, day: date) -> str:
+    return f"quota:{user_id}:{day:%Y%m%d}"
+
+
+def dirty_key(day: date) -> str:
+    """当日有用量变化、尚未同步到数据库的用户集合"""
+    return f"quota:dirty:{day:%Y%m%d}"
+
+
+class DailyQuota:
+    """
+    每日配额计数器
+
+    计数和过期在一个 Lua 脚本中完成：超出配额的请求立即回退计数，不占用额度。
+    键保留到次日零点后 QUOTA_KEY_RETENTION_DAYS 天，便于同步任务读取前一天的最终用量。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = MemoryCache(
+            max_entries=settings.MEMORY_CACHE_MAX_ENTRIES,
+            max_bytes=settings.MEMORY_CACHE_MAX_BYTES,
+            sweep_interval=settings.MEMORY_CACHE_SWEEP_INTERVAL,
+            name="daily_quota",
+        )
+
+    @staticmethod
+    def _window(now: Optional[datetime] = None):
+        """返回 (日期, 重置时间戳, 键过期时间戳)"""
+        now = now or datetime.now()
+        reset_at = int((_day_start(now.date()) + timedelta(days=1)).timestamp())
+        return now.date(), reset_at, reset_at + settings.QUOTA_KEY_RETENTION_DAYS * 86400
+
+    def _hit_local(self, user_id: int, limit: int, cost: int, day: date, reset_at: int) -> QuotaResult:
+        """进程内计数（Redis 不可用时），每个 worker 独立计数，仅作降级兜底"""
+        key = quota_key(user_id, day)
+        with self._lock:
+            used = (self._local.get(key) or 0) + cost
+            if used > limit:
+                return QuotaResult(False, limit, used - cost, reset_at, day)
+            self._local.set(key, used, expire=max(reset_at - int(time.time()), 1))
+            return QuotaResult(True, limit, used, reset_at, day)
+
+    def _refund_local(self, user_id: int, cost: int, day: date) -> int:
+        key = quota_key(user_id, day)
+        with self._lock:
+            used = self._local.get(key)
+            if not used:
+                return 0
+            used = max(0, used - cost)
+            _, reset_at, _ = self._window(_day_start(day))
+            self._local.set(key, used, expire=max(reset_at - int(time.time()), 1))
+            return used
+
+    def _refund_args(self, user_id: int, cost: int, day: date):
+        expire_at = self._window(_day_start(day))[2]
+        return (_REFUND_SCRIPT, 2, quota_key(user_id, day), dirty_key(day), cost, expire_at, user_id)
+
+    def hit(self, user_id: int, limit: int, cost: int = 1) -> QuotaResult:
+        """消耗配额（同步）"""
+        day, reset_at, expire_at = self._window()
+        if _cache.REDIS_AVAILABLE and _cache.redis_client:
+            try:
+                allowed, used = _cache.redis_client.eval(
+                    _QUOTA_SCRIPT, 2, quota_key(user_id, day), dirty_key(day),
+                    cost, limit, expire_at, user_id
+                )
+                return QuotaResult(bool(allowed), limit, int(used), reset_at, day)
+            except Exception as e:
+                logger.warning(f"Quota redis error, using local counter: {e}")
+        return self._hit_local(user_id, limit, cost, day, reset_at)
+
+    async def ahit(self, user_id: int, limit: int, cost: int = 1) -> QuotaResult:
+        """消耗配额（异步），供 async 依赖使用"""
+        day, reset_at, expire_at = self._window()
+        if _cache.REDIS_AVAILABLE:
+            try:
+                allowed, used = await get_async_redis().eval(
+                    _QUOTA_SCRIPT, 2, quota_key(user_id, day), dirty_key(day),
+                    cost, limit, expire_at, user_id
+                )
+                return QuotaResult(bool(allowed), limit, int(used), reset_at, day)
+            except Exception as e:
+                logger.warning(f"Quota redis error, using local counter: {e}")
+        return self._hit_local(user_id, limit, cost, day, reset_at)
+
+    def refund(self, user_id: int, cost: int = 1, day: Optional[date] = None) -> int:
+        """退还已消耗的配额（同步），day 为消耗时所属日期（默认当天），返回退还后的用量"""
+        day = day or datetime.now().date()
+        if _cache.REDIS_AVAILABLE and _cache.redis_client:
+            try:
+                return int(_cache.redis_client.eval(*self._refund_args(user_id, cost, day)))
+            except Exception as e:
+                logger.warning(f"Quota redis error, using local counter: {e}")
+        return self._refund_local(user_id, cost, day)
+
+    async def arefund(self, user_id: int, cost: int = 1, day: Optional[date] = None) -> int:
+        """退还已消耗的配额（异步）"""
+        day = day or datetime.now().date()
+        if _cache.REDIS_AVAILABLE:
+            try:
+                return int(await get_async_redis().eval(*self._refund_args(user_id, cost, day)))
+            except Exception as e:
+                logger.warning(f"Quota redis error, using local counter: {e}")
+        return self._refund_local(user_id, cost, day)
+
+    def usage(self, user_id: int, day: Optional[date] = None) -> int:
+        """查询用户某天（默认当天）的用量"""
+        key = quota_key(user_id, day or datetime.now().date())
+        if _cache.REDIS_AVAILABLE and _cache.redis_client:
+            try:
+                return int(_cache.redis_client.get(key) or 0)
+            except Exception as e:
+                logger.warning(f"Quota redis error: {e}")
+        return self._local.get(key) or 0
+
+    def pop_dirty(self, day: date, count: int) -> Dict[int, int]:
+        """
+        取出一批待同步用户及其当日用量（供同步任务使用，仅 Redis 模式）
+
+        SPOP 是原子的，多个 worker 同时同步时不会重复处理同一用户。
+        """
+        if not (_cache.REDIS_AVAILABLE and _cache.redis_client):
+            return {}
+        user_ids: List[bytes] = _cache.redis_client.spop(dirty_key(day), count) or []
+        if not user_ids:
+            return {}
+        values = _cache.redis_client.mget([quota_key(int(user_id), day) for user_id in user_ids])
+        return {int(user_id): int(value or 0) for user_id, value in zip(user_ids, values)}
+
+    def clear_local(self) -> None:
+        with self._lock:
+            self._local.clear()
+
+
+daily_quota_counter = DailyQuota()
+
+
+def daily_quota(cost: int = 1):
+    """
+    创建每日配额依赖
+
+    按用户的 daily_quota 限额，超限时抛出 429（带 Retry-After，为距次日零点的秒数）；
+    放行时在响应头中返回 X-Quota-Limit / X-Quota-Remaining / X-Quota-Reset。
+    用户ID取自 JWT，daily_quota 取自认证用户快照，通常不查询数据库。
+    配额在接口执行前扣除，接口抛出异常（HTTPException、参数校验失败或未处理的错误）时退还。
+
+    Example:
+        @router.post("/generate", dependencies=[Depends(daily_quota())])
+        async def generate(...):
+            ...
+    """
+
+    async def dependency(request: Request, response: Response, db: Session = Depends(get_db)):
+        if not settings.QUOTA_ENABLED:
+            yield
+            return
+        identity = get_rate_limit_identity(request)
+        if not identity.startswith("user:"):
+            yield  # 未登录由接口自身的认证依赖拒绝
+            return
+        # 未命中快照时会查询数据库，放到线程池中执行，不阻塞事件循环
+        user = await run_in_threadpool(load_auth_user, db, int(identity[5:]))
+        if user is None:
+            yield
+            return
+
+        result = await daily_quota_counter.ahit(user.id, user.daily_quota, cost)
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="今日配额已用完，请明天再试",
+                headers=result.headers(),
+            )
+        response.headers.update(result.headers())
+        try:
+            yield
+        except Exception:
+            await daily_quota_counter.arefund(user.id, cost, result.day)
+            raise
+
+    return dependency
@@ -0,0 +1,370 @@
+"""
+限流工具
+基于 Redis Lua 脚本的原子限流（滑动窗口 / 令牌桶），Redis 不可用时降级为进程内限流
+
+- RateLimiter: 限流器，hit()/ahit() 消耗一次配额并返回 RateLimitResult
+- rate_limit(): FastAPI 依赖，按用户（未登录按 IP）+ 路由限流
+- RateLimitMiddleware: 全局中间件，按 RATE_LIMIT_PER_MINUTE 对每个用户/IP 限流
+"""
+import logging
+import math
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from functools import lru_cache
+from ipaddress import IPv4Network, IPv6Network, ip_address, ip_network
+from typing import Callable, Dict, Optional, Tuple, Union
+
+from fastapi import HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from jose import JWTError, jwt
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.config import settings
+from app.core.redis_client import get_async_redis
+from app.utils import cache as _cache
+from app.utils.memory_cache import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+SLIDING_WINDOW = "sliding_window"
+TOKEN_BUCKET = "token_bucket"
+
+# 时间统一取 Redis 服务器时间（毫秒），避免多台机器时钟不一致
+_SLIDING_WINDOW_SCRIPT = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('PEXPIRE', key, window)
+    return {1, limit - count - 1, 0}
+end
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+local retry = window
+if oldest[2] then
+    retry = tonumber(oldest[2]) + window - now
+end
+return {0, 0, retry}
+"""
+
+_TOKEN_BUCKET_SCRIPT = """
+local key = KEYS[1]
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local state = redis.call('HMGET', key, 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry = math.ceil((cost - tokens) / rate)
+end
+redis.call('HSET', key, 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', key, math.ceil(capacity / rate) + 1000)
+return {allowed, math.floor(tokens), retry}
+"""
+
+
+@dataclass
+class RateLimitResult:
+    """限流结果"""
+    allowed: bool                # 是否放行
+    limit: int                   # 窗口内允许的请求数 / 桶容量
+    remaining: int               # 剩余可用次数
+    retry_after: float = 0.0     # 被拒绝时建议的重试等待时间（秒）
+
+    def headers(self) -> Dict[str, str]:
+        """生成响应头（被拒绝时包含 Retry-After）"""
+        headers = {
+            "X-RateLimit-Limit": str(self.limit),
+            "X-RateLimit-Remaining": str(max(0, self.remaining)),
+        }
+        if not self.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class _LocalRateLimitStore:
+    """
+    进程内限流状态（Redis 不可用时使用）
+
+    每个 worker 独立计数，多 worker 部署下整体限额会放大为 worker 数倍，仅作降级兜底。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._store = MemoryCache(
+            max_entries=settings.MEMORY_CACHE_MAX_ENTRIES,
+            max_bytes=settings.MEMORY_CACHE_MAX_BYTES,
+            sweep_interval=settings.MEMORY_CACHE_SWEEP_INTERVAL,
+            name="rate_limit",
+        )
+
+    def sliding_window(self, key: str, limit: int, window_ms: int) -> RateLimitResult:
+        now = time.monotonic() * 1000
+        with self._lock:
+            hits = [ts for ts in (self._store.get(key) or ()) if ts > now - window_ms]
+            if len(hits) < limit:
+                hits.append(now)
+                self._store.set(key, hits, expire=math.ceil(window_ms / 1000))
+                return RateLimitResult(True, limit, limit - len(hits))
+            self._store.set(key, hits, expire=math.ceil(window_ms / 1000))
+            return RateLimitResult(False, limit, 0, (hits[0] + window_ms - now) / 1000)
+
+    def token_bucket(self, key: str, capacity: int, rate_per_ms: float, cost: int) -> RateLimitResult:
+        now = time.monotonic() * 1000
+        with self._lock:
+            tokens, ts = self._store.get(key) or (float(capacity), now)
+            tokens = min(capacity, tokens + max(0.0, now - ts) * rate_per_ms)
+            if tokens >= cost:
+                tokens -= cost
+                result = RateLimitResult(True, capacity, int(tokens))
+            else:
+                result = RateLimitResult(False, capacity, int(tokens), (cost - tokens) / rate_per_ms / 1000)
+            self._store.set(key, (tokens, now), expire=math.ceil(capacity / rate_per_ms / 1000) + 1)
+            return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._store.clear()
+
+
+_local_store = _LocalRateLimitStore()
+
+
+class RateLimiter:
+    """
+    原子限流器
+
+    - sliding_window：window 秒内最多 limit 次请求（ZSET 记录每次请求时间，无固定窗口边界突发）
+    - token_bucket：容量 burst（默认等于 limit），每 window 秒补充 limit 个令牌，允许短时突发
+
+    Example:
+        limiter = RateLimiter(limit=10, window=60)
+        result = limiter.hit(f"user:{user_id}:login")
+        if not result.allowed:
+            ...
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        window: int = 60,
+        algorithm: str = SLIDING_WINDOW,
+        burst: Optional[int] = None,
+        prefix: str = "rate_limit",
+    ):
+        if algorithm not in (SLIDING_WINDOW, TOKEN_BUCKET):
+            raise ValueError(f"不支持的限流算法: {algorithm}")
+        self.limit = limit
+        self.window = window
+        self.algorithm = algorithm
+        self.capacity = burst or limit
+        self.prefix = prefix
+
+    @property
+    def _window_ms(self) -> int:
+        return int(self.window * 1000)
+
+    @property
+    def _rate_per_ms(self) -> float:
+        return self.limit / self._window_ms
+
+    def _key(self, identity: str) -> str:
+        return f"{self.prefix}:{identity}"
+
+    def _script_args(self, cost: int):
+        if self.algorithm == SLIDING_WINDOW:
+            return _SLIDING_WINDOW_SCRIPT, (self.limit, self._window_ms, uuid.uuid4().hex)
+        return _TOKEN_BUCKET_SCRIPT, (self.capacity, self._rate_per_ms, cost)
+
+    def _to_result(self, raw) -> RateLimitResult:
+        allowed, remaining, retry_ms = (int(v) for v in raw)
+        limit = self.limit if self.algorithm == SLIDING_WINDOW else self.capacity
+        return RateLimitResult(bool(allowed), limit, remaining, retry_ms / 1000)
+
+    def _hit_local(self, key: str, cost: int) -> RateLimitResult:
+        if self.algorithm == SLIDING_WINDOW:
+            return _local_store.sliding_window(key, self.limit, self._window_ms)
+        return _local_store.token_bucket(key, self.capacity, self._rate_per_ms, cost)
+
+    def hit(self, identity: str, cost: int = 1) -> RateLimitResult:
+        """消耗一次配额（同步），cost 仅对令牌桶生效"""
+        key = self._key(identity)
+        if _cache.REDIS_AVAILABLE and _cache.redis_client:
+            script, args = self._script_args(cost)
+            try:
+                return self._to_result(_cache.redis_client.eval(script, 1, key, *args))
+            except Exception as e:
+                logger.warning(f"Rate limit redis error, using local limiter: {e}")
+        return self._hit_local(key, cost)
+
+    async def ahit(self, identity: str, cost: int = 1) -> RateLimitResult:
+        """消耗一次配额（异步），供中间件和 async 依赖使用"""
+        key = self._key(identity)
+        if _cache.REDIS_AVAILABLE:
+            script, args = self._script_args(cost)
+            try:
+                return self._to_result(await get_async_redis().eval(script, 1, key, *args))
+            except Exception as e:
+                logger.warning(f"Rate limit redis error, using local limiter: {e}")
+        return self._hit_local(key, cost)
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxies: Tuple[str, ...]) -> Tuple[Union[IPv4Network, IPv6Network], ...]:
+    """解析 TRUSTED_PROXIES，无法解析的条目忽略"""
+    networks = []
+    for proxy in proxies:
+        try:
+            networks.append(ip_network(proxy, strict=False))
+        except ValueError:
+            logger.warning(f"Invalid TRUSTED_PROXIES entry ignored: {proxy}")
+    return tuple(networks)
+
+
+def _is_trusted_proxy(ip: str) -> bool:
+    """判断地址是否属于可信反向代理"""
+    try:
+        address = ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in _trusted_networks(tuple(settings.TRUSTED_PROXIES)))
+
+
+def get_client_ip(request: Request) -> str:
+    """
+    获取客户端 IP
+
+    转发头可以由客户端任意伪造，只有直连地址是 TRUSTED_PROXIES 中的反向代理时才采信：
+    从 X-Forwarded-For 右侧向左跳过可信代理，取第一个不可信的地址（即最外层代理看到的客户端）；
+    没有 X-Forwarded-For 时使用代理设置的 X-Real-IP。
+    """
+    peer = request.client.host if request.client else None
+    if peer is None:
+        return "unknown"
+    if not _is_trusted_proxy(peer):
+        return peer
+
+    forwarded = [ip.strip() for ip in request.headers.get("X-Forwarded-For", "").split(",") if ip.strip()]
+    for ip in reversed(forwarded):
+        if not _is_trusted_proxy(ip):
+            return ip
+    if forwarded:
+        return forwarded[0]
+    return request.headers.get("X-Real-IP", "").strip() or peer
+
+
+def get_rate_limit_identity(request: Request) -> str:
+    """
+    获取限流主体：已登录按用户 ID，未登录按 IP
+
+    只校验 JWT 签名，不查数据库，保证限流本身足够轻量。
+    """
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        try:
+            payload = jwt.decode(
+                authorization[7:], settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
+            )
+            if payload.get("sub"):
+                return f"user:{payload['sub']}"
+        except JWTError:
+            pass
+    return f"ip:{get_client_ip(request)}"
+
+
+def rate_limit(
+    limit: int,
+    window: int = 60,
+    algorithm: str = SLIDING_WINDOW,
+    burst: Optional[int] = None,
+    scope: Optional[str] = None,
+    identity: Callable[[Request], str] = get_rate_limit_identity,
+):
+    """
+    创建路由级限流依赖
+
+    超限时抛出 429，并带 Retry-After 响应头。
+
+    Args:
+        limit: 窗口内允许的请求数
+        window: 窗口长度（秒）
+        algorithm: sliding_window 或 token_bucket
+        burst: 令牌桶容量，默认等于 limit
+        scope: 限流作用域，默认使用路由路径（同一用户在不同路由上分别计数）
+        identity: 从请求中提取限流主体的函数
+
+    Example:
+        @router.post("/login", dependencies=[Depends(rate_limit(10, 60))])
+        def login(...):
+            ...
+    """
+    limiter = RateLimiter(limit, window, algorithm=algorithm, burst=burst, prefix="rate_limit:route")
+
+    async def dependency(request: Request) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        route = request.scope.get("route")
+        route_scope = scope or f"{request.method}:{getattr(route, 'path', request.url.path)}"
+        result = await limiter.ahit(f"{route_scope}:{identity(request)}")
+        if not result.allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="请求过于频繁，请稍后再试",
+                headers=result.headers(),
+            )
+
+    return dependency
+
+
+class RateLimitMiddleware(BaseHTTPMiddleware):
+    """
+    全局限流中间件
+
+    对每个用户（未登录按 IP）在所有接口上合计限流，限额为 RATE_LIMIT_PER_MINUTE 次/分钟，
+    RATE_LIMIT_EXEMPT_PATHS 中的路径前缀不计数。
+    """
+
+    def __init__(self, app, limiter: Optional[RateLimiter] = None):
+        super().__init__(app)
+        self.limiter = limiter or RateLimiter(
+            settings.RATE_LIMIT_PER_MINUTE, 60, prefix="rate_limit:global"
+        )
+
+    async def dispatch(self, request: Request, call_next):
+        if (
+            not settings.RATE_LIMIT_ENABLED
+            or request.method == "OPTIONS"
+            or request.url.path.startswith(tuple(settings.RATE_LIMIT_EXEMPT_PATHS))
+        ):
+            return await call_next(request)
+
+        result = await self.limiter.ahit(get_rate_limit_identity(request))
+        if not result.allowed:
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "code": 429,
+                    "message": "请求过于频繁，请稍后再试",
+                    "data": None
+                },
+                headers=result.headers(),
+            )
+
+        response = await call_next(request)
+        response.headers.update(result.headers())
+        return response
@@ -0,0 +1,128 @@
+"""
+Server-Sent Events 增量解析
+按网络分块逐段解析：只扫描新到达的数据，跨块的半行保留到下一块拼接，
+UTF-8 多字节字符被切开、\\r\\n 被切在两块之间都能正确处理
+
+用法：
+    async for event in aiter_sse(response):   # httpx 流式响应
+        if event.data == "[DONE]":
+            break
+        data = json.loads(event.data)
+"""
+import codecs
+import re
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator, List, Optional, Union
+
+import httpx
+
+_EOL = re.compile(r"\r\n|\r|\n")
+
+
+@dataclass
+class SSEEvent:
+    """一个事件（多行 data 以 \\n 连接）"""
+    data: str
+    event: str = "message"
+    id: Optional[str] = None
+
+
+class SSEDecoder:
+    """增量 SSE 解析器"""
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._pending = ""          # 尚未遇到换行的半行
+        self._trailing_cr = False   # 上一块以 \r 结尾，下一块开头的 \n 属于同一个换行
+        self._data: List[str] = []
+        self._event = ""
+        self._id: Optional[str] = None
+
+    def feed(self, chunk: Union[bytes, str]) -> List[SSEEvent]:
+        """
+        解析一块数据
+
+        Returns:
+            本块数据中结束的事件
+        """
+        text = self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        if self._trailing_cr and text.startswith("\n"):
+            text = text[1:]
+        if not text:
+            return []
+        self._trailing_cr = text.endswith("\r")
+
+        events: List[SSEEvent] = []
+        start = 0
+        for match in _EOL.finditer(text):
+            line = text[start:match.start()]
+            if self._pending:
+                line, self._pending = self._pending + line, ""
+            event = self._process_line(line)
+            if event is not None:
+                events.append(event)
+            start = match.end()
+        if start < len(text):
+            self._pending += text[start:]
+        return events
+
+    def flush(self) -> List[SSEEvent]:
+        """
+        数据结束时调用，返回缓冲中剩余的事件
+
+        部分服务端最后一个事件后没有空行，这里也作为完整事件返回。
+        """
+        events = self.feed(self._decoder.decode(b"", final=True))
+        if self._pending:
+            line, self._pending = self._pending, ""
+            self._process_line(line)
+        event = self._dispatch()
+        if event is not None:
+            events.append(event)
+        return events
+
+    def _process_line(self, line: str) -> Optional[SSEEvent]:
+        if not line:
+            return self._dispatch()
+        if line.startswith(":"):
+            return None  # 注释（心跳）
+
+        field, _, value = line.partition(":")
+        if value.startswith(" "):
+            value = value[1:]
+        if field == "data":
+            self._data.append(value)
+        elif field == "event":
+            self._event = value
+        elif field == "id":
+            self._id = value
+        return None
+
+    def _dispatch(self) -> Optional[SSEEvent]:
+        if not self._data:
+            self._event = ""
+            return None
+        event = SSEEvent(data="\n".join(self._data), event=self._event or "message", id=self._id)
+        self._data = []
+        self._event = ""
+        return event
+
+
+async def aiter_sse(response: httpx.Response) -> AsyncIterator[SSEEvent]:
+    """逐个返回 httpx 异步流式响应中的事件"""
+    decoder = SSEDecoder()
+    async for chunk in response.aiter_bytes():
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
+
+
+def iter_sse(response: httpx.Response) -> Iterator[SSEEvent]:
+    """逐个返回 httpx 同步流式响应中的事件"""
+    decoder = SSEDecoder()
+    for chunk in response.iter_bytes():
+        for event in decoder.feed(chunk):
+            yield event
+    for event in decoder.flush():
+        yield event
@@ -0,0 +1,109 @@
+"""
+数据库迁移脚本：为高频查询添加组合索引
+
+    creations               (user_id, creation_type, status, created_at)
+                            (user_id, created_at)
+    ai_model_usage_logs     (provider, created_at)
+                            (tool, created_at)
+    page_views              (created_at, session_id)
+    credit_transactions     (user_id, created_at)
+
+索引定义以模型的 __table_args__ 为准，脚本只负责在已有数据库上补建；已存在的索引自动跳过，可重复执行。
+MySQL 8 / InnoDB 创建二级索引默认为在线 DDL，不锁表，但大表上仍建议在低峰期执行。
+
+运行方式：
+    cd backend
+    python -m scripts.add_composite_indexes            # 创建索引
+    python -m scripts.add_composite_indexes --dry-run  # 只打印将要执行的操作
+    python -m scripts.add_composite_indexes --drop     # 回滚：删除这些索引
+"""
+import sys
+import argparse
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, inspect
+from app.core.config import settings
+from app.core.database import get_sync_database_url
+from app.models.creation import Creation
+from app.models.credit import CreditTransaction
+from app.models.model_usage_log import AIModelUsageLog
+from app.models.traffic import PageView
+
+# 本次迁移涉及的组合索引
+COMPOSITE_INDEXES = {
+    Creation.__table__: ["idx_creation_user_type_status_created", "idx_creation_user_created"],
+    AIModelUsageLog.__table__: ["idx_usage_log_provider_created", "idx_usage_log_tool_created"],
+    PageView.__table__: ["idx_page_view_created_session"],
+    CreditTransaction.__table__: ["idx_credit_tx_user_created"],
+}
+
+
+def iter_indexes():
+    """按模型定义返回 (表, 索引)"""
+    for table, names in COMPOSITE_INDEXES.items():
+        indexes = {index.name: index for index in table.indexes}
+        for name in names:
+            yield table, indexes[name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="添加高频查询组合索引")
+    parser.add_argument("--drop", action="store_true", help="删除本脚本创建的索引（回滚）")
+    parser.add_argument("--dry-run", action="store_true", help="只打印将要执行的操作")
+    args = parser.parse_args()
+
+    engine = create_engine(get_sync_database_url(settings.DATABASE_URL))
+    inspector = inspect(engine)
+
+    print("=" * 50)
+    print("数据库迁移：" + ("删除组合索引" if args.drop else "添加组合索引"))
+    print("=" * 50)
+
+    existing_tables = set(inspector.get_table_names())
+    failed = 0
+    for table, index in iter_indexes():
+        columns = ", ".join(column.name for column in index.columns)
+        label = f"{table.name}.{index.name} ({columns})"
+
+        if table.name not in existing_tables:
+            print(f"  - 表 {table.name} 不存在，跳过 {index.name}")
+            continue
+
+        exists = index.name in {i["name"] for i in inspector.get_indexes(table.name)}
+        if args.drop and not exists:
+            print(f"  - {label} 不存在，跳过")
+            continue
+        if not args.drop and exists:
+            print(f"  - {label} 已存在，跳过")
+            continue
+
+        action = "删除" if args.drop else "创建"
+        if args.dry_run:
+            print(f"  - [dry-run] {action} {label}")
+            continue
+
+        try:
+            if args.drop:
+                index.drop(bind=engine)
+            else:
+                index.create(bind=engine)
+            print(f"  - 已{action} {label}")
+        except Exception as e:
+            failed += 1
+            print(f"  - {action} {label} 失败: {e}")
+
+    print("\n" + "=" * 50)
+    if failed:
+        print(f"迁移完成，{failed} 个索引处理失败")
+        print("=" * 50)
+        sys.exit(1)
+    print("数据库迁移完成！")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
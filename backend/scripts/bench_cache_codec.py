@@ -0,0 +1,120 @@
+"""
+独立脚本：缓存编解码基准测试
+对比各序列化格式/压缩算法在典型缓存数据上的编码耗时、解码耗时和体积
+
+用法：
+    python scripts/bench_cache_codec.py [--rounds 200]
+
+参数：
+    --rounds  每种组合编码/解码的次数（默认200）
+
+典型数据：
+    hotspot   热点榜单（HotspotListResponse，50 条）
+    outline   PPT 大纲（20 页，每页标题 + 要点）
+    article   生成的长文（约 8000 字）
+    prices    积分价格列表（小对象，低于压缩阈值）
+"""
+import sys
+import argparse
+import json
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.utils.cache_codec import CacheCodec
+
+
+def build_payloads() -> dict:
+    """按线上缓存数据的结构构造样本"""
+    hotspot = {
+        "v": {
+            "platform": "weibo",
+            "platform_name": "微博热搜",
+            "update_time": "2024-06-01 12:00:00",
+            "items": [
+                {
+                    "title": f"热点话题第{i}条：某品牌发布新品引发网友热议",
+                    "url": f"https://s.weibo.com/weibo?q=%23topic{i}%23",
+                    "hot": 5000000 - i * 37000,
+                    "index": i + 1,
+                    "mobile_url": f"https://m.weibo.cn/search?containerid=topic{i}",
+                }
+                for i in range(50)
+            ],
+        },
+        "t": time.time(),
+    }
+    outline = {
+        "title": "2024年人工智能行业发展趋势分析",
+        "slides": [
+            {
+                "page": i + 1,
+                "title": f"第{i + 1}部分：大模型在垂直行业的落地实践",
+                "layout": "title_and_content",
+                "points": [f"要点{j}：从技术突破到商业化应用的关键路径分析" for j in range(5)],
+                "notes": "演讲备注：结合具体案例说明，控制在两分钟以内。" * 3,
+            }
+            for i in range(20)
+        ],
+    }
+    article = {
+        "creation_id": 10086,
+        "title": "如何用AI工具提升内容创作效率",
+        "content": ("在内容创作领域，人工智能正在改变创作者的工作方式。" * 20 + "\n\n") * 20,
+        "metadata": {"word_count": 8000, "tool_type": "wechat_article", "model": "gpt-4o"},
+    }
+    prices = [
+        {"id": i, "credits": 100 * (i + 1), "price": 9.9 * (i + 1), "bonus_credits": 10 * i, "is_active": True}
+        for i in range(6)
+    ]
+    return {"hotspot": hotspot, "outline": outline, "article": article, "prices": prices}
+
+
+def bench(codec: CacheCodec, value, rounds: int):
+    encoded = codec.encode(value)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        codec.encode(value)
+    encode_us = (time.perf_counter() - start) / rounds * 1e6
+    start = time.perf_counter()
+    for _ in range(rounds):
+        codec.decode(encoded)
+    decode_us = (time.perf_counter() - start) / rounds * 1e6
+    return len(encoded), encode_us, decode_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description="缓存编解码基准测试")
+    parser.add_argument("--rounds", type=int, default=200, help="每种组合的编码/解码次数")
+    args = parser.parse_args()
+
+    combos = [
+        ("legacy", "none"),
+        ("json", "zlib"),
+        ("orjson", "none"),
+        ("orjson", "zlib"),
+        ("orjson", "lz4"),
+        ("msgpack", "none"),
+        ("msgpack", "zlib"),
+        ("msgpack", "lz4"),
+    ]
+    payloads = build_payloads()
+
+    print(f"{'payload':<10}{'codec':<18}{'bytes':>10}{'encode(us)':>14}{'decode(us)':>14}")
+    for name, value in payloads.items():
+        raw = len(json.dumps(value, ensure_ascii=False).encode("utf-8"))
+        print(f"--- {name}: legacy json {raw} bytes")
+        for serializer, compression in combos:
+            codec = CacheCodec(serializer, compression)
+            # 依赖未安装时会回退为 json/zlib，跳过重复组合
+            if serializer not in ("legacy", codec.serializer.name) or codec.compressor.name != compression:
+                continue
+            size, encode_us, decode_us = bench(codec, value, args.rounds)
+            print(f"{name:<10}{serializer + '+' + compression:<18}{size:>10}{encode_us:>14.1f}{decode_us:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+独立脚本：并发积分扣减基准
+每个用户同时发起数百次扣减，对比改造前的“读出余额-检查-写回”和条件 UPDATE 两种实现的
+吞吐量与正确性（成功次数、最终余额、流水条数是否一致）
+
+用法：
+    python scripts/bench_credit_consume.py [--database-url URL] [--users 5] [--deductions 300]
+                                           [--threads 32] [--balance 200]
+
+参数：
+    --database-url  目标数据库（默认在临时目录创建 SQLite 文件；MySQL 请使用独立的测试库，
+                    脚本会删除并重建 id 为 1..users 的用户及其积分流水）
+    --users         参与测试的用户数（默认5）
+    --deductions    每个用户的扣减次数（默认300）
+    --threads       并发线程数（默认32）
+    --balance       每个用户的初始积分（默认200，小于扣减次数以覆盖余额不足的情况）
+
+输出：
+    legacy   改造前：ORM 读出 User、Python 中检查余额后写回
+    atomic   CreditService.check_and_consume_credits（条件 UPDATE）
+    lost     成功扣减次数与实际余额变化不一致的次数（丢失更新）
+    overdraw 余额被扣成负数的用户数
+"""
+import sys
+import argparse
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import BigInteger, Integer, create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base, get_sync_database_url
+from app.core.exceptions import BusinessException
+from app.models import CreditTransaction, TransactionType, User
+from app.services.credit_service import CreditService
+
+
+def legacy_consume(db, user_id: int, amount: int, description: str) -> bool:
+    """改造前的实现：读出余额，在 Python 中检查并扣减后写回"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if user.credits < amount:
+        raise BusinessException("积分不足")
+    balance_before = user.credits
+    user.credits -= amount
+    db.add(CreditTransaction(
+        user_id=user_id,
+        transaction_type=TransactionType.CONSUME,
+        amount=-amount,
+        balance_before=balance_before,
+        balance_after=user.credits,
+        description=description,
+    ))
+    db.commit()
+    return True
+
+
+def reset(engine, users: int, balance: int):
+    """重建测试用户和流水（User 刷新时会检查关联表，所以所有表都需要存在）"""
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    db = Session()
+    db.query(CreditTransaction).filter(CreditTransaction.user_id <= users).delete()
+    db.query(User).filter(User.id <= users).delete()
+    db.commit()
+    for i in range(1, users + 1):
+        db.add(User(id=i, username=f"bench{i}", email=f"bench{i}@example.com", password_hash="x", credits=balance))
+    db.commit()
+    db.close()
+
+
+def run_case(name: str, consume, engine, args):
+    reset(engine, args.users, args.balance)
+    Session = sessionmaker(bind=engine)
+    jobs = [user_id for _ in range(args.deductions) for user_id in range(1, args.users + 1)]
+
+    def work(user_id: int):
+        db = Session()
+        try:
+            consume(db, user_id, 1, "并发扣减基准")
+            return "ok"
+        except BusinessException:
+            db.rollback()
+            return "insufficient"
+        except Exception:
+            db.rollback()
+            return "error"
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        results = list(executor.map(work, jobs))
+    elapsed = time.perf_counter() - start
+
+    db = Session()
+    balances = dict(db.query(User.id, User.credits).filter(User.id <= args.users).all())
+    ledger = dict(
+        db.query(CreditTransaction.user_id, func.count(CreditTransaction.id))
+        .filter(CreditTransaction.user_id <= args.users)
+        .group_by(CreditTransaction.user_id).all()
+    )
+    db.close()
+
+    ok = results.count("ok")
+    # 每条流水代表一次成功扣减，余额实际减少量小于流水条数即发生了丢失更新
+    lost = sum(ledger.get(uid, 0) - (args.balance - credits) for uid, credits in balances.items())
+    overdraw = sum(1 for credits in balances.values() if credits < 0)
+    print(
+        f"{name:<8}{len(jobs) / elapsed:>10.0f}{ok:>8}{results.count('insufficient'):>14}"
+        f"{results.count('error'):>8}{lost:>8}{overdraw:>10}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并发积分扣减基准")
+    parser.add_argument("--database-url", default=None, help="目标数据库（默认临时 SQLite）")
+    parser.add_argument("--users", type=int, default=5, help="用户数")
+    parser.add_argument("--deductions", type=int, default=300, help="每个用户的扣减次数")
+    parser.add_argument("--threads", type=int, default=32, help="并发线程数")
+    parser.add_argument("--balance", type=int, default=200, help="初始积分")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    connect_args = {}
+    if database_url is None:
+        database_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_credit_consume.db'}"
+    if database_url.startswith("sqlite"):
+        connect_args = {"check_same_thread": False, "timeout": 60}
+        # SQLite 中 BIGINT 主键不会自增
+        for table in Base.metadata.tables.values():
+            for column in table.columns:
+                if isinstance(column.type, BigInteger) and column.primary_key:
+                    column.type = Integer()
+    engine = create_engine(
+        get_sync_database_url(database_url),
+        pool_size=args.threads,
+        max_overflow=0,
+        connect_args=connect_args,
+    )
+
+    print(
+        f"{args.users} 个用户 × {args.deductions} 次扣减，{args.threads} 线程，初始积分 {args.balance}"
+        f"（{engine.dialect.name}）"
+    )
+    print(f"{'mode':<8}{'ops/s':>10}{'ok':>8}{'insufficient':>14}{'error':>8}{'lost':>8}{'overdraw':>10}")
+    run_case("legacy", legacy_consume, engine, args)
+    run_case("atomic", CreditService.check_and_consume_credits, engine, args)
+
+
+if __name__ == "__main__":
+    main()
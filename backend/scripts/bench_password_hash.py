@@ -0,0 +1,94 @@
+"""
+独立脚本：并发登录时的事件循环延迟基准
+模拟一批并发登录（bcrypt 校验），同时用一个定时协程测量事件循环的调度延迟，
+对比直接在协程中调用 bcrypt 和使用密码哈希线程池两种方式
+
+用法：
+    python scripts/bench_password_hash.py [--logins 50] [--workers 4] [--tick-ms 10]
+
+参数：
+    --logins   并发登录数（默认50）
+    --workers  密码哈希线程池大小（默认4）
+    --tick-ms  定时协程的间隔（毫秒，默认10），实际间隔超出部分即事件循环延迟
+
+输出：
+    inline   在协程中直接调用 pwd_context.verify（改造前）
+    pool     await averify_password（改造后）
+    每种方式输出总耗时、事件循环延迟 p50/p99/max，以及线程池排队统计
+"""
+import sys
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.core.password_pool import PasswordHashPool
+from app.core.security import pwd_context
+
+
+async def measure_loop_lag(stop: asyncio.Event, tick: float, lags: list):
+    """按固定间隔 sleep，记录实际唤醒时间比预期晚多少"""
+    while not stop.is_set():
+        expected = time.perf_counter() + tick
+        await asyncio.sleep(tick)
+        lags.append(max(time.perf_counter() - expected, 0.0) * 1000)
+
+
+async def run_case(name: str, login, logins: int, tick: float):
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(measure_loop_lag(stop, tick, lags))
+    await asyncio.sleep(tick * 5)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await ticker
+    assert all(results)
+
+    lags.sort()
+    p99 = lags[min(int(len(lags) * 0.99), len(lags) - 1)] if lags else 0.0
+    print(
+        f"{name:<8}{elapsed:>10.2f}s"
+        f"{statistics.median(lags) if lags else 0.0:>12.1f}{p99:>12.1f}{(lags[-1] if lags else 0.0):>12.1f}"
+    )
+
+
+async def main_async(args):
+    password = "correct horse battery staple"
+    hashed = pwd_context.hash(password)
+    pool = PasswordHashPool(args.workers)
+    tick = args.tick_ms / 1000
+
+    async def inline_login():
+        return pwd_context.verify(password, hashed)
+
+    async def pool_login():
+        return await pool.arun(pwd_context.verify, password, hashed)
+
+    print(f"并发登录 {args.logins} 次，线程池 {args.workers} 个线程，定时间隔 {args.tick_ms}ms")
+    print(f"{'mode':<8}{'total':>11}{'lag p50(ms)':>12}{'lag p99(ms)':>12}{'lag max(ms)':>12}")
+    await run_case("inline", inline_login, args.logins, tick)
+    await run_case("pool", pool_login, args.logins, tick)
+    print(f"线程池统计: {pool.stats()}")
+    pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并发登录时的事件循环延迟基准")
+    parser.add_argument("--logins", type=int, default=50, help="并发登录数")
+    parser.add_argument("--workers", type=int, default=4, help="密码哈希线程池大小")
+    parser.add_argument("--tick-ms", type=float, default=10, help="定时协程间隔（毫秒）")
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+独立脚本：高频查询执行计划与耗时基准
+按线上数据分布生成样本数据，记录每条高频查询的 EXPLAIN 结果和耗时，
+并检查执行计划是否命中预期的组合索引，用于发现索引失效或查询退化。
+
+用法：
+    python scripts/bench_query_plans.py [--database-url URL] [--scale 1.0] [--rounds 50]
+                                        [--without-indexes] [--output result.json]
+                                        [--baseline baseline.json] [--tolerance 0.5]
+
+参数：
+    --database-url     目标数据库（默认在临时目录创建 SQLite 文件）。
+                       表中已有数据时不再生成样本，直接在现有数据上测试（可用于预发库）
+    --scale            数据量倍数，1.0 约为 创作 5 万、调用日志 10 万、访问记录 10 万、积分流水 5 万
+    --rounds           每条查询执行次数（默认50）
+    --without-indexes  删除组合索引后再测试，用于对比加索引前后的差异
+    --output           将结果写入 JSON 文件，可作为后续对比的基线
+    --baseline         与基线 JSON 对比：执行计划丢失预期索引，或 p95 耗时超过基线 (1 + tolerance) 倍时返回非 0
+    --tolerance        耗时允许的退化比例（默认0.5，即 50%）
+
+示例：
+    python scripts/bench_query_plans.py --output baseline.json
+    python scripts/bench_query_plans.py --baseline baseline.json
+"""
+import sys
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine, func, insert, select, text
+
+from app.core.database import get_sync_database_url
+from app.models.creation import Creation, CreationStatus, CreationType
+from app.models.credit import CreditTransaction, TransactionType
+from app.models.model_usage_log import AIModelUsageLog
+from app.models.traffic import PageView
+from scripts.add_composite_indexes import COMPOSITE_INDEXES, iter_indexes
+
+BATCH_SIZE = 5000
+DAYS = 90
+PROVIDERS = ["openai", "anthropic", "doubao", "qwen", "zhipu", "spark", "deepseek"]
+TOOLS = ["wechat_article", "xiaohongshu_note", "outline", "image", "video", "ppt", "rewrite", "translation"]
+
+
+def build_volumes(scale: float) -> dict:
+    return {
+        "users": max(int(2000 * scale), 10),
+        "creations": int(50000 * scale),
+        "usage_logs": int(100000 * scale),
+        "page_views": int(100000 * scale),
+        "credit_transactions": int(50000 * scale),
+    }
+
+
+def pick_user(rng: random.Random, users: int) -> int:
+    """少数活跃用户产生大部分数据（长尾分布），用户 1 最活跃"""
+    return min(int(rng.paretovariate(1.2)), users)
+
+
+def random_time(rng: random.Random, now: datetime) -> datetime:
+    return now - timedelta(seconds=rng.randint(0, DAYS * 86400))
+
+
+def insert_batches(conn, table, rows):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            conn.execute(insert(table), batch)
+            batch = []
+    if batch:
+        conn.execute(insert(table), batch)
+
+
+def seed(engine, volumes: dict, now: datetime):
+    """生成样本数据"""
+    rng = random.Random(42)
+    users = volumes["users"]
+    creation_types = list(CreationType)
+    statuses = [CreationStatus.COMPLETED] * 8 + [CreationStatus.FAILED, CreationStatus.PROCESSING]
+
+    with engine.begin() as conn:
+        insert_batches(conn, Creation.__table__, (
+            {
+                "id": i + 1,
+                "user_id": pick_user(rng, users),
+                "creation_type": rng.choice(creation_types),
+                "title": f"作品{i}",
+                "status": rng.choice(statuses),
+                "version_count": 1,
+                "current_version": 1,
+                "is_favorite": False,
+                "created_at": random_time(rng, now),
+                "updated_at": now,
+            }
+            for i in range(volumes["creations"])
+        ))
+        insert_batches(conn, AIModelUsageLog.__table__, (
+            {
+                "id": i + 1,
+                "user_id": pick_user(rng, users),
+                "ai_model_id": rng.randint(1, 30),
+                "provider": rng.choice(PROVIDERS),
+                "model_name": "model",
+                "tool": rng.choice(TOOLS),
+                "request_type": "chat",
+                "total_tokens": rng.randint(100, 4000),
+                "status": "success" if rng.random() < 0.97 else "failed",
+                "created_at": random_time(rng, now),
+            }
+            for i in range(volumes["usage_logs"])
+        ))
+        insert_batches(conn, PageView.__table__, (
+            {
+                "id": i + 1,
+                "path": rng.choice(["/", "/writing", "/image", "/video", "/ppt", "/pricing"]),
+                "session_id": f"s{rng.randint(1, volumes['page_views'] // 5)}",
+                "created_at": random_time(rng, now),
+            }
+            for i in range(volumes["page_views"])
+        ))
+        insert_batches(conn, CreditTransaction.__table__, (
+            {
+                "id": i + 1,
+                "user_id": pick_user(rng, users),
+                "transaction_type": TransactionType.CONSUME,
+                "amount": -10,
+                "balance_before": 1000,
+                "balance_after": 990,
+                "created_at": random_time(rng, now),
+            }
+            for i in range(volumes["credit_transactions"])
+        ))
+
+
+def build_queries(now: datetime) -> list:
+    """
+    高频查询，与接口中的写法保持一致
+
+    Returns:
+        [(名称, 语句, 预期命中的索引)]
+    """
+    today_start = datetime(now.year, now.month, now.day)
+    hot_user = 1
+    return [
+        (
+            "creations_gallery",
+            select(Creation.id).where(
+                Creation.user_id == hot_user,
+                Creation.creation_type == CreationType.IMAGE,
+                Creation.status == CreationStatus.COMPLETED,
+            ).order_by(Creation.created_at.desc(), Creation.id.desc()).limit(20),
+            "idx_creation_user_type_status_created",
+        ),
+        (
+            "creations_list",
+            select(Creation.id).where(Creation.user_id == hot_user)
+            .order_by(Creation.created_at.desc(), Creation.id.desc()).limit(20),
+            "idx_creation_user_created",
+        ),
+        (
+            "usage_logs_by_provider",
+            select(AIModelUsageLog.id).where(AIModelUsageLog.provider == "openai")
+            .order_by(AIModelUsageLog.created_at.desc(), AIModelUsageLog.id.desc()).limit(20),
+            "idx_usage_log_provider_created",
+        ),
+        (
+            "usage_logs_by_tool",
+            select(AIModelUsageLog.id).where(AIModelUsageLog.tool == "outline")
+            .order_by(AIModelUsageLog.created_at.desc(), AIModelUsageLog.id.desc()).limit(20),
+            "idx_usage_log_tool_created",
+        ),
+        (
+            "page_views_today_uv",
+            select(func.count(func.distinct(PageView.session_id))).where(
+                PageView.created_at >= today_start,
+                PageView.created_at < today_start + timedelta(days=1),
+            ),
+            "idx_page_view_created_session",
+        ),
+        (
+            "page_views_week_uv",
+            select(func.count(func.distinct(PageView.session_id))).where(
+                PageView.created_at >= today_start - timedelta(days=7),
+            ),
+            "idx_page_view_created_session",
+        ),
+        (
+            "credit_transactions_by_user",
+            select(CreditTransaction.id).where(CreditTransaction.user_id == hot_user)
+            .order_by(CreditTransaction.created_at.desc(), CreditTransaction.id.desc()).limit(20),
+            "idx_credit_tx_user_created",
+        ),
+    ]
+
+
+def explain(conn, stmt) -> str:
+    """获取执行计划文本"""
+    sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+    rows = conn.execute(text(prefix + sql)).fetchall()
+    return "\n".join(" | ".join(str(v) for v in row) for row in rows)
+
+
+def measure(conn, stmt, rounds: int) -> dict:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        conn.execute(stmt).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(int(len(timings) * 0.95), len(timings) - 1)], 3),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """与基线对比，返回退化项"""
+    problems = []
+    for name, result in results.items():
+        if not result["uses_index"]:
+            problems.append(f"{name}: 执行计划未使用 {result['expected_index']}")
+        base = baseline.get("queries", {}).get(name)
+        if base and result["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {result['p95_ms']}ms，基线 {base['p95_ms']}ms")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="高频查询执行计划与耗时基准")
+    parser.add_argument("--database-url", default=None, help="目标数据库（默认临时 SQLite）")
+    parser.add_argument("--scale", type=float, default=1.0, help="数据量倍数")
+    parser.add_argument("--rounds", type=int, default=50, help="每条查询执行次数")
+    parser.add_argument("--without-indexes", action="store_true", help="删除组合索引后测试")
+    parser.add_argument("--output", default=None, help="结果写入 JSON 文件")
+    parser.add_argument("--baseline", default=None, help="基线 JSON 文件")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="耗时允许的退化比例")
+    args = parser.parse_args()
+
+    database_url = args.database_url
+    if database_url is None:
+        database_url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench_query_plans.db'}"
+    engine = create_engine(get_sync_database_url(database_url))
+    now = datetime.utcnow()
+
+    tables = list(COMPOSITE_INDEXES)
+    for table in tables:
+        table.create(bind=engine, checkfirst=True)
+
+    with engine.connect() as conn:
+        existing = conn.execute(select(func.count()).select_from(Creation.__table__)).scalar()
+    if existing:
+        print(f"表中已有数据（creations {existing} 条），直接在现有数据上测试")
+    else:
+        volumes = build_volumes(args.scale)
+        print("生成样本数据: " + ", ".join(f"{k}={v}" for k, v in volumes.items()))
+        start = time.perf_counter()
+        seed(engine, volumes, now)
+        print(f"生成完成，耗时 {time.perf_counter() - start:.1f}s")
+
+    if args.without_indexes:
+        for table, index in iter_indexes():
+            index.drop(bind=engine, checkfirst=True)
+        print("已删除组合索引")
+
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            conn.execute(text("ANALYZE"))
+        elif conn.dialect.name == "mysql":
+            for table in tables:
+                conn.execute(text(f"ANALYZE TABLE {table.name}"))
+
+        results = {}
+        for name, stmt, expected_index in build_queries(now):
+            plan = explain(conn, stmt)
+            result = measure(conn, stmt, args.rounds)
+            result.update(expected_index=expected_index, uses_index=expected_index in plan, plan=plan)
+            results[name] = result
+
+    print(f"\n{'query':<30}{'p50(ms)':>10}{'p95(ms)':>10}  index")
+    for name, result in results.items():
+        mark = "OK" if result["uses_index"] else "MISSING " + result["expected_index"]
+        print(f"{name:<30}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}  {mark}")
+        for line in result["plan"].splitlines():
+            print(f"    {line}")
+
+    report = {
+        "dialect": engine.dialect.name,
+        "created_at": now.isoformat(),
+        "without_indexes": args.without_indexes,
+        "queries": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+        print(f"\n结果已写入 {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        problems = compare(results, baseline, args.tolerance)
+        if problems:
+            print("\n发现退化：")
+            for problem in problems:
+                print(f"  - {problem}")
+            sys.exit(1)
+        print("\n与基线对比无退化")
+
+
+if __name__ == "__main__":
+    main()
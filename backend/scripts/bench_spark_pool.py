@@ -0,0 +1,92 @@
+"""
+独立脚本：讯飞星火连接池基准测试
+在本地模拟服务上对比每次请求新建连接（direct）和使用连接池（pool）的单次调用延迟
+
+用法：
+    python scripts/bench_spark_pool.py [--calls 50] [--handshake-ms 120] [--interval-ms 200] [--keep-open]
+
+参数：
+    --calls         每种模式的调用次数（默认50）
+    --handshake-ms  模拟服务每次握手的额外耗时，模拟 TLS + 鉴权（默认120）
+    --interval-ms   两次调用之间的间隔，模拟真实请求间隔（默认200）
+    --concurrency   并发调用数（默认1）
+    --keep-open     模拟服务响应后不关闭连接（默认与真实服务一致，每次响应后关闭）
+"""
+import sys
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from app.services.langchain.chat.providers.spark import ChatSpark
+from app.services.langchain.chat.providers.spark_pool import close_spark_pools
+from scripts.spark_stub_server import SparkStubServer, StubOptions
+
+
+def percentile(values, p: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_mode(server: SparkStubServer, use_pool: bool, calls: int, interval: float, concurrency: int):
+    model = ChatSpark(
+        api_base=server.url,
+        app_id="stub",
+        api_key=server.options.api_key,
+        api_secret=server.options.api_secret,
+        use_pool=use_pool,
+    )
+    latencies = []
+
+    async def worker(count: int):
+        for i in range(count):
+            started = time.perf_counter()
+            await model.ainvoke(f"第{i}次调用")
+            latencies.append((time.perf_counter() - started) * 1000)
+            if interval:
+                await asyncio.sleep(interval)
+
+    handshakes = server.stats.handshakes
+    per_worker = max(1, calls // concurrency)
+    await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+    await close_spark_pools()
+    return latencies, server.stats.handshakes - handshakes
+
+
+async def run(args) -> None:
+    options = StubOptions(handshake_ms=args.handshake_ms, keep_open=args.keep_open)
+    async with SparkStubServer(options) as server:
+        mode = "保持连接" if args.keep_open else "响应后关闭连接"
+        print(f"模拟服务 {server.url}：握手 {args.handshake_ms}ms，{mode}，"
+              f"{args.calls} 次调用，间隔 {args.interval_ms}ms，并发 {args.concurrency}")
+        print(f"{'mode':<8}{'p50(ms)':>10}{'p95(ms)':>10}{'mean(ms)':>10}{'max(ms)':>10}{'handshakes':>12}")
+        for name, use_pool in (("direct", False), ("pool", True)):
+            latencies, handshakes = await run_mode(
+                server, use_pool, args.calls, args.interval_ms / 1000, args.concurrency
+            )
+            print(
+                f"{name:<8}{percentile(latencies, 50):>10.1f}{percentile(latencies, 95):>10.1f}"
+                f"{statistics.mean(latencies):>10.1f}{max(latencies):>10.1f}{handshakes:>12}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="讯飞星火连接池基准测试")
+    parser.add_argument("--calls", type=int, default=50, help="每种模式的调用次数")
+    parser.add_argument("--handshake-ms", type=float, default=120.0, help="模拟握手耗时（毫秒）")
+    parser.add_argument("--interval-ms", type=float, default=200.0, help="两次调用之间的间隔（毫秒）")
+    parser.add_argument("--concurrency", type=int, default=1, help="并发调用数")
+    parser.add_argument("--keep-open", action="store_true", help="模拟服务响应后不关闭连接")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+独立脚本：积分批量发放
+为运营活动、补偿等一次给大量用户发放（或扣减）积分，按 campaign_key 幂等：
+同一 campaign_key 再次执行时不会新建批次，而是从未处理的用户继续（可用于中断后恢复）
+
+用法：
+    python scripts/grant_credits.py --campaign-key KEY (--file users.csv | --all-users) [--amount N]
+                                    [--type reward] [--description 描述] [--chunk-size 1000]
+
+参数：
+    --campaign-key  活动幂等键
+    --file          CSV 文件，每行 user_id 或 user_id,amount（未指定 amount 的行使用 --amount）
+    --all-users     发放给所有正常状态的用户（每人 --amount 积分）
+    --amount        每个用户的积分数，负数为扣减（余额不足的用户跳过）
+    --type          积分流水类型（默认 reward）
+    --description   积分流水描述
+    --chunk-size    每个事务处理的用户数（默认1000）
+
+示例：
+    python scripts/grant_credits.py --campaign-key spring-2026 --all-users --amount 100 --description "春节活动赠送"
+    python scripts/grant_credits.py --campaign-key compensation-0301 --file users.csv --amount 50
+"""
+import sys
+import argparse
+import asyncio
+import csv
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import select
+
+from app.core.database_async import AsyncSessionLocal, close_async_db
+from app.core.exceptions import BusinessException
+from app.models.credit import TransactionType
+from app.models.user import User, UserStatus
+from app.services.credit_grant_service import CreditGrantService, grant_progress
+
+
+def read_amounts(path: str, default_amount) -> dict:
+    amounts = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if not row or not row[0].strip().isdigit():
+                continue  # 跳过空行和表头
+            amount = int(row[1]) if len(row) > 1 and row[1].strip() else default_amount
+            if amount is None:
+                raise BusinessException(f"用户 {row[0]} 未指定积分数，请在文件中填写或使用 --amount")
+            amounts[int(row[0])] = amount
+    return amounts
+
+
+def print_progress(progress):
+    print(
+        f"\r  {progress.progress:6.2f}%  已发放 {progress.granted_count}  跳过 {progress.skipped_count}"
+        f"  / 共 {progress.total_count}",
+        end="",
+        flush=True,
+    )
+
+
+async def main_async(args):
+    async with AsyncSessionLocal() as db:
+        grant = await CreditGrantService.get_by_campaign_key(db, args.campaign_key)
+        if grant is None:
+            if args.file:
+                amounts = read_amounts(args.file, args.amount)
+            else:
+                user_ids = (await db.execute(
+                    select(User.id).where(User.status == UserStatus.ACTIVE, User.deleted_at.is_(None))
+                )).scalars().all()
+                amounts = dict.fromkeys(user_ids, args.amount)
+            grant, _ = await CreditGrantService.create_grant(
+                db, args.campaign_key, amounts,
+                transaction_type=TransactionType(args.type),
+                description=args.description,
+            )
+            print(f"已创建批次 {grant.id}，共 {grant.total_count} 个用户")
+        else:
+            print(f"批次 {grant.id} 已存在（{grant.status.value}），从未处理的用户继续")
+
+        start = time.perf_counter()
+        grant = await CreditGrantService.run_grant(db, grant.id, chunk_size=args.chunk_size, progress=print_progress)
+        progress = grant_progress(grant)
+        print_progress(progress)
+        print(f"\n状态: {progress.status}，发放积分 {progress.granted_credits}，耗时 {time.perf_counter() - start:.1f}s")
+    await close_async_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="积分批量发放")
+    parser.add_argument("--campaign-key", required=True, help="活动幂等键")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--file", help="CSV 文件：user_id[,amount]")
+    target.add_argument("--all-users", action="store_true", help="发放给所有正常状态的用户")
+    parser.add_argument("--amount", type=int, default=None, help="每个用户的积分数")
+    parser.add_argument("--type", default=TransactionType.REWARD.value,
+                        choices=[t.value for t in TransactionType], help="积分流水类型")
+    parser.add_argument("--description", default=None, help="积分流水描述")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="每个事务处理的用户数")
+    args = parser.parse_args()
+    if args.all_users and args.amount is None:
+        parser.error("--all-users 需要指定 --amount")
+
+    try:
+        asyncio.run(main_async(args))
+    except BusinessException as e:
+        print(f"\n发放失败: {e.detail}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
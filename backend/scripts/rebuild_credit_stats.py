@@ -0,0 +1,61 @@
+"""
+数据库迁移/修复脚本：重建用户积分/会员统计（user_credit_stats）
+
+统计表在写流水和订单支付成功时增量维护，上线前的历史数据需要执行一次本脚本回填；
+统计出现偏差时也可以对指定用户重新计算。表不存在时自动创建，可重复执行。
+
+运行方式：
+    cd backend
+    python -m scripts.rebuild_credit_stats                     # 重建全部用户
+    python -m scripts.rebuild_credit_stats --user-id 1 --user-id 2
+    python -m scripts.rebuild_credit_stats --batch-size 200
+
+建议在低峰期执行：重建某批用户期间，这批用户新写入的流水可能被覆盖。
+"""
+import sys
+import argparse
+import time
+from pathlib import Path
+
+# 添加项目根目录到Python路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.config import settings
+from app.core.database import get_sync_database_url
+from app.models.credit import UserCreditStats
+from app.services.credit_stats_service import CreditStatsService
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重建用户积分/会员统计")
+    parser.add_argument("--user-id", type=int, action="append", dest="user_ids", help="只重建指定用户，可重复")
+    parser.add_argument("--batch-size", type=int, default=500, help="每批用户数")
+    args = parser.parse_args()
+
+    engine = create_engine(get_sync_database_url(settings.DATABASE_URL))
+    UserCreditStats.__table__.create(bind=engine, checkfirst=True)
+    db = sessionmaker(bind=engine)()
+
+    print("=" * 50)
+    print("重建用户积分/会员统计")
+    print("=" * 50)
+
+    start = time.perf_counter()
+    try:
+        count = CreditStatsService.rebuild(db, user_ids=args.user_ids, batch_size=args.batch_size)
+    except Exception as e:
+        db.rollback()
+        print(f"重建失败: {e}")
+        sys.exit(1)
+    finally:
+        db.close()
+
+    print(f"已重建 {count} 个用户的统计，耗时 {time.perf_counter() - start:.1f}s")
+    print("=" * 50)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+独立脚本：讯飞星火 WebSocket 本地模拟服务
+按星火接口协议校验签名并分帧返回内容，用于连接池测试和基准测试，不消耗真实额度
+
+用法：
+    python scripts/spark_stub_server.py [--port 8765] [--handshake-ms 120] [--keep-open]
+
+参数：
+    --host          监听地址（默认127.0.0.1）
+    --port          监听端口（默认8765）
+    --api-key       接受的 API Key（默认stub-key）
+    --api-secret    用于校验签名的 API Secret（默认stub-secret）
+    --handshake-ms  每次握手额外等待的毫秒数，模拟 TLS + 鉴权耗时（默认120）
+    --frame-ms      每帧之间的间隔毫秒数（默认5）
+    --keep-open     响应结束后不关闭连接（默认与真实服务一致，每次响应后关闭）
+
+ChatSpark 指向模拟服务：
+    ChatSpark(api_base="ws://127.0.0.1:8765", app_id="stub", api_key="stub-key", api_secret="stub-secret")
+"""
+import sys
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# 添加项目根目录到Python路径
+backend_dir = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from websockets.asyncio.server import ServerConnection, serve
+from websockets.datastructures import Headers
+from websockets.exceptions import ConnectionClosed
+from websockets.http11 import Response
+
+# 服务端允许的签名时间偏差（秒）
+MAX_CLOCK_SKEW = 300
+
+
+@dataclass
+class StubOptions:
+    api_key: str = "stub-key"
+    api_secret: str = "stub-secret"
+    handshake_ms: float = 120.0
+    frame_ms: float = 5.0
+    keep_open: bool = False
+
+
+@dataclass
+class StubStats:
+    handshakes: int = 0
+    rejected: int = 0
+    requests: int = 0
+
+
+def _reject(status: int, message: str) -> Response:
+    body = json.dumps({"message": message}).encode("utf-8")
+    return Response(status, "Unauthorized" if status == 401 else "Forbidden",
+                    Headers({"Content-Type": "application/json"}), body)
+
+
+def verify_signature(path: str, host: str, options: StubOptions) -> str:
+    """
+    按星火鉴权规则校验请求路径上的签名
+
+    Returns:
+        校验失败的原因，通过时返回空字符串
+    """
+    parsed = urlparse(path)
+    query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+    try:
+        authorization = base64.b64decode(query["authorization"]).decode("utf-8")
+        date = query["date"]
+    except (KeyError, ValueError):
+        return "missing authorization"
+
+    fields = dict(
+        part.strip().split("=", 1) for part in authorization.split(",") if "=" in part
+    )
+    fields = {k: v.strip('"') for k, v in fields.items()}
+    if fields.get("api_key") != options.api_key:
+        return "invalid api_key"
+
+    try:
+        skew = abs(time.time() - parsedate_to_datetime(date).timestamp())
+    except (TypeError, ValueError):
+        return "invalid date"
+    if skew > MAX_CLOCK_SKEW:
+        return "signature expired"
+
+    signature_origin = f"host: {query.get('host', host)}\ndate: {date}\nGET {parsed.path} HTTP/1.1"
+    expected = base64.b64encode(hmac.new(
+        options.api_secret.encode("utf-8"),
+        signature_origin.encode("utf-8"),
+        digestmod=hashlib.sha256
+    ).digest()).decode()
+    if not hmac.compare_digest(expected, fields.get("signature", "")):
+        return "invalid signature"
+    return ""
+
+
+def _frame(sid: str, seq: int, status: int, content: str, usage: dict = None) -> str:
+    payload = {
+        "choices": {
+            "status": status,
+            "seq": seq,
+            "text": [{"content": content, "role": "assistant", "index": 0}],
+        }
+    }
+    if usage is not None:
+        payload["usage"] = {"text": usage}
+    return json.dumps({
+        "header": {"code": 0, "message": "Success", "sid": sid, "status": status},
+        "payload": payload,
+    }, ensure_ascii=False)
+
+
+def build_reply(request: dict) -> str:
+    """回显最后一条用户消息"""
+    messages = request.get("payload", {}).get("message", {}).get("text", [])
+    last = messages[-1]["content"] if messages else ""
+    return f"收到：{last}"
+
+
+class SparkStubServer:
+    """
+    可在进程内启动的模拟服务
+
+    Example:
+        async with SparkStubServer(StubOptions(keep_open=True)) as server:
+            model = ChatSpark(api_base=server.url, ...)
+    """
+
+    def __init__(self, options: StubOptions = None, host: str = "127.0.0.1", port: int = 0):
+        self.options = options or StubOptions()
+        self.host = host
+        self.port = port
+        self.stats = StubStats()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    async def _process_request(self, connection: ServerConnection, request):
+        if self.options.handshake_ms:
+            await asyncio.sleep(self.options.handshake_ms / 1000)
+        error = verify_signature(request.path, request.headers.get("Host", ""), self.options)
+        if error:
+            self.stats.rejected += 1
+            return _reject(401, error)
+        self.stats.handshakes += 1
+        return None
+
+    async def _handler(self, ws: ServerConnection) -> None:
+        try:
+            async for raw in ws:
+                self.stats.requests += 1
+                request = json.loads(raw)
+                reply = build_reply(request)
+                sid = f"stub{self.stats.requests:06d}"
+                chunks = [reply[i:i + 4] for i in range(0, len(reply), 4)] or [""]
+                for seq, chunk in enumerate(chunks):
+                    last = seq == len(chunks) - 1
+                    usage = None
+                    if last:
+                        prompt_tokens = len(raw) // 4
+                        usage = {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": len(reply),
+                            "total_tokens": prompt_tokens + len(reply),
+                        }
+                    await ws.send(_frame(sid, seq, 2 if last else (0 if seq == 0 else 1), chunk, usage))
+                    if not last and self.options.frame_ms:
+                        await asyncio.sleep(self.options.frame_ms / 1000)
+                if not self.options.keep_open:
+                    await ws.close()
+                    return
+        except ConnectionClosed:
+            pass
+
+    async def start(self) -> "SparkStubServer":
+        self._server = await serve(
+            self._handler, self.host, self.port,
+            process_request=self._process_request,
+            compression=None,
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "SparkStubServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+
+async def run(args) -> None:
+    options = StubOptions(
+        api_key=args.api_key,
+        api_secret=args.api_secret,
+        handshake_ms=args.handshake_ms,
+        frame_ms=args.frame_ms,
+        keep_open=args.keep_open,
+    )
+    async with SparkStubServer(options, args.host, args.port) as server:
+        mode = "保持连接" if options.keep_open else "响应后关闭连接"
+        print(f"星火模拟服务已启动: {server.url}（握手 {options.handshake_ms}ms，{mode}）")
+        await asyncio.Future()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="讯飞星火 WebSocket 本地模拟服务")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--api-key", default="stub-key", help="接受的 API Key")
+    parser.add_argument("--api-secret", default="stub-secret", help="校验签名的 API Secret")
+    parser.add_argument("--handshake-ms", type=float, default=120.0, help="每次握手额外等待的毫秒数")
+    parser.add_argument("--frame-ms", type=float, default=5.0, help="每帧之间的间隔毫秒数")
+    parser.add_argument("--keep-open", action="store_true", help="响应结束后不关闭连接")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
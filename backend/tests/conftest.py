@@ -12,7 +12,9 @@ os.environ["REDIS_URL"] = "redis://localhost:6379/1"
 os.environ["LOG_LEVEL"] = "ERROR"
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import BigInteger, create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.ext.compiler import compiles
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
@@ -30,8 +32,11 @@ from app.models.user import User
 from app.models.platform_config import PlatformConfig
 from app.models.oauth_account import OAuthAccount
 
-# 延迟导入 app
-from app.main import app
+
+@compiles(BigInteger, "sqlite")
+def _compile_sqlite_bigint(type_, compiler, **kw):
+    # SQLite 只有 INTEGER PRIMARY KEY 会自增，建表时把 BIGINT 写成 INTEGER
+    return "INTEGER"
 
 
 # 测试数据库URL - 使用内存数据库避免文件锁问题
@@ -52,15 +57,6 @@ def engine():
         connect_args={"check_same_thread": False}
     )
     
-    # 修复 SQLite BigInteger 自增问题 - 预先修改 Base 元数据中的列类型
-    from sqlalchemy import BigInteger, Integer
-    
-    for table in Base.metadata.tables.values():
-        for column in table.columns:
-            if isinstance(column.type, BigInteger) and column.primary_key:
-                column.type = Integer()
-                column.autoincrement = True
-    
     # 清除所有已存在的表（防止之前的索引残留）
     Base.metadata.drop_all(bind=test_engine)
     # 重新创建所有表
@@ -90,6 +86,55 @@ def engine():
             pass  # 忽略文件删除错误
 
 
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """建好全部表的独立 SQLite 数据库（不替换 app 的引擎）"""
+    test_engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(bind=test_engine)
+    yield test_engine
+    test_engine.dispose()
+
+
+@pytest.fixture
+def autocommit_factory(sqlite_engine):
+    """与线上 MySQL 连接一致的 autocommit 会话工厂：不显式开启事务时每条语句单独提交"""
+    engine = create_engine(sqlite_engine.url, isolation_level="AUTOCOMMIT", connect_args={"timeout": 30})
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+async def async_sqlite_engine(tmp_path):
+    """建好全部表的独立 SQLite 数据库（aiosqlite 异步引擎）"""
+    test_engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with test_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield test_engine
+    await test_engine.dispose()
+
+
+@pytest.fixture
+def reset_http_clients():
+    """测试前后清空共享 HTTP 连接池，避免其他测试留下的连接池影响断言"""
+    from app.core import http_client
+
+    def reset():
+        with http_client._lock:
+            sync_clients = list(http_client._sync_clients.values())
+            http_client._sync_clients.clear()
+            # 其他事件循环已结束，其上的异步客户端无法再 await 关闭，直接丢弃
+            http_client._async_clients.clear()
+        for client in sync_clients:
+            client.close()
+
+    reset()
+    yield
+    reset()
+
+
 @pytest.fixture(scope="function")
 def db_session(engine):
     """创建测试数据库会话"""
@@ -103,6 +148,9 @@ def db_session(engine):
 @pytest.fixture(scope="function")
 def client(db_session):
     """创建测试客户端"""
+    # 延迟导入 app，只用到数据库夹具的测试不必加载全部路由
+    from app.main import app
+
     def override_get_db():
         try:
             yield db_session
@@ -226,3 +274,18 @@ def mock_playwright():
     mock_playwright.chromium.launch = AsyncMock(return_value=mock_browser)
     
     return mock_playwright
+
+
+@pytest.fixture
+def max_queries():
+    """
+    断言代码块内的 SQL 条数上限
+
+    Example:
+        def test_overview(client, auth_headers, max_queries):
+            with max_queries(3):
+                client.get("/api/v1/traffic/overview", headers=auth_headers)
+    """
+    from app.core.query_stats import assert_max_queries
+
+    return assert_max_queries
@@ -0,0 +1,37 @@
+"""
+管理员运行指标接口测试
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.utils.deps import get_current_user
+from app.api.v1 import admin_metrics
+from app.models.user import User, UserRole
+
+
+@pytest.fixture
+def make_client():
+    def factory(role):
+        app = FastAPI()
+        app.include_router(admin_metrics.router, prefix="/admin/metrics")
+        app.dependency_overrides[get_current_user] = lambda: User(id=1, username="u", role=role)
+        return TestClient(app)
+    return factory
+
+
+def test_requires_admin(make_client):
+    """测试普通用户无权查看运行指标"""
+    assert make_client(UserRole.USER).get("/admin/metrics").status_code == 403
+
+
+def test_returns_all_or_one_section(make_client):
+    """测试默认返回全部分组，section 参数只返回指定分组"""
+    client = make_client(UserRole.ADMIN)
+    data = client.get("/admin/metrics").json()["data"]
+    assert set(data) == set(admin_metrics.METRIC_SECTIONS)
+    assert "primary" in data["db"]
+    assert {"l1", "l2", "memory"} <= set(data["cache"])
+
+    assert list(client.get("/admin/metrics", params={"section": "db"}).json()["data"]) == ["db"]
+    assert client.get("/admin/metrics", params={"section": "nope"}).status_code == 404
@@ -0,0 +1,98 @@
+"""
+异步缓存测试（fakeredis）
+"""
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.utils import cache as _cache
+from app.utils.cache import AsyncCache, Cache
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeRedis(server=server, decode_responses=True)
+    async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(_cache, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(_cache, "redis_client", client)
+    monkeypatch.setattr(_cache, "get_async_redis", lambda: async_client)
+    monkeypatch.setattr(settings, "CACHE_L1_ENABLED", False)
+    return client
+
+
+def test_get_set_delete_shares_keys_with_sync_cache(fake_redis):
+    """测试异步读写与同步 Cache 使用同一份 Redis 数据和编码"""
+    async def main():
+        assert await AsyncCache.set("user:1:profile", {"name": "小明", "tags": [1, 2]}, expire=60)
+        assert Cache.get("user:1:profile") == {"name": "小明", "tags": [1, 2]}
+        assert 0 < fake_redis.ttl("user:1:profile") <= 60
+
+        Cache.set("user:2:profile", {"name": "小红"})
+        assert await AsyncCache.get("user:2:profile") == {"name": "小红"}
+        assert await AsyncCache.exists("user:2:profile")
+
+        assert await AsyncCache.delete("user:2:profile")
+        assert await AsyncCache.get("user:2:profile") is None
+        assert not await AsyncCache.exists("user:2:profile")
+
+    asyncio.run(main())
+
+
+def test_bulk_tags_and_patterns(fake_redis):
+    """测试批量读写、按标签和按模式失效"""
+    async def main():
+        assert await AsyncCache.set_many({"a:1": 1, "a:2": 2, "b:1": 3}, expire=60)
+        assert await AsyncCache.get_many(["a:1", "a:2", "a:3", "a:1"]) == {"a:1": 1, "a:2": 2}
+
+        await AsyncCache.set("t:1", "x", tags=["group"])
+        await AsyncCache.set("t:2", "y", tags=["group"])
+        assert await AsyncCache.invalidate_tags("group") == 2
+        assert await AsyncCache.get_many(["t:1", "t:2"]) == {}
+
+        assert await AsyncCache.clear_pattern("a:*") == 2
+        assert await AsyncCache.get("b:1") == 3
+
+        assert await AsyncCache.increment("counter", 5) == 5
+        assert await AsyncCache.decrement("counter", 2) == 3
+
+        token = await AsyncCache.acquire_lock("job")
+        assert token and await AsyncCache.acquire_lock("job") is None
+        assert not await AsyncCache.release_lock("job", "other")
+        assert await AsyncCache.release_lock("job", token)
+
+    asyncio.run(main())
+
+
+def test_redis_errors_are_swallowed(fake_redis, monkeypatch):
+    """测试 Redis 出错时返回默认值而不抛出异常"""
+    class Broken:
+        def __getattr__(self, name):
+            async def fail(*args, **kwargs):
+                raise ConnectionError("redis down")
+            return fail
+
+    monkeypatch.setattr(_cache, "get_async_redis", lambda: Broken())
+
+    async def main():
+        assert await AsyncCache.get("k") is None
+        assert await AsyncCache.set("k", 1) is False
+        assert await AsyncCache.exists("k") is False
+
+    asyncio.run(main())
+
+
+def test_memory_fallback(monkeypatch):
+    """测试 Redis 不可用时使用进程内存储"""
+    monkeypatch.setattr(_cache, "REDIS_AVAILABLE", False)
+    monkeypatch.setattr(_cache, "get_async_redis", lambda: pytest.fail("不应访问 Redis"))
+
+    async def main():
+        await AsyncCache.set("mem:1", {"v": 1}, tags=["mem"])
+        assert await AsyncCache.get("mem:1") == {"v": 1}
+        assert await AsyncCache.invalidate_tags("mem") == 1
+        assert await AsyncCache.get("mem:1") is None
+
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""
+认证用户快照缓存测试
+"""
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core import security
+from app.core.database import Base
+from app.models.user import User, UserStatus
+
+
+class TestAuthUserCache:
+    """load_auth_user 测试"""
+
+    def setup_method(self):
+        self.engine = create_engine("sqlite://")
+        Base.metadata.create_all(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.queries = []
+        event.listen(self.engine, "before_cursor_execute",
+                     lambda conn, cursor, statement, *args: self.queries.append(statement))
+
+        db = self.Session()
+        db.add(User(id=1, username="alice", email="alice@example.com", password_hash="x", credits=100))
+        db.commit()
+        db.close()
+        security.invalidate_auth_user(1)
+
+    def test_cache_hit_skips_query(self):
+        """测试命中快照时鉴权不查询数据库"""
+        db = self.Session()
+        assert security.load_auth_user(db, 1).username == "alice"
+        db.close()
+
+        self.queries.clear()
+        db = self.Session()
+        user = security.load_auth_user(db, 1)
+        assert user.status == UserStatus.ACTIVE
+        assert user.username == "alice"
+        assert self.queries == []
+        db.close()
+
+    def test_non_snapshot_fields_are_fresh(self):
+        """测试快照以外的字段从数据库加载，修改可以正常提交"""
+        db = self.Session()
+        security.load_auth_user(db, 1)
+        db.close()
+
+        db = self.Session()
+        db.query(User).filter(User.id == 1).update({"credits": 80})
+        db.commit()
+        db.close()
+
+        db = self.Session()
+        user = security.load_auth_user(db, 1)
+        assert user.credits == 80
+        user.credits -= 30
+        db.commit()
+        db.close()
+
+        db = self.Session()
+        assert db.query(User.credits).filter(User.id == 1).scalar() == 50
+        db.close()
+
+    def test_invalidate(self):
+        """测试状态变更后清除快照"""
+        db = self.Session()
+        security.load_auth_user(db, 1)
+        db.query(User).filter(User.id == 1).update({"status": UserStatus.BANNED})
+        db.commit()
+        db.close()
+
+        security.invalidate_auth_user(1)
+        db = self.Session()
+        assert security.load_auth_user(db, 1).status == UserStatus.BANNED
+        db.close()
@@ -0,0 +1,99 @@
+"""
+缓存编解码测试
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from pydantic import BaseModel
+
+from app.utils import cache_codec
+from app.utils.cache_codec import CacheCodec
+
+
+class TestCacheCodec:
+    """CacheCodec 测试"""
+
+    def test_roundtrip_with_header(self):
+        """测试编码带头部并可还原"""
+        codec = CacheCodec("orjson", "none")
+        value = {"title": "热点", "items": [1, 2, 3], "ok": True}
+        encoded = codec.encode(value)
+        assert encoded.startswith(b"\x00o-")
+        assert codec.decode(encoded) == value
+
+    def test_compress_above_threshold(self):
+        """测试超过阈值才压缩"""
+        codec = CacheCodec("orjson", "zlib", compress_threshold=100)
+        small = {"a": 1}
+        large = {"content": "内容" * 1000}
+        assert codec.encode(small)[2:3] == b"-"
+        encoded = codec.encode(large)
+        assert encoded[2:3] == b"z"
+        assert len(encoded) < len(json.dumps(large).encode())
+        assert codec.decode(encoded) == large
+
+    def test_read_legacy_and_other_formats(self):
+        """测试迁移期间可读取旧 JSON 文本和其他格式写入的数据"""
+        codec = CacheCodec("orjson", "zlib")
+        legacy = json.dumps({"a": "中文"}, ensure_ascii=False)
+        assert codec.decode(legacy) == {"a": "中文"}
+        assert codec.decode(legacy.encode("utf-8")) == {"a": "中文"}
+        other = CacheCodec("json", "zlib", compress_threshold=10).encode({"b": "x" * 100})
+        assert codec.decode(other) == {"b": "x" * 100}
+
+    def test_legacy_mode_and_integers(self):
+        """测试 legacy 模式写旧格式，整数不加头部以支持 INCR"""
+        assert CacheCodec("legacy").encode({"a": 1}) == b'{"a": 1}'
+        assert CacheCodec("orjson").encode(42) == b"42"
+        assert CacheCodec("orjson").decode(b"43") == 43
+
+    @pytest.mark.parametrize("serializer", ["json", "orjson"])
+    def test_json_formats_do_not_restore_types(self, serializer):
+        """测试 json/orjson 不还原类型：时间读出为 ISO 字符串，bytes 为 base64，Decimal 为字符串，集合为列表"""
+        codec = CacheCodec(serializer, "none")
+        value = {
+            "t": datetime(2024, 1, 1, 8, 30),
+            "d": date(2024, 1, 1),
+            "b": b"\x00\x01",
+            "n": Decimal("9.90"),
+            "s": (1, 2),
+        }
+        assert codec.decode(codec.encode(value)) == {
+            "t": "2024-01-01T08:30:00",
+            "d": "2024-01-01",
+            "b": "AAE=",
+            "n": "9.90",
+            "s": [1, 2],
+        }
+
+    def test_pydantic_model_restores_types(self, monkeypatch):
+        """测试缓存 pydantic 模型时读取后按模型字段还原 datetime/bytes"""
+        from app.utils import cache as _cache
+        from app.utils.cache_decorator import cached
+
+        class Snapshot(BaseModel):
+            t: datetime
+            b: bytes
+
+        monkeypatch.setattr(_cache, "REDIS_AVAILABLE", False)
+        monkeypatch.setattr(cache_codec, "_codec", CacheCodec("orjson", "none"))
+        calls = []
+
+        @cached(key="test:codec:snapshot", ttl=60, model=Snapshot)
+        def load():
+            calls.append(1)
+            return Snapshot(t=datetime(2024, 1, 1, 8, 30), b=b"raw")
+
+        load.invalidate()
+        assert load() == load() == Snapshot(t=datetime(2024, 1, 1, 8, 30), b=b"raw")
+        assert len(calls) == 1
+        load.invalidate()
+
+    def test_msgpack_roundtrip(self):
+        """测试 msgpack 可原样还原 bytes 和 datetime"""
+        pytest.importorskip("msgpack")
+        codec = CacheCodec("msgpack", "none")
+        value = {"b": b"\x00\x01", "t": datetime(2024, 1, 1, 8, 30)}
+        assert codec.decode(codec.encode(value)) == value
@@ -0,0 +1,159 @@
+"""
+cached 缓存装饰器测试
+"""
+import asyncio
+import threading
+import time
+import uuid
+
+from pydantic import BaseModel
+
+from app.utils.cache import Cache
+from app.utils.cache_decorator import cached
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+
+
+class TestCachedDecorator:
+    """测试 single-flight 与 stale-while-revalidate"""
+
+    def test_sync_hit_and_invalidate(self):
+        """测试同步函数缓存命中与失效"""
+        prefix = uuid.uuid4().hex
+        calls = []
+
+        @cached(key=prefix + ":{item_id}", ttl=60, model=Item)
+        def load(item_id: int) -> Item:
+            calls.append(item_id)
+            return Item(id=item_id, name="a")
+
+        assert load(1) == Item(id=1, name="a")
+        assert load(1) == Item(id=1, name="a")
+        assert calls == [1]
+
+        load.invalidate(1)
+        load(1)
+        assert calls == [1, 1]
+        load.invalidate(1)
+
+    def test_sync_single_flight(self):
+        """测试并发未命中时只计算一次"""
+        key = uuid.uuid4().hex
+        calls = []
+
+        @cached(key=key, ttl=60)
+        def slow():
+            calls.append(1)
+            time.sleep(0.3)
+            return {"value": 42}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(slow())) for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == [{"value": 42}] * 10
+        Cache.delete(key)
+
+    def test_async_single_flight(self):
+        """测试异步函数并发未命中时只计算一次"""
+        key = uuid.uuid4().hex
+        calls = []
+
+        @cached(key=key, ttl=60, model=Item)
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.2)
+            return [Item(id=1, name="a"), Item(id=2, name="b")]
+
+        async def run():
+            return await asyncio.gather(*[slow() for _ in range(10)])
+
+        results = asyncio.run(run())
+        assert len(calls) == 1
+        assert all(r == results[0] for r in results)
+        # 命中缓存时反序列化为模型列表
+        assert asyncio.run(slow()) == [Item(id=1, name="a"), Item(id=2, name="b")]
+        Cache.delete(key)
+
+    def test_stale_while_revalidate(self):
+        """测试过期后仍返回旧值，由抢到锁的调用者刷新"""
+        key = uuid.uuid4().hex
+        counter = {"n": 0}
+
+        @cached(key=key, ttl=1, stale_ttl=60)
+        def load():
+            counter["n"] += 1
+            return counter["n"]
+
+        assert load() == 1
+        time.sleep(1.1)
+        # 抢到锁的调用者同步刷新
+        assert load() == 2
+        assert load() == 2
+
+        # 锁被占用时返回旧值
+        time.sleep(1.1)
+        token = Cache.acquire_lock(key, 10)
+        assert load() == 2
+        Cache.release_lock(key, token)
+        assert load() == 3
+        Cache.delete(key)
+
+    def test_sync_lock_held_computes_without_waiting(self):
+        """测试同步函数在锁被其他 worker 占用且无缓存时直接计算，不轮询等待"""
+        key = uuid.uuid4().hex
+        calls = []
+
+        @cached(key=key, ttl=60, lock_timeout=10)
+        def load():
+            calls.append(1)
+            return 1
+
+        token = Cache.acquire_lock(key, 10)
+        try:
+            start = time.monotonic()
+            assert load() == 1
+            assert time.monotonic() - start < 1
+            assert calls == [1]
+        finally:
+            Cache.release_lock(key, token)
+            Cache.delete(key)
+
+    def test_sync_recheck_after_lock(self, monkeypatch):
+        """测试抢到锁后再读一次缓存，其他 worker 刚写入时不重复计算"""
+        key = uuid.uuid4().hex
+        calls = []
+
+        @cached(key=key, ttl=60)
+        def load():
+            calls.append("load")
+            return "load"
+
+        @cached(key=key, ttl=60)
+        def other_worker():
+            calls.append("other")
+            return "other"
+
+        original = Cache.acquire_lock
+        raced = []
+
+        def acquire_lock(lock_key, timeout):
+            # 第一次抢锁前模拟其他 worker 计算完成并释放锁
+            if not raced:
+                raced.append(1)
+                other_worker()
+            return original(lock_key, timeout)
+
+        monkeypatch.setattr(Cache, "acquire_lock", acquire_lock)
+        try:
+            assert load() == "other"
+            assert calls == ["other"]
+        finally:
+            Cache.delete(key)
@@ -0,0 +1,132 @@
+"""
+两级缓存 L1 本地层测试（fakeredis）
+"""
+import json
+import time
+
+import fakeredis
+import pytest
+
+from app.core.config import settings
+from app.utils import cache as _cache
+from app.utils.cache import Cache, CacheInvalidationListener
+
+CHANNEL = "test:cache:invalidate"
+
+
+def _wait_for(condition, timeout=3.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(_cache, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(_cache, "redis_client", client)
+    monkeypatch.setattr(settings, "CACHE_L1_ENABLED", True)
+    monkeypatch.setattr(settings, "CACHE_L1_PATTERNS", ["model:*"])
+    monkeypatch.setattr(settings, "CACHE_INVALIDATION_CHANNEL", CHANNEL)
+    listener = CacheInvalidationListener(CHANNEL)
+    monkeypatch.setattr(_cache, "_invalidation_listener", listener)
+    _cache._l1_cache.clear()
+    _cache._stats.reset()
+    yield client
+    listener.stop()
+    if listener._thread:
+        listener._thread.join(timeout=3)
+    _cache._l1_cache.clear()
+
+
+def _subscribed(client):
+    return lambda: client.pubsub_numsub(CHANNEL)[0][1] > 0
+
+
+def test_l1_pattern_gating(fake_redis, monkeypatch):
+    """测试只有匹配 CACHE_L1_PATTERNS 的键走 L1，关闭开关或 Redis 不可用时都不走"""
+    assert _cache._l1_enabled("model:1")
+    assert not _cache._l1_enabled("user:1")
+    # 先等监听线程订阅完成（订阅时会清空 L1）
+    _cache._invalidation_listener.ensure_started()
+    assert _wait_for(_subscribed(fake_redis))
+
+    Cache.set("model:1", {"v": 1})
+    Cache.set("user:1", {"v": 1})
+    assert Cache.get("model:1") == {"v": 1}
+    assert Cache.get("user:1") == {"v": 1}
+    assert _cache._l1_cache.get("model:1") is not None
+    assert _cache._l1_cache.get("user:1") is None
+    counters = Cache.stats()
+    assert counters["l1"]["hits"] == 1
+    assert counters["l2"]["hits"] == 1
+
+    monkeypatch.setattr(settings, "CACHE_L1_ENABLED", False)
+    assert not _cache._l1_enabled("model:1")
+    monkeypatch.setattr(settings, "CACHE_L1_ENABLED", True)
+    monkeypatch.setattr(_cache, "REDIS_AVAILABLE", False)
+    assert not _cache._l1_enabled("model:1")
+
+
+def test_pubsub_invalidation_from_other_worker(fake_redis):
+    """测试收到其他 worker 的失效消息后淘汰本地 L1，下一次读取拿到 Redis 中的新值"""
+    Cache.set("model:1", {"v": 1})
+    Cache.set("model:2", {"v": 2})
+    assert Cache.get("model:1") == {"v": 1}
+    assert _wait_for(_subscribed(fake_redis))
+    assert Cache.get("model:2") == {"v": 2}  # 订阅建立时会清空 L1，重新读入
+
+    # 模拟另一个 worker 直接改写 Redis 并广播
+    fake_redis.set("model:1", _cache.get_codec().encode({"v": 10}))
+    fake_redis.publish(CHANNEL, json.dumps({"node": "other", "keys": ["model:1"], "pattern": None}))
+    assert _wait_for(lambda: _cache._l1_cache.get("model:1") is None)
+    assert Cache.get("model:1") == {"v": 10}
+    assert _cache._l1_cache.get("model:2") is not None
+
+    fake_redis.publish(CHANNEL, json.dumps({"node": "other", "keys": [], "pattern": "model:*"}))
+    assert _wait_for(lambda: _cache._l1_cache.get("model:2") is None)
+
+
+def test_own_and_malformed_messages_are_ignored(fake_redis):
+    """测试忽略自己发出的消息和无法解析的消息"""
+    _cache._l1_cache.set("model:1", b"x", expire=60)
+    CacheInvalidationListener.handle_message(json.dumps({"node": _cache._NODE_ID, "keys": ["model:1"]}))
+    CacheInvalidationListener.handle_message("not json")
+    CacheInvalidationListener.handle_message(None)
+    assert _cache._l1_cache.get("model:1") == b"x"
+
+
+def test_l1_cleared_on_reconnect(fake_redis, monkeypatch):
+    """测试订阅连接中断后重连时清空 L1（中断期间可能错过失效消息），之后继续接收消息"""
+    real_pubsub = fake_redis.pubsub
+    calls = []
+
+    class BrokenPubSub:
+        def subscribe(self, channel):
+            pass
+
+        def get_message(self, timeout=None):
+            # 断线期间写入 L1 的值可能已被其他 worker 修改
+            _cache._l1_cache.set("model:1", b"stale", expire=60)
+            raise ConnectionError("connection lost")
+
+        def close(self):
+            pass
+
+    def pubsub(**kwargs):
+        calls.append(kwargs)
+        return BrokenPubSub() if len(calls) == 1 else real_pubsub(**kwargs)
+
+    monkeypatch.setattr(fake_redis, "pubsub", pubsub)
+    _cache._invalidation_listener.ensure_started()
+
+    assert _wait_for(_subscribed(fake_redis), timeout=5)
+    assert len(calls) == 2
+    assert _cache._l1_cache.get("model:1") is None
+
+    _cache._l1_cache.set("model:2", b"x", expire=60)
+    fake_redis.publish(CHANNEL, json.dumps({"node": "other", "keys": ["model:2"], "pattern": None}))
+    assert _wait_for(lambda: _cache._l1_cache.get("model:2") is None)
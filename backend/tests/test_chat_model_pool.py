@@ -0,0 +1,71 @@
+"""
+Chat Model 实例池测试
+"""
+from langchain_core.tools import tool
+
+from app.services.langchain.chat.factory import LangChainChatFactory
+from app.services.langchain.chat.pool import ChatModelPool
+
+
+@tool
+def word_count(text: str) -> int:
+    """统计文本字数"""
+    return len(text)
+
+
+def make_tool():
+    @tool
+    def word_count(text: str) -> int:
+        """统计文本字数"""
+        return len(text)
+    return word_count
+
+
+def test_reuses_instances_by_credentials(monkeypatch):
+    """测试相同参数复用实例，密钥、地址或其他参数不同时分别创建"""
+    created = []
+    original = LangChainChatFactory.create.__func__
+
+    def create(cls, **kwargs):
+        created.append(kwargs)
+        return original(cls, **kwargs)
+
+    monkeypatch.setattr(LangChainChatFactory, "create", classmethod(create))
+    pool = ChatModelPool(max_size=2, ttl=60)
+
+    first = pool.get("openai", "gpt-4o-mini", "sk-a")
+    assert pool.get("OpenAI", "gpt-4o-mini", "sk-a") is first
+    assert pool.get("openai", "gpt-4o-mini", "sk-b") is not first
+    assert pool.get("openai", "gpt-4o-mini", "sk-a", api_base="https://proxy.example.com/v1") is not first
+    assert len(created) == 3
+
+    stats = pool.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 3, 1)
+    # 容量为 2，最早的实例已被淘汰
+    assert pool.get("openai", "gpt-4o-mini", "sk-a") is not first
+    assert "sk-a" not in repr(list(pool._models))
+
+
+def test_ttl_eviction(monkeypatch):
+    """测试空闲超过 ttl 的实例重新创建"""
+    pool = ChatModelPool(max_size=8, ttl=0)
+    first = pool.get("openai", "gpt-4o-mini", "sk-a")
+    monkeypatch.setattr("time.monotonic", lambda: 1e12)
+    assert pool.get("openai", "gpt-4o-mini", "sk-a") is not first
+
+
+def test_bind_tools_cached_per_toolset():
+    """测试同一实例上相同工具集复用绑定结果"""
+    pool = ChatModelPool(max_size=8, ttl=60)
+    model = pool.get("openai", "gpt-4o-mini", "sk-a")
+
+    bound = pool.bind_tools(model, [word_count])
+    # 每次请求重新创建的同名同参数工具也复用
+    assert pool.bind_tools(model, [make_tool()]) is bound
+    assert pool.bind_tools(model, [word_count], tool_choice="word_count") is not bound
+    assert bound.kwargs["tools"][0]["function"]["name"] == "word_count"
+    assert (pool.stats()["bind_tools_hits"], pool.stats()["bind_tools_misses"]) == (1, 2)
+
+    # 不在池中的实例直接绑定
+    other = LangChainChatFactory.create("openai", "gpt-4o-mini", "sk-a")
+    assert pool.bind_tools(other, [word_count]) is not pool.bind_tools(other, [word_count])
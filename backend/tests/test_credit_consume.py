@@ -0,0 +1,121 @@
+"""
+积分条件扣减测试
+"""
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import func
+from sqlalchemy.orm import sessionmaker
+
+from app.core.exceptions import BusinessException
+from app.models.credit import CreditTransaction, TransactionType
+from app.models.user import User
+from app.services.credit_service import CreditService
+
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    factory = sessionmaker(bind=sqlite_engine)
+    db = factory()
+    db.add(User(id=1, username="alice", email="alice@example.com", password_hash="x", credits=100))
+    db.add(User(id=2, username="bob", email="bob@example.com", password_hash="x", credits=0,
+                is_member=1, member_expired_at=datetime.now() + timedelta(days=1)))
+    db.commit()
+    db.close()
+    return factory
+
+
+class TestCreditConsume:
+    """CreditService.check_and_consume_credits 测试"""
+
+    def test_consume_records_ledger(self, session_factory):
+        """测试扣减积分并记录流水，已加载的 User 同步为新余额"""
+        db = session_factory()
+        user = db.query(User).filter(User.id == 1).first()
+        assert CreditService.check_and_consume_credits(db, 1, 30, "生成文章", related_id=9, related_type="creation")
+        assert user.credits == 70
+
+        tx = db.query(CreditTransaction).one()
+        assert (tx.amount, tx.balance_before, tx.balance_after) == (-30, 100, 70)
+        assert tx.transaction_type == TransactionType.CONSUME
+        db.close()
+
+    def test_insufficient_credits(self, session_factory):
+        """测试余额不足时不扣减"""
+        db = session_factory()
+        with pytest.raises(BusinessException, match="积分不足"):
+            CreditService.check_and_consume_credits(db, 1, 101, "生成文章")
+        db.rollback()
+        assert db.query(User.credits).filter(User.id == 1).scalar() == 100
+        assert db.query(CreditTransaction).count() == 0
+        db.close()
+
+    def test_member_not_charged(self, session_factory):
+        """测试有效会员不扣积分"""
+        db = session_factory()
+        assert CreditService.check_and_consume_credits(db, 2, 10, "生成文章")
+        assert db.query(CreditTransaction).count() == 0
+        db.close()
+
+    def test_concurrent_consume_never_overdraws(self, session_factory):
+        """测试并发扣减不会超扣，成功次数与流水条数一致"""
+        succeeded = []
+
+        def worker():
+            db = session_factory()
+            for _ in range(15):
+                try:
+                    CreditService.check_and_consume_credits(db, 1, 1, "并发扣减")
+                    succeeded.append(1)
+                except BusinessException:
+                    db.rollback()
+            db.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        db = session_factory()
+        assert len(succeeded) == 100
+        assert db.query(User.credits).filter(User.id == 1).scalar() == 0
+        assert db.query(func.count(CreditTransaction.id)).scalar() == 100
+        assert db.query(func.min(CreditTransaction.balance_after)).scalar() == 0
+        db.close()
+
+    def test_autocommit_ledger_balances_are_consistent(self, session_factory, autocommit_factory):
+        """测试 autocommit 连接上并发扣减时，每条流水记录的前后余额都是本次扣减的"""
+        def worker():
+            db = autocommit_factory()
+            for _ in range(10):
+                CreditService.check_and_consume_credits(db, 1, 1, "并发扣减")
+            db.close()
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        db = autocommit_factory()
+        rows = db.query(CreditTransaction.balance_before, CreditTransaction.balance_after).all()
+        assert sorted(after for _, after in rows) == list(range(20, 100))
+        assert all(before == after + 1 for before, after in rows)
+        db.close()
+
+    def test_autocommit_failed_ledger_write_rolls_back(self, session_factory, autocommit_factory, monkeypatch):
+        """测试 autocommit 连接上写流水失败时扣减一并回滚"""
+        def fail(db, rows):
+            raise RuntimeError("ledger insert failed")
+
+        monkeypatch.setattr(CreditService, "record_transactions", staticmethod(fail))
+        db = autocommit_factory()
+        with pytest.raises(RuntimeError):
+            CreditService.check_and_consume_credits(db, 1, 30, "生成文章")
+        db.close()
+
+        db = autocommit_factory()
+        assert db.query(User.credits).filter(User.id == 1).scalar() == 100
+        db.close()
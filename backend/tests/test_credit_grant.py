@@ -0,0 +1,84 @@
+"""
+积分批量发放测试
+"""
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.credit import CreditGrantStatus, CreditTransaction, UserCreditStats
+from app.models.user import User
+from app.services.credit_grant_service import CreditGrantService, grant_progress
+from app.services.credit_service import AsyncCreditService
+
+
+@pytest.fixture
+async def db(async_sqlite_engine):
+    async with AsyncSession(async_sqlite_engine, expire_on_commit=False) as session:
+        for i in range(1, 6):
+            session.add(User(id=i, username=f"user{i}", email=f"user{i}@example.com",
+                             password_hash="x", credits=i * 10))
+        await session.commit()
+        yield session
+
+
+async def ledger_count(db) -> int:
+    return (await db.execute(select(func.count()).select_from(CreditTransaction))).scalar_one()
+
+
+async def test_grant_is_idempotent_by_campaign_key(db):
+    """测试发放结果、流水和统计，同一 campaign_key 不会重复发放"""
+    grant, created = await CreditGrantService.create_grant(
+        db, "spring", dict.fromkeys([1, 2, 3, 4, 5, 99], 100), description="春节活动"
+    )
+    assert created
+    progress = []
+    grant = await CreditGrantService.run_grant(db, grant.id, chunk_size=2, progress=progress.append)
+
+    assert grant.status == CreditGrantStatus.COMPLETED
+    assert (grant.granted_count, grant.skipped_count, grant.granted_credits) == (5, 1, 500)
+    assert [p.progress for p in progress] == [33.33, 66.67, 100.0]
+    assert (await db.execute(select(User.credits).order_by(User.id))).scalars().all() == [110, 120, 130, 140, 150]
+    tx = (await db.execute(select(CreditTransaction).where(CreditTransaction.user_id == 2))).scalar_one()
+    assert (tx.balance_before, tx.balance_after, tx.description) == (20, 120, "春节活动")
+    assert (await db.get(UserCreditStats, 2)).total_reward == 100
+
+    again, created = await CreditGrantService.create_grant(db, "spring", {1: 100})
+    assert (again.id, created) == (grant.id, False)
+    await CreditGrantService.run_grant(db, grant.id)
+    assert await ledger_count(db) == 5
+
+
+async def test_grant_resumes_after_failure(db, monkeypatch):
+    """测试中途失败后重新执行，只处理未发放的用户"""
+    grant, _ = await CreditGrantService.create_grant(db, "compensation", dict.fromkeys(range(1, 6), 5))
+
+    original = AsyncCreditService.record_transactions
+    calls = []
+
+    async def flaky(session, rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise RuntimeError("数据库连接中断")
+        await original(session, rows)
+
+    monkeypatch.setattr(AsyncCreditService, "record_transactions", flaky)
+    with pytest.raises(RuntimeError):
+        await CreditGrantService.run_grant(db, grant.id, chunk_size=2)
+    grant = await CreditGrantService.get_grant(db, grant.id)
+    assert grant.status == CreditGrantStatus.FAILED
+    assert grant_progress(grant).granted_count == 2
+    assert await ledger_count(db) == 2
+
+    monkeypatch.setattr(AsyncCreditService, "record_transactions", original)
+    grant = await CreditGrantService.run_grant(db, grant.id, chunk_size=2)
+    assert grant.status == CreditGrantStatus.COMPLETED
+    assert await ledger_count(db) == 5
+    assert (await db.execute(select(User.credits).order_by(User.id))).scalars().all() == [15, 25, 35, 45, 55]
+
+
+async def test_negative_adjustment_skips_insufficient_balance(db):
+    """测试扣减时余额不足的用户跳过"""
+    grant, _ = await CreditGrantService.create_grant(db, "adjust", {1: -20, 3: -20})
+    grant = await CreditGrantService.run_grant(db, grant.id)
+    assert (grant.granted_count, grant.skipped_count, grant.granted_credits) == (1, 1, -20)
+    assert (await db.execute(select(User.credits).where(User.id.in_([1, 3])).order_by(User.id))).scalars().all() == [10, 10]
@@ -0,0 +1,183 @@
+"""
+积分/会员统计增量维护测试
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import get_db
+from app.core.exceptions import BusinessException
+from app.utils.deps import get_current_user
+from app.api.v1 import image, writing
+from app.models.ai_model import AIModel
+from app.models.credit import (
+    CreditTransaction, MembershipOrder, MembershipPrice, MembershipType, PaymentStatus,
+    RechargeOrder, TransactionType, UserCreditStats
+)
+from app.models.creation import Creation
+from app.models.user import User
+from app.services.credit_service import CreditService, MembershipService, RechargeService
+from app.services.credit_stats_service import CreditStatsService
+from app.services.writing_service import WritingService
+
+STAT_COLUMNS = [
+    "total_earned", "total_spent", "total_recharge", "total_consume", "total_reward",
+    "recharge_amount", "recharge_count", "last_recharge_at",
+    "membership_amount", "membership_count", "last_membership_at", "last_membership_type",
+]
+
+
+@pytest.fixture
+def db(sqlite_engine):
+    session = sessionmaker(bind=sqlite_engine)()
+    session.add(User(id=1, username="alice", email="alice@example.com", password_hash="x", credits=0))
+    session.add(MembershipPrice(name="月度会员", membership_type=MembershipType.MONTHLY,
+                                amount=Decimal("30.00"), duration_days=30, is_active=True))
+    session.add(RechargeOrder(order_no="R1", user_id=1, amount=Decimal("10.00"), credits=100, bonus_credits=20))
+    session.add(MembershipOrder(order_no="M1", user_id=1, membership_type=MembershipType.MONTHLY,
+                                amount=Decimal("30.00")))
+    session.commit()
+    yield session
+    session.close()
+
+
+def snapshot(db) -> dict:
+    db.expire_all()
+    stats = db.get(UserCreditStats, 1)
+    return {column: getattr(stats, column) for column in STAT_COLUMNS}
+
+
+def test_stats_follow_writes_and_match_rebuild(db):
+    """测试写流水和支付回调时增量更新统计，结果与全量重建一致"""
+    assert RechargeService.process_payment_callback(db, "R1", "tx-1", "paid")
+    CreditService.add_credits(db, 1, 5, TransactionType.REWARD, "签到")
+    CreditService.check_and_consume_credits(db, 1, 30, "生成文章")
+    CreditService.check_and_consume_credits(db, 1, 15, "生成图片")
+    CreditService.add_credits(db, 1, 15, TransactionType.REFUND, "生成失败退款")
+
+    stats = snapshot(db)
+    assert (stats["total_earned"], stats["total_spent"]) == (140, 45)
+    assert (stats["total_recharge"], stats["total_consume"], stats["total_reward"]) == (120, 45, 5)
+    assert (stats["recharge_amount"], stats["recharge_count"]) == (Decimal("10.00"), 1)
+
+    statistics = CreditService.get_credit_statistics(db, 1)
+    assert statistics.current_balance == 95
+    assert statistics.total_consume == 45
+
+    assert MembershipService.process_payment_callback(db, "M1", "tx-2", "paid")
+    statistics = MembershipService.get_membership_statistics(db, 1)
+    assert statistics.is_member
+    assert (statistics.total_orders, statistics.total_amount) == (1, Decimal("30.00"))
+    assert statistics.last_membership_type == MembershipType.MONTHLY
+
+    incremental = snapshot(db)
+    assert CreditStatsService.rebuild(db) == 1
+    assert snapshot(db) == incremental
+
+
+def test_failed_recharge_callback_leaves_stats_unchanged(db, autocommit_factory):
+    """测试 autocommit 连接上加积分失败时，订单状态和充值统计一并回滚，重试不会重复计入"""
+    db.add(RechargeOrder(order_no="R2", user_id=2, amount=Decimal("10.00"), credits=100))
+    db.commit()
+
+    session = autocommit_factory()
+    for _ in range(2):
+        with pytest.raises(BusinessException, match="用户不存在"):
+            RechargeService.process_payment_callback(session, "R2", "tx-3", "paid")
+        session.rollback()
+    session.close()
+
+    db.expire_all()
+    assert db.get(UserCreditStats, 2) is None
+    assert db.query(RechargeOrder).filter(RechargeOrder.order_no == "R2").one().payment_status != PaymentStatus.PAID
+
+    # 用户存在后回调成功，统计只计入一次
+    db.add(User(id=2, username="bob", email="bob@example.com", password_hash="x", credits=0))
+    db.commit()
+    session = autocommit_factory()
+    assert RechargeService.process_payment_callback(session, "R2", "tx-3", "paid")
+    assert RechargeService.process_payment_callback(session, "R2", "tx-3", "paid")
+    session.close()
+    db.expire_all()
+    stats = db.get(UserCreditStats, 2)
+    assert (stats.recharge_amount, stats.recharge_count, stats.total_recharge) == (Decimal("10.00"), 1, 100)
+
+
+def test_statistics_without_history(db):
+    """测试没有统计行的用户返回 0"""
+    statistics = CreditService.get_credit_statistics(db, 1)
+    assert (statistics.total_recharge, statistics.recharge_count, statistics.current_balance) == (0, 0, 0)
+    statistics = MembershipService.get_membership_statistics(db, 1)
+    assert not statistics.is_member
+    assert statistics.total_orders == 0
+
+
+def test_image_generation_charge_counts_as_consume(db, monkeypatch):
+    """测试图片生成扣费经过积分服务，计入消费统计（会员同样扣费）"""
+    user = db.get(User, 1)
+    user.credits, user.is_member, user.member_expired_at = 100, 1, datetime.now() + timedelta(days=1)
+    db.commit()
+
+    async def skip_generation(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(image, "process_image_generation", skip_generation)
+    app = FastAPI()
+    app.include_router(image.router, prefix="/image")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: db.get(User, 1)
+    app.dependency_overrides[image._generate_rate_limit] = lambda: None
+    app.dependency_overrides[image._generate_quota] = lambda: None
+
+    response = TestClient(app).post("/image/generate", json={"prompt": "一只猫", "num_images": 2})
+    assert response.status_code == 200
+
+    creation = db.query(Creation).one()
+    tx = db.query(CreditTransaction).one()
+    assert (tx.amount, tx.balance_before, tx.balance_after) == (-20, 100, 80)
+    assert (tx.related_id, tx.related_type) == (creation.id, "creation")
+    statistics = CreditService.get_credit_statistics(db, 1)
+    assert (statistics.total_consume, statistics.current_balance) == (20, 80)
+
+
+def test_writing_charge_and_refund_share_the_request_session(db, monkeypatch):
+    """测试写作生成的扣费、退款与创作记录使用同一个会话，失败时退款并计入统计"""
+    user = db.get(User, 1)
+    user.credits = 100
+    db.add(AIModel(id=1, user_id=1, name="m", provider="openai", model_name="gpt-4o-mini", api_key="sk"))
+    db.commit()
+
+    outcomes = iter(["正文", RuntimeError("模型超时")])
+
+    async def generate(**kwargs):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(WritingService, "generate_content", generate)
+    app = FastAPI()
+    app.include_router(writing.router, prefix="/writing")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[writing.get_current_user] = lambda: db.get(User, 1)
+    app.dependency_overrides[writing._generate_rate_limit] = lambda: None
+    app.dependency_overrides[writing._generate_quota] = lambda: None
+    client = TestClient(app)
+    body = {"tool_type": "wechat_article", "model_id": 1, "parameters": {"topic": "春天"}}
+
+    assert client.post("/writing/generate", json=body).status_code == 200
+    assert db.get(User, 1).credits == 90
+    assert client.post("/writing/generate", json=body).status_code == 500
+
+    rows = db.query(CreditTransaction).order_by(CreditTransaction.id).all()
+    assert [(tx.amount, tx.balance_before, tx.balance_after) for tx in rows] == [
+        (-10, 100, 90), (-10, 90, 80), (10, 80, 90)
+    ]
+    assert rows[2].transaction_type == TransactionType.REFUND
+    assert db.query(Creation).count() == 1
+    statistics = CreditService.get_credit_statistics(db, 1)
+    assert statistics.current_balance == 90
@@ -0,0 +1,76 @@
+"""
+共享 HTTP 客户端测试
+"""
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.core import http_client
+from app.core.http_client import async_http_client, close_http_clients, http_client_stats
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 支持 keep-alive
+    peers = []
+
+    def do_GET(self):
+        self.peers.append(self.client_address)
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _clean_pools(reset_http_clients):
+    """每个测试都从空的共享连接池开始"""
+    yield
+
+
+@pytest.fixture
+def server():
+    _Handler.peers = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_async_requests_reuse_connection(server):
+    """测试同一事件循环内多次调用复用同一条连接，关闭后重新创建"""
+
+    async def main():
+        for _ in range(3):
+            async with async_http_client(timeout=5.0) as client:
+                response = await client.get(f"{server}/ping")
+                assert response.text == "ok"
+        async with async_http_client(timeout=5.0) as client:
+            async with client.stream("GET", f"{server}/stream") as response:
+                assert await response.aread() == b"ok"
+        stats = http_client_stats()
+        await close_http_clients()
+        return stats
+
+    stats = asyncio.run(main())
+    assert len(set(_Handler.peers)) == 1
+    assert stats["async_pools"] == 1
+    assert stats["hosts"] == [server]
+
+
+def test_sync_requests_reuse_connection(server):
+    """测试同步客户端复用连接，不同主机使用不同连接池"""
+    with http_client.http_client(timeout=5.0) as client:
+        for _ in range(3):
+            assert client.get(f"{server}/ping").status_code == 200
+    assert len(set(_Handler.peers)) == 1
+    assert http_client.get_http_client(server) is not http_client.get_http_client("http://localhost:1")
+    asyncio.run(close_http_clients())
+    assert http_client_stats()["sync_pools"] == 0
@@ -0,0 +1,243 @@
+"""
+LLM 响应缓存测试（进程内存储、Redis 写入脚本）
+"""
+import asyncio
+
+import fakeredis
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel, GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+
+from app.core.config import settings
+from app.services.langchain.callbacks import UsageCallbackHandler
+from app.services.langchain.chat.pool import chat_model_pool
+from app.services.langchain import response_cache
+from app.services.langchain.response_cache import LLMResponseCache, llm_response_cache
+from app.services.langchain.service import LangChainService
+from app.utils import cache as _cache
+
+
+@tool
+def word_count(text: str) -> int:
+    """统计文本字数"""
+    return len(text)
+
+
+@pytest.fixture
+def enabled(monkeypatch):
+    monkeypatch.setattr(_cache, "REDIS_AVAILABLE", False)
+    monkeypatch.setattr(settings, "LLM_RESPONSE_CACHE_ENABLED", True)
+    monkeypatch.setattr(settings, "LLM_RESPONSE_CACHE_TOOL_TTLS", {"no_cache": 0})
+    asyncio.run(llm_response_cache.clear())
+    yield
+    asyncio.run(llm_response_cache.clear())
+
+
+@pytest.fixture
+def saved_logs(monkeypatch):
+    logs = []
+
+    def save(self, response_time_ms):
+        logs.append({
+            "tool": self.tool,
+            "total_tokens": getattr(self, "_total_tokens", 0),
+            "output": self._response_content,
+            "extra_data": self.extra_data,
+            "status": self._status,
+        })
+
+    monkeypatch.setattr(UsageCallbackHandler, "_save_to_db", save)
+    return logs
+
+
+def _service(monkeypatch, responses, tool_name="wechat_article"):
+    model = FakeListChatModel(responses=responses)
+    monkeypatch.setattr(chat_model_pool, "get", lambda **kwargs: model)
+    return LangChainService(
+        provider="openai", model="gpt-4o-mini", api_key="sk-test",
+        user_id=1, ai_model_id=2, tool=tool_name,
+    )
+
+
+def test_identical_request_is_served_from_cache(enabled, saved_logs, monkeypatch):
+    """测试输入相同的第二次调用不再请求模型，并按 0 token 记录调用日志"""
+    service = _service(monkeypatch, ["第一次", "第二次", "第三次"])
+
+    async def main():
+        first = await service.chat("写一篇文章", system_prompt="你是编辑")
+        second = await service.chat("写一篇文章", system_prompt="你是编辑")
+        other = await service.chat("写一篇文章", system_prompt="你是编辑", temperature=0.2)
+        return first, second, other
+
+    first, second, other = asyncio.run(main())
+    assert first.content == second.content == "第一次"
+    assert other.content == "第二次"  # 采样参数不同，不命中
+
+    hits = [log for log in saved_logs if "cache" in log["extra_data"]]
+    assert len(hits) == 1
+    assert hits[0]["total_tokens"] == 0
+    assert hits[0]["output"] == "第一次"
+    assert hits[0]["status"] == "success"
+    assert hits[0]["extra_data"]["cache"]["hit"] is True
+
+
+def test_bypass_cache_calls_model_and_refreshes(enabled, saved_logs, monkeypatch):
+    """测试 bypass_cache 时强制调用模型，新结果覆盖缓存"""
+    service = _service(monkeypatch, ["第一次", "第二次"])
+
+    async def main():
+        await service.chat("你好")
+        fresh = await service.chat("你好", bypass_cache=True)
+        cached = await service.chat("你好")
+        return fresh, cached
+
+    fresh, cached = asyncio.run(main())
+    assert fresh.content == "第二次"
+    assert cached.content == "第二次"
+
+
+def test_disabled_or_zero_ttl_tool_is_not_cached(enabled, saved_logs, monkeypatch):
+    """测试缓存时间为 0 的调用步骤和全局关闭时不缓存"""
+    service = _service(monkeypatch, ["第一次", "第二次", "第三次"], tool_name="no_cache")
+    assert asyncio.run(service.chat("你好")).content == "第一次"
+    assert asyncio.run(service.chat("你好")).content == "第二次"
+
+    monkeypatch.setattr(settings, "LLM_RESPONSE_CACHE_ENABLED", False)
+    service = _service(monkeypatch, ["第一次", "第二次"])
+    assert asyncio.run(service.chat("你好")).content == "第一次"
+    assert asyncio.run(service.chat("你好")).content == "第二次"
+
+
+def test_key_covers_tools_and_ignores_credentials():
+    """测试键包含工具定义、与参数顺序和密钥无关"""
+    messages = [HumanMessage(content="你好")]
+    key = LLMResponseCache.make_key("OpenAI", "gpt-4o-mini", None, messages, {"temperature": 0.7, "max_tokens": 100})
+    assert key == LLMResponseCache.make_key(
+        "openai", "gpt-4o-mini", None, messages, {"max_tokens": 100, "temperature": 0.7, "callbacks": [object()]}
+    )
+    assert key != LLMResponseCache.make_key("openai", "gpt-4o-mini", None, messages, {"temperature": 0.7})
+    assert key != LLMResponseCache.make_key(
+        "openai", "gpt-4o-mini", None, messages, {"temperature": 0.7, "max_tokens": 100}, tools=[word_count]
+    )
+    assert key != LLMResponseCache.make_key(
+        "openai", "gpt-4o-mini", "https://proxy.example.com/v1", messages, {"temperature": 0.7, "max_tokens": 100}
+    )
+
+
+def test_size_budget(monkeypatch):
+    """测试超过单条上限的响应不缓存，总量超出容量时淘汰旧条目"""
+    monkeypatch.setattr(_cache, "REDIS_AVAILABLE", False)
+    cache = LLMResponseCache(max_bytes=400, max_entry_bytes=200)
+
+    async def main():
+        assert not await cache.set("big", {"response": {"content": "x" * 300}}, ttl=60)
+        for i in range(4):
+            assert await cache.set(f"k{i}", {"response": {"content": str(i) * 100}}, ttl=60)
+        return [await cache.get(f"k{i}") for i in range(4)]
+
+    values = asyncio.run(main())
+    assert values[0] is None
+    assert values[3]["response"]["content"] == "3" * 100
+    stats = cache.stats()
+    assert stats["skipped"] == 1
+    assert stats["evictions"] >= 1
+    assert stats["bytes"] <= 400
+
+
+def test_auto_executed_tool_runs_are_not_cached(enabled, saved_logs, monkeypatch):
+    """测试执行过工具的回答不缓存（工具结果可能与用户相关），未调用工具的回答照常缓存"""
+    tool_call = AIMessage(content="", tool_calls=[{"name": "word_count", "args": {"text": "你好"}, "id": "call_1"}])
+    model = GenericFakeChatModel(messages=iter([
+        tool_call, AIMessage(content="共 2 个字"),
+        tool_call, AIMessage(content="共 2 个字（第二次）"),
+        AIMessage(content="无需工具"), AIMessage(content="不应调用"),
+    ]))
+    monkeypatch.setattr(chat_model_pool, "get", lambda **kwargs: model)
+    monkeypatch.setattr(chat_model_pool, "bind_tools", lambda model, tools, **kwargs: model)
+    service = LangChainService(
+        provider="openai", model="gpt-4o-mini", api_key="sk-test", user_id=1, ai_model_id=2, tool="chat",
+    )
+
+    async def main():
+        first = await service.chat_with_tools("你好有几个字", tools=[word_count])
+        second = await service.chat_with_tools("你好有几个字", tools=[word_count])
+        direct = await service.chat_with_tools("不用工具", tools=[word_count])
+        cached = await service.chat_with_tools("不用工具", tools=[word_count])
+        return first, second, direct, cached
+
+    first, second, direct, cached = asyncio.run(main())
+    assert first.content == "共 2 个字"
+    assert second.content == "共 2 个字（第二次）"
+    assert direct.content == cached.content == "无需工具"
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    client = fakeredis.FakeAsyncRedis(decode_responses=True)
+    monkeypatch.setattr(_cache, "REDIS_AVAILABLE", True)
+    monkeypatch.setattr(response_cache, "get_async_redis", lambda: client)
+    return client
+
+
+def test_redis_budget_never_evicts_new_entry(fake_redis):
+    """测试 Redis 写入脚本淘汰最早过期的旧条目，新写入的条目不会被本次淘汰"""
+    cache = LLMResponseCache(max_bytes=400, max_entry_bytes=300)
+
+    async def main():
+        for i, ttl in enumerate([300, 100, 200]):
+            assert await cache.set(f"llm:resp:k{i}", {"response": {"content": str(i) * 80}}, ttl=ttl)
+        # 写入超出容量：淘汰最早过期的 k1、k2，而不是新条目
+        assert await cache.set("llm:resp:new", {"response": {"content": "n" * 200}}, ttl=10)
+        values = {k: await cache.get(f"llm:resp:{k}") for k in ("k0", "k1", "k2", "new")}
+        total = int(await fake_redis.get(response_cache._TOTAL_KEY))
+        sizes = await fake_redis.hgetall(response_cache._SIZES_KEY)
+        index = await fake_redis.zrange(response_cache._INDEX_KEY, 0, -1)
+        return values, total, sizes, index
+
+    values, total, sizes, index = asyncio.run(main())
+    assert values["new"]["response"]["content"] == "n" * 200
+    assert values["k0"] is not None
+    assert values["k1"] is None and values["k2"] is None
+    assert total == sum(int(v) for v in sizes.values()) <= 400
+    assert set(index) == set(sizes) == {"llm:resp:k0", "llm:resp:new"}
+    stats = cache.stats()
+    assert (stats["stores"], stats["evictions"], stats["skipped"]) == (4, 2, 0)
+
+
+def test_redis_overwrite_and_oversized_budget(fake_redis):
+    """测试覆盖写入不重复计量；淘汰全部旧条目仍放不下时不写入并计为跳过"""
+    cache = LLMResponseCache(max_bytes=150, max_entry_bytes=1000)
+
+    async def main():
+        assert await cache.set("llm:resp:a", {"response": {"content": "a" * 50}}, ttl=60)
+        assert await cache.set("llm:resp:a", {"response": {"content": "b" * 50}}, ttl=60)
+        total_after_overwrite = int(await fake_redis.get(response_cache._TOTAL_KEY))
+        stored = await cache.set("llm:resp:a", {"response": {"content": "c" * 300}}, ttl=60)
+        return total_after_overwrite, stored, await cache.get("llm:resp:a")
+
+    total_after_overwrite, stored, value = asyncio.run(main())
+    assert total_after_overwrite < 150
+    assert stored is False
+    # 旧值已被替换计量，不保留过期内容
+    assert value is None
+    assert asyncio.run(fake_redis.get(response_cache._TOTAL_KEY)) == "0"
+    stats = cache.stats()
+    assert (stats["stores"], stats["skipped"]) == (2, 1)
+
+
+def test_redis_expired_entries_are_swept(fake_redis, monkeypatch):
+    """测试写入时清理索引中已过期的条目并扣减总字节数"""
+    cache = LLMResponseCache(max_bytes=10_000, max_entry_bytes=1000)
+    now = [1_000_000]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+
+    async def main():
+        await cache.set("llm:resp:old", {"response": {"content": "x"}}, ttl=10)
+        now[0] += 11
+        await cache.set("llm:resp:fresh", {"response": {"content": "y"}}, ttl=10)
+        return await fake_redis.zrange(response_cache._INDEX_KEY, 0, -1), await fake_redis.hgetall(response_cache._SIZES_KEY)
+
+    index, sizes = asyncio.run(main())
+    assert index == ["llm:resp:fresh"]
+    assert list(sizes) == ["llm:resp:fresh"]
@@ -0,0 +1,66 @@
+"""
+会员过期测试：请求路径只读，过期状态由清扫任务批量写入
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
+
+from app.models.user import User
+from app.services.credit_service import CreditService, MembershipService, is_active_member
+
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    factory = sessionmaker(bind=sqlite_engine)
+    now = datetime.now()
+    db = factory()
+    db.add(User(id=1, username="expired", email="expired@example.com", password_hash="x", credits=50,
+                is_member=1, member_expired_at=now - timedelta(hours=1)))
+    db.add(User(id=2, username="active", email="active@example.com", password_hash="x", credits=0,
+                is_member=1, member_expired_at=now + timedelta(days=1)))
+    db.add(User(id=3, username="plain", email="plain@example.com", password_hash="x", credits=10))
+    db.commit()
+    db.close()
+    return factory
+
+
+def test_is_active_member():
+    now = datetime.now()
+    assert is_active_member(1, now + timedelta(seconds=1), now)
+    assert not is_active_member(1, now, now)
+    assert not is_active_member(1, None, now)
+    assert not is_active_member(0, now + timedelta(days=1), now)
+
+
+def test_balance_of_expired_member_is_read_only(session_factory):
+    """测试查询余额时按到期时间判断，不写库"""
+    db = session_factory()
+    writes = []
+    event.listen(db.get_bind(), "before_cursor_execute",
+                 lambda conn, cursor, statement, *args: writes.append(statement)
+                 if not statement.lstrip().upper().startswith("SELECT") else None)
+
+    balance = CreditService.get_user_balance(db, 1)
+    assert balance == {"credits": 50, "is_member": False, "member_expired_at": None}
+    assert CreditService.get_user_balance(db, 2)["is_member"] is True
+    assert writes == []
+    db.close()
+
+
+def test_expired_member_is_charged_before_sweep(session_factory):
+    """测试清扫前过期会员也按非会员扣积分"""
+    db = session_factory()
+    assert CreditService.check_and_consume_credits(db, 1, 20, "生成文章")
+    assert db.query(User.credits, User.is_member).filter(User.id == 1).one() == (30, 1)
+    db.close()
+
+
+def test_expire_memberships(session_factory):
+    """测试批量清扫只处理已过期会员，可重复执行"""
+    db = session_factory()
+    assert MembershipService.expire_memberships(db, batch_size=1) == [1]
+    assert dict(db.query(User.id, User.is_member).all()) == {1: 0, 2: 1, 3: 0}
+    assert MembershipService.expire_memberships(db) == []
+    db.close()
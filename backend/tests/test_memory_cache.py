@@ -0,0 +1,134 @@
+"""
+MemoryCache 单元测试
+"""
+import threading
+import time
+
+import pytest
+
+from app.utils.memory_cache import MemoryCache
+
+
+class TestMemoryCache:
+    """测试进程内 TTL + LRU 缓存"""
+
+    def test_set_and_get(self):
+        """测试基本读写"""
+        cache = MemoryCache(sweep_interval=0)
+        assert cache.set("a", "1")
+        assert cache.get("a") == "1"
+        assert cache.exists("a")
+        assert cache.delete("a")
+        assert cache.get("a") is None
+
+    def test_expire(self):
+        """测试按键过期"""
+        cache = MemoryCache(sweep_interval=0)
+        cache.set("a", "1", expire=1)
+        cache.set("b", "2")
+        assert cache.ttl("a") in (0, 1)
+        assert cache.ttl("b") == -1
+        time.sleep(1.1)
+        assert cache.get("a") is None
+        assert cache.get("b") == "2"
+
+    def test_lru_eviction_by_entries(self):
+        """测试超过条目上限时淘汰最久未使用的键"""
+        cache = MemoryCache(max_entries=2, sweep_interval=0)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")
+        cache.set("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert cache.stats()["evictions"] == 1
+
+    def test_eviction_by_bytes(self):
+        """测试超过字节上限时淘汰"""
+        cache = MemoryCache(max_bytes=10, sweep_interval=0)
+        cache.set("a", "12345")
+        cache.set("b", "12345")
+        cache.set("c", "12345")
+        assert cache.get("a") is None
+        assert cache.stats()["bytes"] <= 10
+        # 单个值超过预算不缓存
+        assert not cache.set("big", "x" * 11)
+
+    def test_incr(self):
+        """测试计数器"""
+        cache = MemoryCache(sweep_interval=0)
+        assert cache.incr("n") == 1
+        assert cache.incr("n", 5) == 6
+        assert cache.incr("n", -2) == 4
+        cache.set("s", '"text"')
+        with pytest.raises(ValueError):
+            cache.incr("s")
+
+    def test_incr_thread_safe(self):
+        """测试并发计数不丢失"""
+        cache = MemoryCache(sweep_interval=0)
+
+        def worker():
+            for _ in range(1000):
+                cache.incr("n")
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert cache.get("n") == "8000"
+
+    def test_clear_pattern(self):
+        """测试按模式删除"""
+        cache = MemoryCache(sweep_interval=0)
+        cache.set("user:1:quota", "1")
+        cache.set("user:1:profile", "1")
+        cache.set("user:2:quota", "1")
+        assert cache.clear_pattern("user:1:*") == 2
+        assert cache.keys("user:*") == ["user:2:quota"]
+
+    def test_bulk_operations(self):
+        """测试批量读写删除及按键过期时间"""
+        cache = MemoryCache(sweep_interval=0)
+        assert cache.set_many({"a": "1", "b": "2", "c": "3"}, expire={"a": 1, "b": 60})
+        assert cache.get_many(["a", "b", "c", "missing"]) == {"a": "1", "b": "2", "c": "3"}
+        assert cache.ttl("b") > 1
+        assert cache.ttl("c") == -1
+        time.sleep(1.1)
+        assert cache.get_many(["a", "b"]) == {"b": "2"}
+        assert cache.delete_many(["a", "b", "c"]) == 2
+        assert len(cache) == 0
+
+    def test_invalidate_tags(self):
+        """测试按标签批量删除"""
+        cache = MemoryCache(sweep_interval=0)
+        cache.set("user:1:quota", "1", tags=["user:1"])
+        cache.set("user:1:available_models:writing", "1", tags=["user:1", "user:1:available_models"])
+        cache.set("user:2:quota", "1", tags=["user:2"])
+        assert sorted(cache.invalidate_tags("user:1")) == [
+            "user:1:available_models:writing",
+            "user:1:quota",
+        ]
+        assert cache.keys("user:*") == ["user:2:quota"]
+        assert cache.invalidate_tags("user:1") == []
+
+    def test_tags_survive_incr_and_cleanup_on_evict(self):
+        """测试计数保留标签，淘汰时清理标签索引"""
+        cache = MemoryCache(max_entries=1, sweep_interval=0)
+        cache.set("n", "1", tags=["t"])
+        cache.incr("n")
+        assert cache.invalidate_tags("t") == ["n"]
+        cache.set("a", "1", tags=["t"])
+        cache.set("b", "1")
+        assert cache.invalidate_tags("t") == []
+        assert cache.get("b") == "1"
+
+    def test_background_sweep(self):
+        """测试后台线程清理过期键"""
+        cache = MemoryCache(sweep_interval=0.2)
+        cache.set("a", "1", expire=1)
+        time.sleep(1.5)
+        assert len(cache) == 0
+        cache.stop()
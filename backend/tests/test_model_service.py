@@ -0,0 +1,71 @@
+"""
+可用模型列表缓存失效测试
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import get_db
+from app.utils import deps  # noqa: F401  先于 app.api 导入，避免循环导入
+from app.core.security import get_current_user
+from app.api.v1 import models as models_api
+from app.models.ai_model import AIModel
+from app.models.user import User, UserRole
+from app.services.model_service import ModelService
+from app.utils import cache as _cache
+from app.utils.cache import Cache
+
+
+@pytest.fixture
+def db(sqlite_engine, monkeypatch):
+    monkeypatch.setattr(_cache, "REDIS_AVAILABLE", False)
+    Cache.clear_pattern("user:*")
+    session = sessionmaker(bind=sqlite_engine)()
+    session.add_all([
+        User(id=1, username="admin", email="admin@example.com", password_hash="x", role=UserRole.ADMIN),
+        User(id=2, username="bob", email="bob@example.com", password_hash="x"),
+        AIModel(id=1, user_id=1, name="内置", provider="openai", model_name="gpt-4o-mini",
+                api_key="sk", is_system_builtin=True),
+        AIModel(id=2, user_id=2, name="自有", provider="openai", model_name="gpt-4o", api_key="sk"),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    Cache.clear_pattern("user:*")
+
+
+def _names(db, user_id):
+    return sorted(m.display_name for m in ModelService.get_available_models(db, user_id).models)
+
+
+def test_editing_builtin_model_refreshes_every_user(db):
+    """测试管理员编辑系统内置模型后，其他用户缓存的列表也被清除"""
+    app = FastAPI()
+    app.include_router(models_api.router, prefix="/models")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_user] = lambda: db.get(User, 1)
+    client = TestClient(app)
+
+    assert _names(db, 2) == ["内置（系统）", "自有 (openai)"]
+
+    assert client.put("/models/1", json={"name": "新内置"}).status_code == 200
+    assert _names(db, 2) == ["新内置（系统）", "自有 (openai)"]
+
+    # 取消内置标记后从其他用户的列表中移除
+    assert client.put("/models/1", json={"is_system_builtin": False}).status_code == 200
+    assert _names(db, 2) == ["自有 (openai)"]
+
+
+def test_user_model_change_only_invalidates_owner(db):
+    """测试用户自有模型变更只清除本人的缓存"""
+    assert _names(db, 1) == ["内置（系统）"]
+    assert _names(db, 2) == ["内置（系统）", "自有 (openai)"]
+
+    db.get(AIModel, 1).name = "改名"
+    db.get(AIModel, 2).name = "改名"
+    db.commit()
+    ModelService.invalidate_available_models(2)
+
+    assert _names(db, 1) == ["内置（系统）"]
+    assert _names(db, 2) == ["改名 (openai)", "改名（系统）"]
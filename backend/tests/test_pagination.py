@@ -0,0 +1,38 @@
+"""
+游标分页工具测试
+"""
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+from app.utils.pagination import decode_cursor, encode_cursor, split_page
+
+
+class TestPagination:
+    """游标分页测试"""
+
+    def test_cursor_roundtrip(self):
+        """测试游标编码后可以还原"""
+        created_at = datetime(2024, 6, 1, 12, 30, 15, 123456)
+        cursor = encode_cursor(created_at, 42)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == (created_at, 42)
+
+    def test_invalid_cursor(self):
+        """测试无效游标返回 400"""
+        with pytest.raises(HTTPException) as exc_info:
+            decode_cursor("not-a-cursor")
+        assert exc_info.value.status_code == 400
+
+    def test_split_page(self):
+        """测试多取一条判断是否有下一页"""
+        rows = [SimpleNamespace(id=i, created_at=datetime(2024, 6, 1, 12, 0, i)) for i in range(3, 0, -1)]
+        items, next_cursor = split_page(rows, 2)
+        assert [r.id for r in items] == [3, 2]
+        assert decode_cursor(next_cursor) == (rows[1].created_at, 2)
+
+        items, next_cursor = split_page(rows, 3)
+        assert len(items) == 3
+        assert next_cursor is None
@@ -0,0 +1,50 @@
+"""
+密码哈希线程池测试
+"""
+import asyncio
+import threading
+
+from app.core.password_pool import PasswordHashPool
+from app.core.security import aget_password_hash, averify_password, verify_password
+
+
+class TestPasswordHashPool:
+    """PasswordHashPool 测试"""
+
+    def test_concurrency_limit(self):
+        """测试同时执行的任务数不超过线程数，超出部分排队"""
+        pool = PasswordHashPool(2)
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def work():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            threading.Event().wait(0.05)
+            with lock:
+                running.pop()
+            return True
+
+        async def main():
+            return await asyncio.gather(*(pool.arun(work) for _ in range(6)))
+
+        assert asyncio.run(main()) == [True] * 6
+        assert max(peak) == 2
+        stats = pool.stats()
+        assert stats["completed"] == 6
+        assert stats["pending"] == 0
+        assert stats["max_queue_ms"] > 0
+        pool.shutdown()
+
+    def test_hash_and_verify(self):
+        """测试异步哈希结果可被同步校验"""
+        async def main():
+            hashed = await aget_password_hash("secret123")
+            return hashed, await averify_password("secret123", hashed)
+
+        hashed, ok = asyncio.run(main())
+        assert ok
+        assert verify_password("secret123", hashed)
+        assert not verify_password("wrong", hashed)
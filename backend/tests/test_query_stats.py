@@ -0,0 +1,91 @@
+"""
+SQL 查询统计测试
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+
+from app.core.config import settings
+from app.core.query_stats import (
+    UNMATCHED_ENDPOINT,
+    QueryStatsMiddleware,
+    assert_max_queries,
+    install_query_instrumentation,
+    normalize_sql,
+    query_metrics,
+)
+
+
+@pytest.fixture
+def client():
+    install_query_instrumentation()
+    query_metrics.reset()
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    app = FastAPI()
+    app.add_middleware(QueryStatsMiddleware)
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: int):
+        with engine.connect() as conn:
+            for _ in range(item_id):
+                conn.execute(text("SELECT :id"), {"id": item_id})
+        return {"ok": True}
+
+    yield TestClient(app)
+    engine.dispose()
+
+
+def test_normalize_sql():
+    """测试去掉参数和字面量，IN 列表和批量 VALUES 归并"""
+    assert normalize_sql(
+        "SELECT * FROM users\n WHERE id IN (%(id_1_1)s, %(id_1_2)s) AND status = 'it''s' LIMIT 10"
+    ) == "SELECT * FROM users WHERE id IN (...) AND status = ? LIMIT ?"
+    assert normalize_sql("INSERT INTO t (a, b) VALUES (?, ?), (?, ?), (?, ?)") == "INSERT INTO t (a, b) VALUES (?, ?), ..."
+    assert normalize_sql("SELECT anon_1.id FROM t WHERE x = :x_1") == "SELECT anon_1.id FROM t WHERE x = ?"
+
+
+def test_request_stats_and_metrics(client, monkeypatch):
+    """测试按请求统计 SQL 条数，DEBUG 模式返回响应头，并按路由模板汇总"""
+    monkeypatch.setattr(settings, "DEBUG", True)
+    response = client.get("/items/3")
+    assert response.headers["X-DB-Query-Count"] == "3"
+    assert float(response.headers["X-DB-Time-Ms"]) >= 0
+    client.get("/items/1")
+
+    endpoint = query_metrics.stats()["endpoints"][0]
+    assert endpoint["endpoint"] == "GET /items/{item_id}"
+    assert (endpoint["requests"], endpoint["avg_queries"], endpoint["max_queries"]) == (2, 2.0, 3)
+
+    monkeypatch.setattr(settings, "DEBUG", False)
+    assert "X-DB-Query-Count" not in client.get("/items/1").headers
+
+
+def test_unmatched_requests_share_one_entry(client):
+    """测试 404 和方法不匹配的请求不按原始路径各占一项"""
+    for i in range(3):
+        assert client.get(f"/nope/{i}").status_code == 404
+    assert client.delete("/items/1").status_code == 405
+    endpoints = query_metrics.stats()["endpoints"]
+    assert [(e["endpoint"], e["requests"]) for e in endpoints] == [(UNMATCHED_ENDPOINT, 4)]
+
+
+def test_slow_queries(client, monkeypatch):
+    """测试超过阈值的语句计入慢查询"""
+    monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 0)
+    client.get("/items/2")
+    slow = query_metrics.stats()["slow_queries"]
+    assert [(s["sql"], s["count"]) for s in slow] == [("SELECT ?", 2)]
+    assert query_metrics.stats()["endpoints"][0]["slow_queries"] == 2
+
+
+def test_assert_max_queries(client):
+    """测试 SQL 条数超出上限时断言失败并列出语句"""
+    with assert_max_queries(2) as stats:
+        client.get("/items/2")
+    assert stats.statements == ["SELECT ?", "SELECT ?"]
+
+    with pytest.raises(AssertionError, match="期望最多 2 条SQL，实际执行 3 条"):
+        with assert_max_queries(2):
+            client.get("/items/3")
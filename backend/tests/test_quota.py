@@ -0,0 +1,145 @@
+"""
+每日配额测试（进程内计数、Redis Lua 脚本）
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.database import get_db
+from app.core.security import create_access_token
+from app.utils import cache as _cache
+from app.utils import quota
+from app.utils.quota import daily_quota, daily_quota_counter, dirty_key, quota_key
+
+
+class TestDailyQuota:
+    """每日配额测试"""
+
+    def setup_method(self):
+        daily_quota_counter.clear_local()
+
+    def test_counter_rejects_without_consuming(self):
+        """测试超出配额的请求被拒绝且不占用额度"""
+        results = [daily_quota_counter.hit(1, limit=5, cost=2) for _ in range(3)]
+        assert [r.allowed for r in results] == [True, True, False]
+        assert daily_quota_counter.usage(1) == 4
+        # 剩余 1 次仍可使用
+        assert daily_quota_counter.hit(1, limit=5).allowed
+        assert daily_quota_counter.usage(1) == 5
+        assert daily_quota_counter.usage(2) == 0
+
+        headers = results[2].headers()
+        assert headers["X-Quota-Remaining"] == "1"
+        # 次日零点重置
+        assert 0 < int(headers["Retry-After"]) <= 86400
+        assert int(headers["X-Quota-Reset"]) > time.time()
+
+    def test_dependency(self, monkeypatch):
+        """测试依赖按用户 daily_quota 限额并返回配额响应头"""
+        monkeypatch.setattr(quota, "load_auth_user", lambda db, user_id: SimpleNamespace(id=user_id, daily_quota=2))
+        app = FastAPI()
+        app.dependency_overrides[get_db] = lambda: None
+
+        @app.post("/generate", dependencies=[Depends(daily_quota())])
+        def generate():
+            return {"ok": True}
+
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_access_token(7)}"}
+        first = client.post("/generate", headers=headers)
+        assert first.status_code == 200
+        assert (first.headers["X-Quota-Limit"], first.headers["X-Quota-Remaining"]) == ("2", "1")
+        assert client.post("/generate", headers=headers).status_code == 200
+        response = client.post("/generate", headers=headers)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+        # 未登录请求交给接口自身的认证处理
+        assert client.post("/generate").status_code == 200
+
+    def test_dependency_refunds_failed_requests(self, monkeypatch):
+        """测试接口抛出异常或参数校验失败时退还配额"""
+        monkeypatch.setattr(quota, "load_auth_user", lambda db, user_id: SimpleNamespace(id=user_id, daily_quota=1))
+        app = FastAPI()
+        app.dependency_overrides[get_db] = lambda: None
+
+        @app.post("/generate", dependencies=[Depends(daily_quota())])
+        def generate(fail: bool = False, count: int = 1):
+            if fail:
+                raise HTTPException(status_code=500, detail="生成失败")
+            return {"ok": True}
+
+        client = TestClient(app)
+        headers = {"Authorization": f"Bearer {create_access_token(7)}"}
+        assert client.post("/generate", params={"fail": True}, headers=headers).status_code == 500
+        assert daily_quota_counter.usage(7) == 0
+        assert client.post("/generate", params={"count": "x"}, headers=headers).status_code == 422
+        assert daily_quota_counter.usage(7) == 0
+        assert client.post("/generate", headers=headers).status_code == 200
+        assert client.post("/generate", headers=headers).status_code == 429
+        assert daily_quota_counter.usage(7) == 1
+
+    def test_refund_never_goes_negative(self):
+        """测试退还不会使用量小于 0"""
+        daily_quota_counter.hit(1, limit=5, cost=2)
+        assert daily_quota_counter.refund(1, cost=3) == 0
+        assert daily_quota_counter.refund(1) == 0
+        assert daily_quota_counter.usage(1) == 0
+
+
+class TestQuotaScript:
+    """Redis Lua 脚本测试（fakeredis）"""
+
+    @pytest.fixture(autouse=True)
+    def fake_redis(self, monkeypatch):
+        server = fakeredis.FakeServer()
+        client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        monkeypatch.setattr(_cache, "REDIS_AVAILABLE", True)
+        monkeypatch.setattr(_cache, "redis_client", client)
+        monkeypatch.setattr(quota, "get_async_redis", lambda: async_client)
+        daily_quota_counter.clear_local()
+        return client
+
+    def test_incr_expire_and_rollback(self, fake_redis):
+        """测试计数设置次日零点后的过期时间，超限请求回退计数且不登记待同步"""
+        today = datetime.now().date()
+        key = quota_key(1, today)
+        results = [daily_quota_counter.hit(1, limit=5, cost=2) for _ in range(3)]
+        assert [(r.allowed, r.used) for r in results] == [(True, 2), (True, 4), (False, 4)]
+        assert fake_redis.get(key) == "4"
+
+        expire_at = int((datetime(today.year, today.month, today.day) + timedelta(days=1)).timestamp())
+        expire_at += quota.settings.QUOTA_KEY_RETENTION_DAYS * 86400
+        assert abs(fake_redis.ttl(key) - (expire_at - time.time())) <= 2
+        assert fake_redis.smembers(dirty_key(today)) == {"1"}
+        assert fake_redis.ttl(dirty_key(today)) > 0
+
+        # 超限被拒绝的用户不登记到待同步集合
+        fake_redis.delete(dirty_key(today))
+        assert not daily_quota_counter.hit(1, limit=4).allowed
+        assert fake_redis.exists(dirty_key(today)) == 0
+        assert daily_quota_counter.usage(1) == 4
+        assert daily_quota_counter.pop_dirty(today, 10) == {}
+
+    def test_refund_script(self, fake_redis):
+        """测试退还脚本扣减计数、不小于 0，并登记待同步"""
+        today = datetime.now().date()
+
+        async def main():
+            await daily_quota_counter.ahit(1, limit=5, cost=3)
+            fake_redis.delete(dirty_key(today))
+            return await daily_quota_counter.arefund(1, cost=2, day=today)
+
+        assert asyncio.run(main()) == 1
+        assert daily_quota_counter.pop_dirty(today, 10) == {1: 1}
+        assert daily_quota_counter.refund(1, cost=5) == 0
+        assert fake_redis.get(quota_key(1, today)) == "0"
+        # 没有计数（已过期）时不创建键
+        assert daily_quota_counter.refund(2) == 0
+        assert fake_redis.exists(quota_key(2, today)) == 0
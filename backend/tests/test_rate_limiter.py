@@ -0,0 +1,179 @@
+"""
+限流工具测试（进程内限流、Redis Lua 脚本、客户端 IP 识别）
+"""
+import asyncio
+import threading
+import uuid
+
+import fakeredis
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.utils import cache as _cache
+from app.utils import rate_limiter
+from app.utils.rate_limiter import (
+    RateLimiter,
+    TOKEN_BUCKET,
+    _local_store,
+    get_client_ip,
+    rate_limit,
+)
+
+
+class TestRateLimiter:
+    """RateLimiter 测试"""
+
+    def setup_method(self):
+        _local_store.clear()
+
+    def test_sliding_window(self):
+        """测试滑动窗口在窗口内限制请求数"""
+        limiter = RateLimiter(limit=3, window=60)
+        key = uuid.uuid4().hex
+        results = [limiter.hit(key) for _ in range(4)]
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert results[2].remaining == 0
+        assert 0 < results[3].retry_after <= 60
+        assert results[3].headers()["Retry-After"] == "60"
+
+    def test_sliding_window_concurrent(self):
+        """测试并发请求不会超过限额"""
+        limiter = RateLimiter(limit=50, window=60)
+        key = uuid.uuid4().hex
+        allowed = []
+
+        def worker():
+            for _ in range(20):
+                allowed.append(limiter.hit(key).allowed)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert sum(allowed) == 50
+
+    def test_token_bucket_burst(self):
+        """测试令牌桶允许突发到容量上限"""
+        limiter = RateLimiter(limit=60, window=60, algorithm=TOKEN_BUCKET, burst=5)
+        key = uuid.uuid4().hex
+        results = [limiter.hit(key) for _ in range(6)]
+        assert [r.allowed for r in results] == [True] * 5 + [False]
+        # 每秒补充 1 个令牌
+        assert 0 < results[5].retry_after <= 1
+
+    def test_async_hit(self):
+        """测试异步接口"""
+        limiter = RateLimiter(limit=1, window=60)
+        key = uuid.uuid4().hex
+
+        async def main():
+            return [(await limiter.ahit(key)).allowed for _ in range(2)]
+
+        assert asyncio.run(main()) == [True, False]
+
+    def test_dependency_returns_retry_after(self):
+        """测试路由依赖超限返回 429 和 Retry-After"""
+        app = FastAPI()
+
+        @app.get("/limited", dependencies=[Depends(rate_limit(2, 60))])
+        def limited():
+            return {"ok": True}
+
+        client = TestClient(app)
+        assert client.get("/limited").status_code == 200
+        assert client.get("/limited").status_code == 200
+        response = client.get("/limited")
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) > 0
+
+
+class TestRedisScripts:
+    """Redis Lua 脚本测试（fakeredis）"""
+
+    @pytest.fixture(autouse=True)
+    def fake_redis(self, monkeypatch):
+        server = fakeredis.FakeServer()
+        client = fakeredis.FakeRedis(server=server, decode_responses=True)
+        async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+        monkeypatch.setattr(_cache, "REDIS_AVAILABLE", True)
+        monkeypatch.setattr(_cache, "redis_client", client)
+        monkeypatch.setattr(rate_limiter, "get_async_redis", lambda: async_client)
+        _local_store.clear()
+        return client
+
+    def test_sliding_window_script(self, fake_redis):
+        """测试滑动窗口脚本在窗口内限制请求数并返回重试时间"""
+        limiter = RateLimiter(limit=3, window=60, prefix="test")
+        results = [limiter.hit("u1") for _ in range(4)]
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert [r.remaining for r in results[:3]] == [2, 1, 0]
+        assert 59 < results[3].retry_after <= 60
+        assert fake_redis.zcard("test:u1") == 3
+        assert 0 < fake_redis.pttl("test:u1") <= 60000
+        # 状态在 Redis 中，未落到进程内存储
+        assert limiter.hit("u2").allowed
+        assert _local_store._store.get("test:u1") is None
+
+    def test_token_bucket_script(self, fake_redis):
+        """测试令牌桶脚本允许突发到容量上限，按速率给出重试时间"""
+        limiter = RateLimiter(limit=60, window=60, algorithm=TOKEN_BUCKET, burst=5, prefix="test")
+        results = [limiter.hit("u1") for _ in range(6)]
+        assert [r.allowed for r in results] == [True] * 5 + [False]
+        assert results[0].limit == 5
+        assert results[4].remaining == 0
+        assert 0 < results[5].retry_after <= 1
+        assert float(fake_redis.hget("test:u1", "tokens")) < 1
+        # cost 大于剩余令牌时拒绝
+        assert not limiter.hit("u2", cost=6).allowed
+        assert limiter.hit("u2", cost=5).allowed
+
+    def test_async_scripts(self, fake_redis):
+        """测试异步接口执行同一脚本，与同步接口共享计数"""
+        window = RateLimiter(limit=2, window=60, prefix="test")
+        bucket = RateLimiter(limit=60, window=60, algorithm=TOKEN_BUCKET, burst=2, prefix="bucket")
+
+        async def main():
+            return (
+                [(await window.ahit("u1")).allowed for _ in range(2)],
+                [(await bucket.ahit("u1")).allowed for _ in range(3)],
+            )
+
+        window_results, bucket_results = asyncio.run(main())
+        assert window_results == [True, True]
+        assert bucket_results == [True, True, False]
+        assert not window.hit("u1").allowed
+
+
+class TestClientIp:
+    """客户端 IP 识别测试"""
+
+    @staticmethod
+    def _client_ip(peer, headers):
+        app = FastAPI()
+
+        @app.get("/ip")
+        def ip(request: Request):
+            return {"ip": get_client_ip(request)}
+
+        client = TestClient(app, client=(peer, 50000))
+        return client.get("/ip", headers=headers).json()["ip"]
+
+    def test_ignores_forwarded_headers_from_untrusted_peer(self, monkeypatch):
+        """测试直连客户端伪造的转发头不被采信"""
+        monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8"])
+        headers = {"X-Real-IP": "1.1.1.1", "X-Forwarded-For": "2.2.2.2"}
+        assert self._client_ip("203.0.113.9", headers) == "203.0.113.9"
+        assert self._client_ip("203.0.113.9", {}) == "203.0.113.9"
+
+    def test_trusted_proxy_chain(self, monkeypatch):
+        """测试经可信代理转发时取最右侧的不可信地址"""
+        monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8", "not-an-ip"])
+        # 客户端自带的伪造值位于左侧，不会被选中
+        headers = {"X-Forwarded-For": "6.6.6.6, 203.0.113.9, 10.0.0.2"}
+        assert self._client_ip("10.0.0.1", headers) == "203.0.113.9"
+        assert self._client_ip("10.0.0.1", {"X-Real-IP": "203.0.113.9"}) == "203.0.113.9"
+        assert self._client_ip("10.0.0.1", {"X-Forwarded-For": "10.0.0.3"}) == "10.0.0.3"
+        assert self._client_ip("10.0.0.1", {}) == "10.0.0.1"
@@ -0,0 +1,41 @@
+"""
+只读副本路由测试
+"""
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core import database
+
+
+class TestReadReplica:
+    """get_read_db 路由测试"""
+
+    def test_without_replica_uses_primary(self, monkeypatch):
+        """测试未配置副本时使用主库"""
+        monkeypatch.setattr(database, "read_engine", None)
+        gen = database.get_read_db()
+        db = next(gen)
+        assert db.get_bind() is database.engine
+        gen.close()
+
+    def test_replica_failure_falls_back_to_primary(self, monkeypatch, tmp_path):
+        """测试副本连接失败时回退主库，并在重试间隔内不再尝试副本"""
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+        monkeypatch.setattr(database, "read_engine", broken)
+        monkeypatch.setattr(database, "ReadSessionLocal", sessionmaker(bind=broken))
+        monkeypatch.setattr(database, "_replica_down_until", 0.0)
+        monkeypatch.setattr(database, "_replica_fallbacks", 0)
+
+        db = database._open_read_session()
+        assert db.get_bind() is database.engine
+        db.close()
+
+        stats = database.get_pool_stats()
+        assert stats["replica"]["healthy"] is False
+        assert stats["replica"]["fallbacks"] == 1
+        assert "checkedout" in stats["primary"]
+
+        db = database._open_read_session()
+        assert db.get_bind() is database.engine
+        db.close()
+        assert database._replica_fallbacks == 1
@@ -0,0 +1,166 @@
+"""
+讯飞星火 WebSocket 连接池测试（使用本地模拟服务）
+"""
+import asyncio
+import threading
+
+import pytest
+
+from app.services.langchain.chat.providers import spark_pool
+from app.services.langchain.chat.providers.spark import ChatSpark
+from app.services.langchain.chat.providers.spark_pool import (
+    SparkUrlSigner,
+    close_spark_pools,
+    get_async_pool,
+    get_sync_pool,
+)
+from scripts.spark_stub_server import SparkStubServer, StubOptions, verify_signature
+
+
+def _model(server: SparkStubServer, **kwargs) -> ChatSpark:
+    return ChatSpark(
+        api_base=server.url,
+        app_id="stub",
+        api_key=server.options.api_key,
+        api_secret=server.options.api_secret,
+        timeout=5.0,
+        **kwargs
+    )
+
+
+def test_keep_open_connection_is_reused():
+    """测试服务端保持连接时，多次调用只握手一次"""
+
+    async def main():
+        async with SparkStubServer(StubOptions(handshake_ms=0, keep_open=True)) as server:
+            model = _model(server)
+            replies = [(await model.ainvoke(f"问题{i}")).content for i in range(3)]
+            pool = get_async_pool(model._endpoint(), model.api_key, model.api_secret)
+            stats = pool.stats()
+            await close_spark_pools()
+            return replies, server.stats, stats
+
+    replies, server_stats, stats = asyncio.run(main())
+    assert replies == ["收到：问题0", "收到：问题1", "收到：问题2"]
+    assert server_stats.handshakes == 1
+    assert server_stats.requests == 3
+    assert stats["size"] == 1 and stats["idle"] == 1
+
+
+def test_closed_connection_is_replaced_in_background():
+    """测试服务端在响应后关闭连接时，下一次调用使用后台预建的连接"""
+
+    async def main():
+        async with SparkStubServer(StubOptions(handshake_ms=50)) as server:
+            model = _model(server)
+            await model.ainvoke("第一次")
+            await asyncio.sleep(0.2)  # 等待备用连接建立
+            pool = get_async_pool(model._endpoint(), model.api_key, model.api_secret)
+            stats = pool.stats()
+
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            reply = await model.ainvoke("第二次")
+            elapsed = loop.time() - started
+            await close_spark_pools()
+            return reply.content, stats, elapsed, server.stats
+
+    reply, stats, elapsed, server_stats = asyncio.run(main())
+    assert reply == "收到：第二次"
+    assert stats["idle"] == 1
+    assert elapsed < 0.05  # 没有等待握手
+    assert server_stats.requests == 2
+
+
+def test_direct_mode_connects_per_call():
+    """测试关闭连接池时每次调用新建连接"""
+
+    async def main():
+        async with SparkStubServer(StubOptions(handshake_ms=0, keep_open=True)) as server:
+            model = _model(server, use_pool=False)
+            for i in range(2):
+                await model.ainvoke(f"问题{i}")
+            return server.stats
+
+    server_stats = asyncio.run(main())
+    assert server_stats.handshakes == 2
+
+
+def test_stale_idle_connection_is_retried(monkeypatch):
+    """测试复用的空闲连接已断开时换新连接重试"""
+
+    async def main():
+        async with SparkStubServer(StubOptions(handshake_ms=0, keep_open=True)) as server:
+            model = _model(server)
+            await model.ainvoke("第一次")
+            pool = get_async_pool(model._endpoint(), model.api_key, model.api_secret)
+            # 模拟连接在被监测到关闭之前就被取走使用
+            for task in list(pool._tasks):
+                task.cancel()
+            monkeypatch.setattr(spark_pool, "_is_open", lambda ws: True)
+            ws, _ = pool._idle[0]
+            ws.transport.abort()
+            await asyncio.sleep(0)
+            reply = await model.ainvoke("第二次")
+            await close_spark_pools()
+            return reply.content, server.stats
+
+    reply, server_stats = asyncio.run(main())
+    assert reply == "收到：第二次"
+    assert server_stats.handshakes == 2
+
+
+def test_sync_pool_reuses_connection():
+    """测试同步调用复用连接"""
+    loop = asyncio.new_event_loop()
+    server = SparkStubServer(StubOptions(handshake_ms=0, keep_open=True))
+    loop.run_until_complete(server.start())
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        model = _model(server)
+        assert model.invoke("你好").content == "收到：你好"
+        assert model.invoke("再见").content == "收到：再见"
+        pool = get_sync_pool(model._endpoint(), model.api_key, model.api_secret)
+        assert pool.stats()["size"] == 1
+        pool.close()
+        assert server.stats.handshakes == 1
+    finally:
+        asyncio.run_coroutine_threadsafe(server.stop(), loop).result(5)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(5)
+        loop.close()
+
+
+def test_invalid_secret_is_rejected():
+    """测试签名错误时握手失败并抛出 ValueError"""
+
+    async def main():
+        async with SparkStubServer(StubOptions(handshake_ms=0)) as server:
+            model = _model(server)
+            model.api_secret = "wrong-secret"
+            with pytest.raises(ValueError, match="讯飞星火 API 调用失败"):
+                await model.ainvoke("你好")
+            await close_spark_pools()
+            return server.stats
+
+    assert asyncio.run(main()).rejected == 1
+
+
+def test_signed_url_is_cached_until_ttl(monkeypatch):
+    """测试签名 URL 在有效期内复用，过期前重新签名"""
+    signer = SparkUrlSigner("wss://spark-api.xf-yun.com/v3.5/chat", "key", "secret")
+    clock = [1000.0]
+    monkeypatch.setattr(spark_pool.time, "monotonic", lambda: clock[0])
+
+    first = signer.signed_url()
+    assert signer.signed_url() is first
+
+    calls = []
+    monkeypatch.setattr(signer, "sign", lambda: calls.append(1) or "renewed")
+    clock[0] += spark_pool.SIGNATURE_TTL + 1
+    assert signer.signed_url() == "renewed"
+    assert calls == [1]
+
+    path = first.split("spark-api.xf-yun.com", 1)[1]
+    assert verify_signature(path, "spark-api.xf-yun.com", StubOptions(api_key="key", api_secret="secret")) == ""
@@ -0,0 +1,173 @@
+"""
+SSE 增量解析和豆包异步流式输出测试
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackHandler, BaseCallbackHandler
+
+from app.core.http_client import close_http_clients
+from app.services.langchain.chat.providers.doubao import ChatDoubao
+from app.utils.sse import SSEDecoder
+
+
+def _feed_all(decoder: SSEDecoder, chunks):
+    events = []
+    for chunk in chunks:
+        events.extend(decoder.feed(chunk))
+    events.extend(decoder.flush())
+    return events
+
+
+def test_decoder_handles_chunk_boundaries():
+    """测试跨块的半行、被切开的 UTF-8 字符和 \\r\\n"""
+    raw = 'data: {"text": "你好"}\r\n\r\n: ping\n\nevent: done\ndata: a\ndata: b\n\n'.encode("utf-8")
+    expected = [("message", '{"text": "你好"}'), ("done", "a\nb")]
+
+    # 逐字节输入覆盖所有切分位置
+    events = _feed_all(SSEDecoder(), [raw[i:i + 1] for i in range(len(raw))])
+    assert [(e.event, e.data) for e in events] == expected
+
+    for size in (2, 3, 5, 7):
+        events = _feed_all(SSEDecoder(), [raw[i:i + size] for i in range(0, len(raw), size)])
+        assert [(e.event, e.data) for e in events] == expected
+
+
+def test_decoder_cr_split_and_flush():
+    """测试 \\r 与 \\n 分在两块时不产生多余空行，结尾没有空行的事件在 flush 时返回"""
+    decoder = SSEDecoder()
+    assert decoder.feed(b"data: 1\r") == []
+    assert decoder.feed(b"\ndata: 2\r") == []
+    assert [e.data for e in decoder.feed(b"\n\r\n")] == ["1\n2"]
+    assert decoder.feed(b"data: [DONE]") == []
+    assert [e.data for e in decoder.flush()] == ["[DONE]"]
+
+
+def _sse_body(contents, usage):
+    frames = []
+    for content in contents:
+        frames.append({"choices": [{"index": 0, "delta": {"content": content}, "finish_reason": None}]})
+    frames.append({"choices": [{"index": 0, "delta": {"content": ""}, "finish_reason": "stop"}]})
+    frames.append({"choices": [], "usage": usage})
+    body = "".join(f"data: {json.dumps(f, ensure_ascii=False)}\n\n" for f in frames) + "data: [DONE]\n\n"
+    return body.encode("utf-8")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"  # 以关闭连接结束响应体
+    payloads = []
+    delay = 0.05
+
+    def do_POST(self):
+        length = int(self.headers["Content-Length"])
+        self.payloads.append(json.loads(self.rfile.read(length)))
+        body = _sse_body(["你", "好，", "世界"], {"prompt_tokens": 5, "completion_tokens": 3, "total_tokens": 8})
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        # 按 7 字节分块发送，切开 JSON 和中文字符
+        for i in range(0, len(body), 7):
+            self.wfile.write(body[i:i + 7])
+            self.wfile.flush()
+            if i == 0:
+                time.sleep(self.delay)
+            else:
+                time.sleep(0.001)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server(reset_http_clients):
+    _Handler.payloads = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+class _Recorder(AsyncCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+        self.generation_info = None
+
+    async def on_chat_model_start(self, *args, **kwargs):
+        pass
+
+    async def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+
+    async def on_llm_end(self, response, **kwargs):
+        self.generation_info = response.generations[0][0].generation_info
+
+
+def test_doubao_astream_yields_tokens_and_metrics(server):
+    """测试异步流式输出逐块返回内容，回调中可以取到首 token 耗时和生成速度"""
+    model = ChatDoubao(api_key="test", api_base=server, timeout=5.0)
+    recorder = _Recorder()
+
+    async def main():
+        ticks = 0
+        stop = asyncio.Event()
+
+        async def ticker():
+            # 流式读取期间事件循环不应被阻塞
+            nonlocal ticks
+            while not stop.is_set():
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        task = asyncio.create_task(ticker())
+        try:
+            chunks = [c async for c in model.astream("你好", config={"callbacks": [recorder]})]
+        finally:
+            # 关闭本事件循环打开的共享连接池
+            await close_http_clients()
+        stop.set()
+        await task
+        return chunks, ticks
+
+    chunks, ticks = asyncio.run(main())
+    assert "".join(c.content for c in chunks) == "你好，世界"
+    assert [t for t in recorder.tokens if t] == ["你", "好，", "世界"]
+    assert ticks >= 5
+
+    payload = _Handler.payloads[0]
+    assert payload["stream"] is True
+    assert payload["stream_options"] == {"include_usage": True}
+
+    info = recorder.generation_info
+    assert info["finish_reason"] == "stop"
+    assert info["usage_metadata"] == {"input_tokens": 5, "output_tokens": 3, "total_tokens": 8}
+    metrics = info["stream_metrics"]
+    assert metrics["ttft_ms"] >= _Handler.delay * 1000 * 0.8
+    assert metrics["completion_tokens"] == 3
+    assert metrics["tokens_per_second"] > 0
+
+
+def test_doubao_sync_stream_reports_each_token_once(server):
+    """测试同步流式输出每个分块只触发一次 on_llm_new_token"""
+    model = ChatDoubao(api_key="test", api_base=server, timeout=5.0)
+    tokens = []
+
+    class Recorder(BaseCallbackHandler):
+        def on_chat_model_start(self, *args, **kwargs):
+            pass
+
+        def on_llm_new_token(self, token, **kwargs):
+            if token:
+                tokens.append(token)
+
+    try:
+        content = "".join(c.content for c in model.stream("你好", config={"callbacks": [Recorder()]}))
+    finally:
+        asyncio.run(close_http_clients())
+    assert content == "你好，世界"
+    assert tokens == ["你", "好，", "世界"]
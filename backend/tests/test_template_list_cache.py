@@ -0,0 +1,81 @@
+"""
+模板列表缓存测试
+"""
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import get_db  # noqa: F401  先加载数据库模块，避免循环导入
+from app.api.v1 import templates
+from app.models.template import ContentTemplate
+from app.utils.cache import Cache
+
+
+@pytest.fixture
+def db(sqlite_engine):
+    session = sessionmaker(bind=sqlite_engine)()
+    yield session
+    session.close()
+    Cache.invalidate_tags("templates:list")
+
+
+def _list(db, user_id, **params):
+    query = dict(skip=0, limit=50, platform=None, category=None, style=None, is_system=None, search=None)
+    query.update(params)
+    return templates.get_templates(db=db, current_user=SimpleNamespace(id=user_id), **query)
+
+
+def test_default_page_is_cached(db, monkeypatch):
+    """测试默认分页第一页命中缓存，同一用户第二次不再查库"""
+    calls = []
+    original = templates._query_templates
+
+    def counting(*args, **kwargs):
+        calls.append(args[1:])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(templates, "_query_templates", counting)
+
+    _list(db, 101, platform="wechat")
+    _list(db, 101, platform="wechat")
+    assert len(calls) == 1
+    assert Cache.get("templates:list:101:wechat:None:None") is not None
+
+
+@pytest.mark.parametrize("params", [
+    {"search": "周报"},
+    {"skip": 50},
+    {"limit": 10},
+    {"style": "幽默"},
+    {"platform": "unknown"},
+    {"category": "unknown"},
+])
+def test_unbounded_params_skip_cache(db, monkeypatch, params):
+    """测试搜索、翻页和未知筛选值直接查库，不写入缓存"""
+    calls = []
+    original = templates._query_templates
+
+    def counting(*args, **kwargs):
+        calls.append(args[1:])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(templates, "_query_templates", counting)
+    monkeypatch.setattr(templates, "_list_templates", None)
+
+    _list(db, 102, **params)
+    _list(db, 102, **params)
+    assert len(calls) == 2
+
+
+def test_search_filters_results(db):
+    """测试不走缓存的搜索仍按关键词过滤"""
+    db.add(ContentTemplate(name="周报模板", platform="ppt", category="report", is_system=True,
+                           styles={}))
+    db.add(ContentTemplate(name="故事模板", platform="wechat", category="story", is_system=True,
+                           styles={}))
+    db.commit()
+
+    result = _list(db, 103, search="周报")
+    assert result.total == 1
+    assert result.items[0].name == "周报模板"
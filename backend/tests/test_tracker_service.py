@@ -0,0 +1,121 @@
+"""
+埋点缓存服务测试（异步版本，fakeredis）
+"""
+import asyncio
+
+import fakeredis
+import pytest
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.models.traffic import PageView  # noqa: F401  建表
+from app.services import tracker_service as tracker_module
+from app.services.tracker_service import AsyncTrackerService, TrackerService
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(tracker_module.time, "monotonic", clock.monotonic)
+    return clock
+
+
+@pytest.fixture
+def redis_up(monkeypatch):
+    """可切换的异步 Redis：up 为 False 时所有命令抛出连接错误"""
+    server = fakeredis.FakeServer()
+    async_client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    state = {"up": True, "calls": 0}
+
+    class Broken:
+        def __getattr__(self, name):
+            raise ConnectionError("redis down")
+
+    def get_async_redis():
+        state["calls"] += 1
+        return async_client if state["up"] else Broken()
+
+    monkeypatch.setattr(tracker_module, "get_async_redis", get_async_redis)
+    state["sync"] = fakeredis.FakeRedis(server=server, decode_responses=True)
+    return state
+
+
+@pytest.fixture
+def tracker(monkeypatch, redis_up, sqlite_engine):
+    monkeypatch.setattr(settings, "DATABASE_URL", str(sqlite_engine.url))
+    fallback = TrackerService.__new__(TrackerService)
+    fallback.redis_client = redis_up["sync"]
+    return AsyncTrackerService(fallback)
+
+
+def _page_view(session_id="s1", path="/"):
+    return {"path": path, "session_id": session_id, "user_id": None, "ip_address": "127.0.0.1",
+            "user_agent": "pytest", "referer": None}
+
+
+def test_async_writes_are_read_by_sync_consumer(tracker, redis_up):
+    """测试异步写入的记录由同步版本的定时任务读取"""
+    async def main():
+        record_id = await tracker.cache_page_view(_page_view())
+        assert await tracker.update_page_views(
+            [{"page_view_id": record_id, "stay_duration": 12, "max_scroll_depth": 80}]
+        ) == 1
+        assert await tracker.cache_user_events([{"event_type": "click"}, {"event_type": "scroll"}]) == 2
+        stats = await tracker.get_stats()
+        return record_id, stats
+
+    record_id, stats = asyncio.run(main())
+    assert stats == {"status": "ok", "page_views": 1, "events": 2, "updates": 1}
+
+    consumer = tracker._fallback
+    assert [pv["id"] for pv in consumer.get_cached_page_views()] == [record_id]
+    assert consumer.get_cached_page_view_updates()[0]["stay_duration"] == 12
+    assert {e["event_type"] for e in consumer.get_cached_user_events()} == {"click", "scroll"}
+    assert asyncio.run(tracker.update_page_views([])) == 0
+
+
+def test_redis_error_falls_back_to_db_and_cools_down(tracker, redis_up, clock, sqlite_engine):
+    """测试 Redis 出错后页面访问直接写数据库，冷却期内不再访问 Redis，冷却结束后恢复"""
+    redis_up["up"] = False
+
+    async def write(session_id):
+        return await tracker.cache_page_view(_page_view(session_id))
+
+    assert asyncio.run(write("s1")) == "db_stored"
+    calls = redis_up["calls"]
+
+    # 冷却期内：页面访问写库，其余写入直接放弃，不再尝试 Redis
+    redis_up["up"] = True
+    clock.now += AsyncTrackerService.UNAVAILABLE_COOLDOWN - 1
+    assert asyncio.run(write("s2")) == "db_stored"
+    assert asyncio.run(tracker.cache_user_events([{"event_type": "click"}])) == 0
+    assert asyncio.run(tracker.get_stats())["status"] == "redis_unavailable"
+    assert redis_up["calls"] == calls
+
+    with sqlite_engine.connect() as conn:
+        rows = conn.execute(text("SELECT session_id FROM page_views ORDER BY id")).scalars().all()
+    assert rows == ["s1", "s2"]
+
+    # 冷却结束后恢复写入 Redis
+    clock.now += 2
+    assert asyncio.run(write("s3")).startswith("pv_")
+    assert asyncio.run(tracker.get_stats())["page_views"] == 1
+
+
+def test_batch_errors_start_cooldown(tracker, redis_up, clock):
+    """测试批量写入和统计出错同样进入冷却"""
+    redis_up["up"] = False
+    assert asyncio.run(tracker.cache_user_events([{"event_type": "click"}])) == 0
+    assert not tracker._available()
+
+    clock.now += AsyncTrackerService.UNAVAILABLE_COOLDOWN
+    assert asyncio.run(tracker.get_stats())["status"] == "error"
+    assert not tracker._available()